@@ -19,8 +19,10 @@ from .region import LegacyRegion as Region
 
 from .services.storage.bucket import BucketManager, build_batch_copy, build_batch_rename, build_batch_move, \
     build_batch_stat, build_batch_delete, build_batch_restoreAr, build_batch_restore_ar
+from .services.storage.batch_executor import BatchExecutor, BatchOpResult
+from .services.storage.downloader import Downloader, DownloadResult, DownloadError, ObjectReader
 from .services.storage.uploader import put_data, put_file, put_file_v2, put_stream, put_stream_v2
-from .services.storage.upload_progress_recorder import UploadProgressRecorder
+from .services.storage.upload_progress_recorder import UploadProgressRecorder, SQLiteUploadProgressRecorder
 from .services.cdn.manager import CdnManager, DataType, create_timestamp_anti_leech_url, DomainManager
 from .services.processing.pfop import PersistentFop
 from .services.processing.cmd import build_op, pipe_cmd, op_save
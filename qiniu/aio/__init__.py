@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+The asyncio counterparts of the http client, uploaders and bucket manager.
+
+It requires python >= 3.6 and aiohttp, which could be installed by `pip install qiniu[aio]`,
+and it's not imported by `qiniu` package, so the others will not be affected if it's unavailable.
+
+Examples:
+    from qiniu import Auth
+    from qiniu.aio import AsyncBucketManager, AsyncResumeUploaderV2
+
+    async def main():
+        bucket_manager = AsyncBucketManager(Auth(access_key, secret_key))
+        ret, info = await bucket_manager.stat(bucket_name, key)
+"""
+from .http import AsyncHTTPClient, aio_qn_http_client, resolve_regions
+from .services.storage import AsyncBucketManager, AsyncFormUploader, AsyncResumeUploaderV2
+
+__all__ = [
+    'AsyncHTTPClient',
+    'aio_qn_http_client',
+    'resolve_regions',
+    'AsyncBucketManager',
+    'AsyncFormUploader',
+    'AsyncResumeUploaderV2'
+]
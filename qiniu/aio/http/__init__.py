@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+from .client import AsyncHTTPClient
+from .default_client import aio_qn_http_client
+from .regions_provider import resolve_regions
+
+__all__ = [
+    'AsyncHTTPClient',
+    'aio_qn_http_client',
+    'resolve_regions'
+]
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import logging
+
+import requests
+
+try:
+    import aiohttp
+    import yarl
+except ImportError:
+    raise ImportError('qiniu.aio requires aiohttp, install it by `pip install qiniu[aio]`')
+
+from qiniu.compat import json
+from qiniu.config import get_default
+from qiniu.http.response import ResponseInfo
+
+from .middleware import compose_middleware
+
+
+class _ResponseAdapter(object):
+    """
+    Adapt the read aiohttp response to the interface of `requests.Response` used by `ResponseInfo`
+    """
+    def __init__(self, resp, content):
+        """
+        Parameters
+        ----------
+        resp: aiohttp.ClientResponse
+        content: bytes
+        """
+        self.url = str(resp.url)
+        self.status_code = resp.status
+        self.headers = resp.headers
+        self.content = content
+        self.encoding = resp.charset
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncHTTPClient(object):
+    """
+    The asyncio counterpart of `qiniu.http.client.HTTPClient`.
+
+    Requests are built and signed as `requests.Request` exactly like the sync client,
+    so the middlewares and `requests.auth.AuthBase` could work in the same way,
+    then sent by a `aiohttp.ClientSession` which is created lazily for each event loop.
+    """
+    def __init__(self, middlewares=None, send_opts=None, connector_opts=None):
+        """
+        Args:
+            middlewares (list[qiniu.aio.http.middleware.Middleware]):
+            send_opts (dict): 将作为其他参数直接透传给 session.request 方法
+            connector_opts (dict): 创建 aiohttp.TCPConnector 的参数，例如 limit、limit_per_host
+        """
+        self.middlewares = [] if middlewares is None else middlewares
+        self.send_opts = {} if send_opts is None else send_opts
+        self.connector_opts = {} if connector_opts is None else connector_opts
+
+        # event loop -> aiohttp.ClientSession, the session can't be shared among loops
+        self._sessions = {}
+
+    @property
+    def session(self):
+        """
+        The session bound to the running event loop. It must be accessed in a coroutine.
+
+        Returns:
+            aiohttp.ClientSession
+        """
+        loop = asyncio.get_event_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**self.connector_opts)
+            )
+            self._sessions[loop] = session
+        return session
+
+    async def _close_stale_sessions(self):
+        """
+        Close the sessions of the closed event loops, such as each `asyncio.run` creates a new loop,
+        otherwise they are dropped unclosed with warnings.
+        """
+        # copy the items, the client may be shared by the loops in other threads
+        for loop, session in list(self._sessions.items()):
+            if not loop.is_closed() or self._sessions.pop(loop, None) is None:
+                continue
+            # the connector only marks itself closed since its loop is closed, it's safe to await here
+            await session.close()
+
+    async def close(self):
+        """
+        Close the sessions of the running and closed event loops,
+        the ones of the other alive loops should be closed in their own loops.
+        """
+        await self._close_stale_sessions()
+        session = self._sessions.pop(asyncio.get_event_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _wrap_send(self, req, **kwargs):
+        # compatibility with setting timeout by qiniu.config.set_default
+        timeout = kwargs.pop('timeout', get_default('connection_timeout'))
+        if not isinstance(timeout, aiohttp.ClientTimeout):
+            connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            timeout = aiohttp.ClientTimeout(
+                sock_connect=connect_timeout,
+                sock_read=read_timeout
+            )
+
+        await self._close_stale_sessions()
+        prepared = req.prepare()
+        async with self.session.request(
+            prepared.method,
+            # the url has been encoded and maybe signed, so keep it as is
+            yarl.URL(prepared.url, encoded=True),
+            data=prepared.body,
+            headers=prepared.headers,
+            timeout=timeout,
+            **kwargs
+        ) as resp:
+            content = await resp.read()
+        return ResponseInfo(_ResponseAdapter(resp, content), None)
+
+    async def send_request(self, request, middlewares=None, **kwargs):
+        """
+
+        Args:
+            request (requests.Request):
+                requests.Request 对象
+
+            middlewares (list[qiniu.aio.http.middleware.Middleware] or (list) -> list):
+                仅对本次请求生效的中间件，用法同 qiniu.http.client.HTTPClient.send_request
+
+            kwargs:
+                将作为其他参数直接透传给 session.request 方法
+
+
+        Returns:
+            (dict, ResponseInfo): 可拆包的一个元组。
+            第一个元素为响应体的 dict，若响应体为 json 的话。
+            第二个元素为包装过的响应内容，包括了更多的响应内容。
+
+        """
+
+        # set default values
+        middlewares = [] if middlewares is None else middlewares
+
+        # join middlewares and client middlewares
+        mw_ls = []
+        if callable(middlewares):
+            mw_ls = middlewares(self.middlewares.copy())
+        elif isinstance(middlewares, list):
+            mw_ls = self.middlewares + middlewares
+
+        # send request
+        try:
+            handle = compose_middleware(
+                mw_ls,
+                lambda req: self._wrap_send(req, **kwargs)
+            )
+            resp_info = await handle(request)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return None, ResponseInfo(None, e)
+
+        # if ok try dump response info to dict from json
+        if not resp_info.ok():
+            return None, resp_info
+
+        try:
+            ret = resp_info.json()
+        except ValueError:
+            logging.debug("response body decode error: %s" % resp_info.text_body)
+            ret = {}
+        return ret, resp_info
+
+    async def get(
+        self,
+        url,
+        params=None,
+        auth=None,
+        headers=None,
+        middlewares=None,
+        **kwargs
+    ):
+        req = requests.Request(
+            method='get',
+            url=url,
+            params=params,
+            auth=auth,
+            headers=headers
+        )
+        send_opts = self.send_opts.copy()
+        send_opts.update(kwargs)
+        send_opts.setdefault("allow_redirects", True)
+        return await self.send_request(
+            req,
+            middlewares=middlewares,
+            **send_opts
+        )
+
+    async def post(
+        self,
+        url,
+        data,
+        files,
+        auth=None,
+        headers=None,
+        middlewares=None,
+        **kwargs
+    ):
+        req = requests.Request(
+            method='post',
+            url=url,
+            data=data,
+            files=files,
+            auth=auth,
+            headers=headers
+        )
+        send_opts = self.send_opts.copy()
+        send_opts.update(kwargs)
+        return await self.send_request(
+            req,
+            middlewares=middlewares,
+            **send_opts
+        )
+
+    async def put(
+        self,
+        url,
+        data,
+        files,
+        auth=None,
+        headers=None,
+        middlewares=None,
+        **kwargs
+    ):
+        req = requests.Request(
+            method='put',
+            url=url,
+            data=data,
+            files=files,
+            auth=auth,
+            headers=headers
+        )
+        send_opts = self.send_opts.copy()
+        send_opts.update(kwargs)
+        return await self.send_request(
+            req,
+            middlewares=middlewares,
+            **send_opts
+        )
+
+    async def delete(
+        self,
+        url,
+        params,
+        auth=None,
+        headers=None,
+        middlewares=None,
+        **kwargs
+    ):
+        req = requests.Request(
+            method='delete',
+            url=url,
+            params=params,
+            auth=auth,
+            headers=headers
+        )
+        send_opts = self.send_opts.copy()
+        send_opts.update(kwargs)
+        return await self.send_request(
+            req,
+            middlewares=middlewares,
+            **send_opts
+        )
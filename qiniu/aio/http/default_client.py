@@ -0,0 +1,10 @@
+from qiniu import __version__
+
+from .client import AsyncHTTPClient
+from .middleware import UserAgentMiddleware
+
+aio_qn_http_client = AsyncHTTPClient(
+    middlewares=[
+        UserAgentMiddleware(__version__)
+    ]
+)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+from qiniu.compat import urlparse
+from qiniu.http.middleware import (  # noqa
+    compose_middleware,
+    UserAgentMiddleware,
+    RetryDomainsMiddleware as _RetryDomainsMiddleware
+)
+
+
+class Middleware:
+    """
+    The async counterpart of `qiniu.http.middleware.Middleware`.
+
+    `compose_middleware` is shared with the sync client,
+    so a sync middleware which only returns `nxt(request)`, such as `UserAgentMiddleware`,
+    could be used by the async client directly.
+    """
+    async def __call__(self, request, nxt):
+        """
+        Args:
+            request (requests.Request):
+            nxt ((requests.Request) -> Awaitable[qiniu.http.response.ResponseInfo]):
+
+        Returns:
+            qiniu.http.response.ResponseInfo:
+
+        """
+        raise NotImplementedError('{0}.__call__ method is not implemented yet'.format(type(self)))
+
+
+class RetryDomainsMiddleware(_RetryDomainsMiddleware):
+    @staticmethod
+    async def _try_nxt(request, nxt):
+        resp = None
+        err = None
+        try:
+            resp = await nxt(request)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            err = e
+        return resp, err
+
+    async def __call__(self, request, nxt):
+        resp_info, err = None, None
+        url_parse_result = urlparse(request.url)
+
+        for backup_domain in [str(url_parse_result.hostname)] + self.backup_domains:
+            request.url = RetryDomainsMiddleware._get_changed_url(request.url, backup_domain)
+            self.retried_times = 0
+
+            while self.retried_times < self.max_retry_times:
+                resp_info, err = await RetryDomainsMiddleware._try_nxt(request, nxt)
+                self.retried_times += 1
+                if not self._should_retry(resp_info, request):
+                    if err is not None:
+                        raise err
+                    return resp_info
+
+        if err is not None:
+            raise err
+
+        return resp_info
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import weakref
+
+from qiniu.http.regions_provider import CachedRegionsProvider
+
+# the in-flight resolving of each event loop, `{loop: {cache_key: asyncio.Future}}`
+_resolving_by_loop = weakref.WeakKeyDictionary()
+
+
+async def resolve_regions(regions_provider, executor=None):
+    """
+    Resolve the regions without blocking the event loop.
+
+    The regions are returned directly if they are a list or hit the memo cache of `CachedRegionsProvider`.
+    Otherwise, the provider is iterated in the executor, which may read the cache file or query regions,
+    and the concurrent resolving of the same `CachedRegionsProvider.cache_key` is merged into one.
+
+    Parameters
+    ----------
+    regions_provider: Iterable[Region]
+    executor: concurrent.futures.Executor, optional
+        the default executor of event loop is used if not provided
+
+    Returns
+    -------
+    list[Region]
+    """
+    if isinstance(regions_provider, (list, tuple)):
+        return list(regions_provider)
+
+    loop = asyncio.get_event_loop()
+    if not isinstance(regions_provider, CachedRegionsProvider):
+        return await loop.run_in_executor(executor, list, regions_provider)
+
+    regions = regions_provider.peek_regions()
+    if regions:
+        return list(regions)
+
+    cache_key = regions_provider.cache_key
+    resolving = _resolving_by_loop.setdefault(loop, {})
+    ftr = resolving.get(cache_key)
+    if ftr is None:
+        ftr = loop.run_in_executor(executor, list, regions_provider)
+        resolving[cache_key] = ftr
+
+        def _on_done(f):
+            if resolving.get(cache_key) is f:
+                del resolving[cache_key]
+
+        ftr.add_done_callback(_on_done)
+
+    # shield it, the cancellation of one caller should not affect the others
+    regions = await asyncio.shield(ftr)
+    return list(regions)
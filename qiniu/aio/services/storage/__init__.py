@@ -0,0 +1,8 @@
+from .bucket import AsyncBucketManager
+from .uploaders import AsyncFormUploader, AsyncResumeUploaderV2
+
+__all__ = [
+    'AsyncBucketManager',
+    'AsyncFormUploader',
+    'AsyncResumeUploaderV2'
+]
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+from qiniu.auth import QiniuMacRequestsAuth
+from qiniu.http.endpoint_health import default_endpoint_health_tracker
+from qiniu.http.region import ServiceName
+from qiniu.utils import urlsafe_base64_encode, entry, decode_entry
+from qiniu.services.storage.bucket import BucketManager
+from qiniu.services.storage._bucket_default_retrier import get_default_retrier
+
+from qiniu.aio.http import aio_qn_http_client, resolve_regions
+
+
+class AsyncBucketManager(object):
+    """空间管理类的 asyncio 版本
+
+    接口的参数及返回值与 BucketManager 的同名方法一致，区别在于均为协程，
+    区域信息的查询也不会阻塞事件循环。
+
+    Examples:
+        bucket_manager = AsyncBucketManager(auth)
+        ret, info = await bucket_manager.stat(bucket, key)
+
+    Attributes:
+        auth: 账号管理密钥对，Auth对象
+        http_client: AsyncHTTPClient 对象
+    """
+
+    def __init__(
+        self,
+        auth,
+        zone=None,
+        regions=None,
+        query_regions_endpoints=None,
+        preferred_scheme='http',
+        http_client=None,
+        endpoint_health_tracker=default_endpoint_health_tracker
+    ):
+        """
+        Parameters
+        ----------
+        auth: Auth
+        zone: LegacyRegion
+        regions: list[Region]
+        query_regions_endpoints: list[Endpoint]
+        preferred_scheme: str, default='http'
+        http_client: AsyncHTTPClient, default=aio_qn_http_client
+        endpoint_health_tracker: EndpointHealthTracker, default=default_endpoint_health_tracker
+        """
+        # reuse the regions resolving of sync version
+        self._bucket_manager = BucketManager(
+            auth,
+            zone=zone,
+            regions=regions,
+            query_regions_endpoints=query_regions_endpoints,
+            preferred_scheme=preferred_scheme,
+            endpoint_health_tracker=endpoint_health_tracker
+        )
+        self.auth = auth
+        self.mac_auth = self._bucket_manager.mac_auth
+        self.preferred_scheme = preferred_scheme
+        self.http_client = http_client if http_client is not None else aio_qn_http_client
+
+    async def list(self, bucket, prefix=None, marker=None, limit=None, delimiter=None):
+        """前缀查询，参数及返回值同 BucketManager.list
+
+        Returns:
+            一个dict变量，一个EOF信息，一个ResponseInfo对象
+        """
+        options = {
+            'bucket': bucket,
+        }
+        if marker is not None:
+            options['marker'] = marker
+        if limit is not None:
+            options['limit'] = limit
+        if prefix is not None:
+            options['prefix'] = prefix
+        if delimiter is not None:
+            options['delimiter'] = delimiter
+
+        ret, info = await self.__server_do_with_retrier(
+            bucket,
+            [ServiceName.RSF],
+            '/list',
+            data=options,
+            method='GET'
+        )
+
+        eof = False
+        if ret and not ret.get('marker'):
+            eof = True
+
+        return ret, eof, info
+
+    async def stat(self, bucket, key):
+        """获取文件信息，参数及返回值同 BucketManager.stat"""
+        resource = entry(bucket, key)
+        return await self.__server_do_with_retrier(
+            bucket,
+            [ServiceName.RS],
+            '/stat/{0}'.format(resource)
+        )
+
+    async def delete(self, bucket, key):
+        """删除文件，参数及返回值同 BucketManager.delete"""
+        resource = entry(bucket, key)
+        return await self.__server_do_with_retrier(
+            bucket,
+            [ServiceName.RS],
+            '/delete/{0}'.format(resource)
+        )
+
+    async def rename(self, bucket, key, key_to, force='false'):
+        """重命名文件，参数及返回值同 BucketManager.rename"""
+        return await self.move(bucket, key, bucket, key_to, force)
+
+    async def move(self, bucket, key, bucket_to, key_to, force='false'):
+        """移动文件，参数及返回值同 BucketManager.move"""
+        src = entry(bucket, key)
+        dst = entry(bucket_to, key_to)
+        return await self.__server_do_with_retrier(
+            bucket,
+            [ServiceName.RS],
+            '/move/{src}/{dst}/force/{force}'.format(
+                src=src,
+                dst=dst,
+                force=force
+            )
+        )
+
+    async def copy(self, bucket, key, bucket_to, key_to, force='false'):
+        """复制文件，参数及返回值同 BucketManager.copy"""
+        src = entry(bucket, key)
+        dst = entry(bucket_to, key_to)
+        return await self.__server_do_with_retrier(
+            bucket,
+            [ServiceName.RS],
+            '/copy/{src}/{dst}/force/{force}'.format(
+                src=src,
+                dst=dst,
+                force=force
+            )
+        )
+
+    async def change_mime(self, bucket, key, mime):
+        """修改文件mimeType，参数及返回值同 BucketManager.change_mime"""
+        resource = entry(bucket, key)
+        encode_mime = urlsafe_base64_encode(mime)
+        return await self.__server_do_with_retrier(
+            bucket,
+            [ServiceName.RS],
+            '/chgm/{0}/mime/{1}'.format(resource, encode_mime)
+        )
+
+    async def change_type(self, bucket, key, storage_type):
+        """修改文件的存储类型，参数及返回值同 BucketManager.change_type"""
+        resource = entry(bucket, key)
+        return await self.__server_do_with_retrier(
+            bucket,
+            [ServiceName.RS],
+            '/chtype/{0}/type/{1}'.format(resource, storage_type)
+        )
+
+    async def delete_after_days(self, bucket, key, days):
+        """更新文件生命周期，参数及返回值同 BucketManager.delete_after_days"""
+        resource = entry(bucket, key)
+        return await self.__server_do_with_retrier(
+            bucket,
+            [ServiceName.RS],
+            '/deleteAfterDays/{0}/{1}'.format(resource, days)
+        )
+
+    async def batch(self, operations):
+        """批量操作，参数及返回值同 BucketManager.batch"""
+        if not operations:
+            # change to ValueError when make break changes version
+            raise Exception('operations is empty')
+        bucket = ''
+        for op in operations:
+            segments = op.split('/')
+            e = segments[1] if len(segments) >= 2 else ''
+            bucket, _ = decode_entry(e)
+            if bucket:
+                break
+        if not bucket:
+            # change to ValueError when make break changes version
+            raise Exception('bucket is empty')
+
+        return await self.__server_do_with_retrier(
+            bucket,
+            [ServiceName.RS],
+            '/batch',
+            {'op': operations}
+        )
+
+    async def __server_do_with_retrier(self, bucket_name, service_names, url_resource, data=None, method='POST'):
+        """
+        Parameters
+        ----------
+        bucket_name: str
+        service_names: List[ServiceName]
+        url_resource: str
+        data: dict or None
+        method: str
+
+        Returns
+        -------
+        ret: dict or None
+        resp: ResponseInfo
+        """
+        if not service_names:
+            raise ValueError('service_names is empty')
+
+        method = method.upper()
+        if method == 'POST':
+            send_request = self.__post
+        elif method == 'GET':
+            send_request = self.__get
+        else:
+            raise ValueError('"method" must be "POST" or "GET"')
+
+        regions = await resolve_regions(
+            self._bucket_manager._get_regions_provider(bucket_name=bucket_name)
+        )
+        retrier = get_default_retrier(
+            regions_provider=regions,
+            service_names=service_names,
+            endpoint_health_tracker=self._bucket_manager.endpoint_health_tracker,
+            retry_budget=self._bucket_manager.retry_budget
+        )
+
+        attempt = None
+        for attempt in retrier:
+            with attempt:
+                host = attempt.context.get('endpoint').get_value(scheme=self.preferred_scheme)
+                url = host + url_resource
+                attempt.result = await send_request(url, data)
+                ret, resp = attempt.result
+                if resp.ok() and ret:
+                    return attempt.result
+                if not resp.need_retry():
+                    return attempt.result
+
+        if attempt is None:
+            raise RuntimeError('Retrier is not working. attempt is None')
+
+        return attempt.result
+
+    async def __post(self, url, data=None):
+        ret, resp = await self.http_client.post(
+            url,
+            data=data,
+            files=None,
+            auth=QiniuMacRequestsAuth(self.mac_auth)
+        )
+        return _legacy_result(ret, resp)
+
+    async def __get(self, url, params=None):
+        ret, resp = await self.http_client.get(
+            url,
+            params=params,
+            auth=QiniuMacRequestsAuth(self.mac_auth)
+        )
+        return _legacy_result(ret, resp)
+
+
+def _legacy_result(ret, resp):
+    """
+    keep the results same as `BucketManager`, which is sent by `qiniu.http._post`
+
+    Parameters
+    ----------
+    ret: dict or None
+    resp: ResponseInfo
+
+    Returns
+    -------
+    ret: dict or None
+    resp: ResponseInfo
+    """
+    if resp.status_code != 200 or resp.req_id is None:
+        return None, resp
+    return ret, resp
@@ -0,0 +1,7 @@
+from .form_uploader import AsyncFormUploader
+from .resume_uploader_v2 import AsyncResumeUploaderV2
+
+__all__ = [
+    'AsyncFormUploader',
+    'AsyncResumeUploaderV2'
+]
@@ -0,0 +1,201 @@
+import asyncio
+from os import path
+
+from qiniu.utils import b, crc32
+from qiniu.auth import Auth
+from qiniu.services.storage.uploaders import FormUploader
+from qiniu.services.storage.uploaders._default_retrier import get_default_retrier
+
+from qiniu.aio.http import aio_qn_http_client, resolve_regions
+
+
+class AsyncFormUploader(FormUploader):
+    """
+    The asyncio version of `FormUploader`.
+
+    The data is read into memory by the executor of event loop before sending,
+    it's fine for form uploading, which is for the small files.
+    """
+    def __init__(self, bucket_name, **kwargs):
+        """
+        Parameters
+        ----------
+        bucket_name: str
+        kwargs
+            auth, regions, http_client
+        """
+        super(AsyncFormUploader, self).__init__(bucket_name, **kwargs)
+
+        self.http_client = kwargs.get('http_client', None)
+        if self.http_client is None:
+            self.http_client = aio_qn_http_client
+
+    async def upload(
+        self,
+        key,
+        file_path=None,
+        data=None,
+        data_size=None,
+        modify_time=None,
+        part_size=None,
+        mime_type=None,
+        metadata=None,
+        file_name=None,
+        custom_vars=None,
+        **kwargs
+    ):
+        """
+        Parameters and returns are same as `FormUploader.upload`
+        """
+        # check and initial arguments
+        # bucket_name
+        bucket_name = kwargs.get('bucket_name', self.bucket_name)
+
+        # up_token
+        up_token = kwargs.get('up_token', None)
+        if not up_token:
+            up_token = self.get_up_token(**kwargs)
+            access_key = self.auth.get_access_key()
+        else:
+            access_key, _, _ = Auth.up_token_decode(up_token)
+
+        # crc32 from outside
+        crc32_int = kwargs.get('crc32_int', None)
+        # try to get file_name
+        if not file_name and file_path:
+            file_name = path.basename(file_path)
+
+        # must provide file_path or data
+        if not file_path and not data:
+            raise TypeError('Must provide one of file_path or data.')
+        if file_path and data:
+            raise TypeError('Must provide only one of file_path or data.')
+
+        # read data without blocking the event loop
+        loop = asyncio.get_event_loop()
+        content, crc32_of_content = await loop.run_in_executor(
+            None,
+            _read_content,
+            file_path,
+            data,
+            not crc32_int
+        )
+        if not crc32_int:
+            crc32_int = crc32_of_content
+
+        fields = self._get_form_fields(
+            up_token=up_token,
+            key=key,
+            crc32_int=crc32_int,
+            custom_vars=custom_vars,
+            metadata=metadata
+        )
+        return await self.__upload_data_with_retrier(
+            # retrier options
+            access_key=access_key,
+            bucket_name=bucket_name,
+            # upload_data options
+            fields=fields,
+            file_name=file_name,
+            data=content,
+            mime_type=mime_type
+        )
+
+    async def __upload_data_with_retrier(
+        self,
+        access_key,
+        bucket_name,
+        **upload_data_opts
+    ):
+        regions = await resolve_regions(
+            self._get_regions_provider(
+                access_key=access_key,
+                bucket_name=bucket_name
+            )
+        )
+        retrier = get_default_retrier(
+            regions_provider=regions,
+            accelerate_uploading=self.accelerate_uploading,
+            endpoint_health_tracker=self.endpoint_health_tracker,
+            retry_budget=self.retry_budget
+        )
+        attempt = None
+        for attempt in retrier:
+            with attempt:
+                attempt.result = await self.__upload_data(
+                    up_endpoint=attempt.context.get('endpoint'),
+                    **upload_data_opts
+                )
+                ret, resp = attempt.result
+                if resp.ok() and ret:
+                    return attempt.result
+                if not resp.need_retry():
+                    return attempt.result
+
+        if attempt is None:
+            raise RuntimeError('Retrier is not working. attempt is None')
+
+        return attempt.result
+
+    async def __upload_data(
+        self,
+        up_endpoint,
+        fields,
+        file_name,
+        data,
+        mime_type='application/octet-stream'
+    ):
+        """
+        Parameters
+        ----------
+        up_endpoint: Endpoint
+        fields: dict
+        file_name: str
+        data: bytes
+        mime_type: str
+
+        Returns
+        -------
+        ret: dict
+        resp: ResponseInfo
+        """
+        req_url = up_endpoint.get_value(scheme=self.preferred_scheme)
+        if not file_name or not file_name.strip():
+            file_name = 'file_name'
+
+        return await self.http_client.post(
+            url=req_url,
+            data=fields,
+            files={
+                'file': (file_name, data, mime_type)
+            }
+        )
+
+
+def _read_content(file_path, data, with_crc32):
+    """
+    Parameters
+    ----------
+    file_path: str or None
+    data: bytes or str or IOBase or None
+    with_crc32: bool
+
+    Returns
+    -------
+    content: bytes
+    crc32_int: int or None
+    """
+    if file_path:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+    elif isinstance(data, bytes):
+        content = data
+    elif isinstance(data, str):
+        content = b(data)
+    else:
+        content = data.read()
+
+    crc32_int = None
+    if with_crc32:
+        crc32_int = crc32(content)
+    return content, crc32_int
@@ -0,0 +1,664 @@
+import asyncio
+import functools
+import hashlib
+import math
+from io import BytesIO
+from os import path
+from threading import Lock
+from time import time
+
+from qiniu.auth import Auth
+from qiniu.compat import json
+from qiniu.http import ResponseInfo
+from qiniu.http.endpoint import Endpoint
+from qiniu.utils import b
+from qiniu.services.storage.uploaders import ResumeUploaderV2
+from qiniu.services.storage.uploaders.io_chunked import read_chunk
+from qiniu.services.storage.uploaders.resume_uploader_v2 import _ResumeUploadV2Part
+from qiniu.services.storage.uploaders._default_retrier import ProgressRecord, get_default_retrier
+
+from qiniu.aio.http import aio_qn_http_client, resolve_regions
+
+
+class AsyncResumeUploaderV2(ResumeUploaderV2):
+    """
+    The asyncio version of `ResumeUploaderV2`, and the upload records are compatible with it.
+
+    The parts are uploaded concurrently on the event loop, limited by `max_concurrent_workers`.
+    Reading the parts is running in `concurrent_executor`,
+    so the file I/O and computing md5 will not block the event loop.
+    The parts are uploaded sequentially if `concurrent_executor` is set to None explicitly.
+    """
+    def __init__(self, bucket_name, **kwargs):
+        """
+        Parameters
+        ----------
+        bucket_name: str
+        kwargs
+            the same as `ResumeUploaderBase` and http_client
+        """
+        super(AsyncResumeUploaderV2, self).__init__(bucket_name, **kwargs)
+
+        self.max_concurrent_workers = kwargs.get('max_concurrent_workers', 3)
+
+        self.http_client = kwargs.get('http_client', None)
+        if self.http_client is None:
+            self.http_client = aio_qn_http_client
+
+    async def initial_parts(
+        self,
+        up_token,
+        key,
+        file_path=None,
+        data=None,
+        data_size=None,
+        modify_time=None,
+        part_size=None,
+        file_name=None,
+        up_endpoint=None,
+        **kwargs
+    ):
+        """
+        Parameters and returns are same as `ResumeUploaderV2.initial_parts`
+        """
+        # -- check and initial arguments
+        # must provide file_path or data
+        if not file_path and not data:
+            raise TypeError('Must provide one of file_path or data.')
+        if file_path and data:
+            raise TypeError('Must provide only one of file_path or data.')
+
+        # data must has length
+        if not file_path and not data_size:
+            raise TypeError('Must provide size if use data.')
+
+        if not modify_time:
+            if file_path:
+                modify_time = int(path.getmtime(file_path))
+            else:
+                modify_time = int(time())
+
+        if not part_size:
+            part_size = self.part_size
+
+        # -- initial context
+        if not file_name and file_path:
+            file_name = path.basename(file_path)
+        # reading the upload record is file or database I/O, so keep it off the event loop
+        context = await _run_blocking(
+            self._initial_context,
+            key=key,
+            file_name=file_name,
+            modify_time=modify_time,
+            part_size=part_size
+        )
+
+        if (
+            context.up_hosts and
+            context.upload_id and
+            context.expired_at
+        ):
+            return context, None
+
+        # -- get a new upload id
+        if not context.up_hosts and up_endpoint:
+            context.up_hosts.extend([up_endpoint.get_value(scheme=self.preferred_scheme)])
+
+        if not context.up_hosts:
+            access_key, _, _ = Auth.up_token_decode(up_token)
+            loop = asyncio.get_event_loop()
+            context.up_hosts.extend(
+                await loop.run_in_executor(None, self._get_up_hosts, access_key)
+            )
+
+        bucket_name = Auth.get_bucket_name(up_token)
+
+        resp = None
+        for up_host in context.up_hosts:
+            url = self._get_url_for_upload(
+                up_host,
+                bucket_name,
+                key
+            )
+            ret, resp = await self.http_client.post(
+                url=url,
+                data='',
+                files=None,
+                headers={
+                    'Authorization': 'UpToken {}'.format(up_token)
+                }
+            )
+            if not resp.ok() and not resp.need_retry():
+                break
+            if resp.ok() and ret:
+                context = context._replace(
+                    upload_id=ret.get('uploadId', ''),
+                    expired_at=ret.get('expireAt', 0)
+                )
+                break
+
+        return context, resp
+
+    async def upload_parts(
+        self,
+        up_token,
+        data,
+        data_size,
+        context,
+        **kwargs
+    ):
+        """
+        Parameters and returns are same as `ResumeUploaderV2.upload_parts`
+        """
+        # initial arguments
+        chunk_list = self.gen_chunk_list(
+            size=data_size,
+            chunk_size=context.part_size,
+            uploaded_chunk_no_list=[
+                p.part_no for p in context.parts
+            ]
+        )
+        up_hosts = list(context.up_hosts)
+        file_name = kwargs.get('file_name', None)
+        key = kwargs.get('key', None)
+        up_token_provider = kwargs.get('up_token_provider', None)
+
+        # initial upload state
+        part, resp = None, None
+        uploaded_size = context.part_size * len(context.parts)
+        if math.ceil(data_size / context.part_size) in [p.part_no for p in context.parts]:
+            # if last part uploaded, should correct the uploaded size
+            uploaded_size += (data_size % context.part_size) - context.part_size
+        lock = Lock()
+
+        upload_part = functools.partial(
+            self.__upload_part,
+            data=data,
+            up_hosts=up_hosts,
+            up_token=up_token,
+            upload_id=context.upload_id,
+            key=key,
+            lock=lock,
+            etag_calculator=context.etag_calculator,
+            up_token_provider=up_token_provider
+        )
+
+        if not self.concurrent_executor:
+            # upload sequentially
+            for chunk in chunk_list:
+                part, resp = await upload_part(chunk_info=chunk)
+                if not resp.ok():
+                    return None, resp
+                context.parts.append(part)
+                uploaded_size += chunk.chunk_size
+                await self.__progress_handler(
+                    file_name=file_name,
+                    key=key,
+                    context=context,
+                    uploaded_size=uploaded_size,
+                    total_size=data_size
+                )
+            return part, resp
+
+        # upload concurrently
+        semaphore = asyncio.Semaphore(self.max_concurrent_workers)
+
+        async def upload_part_limited(chunk_info):
+            async with semaphore:
+                chunk_part, chunk_resp = await upload_part(chunk_info=chunk_info)
+            return chunk_info, chunk_part, chunk_resp
+
+        tasks = [
+            asyncio.ensure_future(upload_part_limited(chunk))
+            for chunk in chunk_list
+        ]
+
+        first_failed_resp = None
+        try:
+            for task in asyncio.as_completed(tasks):
+                try:
+                    chunk, part, resp = await task
+                except asyncio.CancelledError:
+                    raise
+                except Exception as err:
+                    first_failed_resp = ResponseInfo(None, err)
+                    break
+                if not part:
+                    first_failed_resp = resp
+                    break
+                context.parts.append(part)
+                uploaded_size += chunk.chunk_size
+                await self.__progress_handler(
+                    file_name=file_name,
+                    key=key,
+                    context=context,
+                    uploaded_size=uploaded_size,
+                    total_size=data_size
+                )
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        if first_failed_resp:
+            return None, first_failed_resp
+
+        return part, resp
+
+    async def __progress_handler(
+        self,
+        file_name,
+        key,
+        context,
+        uploaded_size,
+        total_size
+    ):
+        """
+        The same as `ResumeUploaderV2._progress_handler`,
+        but the record is written in the default executor to keep the file or database I/O off the event loop
+        """
+        await _run_blocking(self._set_to_record, file_name, key, context)
+        if not callable(self.progress_handler):
+            return
+        try:
+            self.progress_handler(uploaded_size, total_size)
+        except Exception as err:
+            err.no_need_retry = True
+            raise err
+
+    async def complete_parts(
+        self,
+        up_token,
+        data_size,
+        context,
+        **kwargs
+    ):
+        """
+        Parameters and returns are same as `ResumeUploaderV2.complete_parts`
+        """
+        key = kwargs.get('key', None)
+        file_name = kwargs.get('file_name', None)
+        mime_type = kwargs.get('mime_type', None)
+        params = kwargs.get('params', None)
+        metadata = kwargs.get('metadata', None)
+        up_token_provider = kwargs.get('up_token_provider', None)
+        if up_token_provider:
+            up_token = up_token_provider()
+
+        # sort contexts
+        sorted_parts = sorted(context.parts, key=lambda part: part.part_no)
+
+        bucket_name = Auth.get_bucket_name(up_token)
+
+        ret, resp = None, None
+        for up_host in context.up_hosts:
+            url = self._get_url_for_upload(
+                up_host,
+                bucket_name,
+                key,
+                upload_id=context.upload_id
+            )
+            data = {
+                'parts': [
+                    {
+                        'etag': p.etag,
+                        'partNumber': p.part_no
+                    }
+                    for p in sorted_parts
+                ],
+                'fname': file_name,
+                'mimeType': mime_type,
+                'customVars': params,
+                'metadata': metadata
+            }
+            ret, resp = await self.http_client.post(
+                url=url,
+                data=json.dumps(data),
+                files=None,
+                headers={
+                    'Content-Type': 'application/json',
+                    'Authorization': 'UpToken {}'.format(up_token)
+                }
+            )
+            if resp.ok() or not resp.need_retry():
+                break
+        await _run_blocking(
+            self._try_delete_record,
+            file_name,
+            key,
+            context,
+            resp
+        )
+        return self._verify_etag(context, ret, resp)
+
+    async def upload(
+        self,
+        key,
+        file_path=None,
+        data=None,
+        data_size=None,
+
+        part_size=None,
+        modify_time=None,
+        mime_type=None,
+        metadata=None,
+        file_name=None,
+        custom_vars=None,
+        **kwargs
+    ):
+        """
+        Parameters and returns are same as `ResumeUploaderV2.upload`
+        """
+        # up_token
+        up_token_opts = dict(
+            (k, kwargs.pop(k))
+            for k in ['bucket_name', 'expired', 'policy', 'strict_policy']
+            if k in kwargs
+        )
+        up_token = kwargs.get('up_token', None)
+        up_token_provider = None
+        if not up_token:
+            # the up token generated by uploader will be renewed during uploading the parts
+            up_token_provider = functools.partial(self.get_up_token, **up_token_opts)
+            up_token = up_token_provider()
+            kwargs['up_token'] = up_token
+            access_key = self.auth.get_access_key()
+        else:
+            access_key, _, _ = Auth.up_token_decode(up_token)
+
+        # bucket_name
+        kwargs['bucket_name'] = Auth.get_bucket_name(up_token)
+
+        # file_name
+        if not file_name and file_path:
+            file_name = path.basename(file_path)
+
+        # upload
+        return await self.__upload_with_retrier(
+            access_key=access_key,
+            key=key,
+            file_path=file_path,
+            file_name=file_name,
+            data=data,
+            data_size=data_size,
+            part_size=part_size,
+            modify_time=modify_time,
+            mime_type=mime_type,
+            custom_vars=custom_vars,
+            metadata=metadata,
+            up_token_provider=up_token_provider,
+            **kwargs
+        )
+
+    async def __upload_with_retrier(
+        self,
+        access_key,
+        bucket_name,
+        **upload_opts
+    ):
+        file_name = upload_opts.get('file_name', None)
+        key = upload_opts.get('key', None)
+        modify_time = upload_opts.get('modify_time', None)
+        part_size = upload_opts.get('part_size', self.part_size)
+
+        context = await _run_blocking(
+            self._initial_context,
+            key=key,
+            file_name=file_name,
+            modify_time=modify_time,
+            part_size=part_size
+        )
+        preferred_endpoints = None
+        if context.up_hosts:
+            preferred_endpoints = [
+                Endpoint.from_host(h)
+                for h in context.up_hosts
+            ]
+
+        progress_record = None
+        if all(
+            [
+                self.upload_progress_recorder,
+                file_name,
+                key
+            ]
+        ):
+            progress_record = ProgressRecord(
+                upload_api_version='v1',
+                exists=functools.partial(
+                    self.upload_progress_recorder.has_upload_record,
+                    file_name=file_name,
+                    key=key
+                ),
+                delete=functools.partial(
+                    self.upload_progress_recorder.delete_upload_record,
+                    file_name=file_name,
+                    key=key
+                )
+            )
+
+        regions = await resolve_regions(
+            self._get_regions_provider(
+                access_key=access_key,
+                bucket_name=bucket_name
+            )
+        )
+        retrier = get_default_retrier(
+            regions_provider=regions,
+            preferred_endpoints_provider=preferred_endpoints,
+            progress_record=progress_record,
+            accelerate_uploading=self.accelerate_uploading,
+            endpoint_health_tracker=self.endpoint_health_tracker,
+            retry_budget=self.retry_budget
+        )
+
+        attempt = None
+        for attempt in retrier:
+            with attempt:
+                upload_opts['up_endpoint'] = attempt.context.get('endpoint')
+                attempt.result = await self.__upload(
+                    **upload_opts
+                )
+                ret, resp = attempt.result
+                if resp.ok() and ret:
+                    return attempt.result
+                if not resp.need_retry():
+                    return attempt.result
+
+        if attempt is None:
+            raise RuntimeError('Retrier is not working. attempt is None')
+
+        return attempt.result
+
+    async def __upload(
+        self,
+        up_token,
+        key,
+        file_path,
+        file_name,
+        data,
+        data_size,
+        part_size,
+        modify_time,
+        mime_type,
+        custom_vars,
+        metadata,
+        up_endpoint,
+        up_token_provider=None
+    ):
+        # initial_parts
+        context, resp = await self.initial_parts(
+            up_token,
+            key,
+            file_path=file_path,
+            file_name=file_name,
+            data=data,
+            data_size=data_size,
+            modify_time=modify_time,
+            part_size=part_size,
+            up_endpoint=up_endpoint
+        )
+
+        if (
+            not context.up_hosts or
+            not context.upload_id or
+            not context.expired_at
+        ):
+            return None, resp
+
+        # upload parts
+        try:
+            if file_path:
+                data_size = path.getsize(file_path)
+                data = open(file_path, 'rb')
+            elif isinstance(data, bytes):
+                data_size = len(data)
+                data = BytesIO(data)
+            elif isinstance(data, str):
+                data_size = len(data)
+                data = BytesIO(b(data))
+            ret, resp = await self.upload_parts(
+                up_token=up_token,
+                data=data,
+                data_size=data_size,
+                context=context,
+
+                key=key,
+                file_name=file_name,
+                up_token_provider=up_token_provider
+            )
+        finally:
+            if file_path:
+                data.close()
+
+        if resp and not resp.ok():
+            return ret, resp
+
+        # complete parts
+        ret, resp = await self.complete_parts(
+            up_token=up_token,
+            data_size=data_size,
+            context=context,
+
+            key=key,
+            up_token_provider=up_token_provider,
+            mime_type=mime_type,
+            file_name=file_name,
+            params=custom_vars,
+            metadata=metadata
+        )
+
+        return ret, resp
+
+    async def __upload_part(
+        # resort arguments
+        self,
+        data,
+        chunk_info,
+        up_hosts,
+        up_token,
+        upload_id,
+        key,
+        lock,
+        etag_calculator=None,
+        up_token_provider=None
+    ):
+        """
+        Parameters
+        ----------
+        data: IOBase
+        chunk_info: ChunkInfo
+        up_hosts: list[str]
+        up_token: str
+        upload_id: str
+        key: str
+        lock: Lock
+        etag_calculator: EtagV2Calculator
+        up_token_provider: () -> str
+            get the renewed up token if provided
+
+        Returns
+        -------
+        part: _ResumeUploadV2Part
+        resp: ResponseInfo
+        """
+        if not up_hosts:
+            raise ValueError('Must provide on up host at least')
+
+        if up_token_provider:
+            up_token = up_token_provider()
+
+        bucket_name = Auth.get_bucket_name(up_token)
+        if not bucket_name:
+            bucket_name = self.bucket_name
+
+        loop = asyncio.get_event_loop()
+        chunk_data, chunk_md5 = await loop.run_in_executor(
+            self.concurrent_executor,
+            _read_chunk,
+            data,
+            chunk_info,
+            lock,
+            etag_calculator
+        )
+        part, resp = None, None
+        for up_host in up_hosts:
+            url = self._get_url_for_upload(
+                up_host,
+                bucket_name,
+                key,
+                upload_id=upload_id,
+                part_no=chunk_info.chunk_no
+            )
+            ret, resp = await self.http_client.put(
+                url=url,
+                data=chunk_data,
+                files=None,
+                headers={
+                    'Content-Type': 'application/octet-stream',
+                    'Content-MD5': chunk_md5,
+                    'Authorization': 'UpToken {}'.format(up_token)
+                }
+            )
+            if resp.ok() and ret:
+                part = _ResumeUploadV2Part(
+                    part_no=chunk_info.chunk_no,
+                    etag=ret.get('etag', '')
+                )
+                return part, resp
+            if not resp.need_retry():
+                return part, resp
+        return part, resp
+
+
+async def _run_blocking(func, *args, **kwargs):
+    """
+    Run the blocking function, such as reading or writing the upload record, in the default executor
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+def _read_chunk(data, chunk_info, lock, etag_calculator=None):
+    """
+    Parameters
+    ----------
+    data: IOBase
+    chunk_info: ChunkInfo
+    lock: Lock
+    etag_calculator: EtagV2Calculator
+
+    Returns
+    -------
+    chunk_data: bytes
+    chunk_md5: str
+    """
+    chunk_data = read_chunk(
+        base_io=data,
+        chunk_offset=chunk_info.chunk_offset,
+        chunk_size=chunk_info.chunk_size,
+        lock=lock
+    )
+    if etag_calculator:
+        etag_calculator.update_part(chunk_info.chunk_no, chunk_data)
+    return chunk_data, hashlib.md5(chunk_data).hexdigest()
@@ -40,8 +40,9 @@ is_py3 = (_ver[0] == 3)
 # ---------
 
 if is_py2:
-    from urllib import urlencode  # noqa
+    from urllib import urlencode, quote  # noqa
     from urlparse import urlparse  # noqa
+    import Queue as queue  # noqa
     import StringIO
     StringIO = BytesIO = StringIO.StringIO
 
@@ -68,7 +69,8 @@ if is_py2:
             return False
 
 elif is_py3:
-    from urllib.parse import urlparse, urlencode  # noqa
+    from urllib.parse import urlparse, urlencode, quote  # noqa
+    import queue  # noqa
     import io
     StringIO = io.StringIO
     BytesIO = io.BytesIO
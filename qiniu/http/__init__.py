@@ -10,6 +10,7 @@ import qiniu.auth
 
 from .response import ResponseInfo
 from .default_client import qn_http_client, _init_http_adapter
+from .instrumentation import instrument
 
 _sys_info = '{0}; {1}'.format(platform.system(), platform.machine())
 _python_ver = platform.python_version()
@@ -48,9 +49,13 @@ def _post(url, data, files, auth, headers=None):
         if headers is not None:
             for k, v in headers.items():
                 post_headers.update({k: v})
-        r = _session.post(
-            url, data=data, files=files, auth=auth, headers=post_headers,
-            timeout=config.get_default('connection_timeout'))
+        r = instrument(
+            'post',
+            url,
+            lambda: _session.post(
+                url, data=data, files=files, auth=auth, headers=post_headers,
+                timeout=config.get_default('connection_timeout'))
+        )
     except Exception as e:
         return None, ResponseInfo(None, e)
     return __return_wrapper(r)
@@ -64,9 +69,13 @@ def _put(url, data, files, auth, headers=None):
         if headers is not None:
             for k, v in headers.items():
                 post_headers.update({k: v})
-        r = _session.put(
-            url, data=data, files=files, auth=auth, headers=post_headers,
-            timeout=config.get_default('connection_timeout'))
+        r = instrument(
+            'put',
+            url,
+            lambda: _session.put(
+                url, data=data, files=files, auth=auth, headers=post_headers,
+                timeout=config.get_default('connection_timeout'))
+        )
     except Exception as e:
         return None, ResponseInfo(None, e)
     return __return_wrapper(r)
@@ -80,12 +89,16 @@ def _get(url, params, auth, headers=None):
         if headers is not None:
             for k, v in headers.items():
                 get_headers.update({k: v})
-        r = _session.get(
+        r = instrument(
+            'get',
             url,
-            params=params,
-            auth=auth,
-            timeout=config.get_default('connection_timeout'),
-            headers=get_headers)
+            lambda: _session.get(
+                url,
+                params=params,
+                auth=auth,
+                timeout=config.get_default('connection_timeout'),
+                headers=get_headers)
+        )
     except Exception as e:
         return None, ResponseInfo(None, e)
     return __return_wrapper(r)
@@ -170,12 +183,16 @@ def _get_with_qiniu_mac_and_headers(url, params, auth, headers):
         if headers is not None:
             for k, v in headers.items():
                 post_headers.update({k: v})
-        r = requests.get(
+        r = instrument(
+            'get',
             url,
-            params=params,
-            auth=qiniu.auth.QiniuMacRequestsAuth(auth) if auth is not None else None,
-            timeout=config.get_default('connection_timeout'),
-            headers=post_headers)
+            lambda: requests.get(
+                url,
+                params=params,
+                auth=qiniu.auth.QiniuMacRequestsAuth(auth) if auth is not None else None,
+                timeout=config.get_default('connection_timeout'),
+                headers=post_headers)
+        )
     except Exception as e:
         return None, ResponseInfo(None, e)
     return __return_wrapper(r)
@@ -183,12 +200,16 @@ def _get_with_qiniu_mac_and_headers(url, params, auth, headers):
 
 def _delete_with_qiniu_mac(url, params, auth):
     try:
-        r = requests.delete(
+        r = instrument(
+            'delete',
             url,
-            params=params,
-            auth=qiniu.auth.QiniuMacRequestsAuth(auth) if auth is not None else None,
-            timeout=config.get_default('connection_timeout'),
-            headers=_headers)
+            lambda: requests.delete(
+                url,
+                params=params,
+                auth=qiniu.auth.QiniuMacRequestsAuth(auth) if auth is not None else None,
+                timeout=config.get_default('connection_timeout'),
+                headers=_headers)
+        )
     except Exception as e:
         return None, ResponseInfo(None, e)
     return __return_wrapper(r)
@@ -200,12 +221,16 @@ def _delete_with_qiniu_mac_and_headers(url, params, auth, headers):
         if headers is not None:
             for k, v in headers.items():
                 post_headers.update({k: v})
-        r = requests.delete(
+        r = instrument(
+            'delete',
             url,
-            params=params,
-            auth=qiniu.auth.QiniuMacRequestsAuth(auth) if auth is not None else None,
-            timeout=config.get_default('connection_timeout'),
-            headers=post_headers)
+            lambda: requests.delete(
+                url,
+                params=params,
+                auth=qiniu.auth.QiniuMacRequestsAuth(auth) if auth is not None else None,
+                timeout=config.get_default('connection_timeout'),
+                headers=post_headers)
+        )
     except Exception as e:
         return None, ResponseInfo(None, e)
     return __return_wrapper(r)
@@ -6,6 +6,7 @@ import requests
 from qiniu.config import get_default
 from .response import ResponseInfo
 from .middleware import compose_middleware
+from .instrumentation import instrument
 
 
 class HTTPClient:
@@ -18,7 +19,12 @@ class HTTPClient:
         # compatibility with setting timeout by qiniu.config.set_default
         kwargs.setdefault('timeout', get_default('connection_timeout'))
 
-        resp = self.session.send(req.prepare(), **kwargs)
+        prepared_req = req.prepare()
+        resp = instrument(
+            prepared_req.method,
+            prepared_req.url,
+            lambda: self.session.send(prepared_req, **kwargs)
+        )
         return ResponseInfo(resp, None)
 
     def send_request(self, request, middlewares=None, **kwargs):
@@ -1,4 +1,5 @@
 import functools
+import threading
 
 from requests.adapters import HTTPAdapter
 
@@ -26,12 +27,38 @@ def _before_send(func):
 
 qn_http_client.send_request = _before_send(qn_http_client.send_request)
 
+_http_adapter_lock = threading.Lock()
+# the options of the mounted adapter, `(connection_pool, connection_retries)`
+_http_adapter_opts = None
+
+
+def _get_http_adapter_opts():
+    return (
+        config.get_default('connection_pool'),
+        config.get_default('connection_retries')
+    )
+
 
 def _init_http_adapter():
-    # may be optimized:
-    # only called when config changed, not every time before send request
-    adapter = HTTPAdapter(
-        pool_connections=config.get_default('connection_pool'),
-        pool_maxsize=config.get_default('connection_pool'),
-        max_retries=config.get_default('connection_retries'))
-    qn_http_client.session.mount('http://', adapter)
+    """
+    Mount the adapter configured by qiniu.config to the session of default client.
+
+    The adapter is only rebuilt when the pool or retry options changed,
+    so the connections kept by the pool could be reused between requests.
+    """
+    global _http_adapter_opts
+    opts = _get_http_adapter_opts()
+    if opts == _http_adapter_opts:
+        return
+
+    with _http_adapter_lock:
+        if opts == _http_adapter_opts:
+            return
+        pool_size, max_retries = opts
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=max_retries)
+        qn_http_client.session.mount('http://', adapter)
+        qn_http_client.session.mount('https://', adapter)
+        _http_adapter_opts = opts
@@ -0,0 +1,220 @@
+import threading
+import time
+from collections import namedtuple, OrderedDict
+
+
+# use dataclass instead namedtuple if min version of python update to 3.7
+EndpointHealthStats = namedtuple(
+    'EndpointHealthStats',
+    [
+        'host',
+        'latency_ewma',
+        'failure_ewma',
+        'successes',
+        'failures',
+        'consecutive_failures',
+        'circuit_open_until',
+        'score'
+    ]
+)
+
+
+class _EndpointHealth(object):
+    def __init__(self):
+        self.latency_ewma = None
+        self.failure_ewma = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.circuit_open_until = 0
+
+
+class EndpointHealthTracker(object):
+    """
+    Record the latency and failure rate of hosts by EWMA, which are shared by all retriers,
+    and order the endpoints by them.
+
+    A host is circuit broken for `cooldown` seconds after `failure_threshold` consecutive failures,
+    and tried again after that. One more failure breaks it again, and a success closes the circuit.
+    Broken hosts are still tried, but after all the others.
+    """
+
+    def __init__(
+        self,
+        alpha=0.3,
+        failure_threshold=3,
+        cooldown=30,
+        failure_penalty=10,
+        max_hosts=1024
+    ):
+        """
+        Parameters
+        ----------
+        alpha: float
+            the weight of the newest sample in EWMA, in range (0, 1]
+        failure_threshold: int
+            the consecutive failures to open the circuit
+        cooldown: float
+            the seconds the circuit keeps open
+        failure_penalty: float
+            the score is `latency_ewma * (1 + failure_penalty * failure_ewma)`, the lower is the better
+        max_hosts: int
+            the max count of tracked hosts, the least recently updated will be evicted
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError('alpha must be in range (0, 1]')
+        if failure_threshold < 1:
+            raise ValueError('failure_threshold must be greater than 0')
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failure_penalty = failure_penalty
+        self.max_hosts = max_hosts
+
+        self.__hosts = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def record_success(self, host, latency=None):
+        """
+        Parameters
+        ----------
+        host: str
+        latency: float, optional
+            seconds. None if it's unknown, such as the duration of uploading or downloading a body,
+            which depends on the size of the body rather than the host.
+        """
+        with self.__lock:
+            health = self.__get_or_create(host)
+            if latency is not None:
+                if health.latency_ewma is None:
+                    health.latency_ewma = latency
+                else:
+                    health.latency_ewma += self.alpha * (latency - health.latency_ewma)
+            health.failure_ewma -= self.alpha * health.failure_ewma
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.circuit_open_until = 0
+
+    def record_failure(self, host, now=None):
+        """
+        Parameters
+        ----------
+        host: str
+        now: float, optional
+        """
+        if now is None:
+            now = time.time()
+        with self.__lock:
+            health = self.__get_or_create(host)
+            health.failure_ewma += self.alpha * (1 - health.failure_ewma)
+            health.failures += 1
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= self.failure_threshold:
+                health.circuit_open_until = now + self.cooldown
+
+    def is_available(self, host, now=None):
+        """
+        Parameters
+        ----------
+        host: str
+        now: float, optional
+
+        Returns
+        -------
+        bool
+            False if the circuit of the host is open
+        """
+        if now is None:
+            now = time.time()
+        with self.__lock:
+            health = self.__hosts.get(host)
+            return health is None or health.circuit_open_until <= now
+
+    def sort_endpoints(self, endpoints, now=None):
+        """
+        Order the endpoints by the circuit state and the score.
+        The hosts without any sample are scored as the healthy one with the lowest latency,
+        so the original order is kept if there isn't any evidence.
+
+        Parameters
+        ----------
+        endpoints: list[qiniu.http.endpoint.Endpoint]
+        now: float, optional
+
+        Returns
+        -------
+        list[qiniu.http.endpoint.Endpoint]
+            a new list
+        """
+        if len(endpoints) < 2:
+            return list(endpoints)
+        if now is None:
+            now = time.time()
+        with self.__lock:
+            healths = [self.__hosts.get(e.host) for e in endpoints]
+            base_latency = self.__base_latency(healths)
+            keys = [
+                (
+                    h is not None and h.circuit_open_until > now,
+                    self.__score(h, base_latency) if h is not None else base_latency
+                )
+                for h in healths
+            ]
+        # sorted is stable, the endpoints with same key keep the original order
+        order = sorted(range(len(endpoints)), key=lambda i: keys[i])
+        return [endpoints[i] for i in order]
+
+    def stats(self):
+        """
+        Returns
+        -------
+        dict[str, EndpointHealthStats]
+        """
+        with self.__lock:
+            base_latency = self.__base_latency(self.__hosts.values())
+            return dict(
+                (
+                    host,
+                    EndpointHealthStats(
+                        host=host,
+                        latency_ewma=h.latency_ewma,
+                        failure_ewma=h.failure_ewma,
+                        successes=h.successes,
+                        failures=h.failures,
+                        consecutive_failures=h.consecutive_failures,
+                        circuit_open_until=h.circuit_open_until,
+                        score=self.__score(h, base_latency)
+                    )
+                )
+                for host, h in self.__hosts.items()
+            )
+
+    def clear(self):
+        with self.__lock:
+            self.__hosts.clear()
+
+    @staticmethod
+    def __base_latency(healths):
+        # the lowest latency of the hosts, or 1 second if none of them succeeded
+        return min([
+            h.latency_ewma
+            for h in healths
+            if h is not None and h.latency_ewma is not None
+        ] or [1])
+
+    def __score(self, health, base_latency):
+        latency = health.latency_ewma if health.latency_ewma is not None else base_latency
+        return latency * (1 + self.failure_penalty * health.failure_ewma)
+
+    def __get_or_create(self, host):
+        health = self.__hosts.pop(host, None)
+        if health is None:
+            health = _EndpointHealth()
+            while len(self.__hosts) >= self.max_hosts:
+                self.__hosts.popitem(last=False)
+        # reinsert to mark it as recently updated
+        self.__hosts[host] = health
+        return health
+
+
+default_endpoint_health_tracker = EndpointHealthTracker()
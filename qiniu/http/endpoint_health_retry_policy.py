@@ -0,0 +1,101 @@
+from qiniu.retry.abc import RetryPolicy
+
+from .response import ResponseInfo
+
+
+class EndpointHealthRetryPolicy(RetryPolicy):
+    def __init__(self, endpoint_health_tracker, record_latency=True):
+        """
+        Observe the attempts to record the health of endpoints,
+        and order the endpoints in context by it. It never retries by itself.
+
+        It should be the last policy of the retrier,
+        so the endpoints are ordered after they are prepared by the other policies.
+
+        Parameters
+        ----------
+        endpoint_health_tracker: qiniu.http.endpoint_health.EndpointHealthTracker
+        record_latency: bool
+            record the duration of attempts as the latency of endpoints.
+            False for the attempts transferring bulk data, such as uploading or downloading files,
+            whose duration scales with the size of data, then only the failures are counted.
+        """
+        self.endpoint_health_tracker = endpoint_health_tracker
+        self.record_latency = record_latency
+
+    def init_context(self, context):
+        """
+        Parameters
+        ----------
+        context: dict
+        """
+        self._sort_endpoints(context)
+
+    def should_retry(self, attempt):
+        return False
+
+    def prepare_retry(self, attempt):
+        pass
+
+    def after_retry(self, attempt, policy):
+        """
+        Parameters
+        ----------
+        attempt: qiniu.retry.Attempt
+        policy: qiniu.retry.abc.RetryPolicy
+        """
+        self._sort_endpoints(attempt.context)
+
+    def after_attempt(self, attempt):
+        """
+        Parameters
+        ----------
+        attempt: qiniu.retry.Attempt
+        """
+        endpoint = attempt.context.get('endpoint')
+        if endpoint is None or attempt.started_at is None:
+            return
+        if _is_endpoint_failed(attempt):
+            self.endpoint_health_tracker.record_failure(endpoint.host, now=attempt.finished_at)
+        else:
+            self.endpoint_health_tracker.record_success(
+                endpoint.host,
+                latency=attempt.finished_at - attempt.started_at if self.record_latency else None
+            )
+
+    def _sort_endpoints(self, context):
+        """
+        Parameters
+        ----------
+        context: dict
+        """
+        endpoint = context.get('endpoint')
+        if endpoint is None or not context.get('alternative_endpoints'):
+            return
+        endpoints = self.endpoint_health_tracker.sort_endpoints(
+            [endpoint] + context['alternative_endpoints']
+        )
+        context['endpoint'] = endpoints.pop(0)
+        context['alternative_endpoints'] = endpoints
+
+
+def _is_endpoint_failed(attempt):
+    """
+    The responses of client errors, such as 4xx, are not counted as the failures of the endpoint,
+    neither are the exceptions marked `no_need_retry`, such as the file not found or the token expired,
+    which the other endpoints will raise as well.
+
+    Parameters
+    ----------
+    attempt: qiniu.retry.Attempt
+
+    Returns
+    -------
+    bool
+    """
+    if attempt.exception is not None:
+        return not getattr(attempt.exception, 'no_need_retry', False)
+    result = attempt.result
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], ResponseInfo):
+        return result[1].need_retry()
+    return False
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+Instrument the requests sent by `HTTPClient` and the legacy functions in `qiniu.http`.
+
+The hooks added by `add_request_hook` are called with a `RequestMetrics` after each request finished,
+including every retry. Nothing is measured if there isn't any hook.
+
+Examples
+--------
+from qiniu.http.instrumentation import add_request_hook, PrometheusRequestHook
+
+add_request_hook(PrometheusRequestHook())
+"""
+import contextlib
+import functools
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from qiniu.compat import urlparse
+
+
+# the fields of RequestMetrics:
+# method: str
+# url: str
+#     the full url, which may carry credentials in the query, such as the token of private download urls
+# host: str
+# service_name: str or None
+#     tagged by `request_tags`, such as the BucketManager and uploaders do
+# status_code: int
+#     -1 if the request failed without response
+# req_id: str or None
+#     the `X-Reqid` of response
+# request_size: int or None
+#     the size of body, None if it's unknown, such as a stream
+# response_size: int or None
+#     by the `Content-Length` of response
+# started_at: float
+#     timestamp
+# ttfb: float or None
+#     seconds from sending the request to the response headers parsed.
+#     DNS and connecting are included and not measured separately, which aren't exposed by requests.
+# duration: float
+#     seconds
+# exception: Exception or None
+#
+# use dataclass instead namedtuple if min version of python update to 3.7
+RequestMetrics = namedtuple(
+    'RequestMetrics',
+    [
+        'method',
+        'url',
+        'host',
+        'service_name',
+        'status_code',
+        'req_id',
+        'request_size',
+        'response_size',
+        'started_at',
+        'ttfb',
+        'duration',
+        'exception'
+    ]
+)
+
+_request_hooks = []
+_request_hooks_lock = threading.Lock()
+_request_tags = threading.local()
+
+
+def add_request_hook(hook):
+    """
+    Parameters
+    ----------
+    hook: callable
+        `(metrics: RequestMetrics) -> None`, it's called in the thread sent the request,
+        so it should be fast and thread-safe.
+    """
+    global _request_hooks
+    with _request_hooks_lock:
+        # copy on write, so sending requests doesn't need the lock
+        _request_hooks = _request_hooks + [hook]
+
+
+def remove_request_hook(hook):
+    """
+    Parameters
+    ----------
+    hook: callable
+    """
+    global _request_hooks
+    with _request_hooks_lock:
+        _request_hooks = [h for h in _request_hooks if h != hook]
+
+
+@contextlib.contextmanager
+def request_tags(service_name=None):
+    """
+    Tag the requests sent in the current thread within the context.
+
+    Parameters
+    ----------
+    service_name: qiniu.http.region.ServiceName or str
+    """
+    if not _request_hooks:
+        yield
+        return
+    last_service_name = getattr(_request_tags, 'service_name', None)
+    _request_tags.service_name = getattr(service_name, 'value', service_name)
+    try:
+        yield
+    finally:
+        _request_tags.service_name = last_service_name
+
+
+def bind_request_tags(func):
+    """
+    Bind the tags of the current thread to the function,
+    so the requests it sends in other threads, such as the executors uploading parts, are tagged as well.
+
+    Parameters
+    ----------
+    func: callable
+
+    Returns
+    -------
+    callable
+    """
+    service_name = getattr(_request_tags, 'service_name', None)
+    if not _request_hooks or service_name is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with request_tags(service_name=service_name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def instrument(method, url, send):
+    """
+    Parameters
+    ----------
+    method: str
+    url: str
+    send: callable
+        `() -> requests.Response`
+
+    Returns
+    -------
+    requests.Response
+    """
+    hooks = _request_hooks
+    if not hooks:
+        return send()
+
+    started_at = time.time()
+    try:
+        resp = send()
+    except Exception as err:
+        _call_hooks(hooks, _get_metrics(method, url, started_at, None, err))
+        raise
+    _call_hooks(hooks, _get_metrics(method, url, started_at, resp, None))
+    return resp
+
+
+def _get_metrics(method, url, started_at, resp, exception):
+    """
+    Parameters
+    ----------
+    method: str
+    url: str
+    started_at: float
+    resp: requests.Response or None
+    exception: Exception or None
+
+    Returns
+    -------
+    RequestMetrics
+    """
+    duration = time.time() - started_at
+    status_code, req_id, request_size, response_size, ttfb = -1, None, None, None, None
+    if resp is not None:
+        status_code = resp.status_code
+        req_id = resp.headers.get('X-Reqid')
+        request_size = _get_body_size(resp.request)
+        response_size = _to_int(resp.headers.get('Content-Length'))
+        ttfb = resp.elapsed.total_seconds()
+    return RequestMetrics(
+        method=method.upper(),
+        url=url,
+        host=urlparse(url).hostname,
+        service_name=getattr(_request_tags, 'service_name', None),
+        status_code=status_code,
+        req_id=req_id,
+        request_size=request_size,
+        response_size=response_size,
+        started_at=started_at,
+        ttfb=ttfb,
+        duration=duration,
+        exception=exception
+    )
+
+
+def _get_body_size(prepared_request):
+    """
+    Parameters
+    ----------
+    prepared_request: requests.PreparedRequest or None
+
+    Returns
+    -------
+    int or None
+    """
+    if prepared_request is None:
+        return None
+    body = prepared_request.body
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    return _to_int(prepared_request.headers.get('Content-Length'))
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _call_hooks(hooks, metrics):
+    for hook in hooks:
+        try:
+            hook(metrics)
+        except Exception:
+            logging.exception('request hook %r failed', hook)
+
+
+class PrometheusRequestHook(object):
+    def __init__(self, registry=None, prefix='qiniu_http', buckets=None):
+        """
+        Export the metrics of requests by `prometheus_client`, which should be installed.
+
+        Parameters
+        ----------
+        registry: prometheus_client.CollectorRegistry, optional
+        prefix: str
+            the prefix of metric names
+        buckets: list[float], optional
+            the buckets of duration histograms
+        """
+        try:
+            import prometheus_client
+        except ImportError:
+            raise RuntimeError('prometheus_client is required by PrometheusRequestHook')
+
+        opts = {}
+        if registry is not None:
+            opts['registry'] = registry
+        histogram_opts = dict(opts)
+        if buckets is not None:
+            histogram_opts['buckets'] = buckets
+        labels = ['host', 'method', 'service']
+
+        self.requests = prometheus_client.Counter(
+            prefix + '_requests_total',
+            'The count of requests, including retries',
+            labels + ['status'],
+            **opts
+        )
+        self.duration = prometheus_client.Histogram(
+            prefix + '_request_duration_seconds',
+            'The total seconds of requests',
+            labels,
+            **histogram_opts
+        )
+        self.ttfb = prometheus_client.Histogram(
+            prefix + '_request_ttfb_seconds',
+            'The seconds from sending requests to the response headers parsed',
+            labels,
+            **histogram_opts
+        )
+        self.request_bytes = prometheus_client.Counter(
+            prefix + '_request_bytes_total',
+            'The total size of request bodies',
+            labels,
+            **opts
+        )
+        self.response_bytes = prometheus_client.Counter(
+            prefix + '_response_bytes_total',
+            'The total size of response bodies',
+            labels,
+            **opts
+        )
+
+    def __call__(self, metrics):
+        """
+        Parameters
+        ----------
+        metrics: RequestMetrics
+        """
+        labels = (metrics.host or '', metrics.method, metrics.service_name or '')
+        status = str(metrics.status_code) if metrics.exception is None else 'error'
+        self.requests.labels(*(labels + (status,))).inc()
+        self.duration.labels(*labels).observe(metrics.duration)
+        if metrics.ttfb is not None:
+            self.ttfb.labels(*labels).observe(metrics.ttfb)
+        if metrics.request_size:
+            self.request_bytes.labels(*labels).inc(metrics.request_size)
+        if metrics.response_size:
+            self.response_bytes.labels(*labels).inc(metrics.response_size)
+
+
+class OpenTelemetryRequestHook(object):
+    def __init__(self, tracer=None):
+        """
+        Export a client span for each request by `opentelemetry-api`, which should be installed.
+        The spans are children of the current span in the thread sent the request.
+
+        Parameters
+        ----------
+        tracer: opentelemetry.trace.Tracer, optional
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise RuntimeError('opentelemetry-api is required by OpenTelemetryRequestHook')
+
+        self._trace = trace
+        self.tracer = tracer if tracer is not None else trace.get_tracer('qiniu')
+
+    def __call__(self, metrics):
+        """
+        Parameters
+        ----------
+        metrics: RequestMetrics
+        """
+        attributes = {
+            'http.request.method': metrics.method,
+            'url.full': _redact_url(metrics.url),
+            'server.address': metrics.host or ''
+        }
+        if metrics.status_code > 0:
+            attributes['http.response.status_code'] = metrics.status_code
+        if metrics.req_id:
+            attributes['qiniu.req_id'] = metrics.req_id
+        if metrics.service_name:
+            attributes['qiniu.service_name'] = metrics.service_name
+        if metrics.request_size is not None:
+            attributes['http.request.body.size'] = metrics.request_size
+        if metrics.response_size is not None:
+            attributes['http.response.body.size'] = metrics.response_size
+
+        span = self.tracer.start_span(
+            metrics.method,
+            kind=self._trace.SpanKind.CLIENT,
+            attributes=attributes,
+            start_time=int(metrics.started_at * 1e9)
+        )
+        if metrics.exception is not None:
+            span.record_exception(metrics.exception)
+        if metrics.exception is not None or metrics.status_code >= 500:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end(end_time=int((metrics.started_at + metrics.duration) * 1e9))
+
+
+def _redact_url(url):
+    """
+    Redact the userinfo and the values of query, which may be credentials,
+    such as the token of private download urls and the access key of querying regions.
+
+    Parameters
+    ----------
+    url: str
+
+    Returns
+    -------
+    str
+    """
+    parsed = urlparse(url)
+    query = '&'.join(
+        p.partition('=')[0] + '=REDACTED' if '=' in p else p
+        for p in parsed.query.split('&')
+        if p
+    )
+    return parsed._replace(netloc=parsed.netloc.rpartition('@')[2], query=query).geturl()
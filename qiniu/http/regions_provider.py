@@ -3,21 +3,31 @@ import datetime
 import errno
 import itertools
 from collections import namedtuple
+from concurrent import futures
 import logging
 import tempfile
 import os
 import shutil
 import threading
+import time
 
+from qiniu import config
 from qiniu.compat import json, b as to_bytes, is_windows, is_linux, is_macos
-from qiniu.utils import io_md5, dt2ts
+from qiniu.utils import io_md5
 
 from .endpoint import Endpoint
 from .region import Region, ServiceName
 from .default_client import qn_http_client
 from .middleware import RetryDomainsMiddleware
+from .regions_refresher import default_regions_refresher
 from .single_flight import SingleFlight
 
+try:
+    import sqlite3
+except ImportError:
+    # some python builds are without sqlite3
+    sqlite3 = None
+
 
 class RegionsProvider:
     __metaclass__ = abc.ABCMeta
@@ -83,6 +93,7 @@ class QueryRegionsProvider(RegionsProvider):
         endpoints_provider,
         preferred_scheme='http',
         max_retry_times_per_endpoint=1,
+        hedging=None
     ):
         """
         Parameters
@@ -92,12 +103,15 @@ class QueryRegionsProvider(RegionsProvider):
         endpoints_provider: Iterable[Endpoint]
         preferred_scheme: str
         max_retry_times_per_endpoint: int
+        hedging: qiniu.retry.hedging.Hedging, optional
+            query by the next endpoint if the first one is slow
         """
         self.access_key = access_key
         self.bucket_name = bucket_name
         self.endpoints_provider = endpoints_provider
         self.preferred_scheme = preferred_scheme
         self.max_retry_times_per_endpoint = max_retry_times_per_endpoint
+        self.hedging = hedging
 
     def __iter__(self):
         endpoints_md5 = io_md5([
@@ -117,18 +131,18 @@ class QueryRegionsProvider(RegionsProvider):
         endpoints = list(self.endpoints_provider)
         if not endpoints:
             raise ValueError('There aren\'t any available endpoints to query regions')
-        endpoint, alternative_endpoints = endpoints[0], endpoints[1:]
-
-        url = '{0}/v4/query?ak={1}&bucket={2}'.format(endpoint.get_value(), self.access_key, self.bucket_name)
-        ret, resp = qn_http_client.get(
-            url,
-            middlewares=[
-                RetryDomainsMiddleware(
-                    backup_domains=[e.host for e in alternative_endpoints],
-                    max_retry_times=self.max_retry_times_per_endpoint
-                )
-            ]
-        )
+        context = {
+            'endpoint': endpoints[0],
+            'alternative_endpoints': endpoints[1:]
+        }
+        if self.hedging is None:
+            ret, resp = self.__query(context)
+        else:
+            ret, resp = self.hedging.do(
+                context,
+                self.__query,
+                accept_result=lambda result: result[1].ok()
+            )
 
         if not resp.ok():
             raise RuntimeError(
@@ -144,6 +158,33 @@ class QueryRegionsProvider(RegionsProvider):
             for d in ret.get('hosts', [])
         ]
 
+    def __query(self, context):
+        """
+        Parameters
+        ----------
+        context: dict
+            `endpoint` to query and `alternative_endpoints` to retry
+
+        Returns
+        -------
+        ret: dict or None
+        resp: ResponseInfo
+        """
+        url = '{0}/v4/query?ak={1}&bucket={2}'.format(
+            context['endpoint'].get_value(),
+            self.access_key,
+            self.bucket_name
+        )
+        return qn_http_client.get(
+            url,
+            middlewares=[
+                RetryDomainsMiddleware(
+                    backup_domains=[e.host for e in context['alternative_endpoints']],
+                    max_retry_times=self.max_retry_times_per_endpoint
+                )
+            ]
+        )
+
 
 # --- helpers for CachedRegionsProvider ---
 class FileAlreadyLocked(RuntimeError):
@@ -300,7 +341,7 @@ _global_cache_scope = CacheScope(
     persist_path=os.path.join(
         tempfile.gettempdir(),
         'qn-py-sdk',
-        'regions-cache.jsonl'
+        'regions-cache.sqlite3' if sqlite3 is not None else 'regions-cache.jsonl'
     ),
     last_shrink_at=datetime.datetime.fromtimestamp(0),
     shrink_interval=datetime.timedelta(days=1),
@@ -389,7 +430,9 @@ def _persist_region(region):
         },
         ttl=region.ttl,
         # use datetime.datetime.timestamp() when min version of python >= 3
-        createTime=dt2ts(region.create_time)
+        # in milliseconds, as `_get_region_from_persisted` reads.
+        # create_time is a naive local datetime, so don't convert it by `dt2ts` which treats it as UTC
+        createTime=int(time.mktime(region.create_time.timetuple()) * 1000)
     )._asdict()
 
 
@@ -473,6 +516,184 @@ def _walk_persist_cache_file(persist_path, ignore_parse_error=True):
                     raise err
 
 
+_SQLITE_REGIONS_CACHE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS regions_cache (
+    cache_key TEXT NOT NULL PRIMARY KEY,
+    regions TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS regions_cache_expires_at ON regions_cache (expires_at);
+CREATE INDEX IF NOT EXISTS regions_cache_updated_at ON regions_cache (updated_at);
+'''
+
+
+class SQLiteRegionsCache(object):
+    """
+    The persistent cache of regions in a SQLite database (WAL mode), indexed by the cache key.
+
+    Each lookup and update only touches the row of the cache key, and is atomic,
+    so it could be shared by threads and processes, regardless of how many buckets are cached.
+    It's used by `CachedRegionsProvider` if the persist file is a SQLite database,
+    or it doesn't exist yet and its name ends with `.sqlite3`, `.sqlite` or `.db`, such as the default one.
+    The other persist files are in JSON lines as before.
+    """
+
+    def __init__(self, db_path, max_age=30 * 24 * 3600, timeout=30):
+        """
+        Parameters
+        ----------
+        db_path: str
+        max_age: float
+            the rows not updated in the seconds are evicted by `shrink`
+        timeout: float
+            the seconds to wait for the lock of other connections
+        """
+        if sqlite3 is None:
+            raise RuntimeError('SQLiteRegionsCache requires the sqlite3 module')
+        self.db_path = db_path
+        self.max_age = max_age
+        self.timeout = timeout
+        self.__local = threading.local()
+
+    @property
+    def __conn(self):
+        conn = getattr(self.__local, 'conn', None)
+        if conn is not None:
+            return conn
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        # create the schema for each connection, in case the file is removed by others
+        conn.executescript(_SQLITE_REGIONS_CACHE_SCHEMA)
+        # make the cache file available for all users
+        if is_linux or is_macos:
+            try:
+                os.chmod(self.db_path, 0o666)
+            except OSError:
+                pass
+        self.__local.conn = conn
+        return conn
+
+    def get(self, cache_key):
+        """
+        Parameters
+        ----------
+        cache_key: str
+
+        Returns
+        -------
+        list[Region] or None
+        """
+        row = self.__conn.execute(
+            'SELECT regions FROM regions_cache WHERE cache_key = ?',
+            (cache_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return [
+            _get_region_from_persisted(d)
+            for d in json.loads(row[0])
+        ]
+
+    def set(self, cache_key, regions):
+        """
+        Parameters
+        ----------
+        cache_key: str
+        regions: list[Region]
+        """
+        regions = list(regions)
+        expires_at = max([_get_region_expires_at(r) for r in regions] or [0])
+        self.__conn.execute(
+            'INSERT OR REPLACE INTO regions_cache (cache_key, regions, expires_at, updated_at) VALUES (?, ?, ?, ?)',
+            (
+                cache_key,
+                json.dumps([_persist_region(r) for r in regions]),
+                expires_at,
+                time.time()
+            )
+        )
+
+    def shrink(self, should_shrink_expired_regions=False, now=None):
+        """
+        Parameters
+        ----------
+        should_shrink_expired_regions: bool
+            evict the rows all regions of which are expired
+        now: float
+            timestamp, default is `time.time()`
+
+        Returns
+        -------
+        int
+            the count of evicted rows
+        """
+        if now is None:
+            now = time.time()
+        expires_before = now if should_shrink_expired_regions else 0
+        cursor = self.__conn.execute(
+            'DELETE FROM regions_cache WHERE expires_at < ? OR updated_at < ?',
+            (expires_before, now - self.max_age)
+        )
+        return cursor.rowcount
+
+
+_sqlite_regions_caches = {}
+_sqlite_regions_caches_lock = threading.Lock()
+
+# the suffixes of the new persist files created as SQLite databases
+_SQLITE_FILE_SUFFIXES = ('.sqlite3', '.sqlite', '.db')
+_SQLITE_FILE_HEADER = b'SQLite format 3\x00'
+
+
+def _is_sqlite_persist_path(persist_path):
+    """
+    Parameters
+    ----------
+    persist_path: str
+
+    Returns
+    -------
+    bool
+        the existing file is decided by its header, so the JSON lines files of custom paths are still read,
+        and the new or empty file is decided by its suffix
+    """
+    try:
+        with open(persist_path, 'rb') as f:
+            header = f.read(len(_SQLITE_FILE_HEADER))
+    except (IOError, OSError):
+        header = b''
+    if header:
+        return header == _SQLITE_FILE_HEADER
+    return persist_path.endswith(_SQLITE_FILE_SUFFIXES)
+
+
+def _get_sqlite_regions_cache(persist_path):
+    """
+    Parameters
+    ----------
+    persist_path: str
+
+    Returns
+    -------
+    SQLiteRegionsCache or None
+        None if the path is a JSON lines file, or sqlite3 is unavailable
+    """
+    if not persist_path or sqlite3 is None:
+        return None
+    if not _is_sqlite_persist_path(persist_path):
+        # e.g. the file is replaced by a JSON lines one
+        if persist_path in _sqlite_regions_caches:
+            with _sqlite_regions_caches_lock:
+                _sqlite_regions_caches.pop(persist_path, None)
+        return None
+    with _sqlite_regions_caches_lock:
+        if persist_path not in _sqlite_regions_caches:
+            _sqlite_regions_caches[persist_path] = SQLiteRegionsCache(persist_path)
+        return _sqlite_regions_caches[persist_path]
+
+
 def _merge_regions(*args):
     """
     merge two regions by region id.
@@ -511,11 +732,17 @@ class CachedRegionsProvider(MutableRegionsProvider):
         base_regions_provider: Iterable[Region]
         kwargs
             persist_path: str
+                an existing SQLite database or a new file ended with `.sqlite3`, `.sqlite` or `.db` is used
+                as `SQLiteRegionsCache`, otherwise it's a JSON lines file
             shrink_interval: datetime.timedelta
             should_shrink_expired_regions: bool
+            regions_refresher: qiniu.http.regions_refresher.RegionsRefresher
+                refresh the regions before expired and shrink the cache in background,
+                instead of on the request path
         """
         self.cache_key = cache_key
         self.base_regions_provider = base_regions_provider
+        self.regions_refresher = kwargs.get('regions_refresher', None)
 
         persist_path = kwargs.get('persist_path', None)
         last_shrink_at = datetime.datetime.fromtimestamp(0)
@@ -555,6 +782,14 @@ class CachedRegionsProvider(MutableRegionsProvider):
         )
 
     def __iter__(self):
+        if self.regions_refresher is not None:
+            if self.__should_shrink:
+                self.regions_refresher.shrink_later(self)
+            # change to `yield from` when min version of python update to >= 3.3
+            for r in self.__get_regions_refreshed_in_background():
+                yield r
+            return
+
         if self.__should_shrink:
             try:
                 self.__shrink_cache()
@@ -587,10 +822,17 @@ class CachedRegionsProvider(MutableRegionsProvider):
         with self._cache_scope.memo_cache_lock:
             self._cache_scope.memo_cache[self.cache_key] = regions
 
+        if self.regions_refresher is not None:
+            self.regions_refresher.watch(self, _get_regions_expires_in(regions))
+
         if not self._cache_scope.persist_path:
             return
 
         try:
+            sqlite_regions_cache = _get_sqlite_regions_cache(self._cache_scope.persist_path)
+            if sqlite_regions_cache is not None:
+                sqlite_regions_cache.set(self.cache_key, regions)
+                return
             with open(self._cache_scope.persist_path, 'a') as f:
                 f.write(json.dumps({
                     'cacheKey': self.cache_key,
@@ -599,6 +841,23 @@ class CachedRegionsProvider(MutableRegionsProvider):
         except Exception as err:
             logging.warning('failed to cache regions result to file. error: %s', err)
 
+    def peek_regions(self):
+        """
+        Get the live regions from the memo cache only, without any file or network I/O.
+        It's useful for the callers which should not be blocked, such as an asyncio event loop.
+
+        Returns
+        -------
+        list[Region] or None
+            None if the memo cache missed, the regions expired or the cache should be shrunk.
+        """
+        if self.__should_shrink:
+            return None
+        regions = self.__get_regions_from_memo()
+        if regions and all(r.is_live for r in regions):
+            return regions
+        return None
+
     @property
     def persist_path(self):
         """
@@ -672,6 +931,51 @@ class CachedRegionsProvider(MutableRegionsProvider):
             should_shrink_expired_regions=value
         )
 
+    def touch(self):
+        """
+        Mark the regions used without reading the cache, such as they're memoized by `MemoizedRegionsProvider`,
+        so the refresher still refreshes them before they expire.
+        """
+        if self.regions_refresher is not None:
+            self.regions_refresher.touch(self)
+
+    def refresh(self):
+        """
+        Query the regions by the base regions provider, and update the cache.
+        """
+        self.set_regions(list(self.base_regions_provider))
+
+    def shrink(self):
+        """
+        Remove the regions not used for a long time from the cache, and the expired ones
+        if `should_shrink_expired_regions` is set.
+        """
+        self.__shrink_cache()
+
+    def __get_regions_refreshed_in_background(self):
+        """
+        Get the regions from the cache, the expired ones are provided until they're refreshed by the refresher.
+        Only query the regions on the request path if they're not cached.
+
+        Returns
+        -------
+        list[Region]
+        """
+        regions = self.__get_regions_from_memo()
+        if not regions:
+            regions = self.__get_regions_from_file(fallback=[])
+            if regions:
+                # loaded by this process the first time
+                self.regions_refresher.watch(self, _get_regions_expires_in(regions))
+        if not regions:
+            return self.__get_regions_from_base_provider()
+
+        if all(r.is_live for r in regions):
+            self.regions_refresher.touch(self)
+        else:
+            self.regions_refresher.refresh_later(self)
+        return regions
+
     def __get_regions_from_memo(self, fallback=None):
         """
         Parameters
@@ -733,12 +1037,23 @@ class CachedRegionsProvider(MutableRegionsProvider):
         return regions
 
     def __flush_file_cache_to_memo(self):
+        sqlite_regions_cache = _get_sqlite_regions_cache(self._cache_scope.persist_path)
+        if sqlite_regions_cache is not None:
+            regions = sqlite_regions_cache.get(self.cache_key)
+            if not regions:
+                return
+            memo_regions = self._cache_scope.memo_cache.get(self.cache_key)
+            self._cache_scope.memo_cache[self.cache_key] = (
+                _merge_regions(memo_regions, regions) if memo_regions else regions
+            )
+            return
+
         for cache_key, regions in _walk_persist_cache_file(
             persist_path=self._cache_scope.persist_path
         ):
             if cache_key not in self._cache_scope.memo_cache:
                 self._cache_scope.memo_cache[cache_key] = regions
-                return
+                continue
             memo_regions = self._cache_scope.memo_cache[cache_key]
             self._cache_scope.memo_cache[cache_key] = _merge_regions(
                 memo_regions,
@@ -777,6 +1092,12 @@ class CachedRegionsProvider(MutableRegionsProvider):
             )
             return
 
+        sqlite_regions_cache = _get_sqlite_regions_cache(self._cache_scope.persist_path)
+        if sqlite_regions_cache is not None:
+            sqlite_regions_cache.shrink(self._cache_scope.should_shrink_expired_regions)
+            self.__update_last_shrink_at()
+            return
+
         shrink_file_path = self._cache_scope.persist_path + '.shrink'
         try:
             with open(shrink_file_path, 'a') as f, _FileThreadingLocker(f), _FileLocker(f):
@@ -821,20 +1142,102 @@ class CachedRegionsProvider(MutableRegionsProvider):
                     f.close()
                 shutil.move(shrink_file_path, self._cache_scope.persist_path)
 
-                # update last shrink time
-                self._cache_scope = self._cache_scope._replace(
-                    last_shrink_at=datetime.datetime.now()
-                )
-                global _global_cache_scope
-                if _global_cache_scope.persist_path == self._cache_scope.persist_path:
-                    _global_cache_scope = _global_cache_scope._replace(
-                        last_shrink_at=self._cache_scope.last_shrink_at
-                    )
+                self.__update_last_shrink_at()
 
         except FileAlreadyLocked:
             # skip file shrink by another running
             pass
 
+    def __update_last_shrink_at(self):
+        self._cache_scope = self._cache_scope._replace(
+            last_shrink_at=datetime.datetime.now()
+        )
+        global _global_cache_scope
+        if _global_cache_scope.persist_path == self._cache_scope.persist_path:
+            _global_cache_scope = _global_cache_scope._replace(
+                last_shrink_at=self._cache_scope.last_shrink_at
+            )
+
+
+class MemoizedRegionsProvider(RegionsProvider):
+    def __init__(
+        self,
+        base_regions_provider,
+        max_ttl=None
+    ):
+        """
+        Memoize the regions of base_regions_provider in the instance until any of them expired,
+        so iterating it again is cheap. The regions are resolved again after that,
+        and the base provider (e.g. `CachedRegionsProvider`) decides to use its cache or query them.
+
+        Parameters
+        ----------
+        base_regions_provider: Iterable[Region]
+        max_ttl: int, optional
+            the max seconds to memoize the regions, even though they are not expired.
+        """
+        self.base_regions_provider = base_regions_provider
+        self.max_ttl = max_ttl
+        # (regions, expires_at)
+        self.__memo = None
+
+    def __iter__(self):
+        memo = self.__memo
+        now = time.time()
+        if memo is None or now >= memo[1]:
+            regions = list(self.base_regions_provider)
+            expires_at = min(
+                [_get_region_expires_at(r) for r in regions] +
+                [now + self.max_ttl if self.max_ttl is not None else float('inf')]
+            )
+            memo = (regions, expires_at)
+            self.__memo = memo
+        else:
+            # the base provider isn't iterated while memoized, so tell it the regions are still used,
+            # e.g. `CachedRegionsProvider` refreshes them ahead only if they're used since the last refresh
+            touch = getattr(self.base_regions_provider, 'touch', None)
+            if callable(touch):
+                touch()
+        return iter(memo[0])
+
+    def invalidate(self):
+        self.__memo = None
+
+
+def _get_regions_expires_in(regions):
+    """
+    Parameters
+    ----------
+    regions: list[Region]
+
+    Returns
+    -------
+    float
+        the seconds before any of the regions expired, `float('inf')` if none of them expires
+    """
+    now = datetime.datetime.now()
+    return min(
+        [(r.create_time - now).total_seconds() + r.ttl for r in regions if r.ttl >= 0] or
+        [float('inf')]
+    )
+
+
+def _get_region_expires_at(region):
+    """
+    Parameters
+    ----------
+    region: Region
+
+    Returns
+    -------
+    float
+        the timestamp
+    """
+    if region.ttl < 0:
+        return float('inf')
+    # create_time is a naive local datetime, so compare it with the local now rather than converting it by `dt2ts`
+    return time.time() + (region.create_time - datetime.datetime.now()).total_seconds() + region.ttl
+
 
 def get_default_regions_provider(
     query_endpoints_provider,
@@ -857,12 +1260,17 @@ def get_default_regions_provider(
             option of QueryRegionsProvider
         max_retry_times_per_endpoint: int
             option of QueryRegionsProvider
+        hedging: qiniu.retry.hedging.Hedging
+            option of QueryRegionsProvider
         persist_path: str
             option of CachedRegionsProvider
         shrink_interval: datetime.timedelta
             option of CachedRegionsProvider
         should_shrink_expired_regions: bool
             option of CachedRegionsProvider
+        regions_refresher: qiniu.http.regions_refresher.RegionsRefresher
+            option of CachedRegionsProvider, `default_regions_refresher` if not set,
+            None to refresh and shrink the cache on the request path
 
     Returns
     -------
@@ -876,7 +1284,7 @@ def get_default_regions_provider(
     query_regions_provider_opts.update({
         k: v
         for k, v in kwargs.items()
-        if k in ['preferred_scheme', 'max_retry_times_per_endpoint']
+        if k in ['preferred_scheme', 'max_retry_times_per_endpoint', 'hedging']
     })
 
     query_regions_provider = QueryRegionsProvider(**query_regions_provider_opts)
@@ -899,6 +1307,7 @@ def get_default_regions_provider(
     cached_regions_provider_opts = {
         'cache_key': cache_key,
         'base_regions_provider': query_regions_provider,
+        'regions_refresher': kwargs.get('regions_refresher', default_regions_refresher)
     }
     cached_regions_provider_opts.update({
         k: v
@@ -913,3 +1322,82 @@ def get_default_regions_provider(
     return CachedRegionsProvider(
         **cached_regions_provider_opts
     )
+
+
+# use dataclass instead namedtuple if min version of python update to 3.7
+RegionsWarmUpResult = namedtuple(
+    'RegionsWarmUpResult',
+    [
+        'bucket_name',
+        'regions',
+        'error'
+    ]
+)
+
+
+def warm_up_regions(
+    access_key,
+    bucket_names,
+    query_endpoints_provider=None,
+    accelerate_uploading=False,
+    force_refresh=False,
+    max_workers=16,
+    **kwargs
+):
+    """
+    Resolve the regions of buckets concurrently, and fill them into the memory and persistent cache,
+    so the first requests of the buckets don't wait for querying regions, such as at the process start.
+
+    Parameters
+    ----------
+    access_key: str
+    bucket_names: Iterable[str]
+    query_endpoints_provider: Iterable[Endpoint], optional
+        the default query region hosts in `qiniu.config` if not provided
+    accelerate_uploading: bool
+    force_refresh: bool
+        query the regions even if they're cached and not expired
+    max_workers: int
+        the max count of buckets queried concurrently
+    kwargs
+        the options of `get_default_regions_provider`, e.g. preferred_scheme, persist_path
+
+    Returns
+    -------
+    list[RegionsWarmUpResult]
+        in the order of bucket_names, the error is None if succeeded
+    """
+    if query_endpoints_provider is None:
+        query_endpoints_provider = [
+            Endpoint.from_host(h)
+            for h in [config.get_default('default_query_region_host')] +
+            config.get_default('default_query_region_backup_hosts')
+        ]
+    query_endpoints = list(query_endpoints_provider)
+
+    def _warm_up(bucket_name):
+        try:
+            regions_provider = get_default_regions_provider(
+                query_endpoints_provider=query_endpoints,
+                access_key=access_key,
+                bucket_name=bucket_name,
+                accelerate_uploading=accelerate_uploading,
+                **kwargs
+            )
+            if force_refresh:
+                regions_provider.refresh()
+            regions = list(regions_provider)
+            if not regions:
+                raise RuntimeError('no region found for bucket {0}'.format(bucket_name))
+            return RegionsWarmUpResult(bucket_name=bucket_name, regions=regions, error=None)
+        except Exception as err:
+            return RegionsWarmUpResult(bucket_name=bucket_name, regions=[], error=err)
+
+    bucket_names = list(bucket_names)
+    if not bucket_names:
+        return []
+    executor = futures.ThreadPoolExecutor(max_workers=min(max_workers, len(bucket_names)))
+    try:
+        return list(executor.map(_warm_up, bucket_names))
+    finally:
+        executor.shutdown(wait=True)
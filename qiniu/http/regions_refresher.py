@@ -0,0 +1,184 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+
+class RegionsRefresher(object):
+    """
+    Refresh the regions cached by `CachedRegionsProvider` and shrink the cache in a daemon thread,
+    so the requests only read the cache in memory after the regions of the bucket are queried once.
+
+    The regions are queried again `refresh_ahead` seconds before they expire.
+    If they're expired and not refreshed yet, such as the query failed,
+    the expired regions are still provided while they're being refreshed (stale-while-revalidate).
+    The regions not used since the last refresh are not refreshed any more,
+    so the buckets used once don't cost queries forever.
+
+    Examples
+    --------
+    refresher = RegionsRefresher(refresh_ahead=600)
+    regions_provider = get_default_regions_provider(..., regions_refresher=refresher)
+    """
+
+    def __init__(self, refresh_ahead=300, retry_interval=30, thread_name='qiniu-regions-refresher'):
+        """
+        Parameters
+        ----------
+        refresh_ahead: float
+            the seconds to refresh the regions before they expire
+        retry_interval: float
+            the seconds to retry if failed to refresh, also the min interval of refreshing the same regions
+        thread_name: str
+        """
+        if refresh_ahead < 0:
+            raise ValueError('refresh_ahead must not be negative')
+        if retry_interval <= 0:
+            raise ValueError('retry_interval must be greater than 0')
+        self.refresh_ahead = refresh_ahead
+        self.retry_interval = retry_interval
+        self.thread_name = thread_name
+
+        # heap of (due_at, seq, task_key)
+        self.__tasks = []
+        # task_key -> (due_at, provider)
+        self.__scheduled = {}
+        # the cache keys used since their last refresh
+        self.__accessed = {}
+        self.__seq = itertools.count()
+        self.__cond = threading.Condition()
+        self.__thread = None
+        self.__stopped = False
+
+    def touch(self, provider):
+        """
+        Mark the regions of the provider used, called on the request path, so it doesn't acquire any lock.
+
+        Parameters
+        ----------
+        provider: qiniu.http.regions_provider.CachedRegionsProvider
+        """
+        self.__accessed[provider.cache_key] = True
+
+    def watch(self, provider, expires_in):
+        """
+        Schedule to refresh the regions of the provider before they expire.
+
+        Parameters
+        ----------
+        provider: qiniu.http.regions_provider.CachedRegionsProvider
+        expires_in: float
+            the seconds the regions will expire in, `float('inf')` if never
+        """
+        if expires_in == float('inf'):
+            return
+        delay = max(self.retry_interval, expires_in - self.refresh_ahead)
+        self.__schedule(('refresh', provider.cache_key), provider, time.time() + delay)
+
+    def refresh_later(self, provider):
+        """
+        Refresh the regions of the provider as soon as possible, such as they're expired,
+        unless the refreshing is scheduled already, e.g. retrying after failed.
+
+        Parameters
+        ----------
+        provider: qiniu.http.regions_provider.CachedRegionsProvider
+        """
+        self.touch(provider)
+        self.__schedule(('refresh', provider.cache_key), provider, time.time(), replace=False)
+
+    def shrink_later(self, provider):
+        """
+        Shrink the cache of the provider as soon as possible.
+
+        Parameters
+        ----------
+        provider: qiniu.http.regions_provider.CachedRegionsProvider
+        """
+        self.__schedule(('shrink', provider.persist_path), provider, time.time(), replace=False)
+
+    def stop(self, wait=True):
+        """
+        Stop the thread, the scheduled tasks are discarded.
+
+        Parameters
+        ----------
+        wait: bool
+        """
+        with self.__cond:
+            self.__stopped = True
+            self.__cond.notify_all()
+            thread = self.__thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def __schedule(self, task_key, provider, due_at, replace=True):
+        with self.__cond:
+            if self.__stopped:
+                return
+            scheduled = self.__scheduled.get(task_key)
+            if scheduled is not None and (not replace or scheduled[0] <= due_at):
+                # keep the earlier one, the provider with the same key shares the cache
+                return
+            self.__scheduled[task_key] = (due_at, provider)
+            heapq.heappush(self.__tasks, (due_at, next(self.__seq), task_key))
+            # the thread is gone after fork, so check it's alive rather than created
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__thread = threading.Thread(target=self.__run, name=self.thread_name)
+                self.__thread.daemon = True
+                self.__thread.start()
+            else:
+                self.__cond.notify()
+
+    def __pop_due_task(self):
+        """
+        must be called with the lock held
+
+        Returns
+        -------
+        (tuple, CachedRegionsProvider) or (None, None)
+            None if stopped
+        """
+        while not self.__stopped:
+            if not self.__tasks:
+                self.__cond.wait()
+                continue
+            due_at, _, task_key = self.__tasks[0]
+            scheduled = self.__scheduled.get(task_key)
+            if scheduled is None or scheduled[0] != due_at:
+                # replaced by an earlier one, or done
+                heapq.heappop(self.__tasks)
+                continue
+            now = time.time()
+            if due_at > now:
+                self.__cond.wait(due_at - now)
+                continue
+            heapq.heappop(self.__tasks)
+            del self.__scheduled[task_key]
+            return task_key, scheduled[1]
+        return None, None
+
+    def __run(self):
+        while True:
+            with self.__cond:
+                task_key, provider = self.__pop_due_task()
+            if task_key is None:
+                return
+
+            kind = task_key[0]
+            try:
+                if kind == 'shrink':
+                    provider.shrink()
+                    continue
+                # the refreshed regions are watched again by `set_regions`
+                if self.__accessed.pop(provider.cache_key, False):
+                    provider.refresh()
+            except Exception as err:
+                logging.warning('failed to %s regions of %s. error: %s', kind, provider.cache_key, err)
+                if kind == 'refresh':
+                    # retry later if the regions are used again, the expired ones are provided before that
+                    self.__schedule(task_key, provider, time.time() + self.retry_interval)
+
+
+default_regions_refresher = RegionsRefresher()
@@ -48,6 +48,8 @@ class ResponseInfo(object):
         return self.status_code // 100 == 2
 
     def need_retry(self):
+        if getattr(self.exception, 'no_need_retry', False):
+            return False
         if 100 <= self.status_code < 500:
             return False
         if all([
@@ -2,8 +2,117 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import os
+import sys
 
-from qiniu import etag
+from qiniu.utils import etag_files as calc_etag_files
+
+
+def _print_etag_progress(hashed_size, total_size):
+    if total_size:
+        percent = hashed_size * 100.0 / total_size
+    else:
+        percent = 100.0
+    sys.stderr.write('\r{0:.1f}% ({1}/{2} bytes)'.format(percent, hashed_size, total_size))
+    if hashed_size >= total_size:
+        sys.stderr.write('\n')
+    sys.stderr.flush()
+
+
+def _etag(args):
+    r = calc_etag_files(
+        args.etag_files,
+        max_workers=args.jobs or None,
+        progress_handler=_print_etag_progress if args.progress else None
+    )
+    if len(r) == 1:
+        print(r[0])
+    else:
+        print(' '.join(r))
+
+
+def _upload_dir(args):
+    from qiniu import Auth, SQLiteUploadProgressRecorder
+    from qiniu.services.storage.bulk_uploader import BulkUploader
+
+    access_key = os.getenv('QINIU_ACCESS_KEY')
+    secret_key = os.getenv('QINIU_SECRET_KEY')
+    if not access_key or not secret_key:
+        sys.stderr.write('QINIU_ACCESS_KEY and QINIU_SECRET_KEY are required in environment variables\n')
+        return 2
+
+    manifest_path = args.manifest
+    if manifest_path is None:
+        manifest_path = os.path.join(args.local_dir, '.qiniu-upload-manifest.jsonl')
+    manifest_path = os.path.abspath(manifest_path)
+    bulk_uploader = BulkUploader(
+        args.bucket,
+        Auth(access_key, secret_key),
+        resume_threshold=args.resume_threshold_mb * (1024 ** 2),
+        max_in_flight_files=args.jobs,
+        max_in_flight_bytes=args.max_in_flight_mb * (1024 ** 2),
+        upload_progress_recorder=SQLiteUploadProgressRecorder(
+            db_path=manifest_path + '.records.sqlite3'
+        )
+    )
+
+    uploaded_count, skipped_count, failed_count = 0, 0, 0
+    for result in bulk_uploader.upload_dir(args.local_dir, key_prefix=args.prefix, manifest_path=manifest_path):
+        if result.skipped:
+            skipped_count += 1
+        elif result.ok:
+            uploaded_count += 1
+            print(result.key)
+        else:
+            failed_count += 1
+            sys.stderr.write('failed to upload {0}: {1}\n'.format(result.file_path, result.error))
+    sys.stderr.write('uploaded: {0}, skipped: {1}, failed: {2}\n'.format(
+        uploaded_count,
+        skipped_count,
+        failed_count
+    ))
+    return 1 if failed_count else 0
+
+
+def _warm_up_regions(args):
+    from qiniu.http.regions_provider import warm_up_regions
+
+    access_key = os.getenv('QINIU_ACCESS_KEY')
+    if not access_key:
+        sys.stderr.write('QINIU_ACCESS_KEY is required in environment variables\n')
+        return 2
+
+    bucket_names = list(args.buckets)
+    if args.buckets_file:
+        with open(args.buckets_file, 'r') as f:
+            bucket_names.extend(line.strip() for line in f if line.strip())
+    if not bucket_names:
+        sys.stderr.write('no bucket to warm up\n')
+        return 2
+
+    opts = {}
+    if args.persist_path:
+        opts['persist_path'] = args.persist_path
+    results = warm_up_regions(
+        access_key,
+        bucket_names,
+        accelerate_uploading=args.accelerate_uploading,
+        force_refresh=args.force,
+        max_workers=args.jobs,
+        # the process exits soon, don't refresh in background
+        regions_refresher=None,
+        **opts
+    )
+
+    failed_count = 0
+    for result in results:
+        if result.error is None:
+            print('{0}\t{1}'.format(result.bucket_name, ','.join(r.region_id or '' for r in result.regions)))
+        else:
+            failed_count += 1
+            sys.stderr.write('failed to warm up regions of {0}: {1}\n'.format(result.bucket_name, result.error))
+    sys.stderr.write('warmed up: {0}, failed: {1}\n'.format(len(results) - failed_count, failed_count))
+    return 1 if failed_count else 0
 
 
 def main():
@@ -13,27 +122,104 @@ def main():
     parser_etag = sub_parsers.add_parser(
         'etag',
         description='calculate the etag of the file',
-        help='etag [file...]')
+        help='etag [-j N] [--progress] [file...]')
+    parser_etag.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=1,
+        help='the number of threads for calculate, 0 for the number of CPUs')
+    parser_etag.add_argument(
+        '--progress',
+        action='store_true',
+        help='print the progress to stderr')
     parser_etag.add_argument(
         'etag_files',
         metavar='N',
         nargs='+',
         help='the file list for calculate')
+    parser_etag.set_defaults(func=_etag)
 
-    args = parser.parse_args()
+    parser_upload_dir = sub_parsers.add_parser(
+        'upload-dir',
+        description='upload all files in the directory, '
+                    'the keys are the prefix with the relative paths. '
+                    'QINIU_ACCESS_KEY and QINIU_SECRET_KEY are required in environment variables',
+        help='upload-dir [--prefix PREFIX] [-j N] local_dir bucket')
+    parser_upload_dir.add_argument(
+        'local_dir',
+        help='the directory for upload')
+    parser_upload_dir.add_argument(
+        'bucket',
+        help='the bucket upload to')
+    parser_upload_dir.add_argument(
+        '--prefix',
+        default='',
+        help='the prefix of keys')
+    parser_upload_dir.add_argument(
+        '--manifest',
+        default=None,
+        help='the manifest records the uploaded files, rerun with it will skip them. '
+             'default is .qiniu-upload-manifest.jsonl in the directory')
+    parser_upload_dir.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=16,
+        help='the number of files upload concurrently')
+    parser_upload_dir.add_argument(
+        '--max-in-flight-mb',
+        type=int,
+        default=256,
+        help='the total size of files upload concurrently')
+    parser_upload_dir.add_argument(
+        '--resume-threshold-mb',
+        type=int,
+        default=4,
+        help='the files larger than it upload by resumable upload')
+    parser_upload_dir.set_defaults(func=_upload_dir)
 
-    try:
-        etag_files = args.etag_files
+    parser_warm_up_regions = sub_parsers.add_parser(
+        'warm-up-regions',
+        description='query the regions of buckets concurrently and save them into the regions cache file, '
+                    'so the processes started later needn\'t query them. '
+                    'QINIU_ACCESS_KEY is required in environment variables',
+        help='warm-up-regions [-j N] [--buckets-file FILE] [bucket...]')
+    parser_warm_up_regions.add_argument(
+        'buckets',
+        nargs='*',
+        help='the buckets to warm up')
+    parser_warm_up_regions.add_argument(
+        '--buckets-file',
+        default=None,
+        help='the file with a bucket per line')
+    parser_warm_up_regions.add_argument(
+        '--persist-path',
+        default=None,
+        help='the regions cache file, default is the one shared by the sdk')
+    parser_warm_up_regions.add_argument(
+        '--accelerate-uploading',
+        action='store_true',
+        help='warm up the regions for accelerate uploading')
+    parser_warm_up_regions.add_argument(
+        '--force',
+        action='store_true',
+        help='query the regions even if they are cached')
+    parser_warm_up_regions.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=16,
+        help='the number of buckets query concurrently')
+    parser_warm_up_regions.set_defaults(func=_warm_up_regions)
 
-    except AttributeError:
-        etag_files = None
+    args = parser.parse_args()
 
-    if etag_files:
-        r = [etag(file) for file in etag_files]
-        if len(r) == 1:
-            print(r[0])
-        else:
-            print(' '.join(r))
+    func = getattr(args, 'func', None)
+    if func is None:
+        parser.print_help()
+        return
+    sys.exit(func(args) or 0)
 
 
 if __name__ == '__main__':
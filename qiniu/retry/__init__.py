@@ -1,7 +1,16 @@
 from .attempt import Attempt
+from .backoff import FixedBackoff, ExponentialBackoff, DecorrelatedJitterBackoff
+from .budget import RetryBudget, default_retry_budget
+from .hedging import Hedging
 from .retrier import Retrier
 
 __all__ = [
     'Attempt',
+    'FixedBackoff',
+    'ExponentialBackoff',
+    'DecorrelatedJitterBackoff',
+    'RetryBudget',
+    'default_retry_budget',
+    'Hedging',
     'Retrier'
 ]
@@ -1,5 +1,7 @@
+from .backoff import Backoff
 from .policy import RetryPolicy
 
 __all__ = [
+    'Backoff',
     'RetryPolicy'
 ]
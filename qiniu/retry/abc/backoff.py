@@ -0,0 +1,22 @@
+import abc
+
+
+class Backoff(object):
+    __metaclass__ = abc.ABCMeta
+
+    @abc.abstractmethod
+    def get_delay(self, retried_times, last_delay):
+        """
+        the seconds to wait before next attempt
+
+        Parameters
+        ----------
+        retried_times: int
+            the times retried before this retry, 0 for the first retry
+        last_delay: float
+            the delay of last retry, 0 for the first retry
+
+        Returns
+        -------
+        float
+        """
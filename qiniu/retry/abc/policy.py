@@ -59,3 +59,14 @@ class RetryPolicy(object):
         attempt: qiniu.retry.attempt.Attempt
         policy: RetryPolicy
         """
+
+    def after_attempt(self, attempt):
+        """
+        called when each attempt finished, whether it succeeded or not.
+        unlike other methods, it's also called if the result is returned from the code block of the attempt directly,
+        so it's useful to observe the attempts.
+
+        Parameters
+        ----------
+        attempt: qiniu.retry.attempt.Attempt
+        """
@@ -1,18 +1,32 @@
+import time
+
+
 class Attempt:
-    def __init__(self, custom_context=None):
+    def __init__(self, custom_context=None, after_attempt=None):
         """
         Parameters
         ----------
         custom_context: dict or None
+        after_attempt: callable or None
+            `(attempt: Attempt) -> None`, called when the code block of the attempt exited,
+            even though it returned the result directly from the code block.
         """
         self.context = custom_context if custom_context is not None else {}
         self.exception = None
         self.result = None
+        self.started_at = None
+        self.finished_at = None
+        self.after_attempt = after_attempt
 
     def __enter__(self):
-        pass
+        self.started_at = time.time()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if exc_type is not None and exc_val is not None:
+        self.finished_at = time.time()
+        swallow = exc_type is not None and exc_val is not None
+        if swallow:
             self.exception = exc_val
+        if callable(self.after_attempt):
+            self.after_attempt(self)
+        if swallow:
             return True  # Swallow exception.
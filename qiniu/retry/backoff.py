@@ -0,0 +1,65 @@
+import random
+
+from .abc import Backoff
+
+
+class FixedBackoff(Backoff):
+    def __init__(self, delay):
+        """
+        Parameters
+        ----------
+        delay: float
+            seconds
+        """
+        self.delay = delay
+
+    def get_delay(self, retried_times, last_delay):
+        return self.delay
+
+
+class ExponentialBackoff(Backoff):
+    def __init__(self, base_delay=0.1, max_delay=5, multiplier=2, full_jitter=True):
+        """
+        The delay is `min(max_delay, base_delay * multiplier ** retried_times)`,
+        which is randomized in `[0, delay]` if `full_jitter`,
+        so the clients failed at the same time don't retry at the same time.
+
+        Parameters
+        ----------
+        base_delay: float
+        max_delay: float
+        multiplier: float
+        full_jitter: bool
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.full_jitter = full_jitter
+
+    def get_delay(self, retried_times, last_delay):
+        # avoid overflow by large retried times
+        delay = self.max_delay
+        if retried_times < 64:
+            delay = min(self.max_delay, self.base_delay * self.multiplier ** retried_times)
+        if self.full_jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+
+class DecorrelatedJitterBackoff(Backoff):
+    def __init__(self, base_delay=0.1, max_delay=5):
+        """
+        The delay is randomized in `[base_delay, last_delay * 3]` and capped by `max_delay`,
+        it grows like the exponential backoff but spreads better.
+
+        Parameters
+        ----------
+        base_delay: float
+        max_delay: float
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def get_delay(self, retried_times, last_delay):
+        upper = max(self.base_delay, last_delay * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
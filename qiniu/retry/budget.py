@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import namedtuple
+
+
+# use dataclass instead namedtuple if min version of python update to 3.7
+RetryBudgetStats = namedtuple(
+    'RetryBudgetStats',
+    [
+        'requests',
+        'retries',
+        'rejected_retries',
+        'tokens'
+    ]
+)
+
+
+class RetryBudget(object):
+    """
+    A token bucket shared by retriers, which limits the retries to a ratio of the requests.
+
+    Each request deposits `ratio` tokens, and each retry withdraws one.
+    The bucket is also refilled by `min_retries_per_second`, so the clients with few requests could still retry.
+    When the bucket is empty, the retriers stop retrying and return the last result,
+    so the retries don't amplify the load during an outage.
+    """
+
+    def __init__(self, ratio=0.2, min_retries_per_second=10, max_tokens=100):
+        """
+        Parameters
+        ----------
+        ratio: float
+            the max ratio of retries to requests
+        min_retries_per_second: float
+        max_tokens: float
+            the max tokens could be saved, also the initial tokens
+        """
+        if ratio < 0:
+            raise ValueError('ratio must not be negative')
+        if max_tokens < 0:
+            raise ValueError('max_tokens must not be negative')
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_tokens = max_tokens
+
+        self.__tokens = float(max_tokens)
+        self.__refilled_at = time.time()
+        self.__requests = 0
+        self.__retries = 0
+        self.__rejected_retries = 0
+        self.__lock = threading.Lock()
+
+    def deposit(self):
+        """
+        called when a request starts, not including its retries
+        """
+        with self.__lock:
+            self.__requests += 1
+            self.__tokens = min(self.max_tokens, self.__tokens + self.ratio)
+
+    def withdraw(self):
+        """
+        called before retry
+
+        Returns
+        -------
+        bool
+            False if there isn't enough budget to retry
+        """
+        with self.__lock:
+            now = time.time()
+            self.__tokens = min(
+                self.max_tokens,
+                self.__tokens + (now - self.__refilled_at) * self.min_retries_per_second
+            )
+            self.__refilled_at = now
+            if self.__tokens < 1:
+                self.__rejected_retries += 1
+                return False
+            self.__tokens -= 1
+            self.__retries += 1
+            return True
+
+    def stats(self):
+        """
+        Returns
+        -------
+        RetryBudgetStats
+        """
+        with self.__lock:
+            return RetryBudgetStats(
+                requests=self.__requests,
+                retries=self.__retries,
+                rejected_retries=self.__rejected_retries,
+                tokens=self.__tokens
+            )
+
+
+default_retry_budget = RetryBudget()
@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent import futures
+
+
+# use dataclass instead namedtuple if min version of python update to 3.7
+HedgingStats = namedtuple(
+    'HedgingStats',
+    [
+        'requests',
+        'hedges',
+        'hedge_wins',
+        'delay'
+    ]
+)
+
+
+class Hedging(object):
+    """
+    Hedge the slow requests, which are IDEMPOTENT only.
+
+    If the request to the endpoint in retry context has not answered within the delay,
+    the same request is sent to the next alternative endpoint, and the first accepted result is taken.
+    The delay is the percentile of the recent latencies, unless it's fixed.
+
+    The hedges are budgeted by a token bucket, each request earns `max_hedge_ratio` tokens,
+    and each hedge costs one, so there are at most `max_hedge_ratio` extra requests.
+
+    Examples
+    --------
+    hedging = Hedging(delay_percentile=95, max_hedge_ratio=0.05)
+    for attempt in retrier:
+        with attempt:
+            attempt.result = hedging.do(
+                attempt.context,
+                lambda ctx: send_request(ctx['endpoint'])
+            )
+    """
+
+    def __init__(
+        self,
+        delay=None,
+        delay_percentile=95,
+        initial_delay=1.0,
+        min_delay=0.01,
+        max_hedge_ratio=0.05,
+        max_burst=10,
+        window_size=1000,
+        max_workers=16
+    ):
+        """
+        Parameters
+        ----------
+        delay: float, optional
+            the fixed seconds to wait before hedging. The percentile delay is used if not specified.
+        delay_percentile: float
+            in range (0, 100]
+        initial_delay: float
+            the seconds to wait before there are enough latencies to compute the percentile
+        min_delay: float
+        max_hedge_ratio: float
+            the max ratio of extra requests, in range [0, 1]
+        max_burst: float
+            the max tokens could be saved, which limits the hedges in burst
+        window_size: int
+            the count of the recent latencies to compute the percentile
+        max_workers: int
+            the max threads of the executor, which sends the requests and hedges
+        """
+        if not 0 < delay_percentile <= 100:
+            raise ValueError('delay_percentile must be in range (0, 100]')
+        if not 0 <= max_hedge_ratio <= 1:
+            raise ValueError('max_hedge_ratio must be in range [0, 1]')
+        self.delay = delay
+        self.delay_percentile = delay_percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_hedge_ratio = max_hedge_ratio
+        self.max_burst = max_burst
+        self.max_workers = max_workers
+
+        self.__latencies = deque(maxlen=window_size)
+        self.__tokens = 0.0
+        self.__requests = 0
+        self.__hedges = 0
+        self.__hedge_wins = 0
+        self.__lock = threading.Lock()
+        self.__executor = None
+
+    def get_delay(self):
+        """
+        Returns
+        -------
+        float
+            the seconds to wait before hedging
+        """
+        if self.delay is not None:
+            return self.delay
+        with self.__lock:
+            latencies = sorted(self.__latencies)
+        # too few samples to compute the percentile
+        if len(latencies) * (100 - self.delay_percentile) < 100:
+            return self.initial_delay
+        index = int(len(latencies) * self.delay_percentile / 100.0)
+        return max(self.min_delay, latencies[min(index, len(latencies) - 1)])
+
+    def do(self, context, func, accept_result=None):
+        """
+        Parameters
+        ----------
+        context: dict
+            the retry context with `endpoint` and `alternative_endpoints`.
+            The endpoint used by hedge is taken from `alternative_endpoints`,
+            and `endpoint` is set to the one responded the result.
+        func: callable
+            `(context: dict) -> Any`, the idempotent request with a shallow copy of the context.
+        accept_result: callable, optional
+            `(result: Any) -> bool`. Any result is accepted if not specified,
+            the exceptions are never accepted.
+
+        Returns
+        -------
+        Any
+            the first accepted result, or the result of the request if none of them accepted.
+        """
+        with self.__lock:
+            self.__requests += 1
+            self.__tokens = min(self.max_burst, self.__tokens + self.max_hedge_ratio)
+
+        executor = self.__get_executor()
+        started_at = time.time()
+        primary_ftr = executor.submit(func, dict(context))
+        primary_ftr.add_done_callback(
+            lambda _ftr: self.__record_latency(time.time() - started_at)
+        )
+
+        done, _ = futures.wait([primary_ftr], timeout=self.get_delay())
+        if done or not context.get('alternative_endpoints') or not self.__acquire_token():
+            return primary_ftr.result()
+
+        # change to `list.copy` for more readable when min version of python update to >= 3
+        alternative_endpoints = context['alternative_endpoints'][:]
+        hedge_context = dict(context)
+        hedge_context['endpoint'] = alternative_endpoints.pop(0)
+        hedge_context['alternative_endpoints'] = []
+        # the endpoint used by hedge shouldn't be retried
+        context['alternative_endpoints'] = alternative_endpoints
+        hedge_ftr = executor.submit(func, hedge_context)
+
+        not_done = set([primary_ftr, hedge_ftr])
+        while not_done:
+            done, not_done = futures.wait(not_done, return_when=futures.FIRST_COMPLETED)
+            for ftr in done:
+                if ftr.exception() is not None:
+                    continue
+                result = ftr.result()
+                if accept_result is not None and not accept_result(result):
+                    continue
+                if ftr is hedge_ftr:
+                    context['endpoint'] = hedge_context['endpoint']
+                    with self.__lock:
+                        self.__hedge_wins += 1
+                return result
+
+        return primary_ftr.result()
+
+    def stats(self):
+        """
+        Returns
+        -------
+        HedgingStats
+        """
+        delay = self.get_delay()
+        with self.__lock:
+            return HedgingStats(
+                requests=self.__requests,
+                hedges=self.__hedges,
+                hedge_wins=self.__hedge_wins,
+                delay=delay
+            )
+
+    def __acquire_token(self):
+        with self.__lock:
+            if self.__tokens < 1:
+                return False
+            self.__tokens -= 1
+            self.__hedges += 1
+            return True
+
+    def __record_latency(self, latency):
+        with self.__lock:
+            self.__latencies.append(latency)
+
+    def __get_executor(self):
+        if self.__executor is None:
+            with self.__lock:
+                if self.__executor is None:
+                    self.__executor = futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        return self.__executor
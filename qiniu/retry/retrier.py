@@ -1,4 +1,5 @@
 import functools
+import time
 
 from .attempt import Attempt
 
@@ -8,16 +9,26 @@ def before_retry_nothing(attempt, policy):
 
 
 class Retrier:
-    def __init__(self, policies=None, before_retry=None):
+    def __init__(self, policies=None, before_retry=None, backoff=None, retry_budget=None, sleep=None):
         """
         Parameters
         ----------
         policies: list[qiniu.retry.abc.RetryPolicy]
         before_retry: callable
             `(attempt: Attempt, policy: qiniu.retry.abc.RetryPolicy) -> bool`
+        backoff: qiniu.retry.abc.Backoff
+            the delay before each retry, no delay if not specified.
+            it blocks the thread, so don't use it in the coroutines.
+        retry_budget: qiniu.retry.budget.RetryBudget
+            stop retrying when the budget shared by retriers runs out
+        sleep: callable
+            `(seconds: float) -> None`, default is `time.sleep`
         """
         self.policies = policies if policies is not None else []
         self.before_retry = before_retry if before_retry is not None else before_retry_nothing
+        self.backoff = backoff
+        self.retry_budget = retry_budget
+        self.sleep = sleep if sleep is not None else time.sleep
 
     def __iter__(self):
         retrying = Retrying(
@@ -26,8 +37,12 @@ class Retrier:
             before_retry=self.before_retry
         )
         retrying.init_context()
+        if self.retry_budget is not None:
+            self.retry_budget.deposit()
+        retried_times = 0
+        delay = 0
         while True:
-            attempt = Attempt(retrying.context)
+            attempt = Attempt(retrying.context, after_attempt=retrying.after_attempt)
             yield attempt
             if (
                 hasattr(attempt.exception, 'no_need_retry') and
@@ -39,8 +54,15 @@ class Retrier:
                 break
             if not self.before_retry(attempt, policy):
                 break
+            if self.retry_budget is not None and not self.retry_budget.withdraw():
+                break
+            if self.backoff is not None:
+                delay = self.backoff.get_delay(retried_times, delay)
+                if delay > 0:
+                    self.sleep(delay)
             policy.prepare_retry(attempt)
             retrying.after_retried(attempt, policy)
+            retried_times += 1
         if attempt.exception:
             raise attempt.exception
 
@@ -145,6 +167,10 @@ class Retrying:
         for p in self.policies:
             p.after_retry(attempt, policy)
 
+    def after_attempt(self, attempt):
+        for p in self.policies:
+            p.after_attempt(attempt)
+
 
 """
 Examples
@@ -1,13 +1,40 @@
+from qiniu.http.endpoint_health import default_endpoint_health_tracker
+from qiniu.http.endpoint_health_retry_policy import EndpointHealthRetryPolicy
 from qiniu.http.endpoints_retry_policy import EndpointsRetryPolicy
 from qiniu.http.regions_retry_policy import RegionsRetryPolicy
 from qiniu.retry import Retrier
+from qiniu.retry.budget import default_retry_budget
 
 
 def get_default_retrier(
     regions_provider,
     service_names,
     preferred_endpoints_provider=None,
+    endpoint_health_tracker=default_endpoint_health_tracker,
+    backoff=None,
+    retry_budget=default_retry_budget,
+    record_latency=True
 ):
+    """
+    Parameters
+    ----------
+    regions_provider: Iterable[Region]
+    service_names: list[ServiceName]
+    preferred_endpoints_provider: Iterable[Endpoint]
+    endpoint_health_tracker: EndpointHealthTracker
+        order the endpoints by their health. None to keep the original order.
+    backoff: qiniu.retry.abc.Backoff
+        the delay before each retry. None to retry immediately.
+    retry_budget: qiniu.retry.RetryBudget
+        the budget shared by retriers. None to retry without limit.
+    record_latency: bool
+        record the duration of attempts as the latency of endpoints,
+        False if the duration depends on the size of data, such as downloading.
+
+    Returns
+    -------
+    Retrier
+    """
     if not service_names:
         raise ValueError('service_names should not be empty')
 
@@ -22,4 +49,14 @@ def get_default_retrier(
         )
     ]
 
-    return Retrier(retry_policies)
+    if endpoint_health_tracker is not None:
+        retry_policies.append(EndpointHealthRetryPolicy(
+            endpoint_health_tracker,
+            record_latency=record_latency
+        ))
+
+    return Retrier(
+        retry_policies,
+        backoff=backoff,
+        retry_budget=retry_budget
+    )
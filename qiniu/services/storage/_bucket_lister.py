@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from collections import namedtuple
+from concurrent import futures
+
+from qiniu.compat import queue
+
+
+# use dataclass instead namedtuple if min version of python update to 3.7
+ListShardStats = namedtuple(
+    'ListShardStats',
+    [
+        'prefix',
+        'delimiter',
+        'pages',
+        'items',
+        'elapsed',
+        'items_per_second'
+    ]
+)
+
+_ListShard = namedtuple(
+    'ListShard',
+    [
+        'prefix',
+        'delimiter'
+    ]
+)
+
+_MSG_PAGE = 'page'
+_MSG_DONE = 'done'
+_MSG_ERROR = 'error'
+
+
+class ObjectsLister(object):
+    """
+    Follow the markers of `BucketManager.list` automatically and list shards concurrently.
+
+    Every shard is listed by a worker of the thread pool, which pushes pages into a bounded queue,
+    so the next page is always being fetched while the caller consumes the current one.
+    """
+
+    def __init__(
+        self,
+        list_func,
+        bucket,
+        limit=None,
+        max_workers=4,
+        prefetch_pages=1,
+        ordered=True,
+        shard_stats_handler=None
+    ):
+        """
+        Parameters
+        ----------
+        list_func: callable
+            `(bucket, prefix, marker, limit, delimiter) -> (dict, bool, ResponseInfo)`, e.g. `BucketManager.list`
+        bucket: str
+        limit: int
+            page size of every list request
+        max_workers: int
+            how many shards could be listed at the same time
+        prefetch_pages: int
+            how many pages could be buffered by every shard
+        ordered: bool
+            if True, the shards are yielded one by one by the order of shards,
+            else the pages are yielded as soon as they arrived
+        shard_stats_handler: callable
+            `(stats: ListShardStats) -> None`, called when a shard is done
+        """
+        if max_workers < 1:
+            raise ValueError('max_workers must be greater than 0')
+        if prefetch_pages < 1:
+            raise ValueError('prefetch_pages must be greater than 0')
+        self.list_func = list_func
+        self.bucket = bucket
+        self.limit = limit
+        self.max_workers = max_workers
+        self.prefetch_pages = prefetch_pages
+        self.ordered = ordered
+        self.shard_stats_handler = shard_stats_handler
+
+    def iter_objects(self, prefixes=None, shard_delimiter=None, prefix=None):
+        """
+        Parameters
+        ----------
+        prefixes: list[str]
+            list every prefix as a shard
+        shard_delimiter: str
+            discover shards by listing `prefix` with the delimiter,
+            every common prefix will be listed as a shard
+        prefix: str
+            used when `prefixes` not provided
+
+        Yields
+        ------
+        dict
+            the item of list response
+        """
+        if prefixes:
+            shards = [_ListShard(prefix=p, delimiter=None) for p in prefixes]
+        elif shard_delimiter:
+            shards = [_ListShard(prefix=prefix, delimiter=shard_delimiter)]
+        else:
+            shards = [_ListShard(prefix=prefix, delimiter=None)]
+
+        stop_event = threading.Event()
+        executor = futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            if self.ordered:
+                items_iter = self.__iter_ordered(executor, stop_event, shards)
+            else:
+                items_iter = self.__iter_unordered(executor, stop_event, shards)
+            # change to `yield from` when min version of python update to >= 3.3
+            for item in items_iter:
+                yield item
+        finally:
+            stop_event.set()
+            executor.shutdown(wait=False)
+
+    def __iter_ordered(self, executor, stop_event, shards):
+        channels = []
+
+        def submit(shard):
+            q = queue.Queue(maxsize=self.prefetch_pages)
+            channels.append((shard, q))
+            executor.submit(self.__list_shard, shard, q, stop_event)
+
+        for s in shards:
+            submit(s)
+
+        i = 0
+        while i < len(channels):
+            _shard, q = channels[i]
+            while True:
+                shard, msg_type, payload = q.get()
+                if msg_type == _MSG_ERROR:
+                    raise payload
+                if msg_type == _MSG_DONE:
+                    self.__handle_shard_stats(payload)
+                    break
+                items, common_prefixes = payload
+                for p in common_prefixes:
+                    submit(_ListShard(prefix=p, delimiter=None))
+                for item in items:
+                    yield item
+            i += 1
+
+    def __iter_unordered(self, executor, stop_event, shards):
+        q = queue.Queue(maxsize=self.prefetch_pages * self.max_workers)
+        pending = [0]
+
+        def submit(shard):
+            pending[0] += 1
+            executor.submit(self.__list_shard, shard, q, stop_event)
+
+        for s in shards:
+            submit(s)
+
+        while pending[0] > 0:
+            shard, msg_type, payload = q.get()
+            if msg_type == _MSG_ERROR:
+                raise payload
+            if msg_type == _MSG_DONE:
+                pending[0] -= 1
+                self.__handle_shard_stats(payload)
+                continue
+            items, common_prefixes = payload
+            for p in common_prefixes:
+                submit(_ListShard(prefix=p, delimiter=None))
+            for item in items:
+                yield item
+
+    def __handle_shard_stats(self, stats):
+        if callable(self.shard_stats_handler):
+            self.shard_stats_handler(stats)
+
+    def __list_shard(self, shard, q, stop_event):
+        """
+        Parameters
+        ----------
+        shard: _ListShard
+        q: queue.Queue
+        stop_event: threading.Event
+        """
+        started_at = time.time()
+        pages, items_count = 0, 0
+        marker = None
+        try:
+            while not stop_event.is_set():
+                ret, eof, resp = self.list_func(
+                    self.bucket,
+                    prefix=shard.prefix,
+                    marker=marker,
+                    limit=self.limit,
+                    delimiter=shard.delimiter
+                )
+                if ret is None:
+                    raise RuntimeError(
+                        (
+                            'List objects failed with '
+                            'HTTP Status Code {0}, '
+                            'Body {1}'
+                        ).format(resp.status_code, resp.text_body)
+                    )
+                items = ret.get('items', [])
+                pages += 1
+                items_count += len(items)
+                common_prefixes = ret.get('commonPrefixes', []) if shard.delimiter else []
+                _put_until_stopped(q, (shard, _MSG_PAGE, (items, common_prefixes)), stop_event)
+                marker = ret.get('marker')
+                if eof or not marker:
+                    break
+
+            elapsed = time.time() - started_at
+            stats = ListShardStats(
+                prefix=shard.prefix,
+                delimiter=shard.delimiter,
+                pages=pages,
+                items=items_count,
+                elapsed=elapsed,
+                items_per_second=items_count / elapsed if elapsed > 0 else float(items_count)
+            )
+            _put_until_stopped(q, (shard, _MSG_DONE, stats), stop_event)
+        except Exception as err:
+            _put_until_stopped(q, (shard, _MSG_ERROR, err), stop_event)
+
+
+def _put_until_stopped(q, msg, stop_event, interval=0.1):
+    """
+    Parameters
+    ----------
+    q: queue.Queue
+    msg: any
+    stop_event: threading.Event
+    interval: float
+    """
+    while not stop_event.is_set():
+        try:
+            q.put(msg, timeout=interval)
+            return
+        except queue.Full:
+            continue
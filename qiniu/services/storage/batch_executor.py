@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+import itertools
+import time
+from collections import namedtuple, deque
+from concurrent import futures
+
+from qiniu.compat import s as to_str
+from qiniu.utils import urlsafe_base64_decode
+
+
+# the max operations count of one batch request, limited by server
+MAX_BATCH_SIZE = 1000
+
+# the codes of single operation which are worth to retry
+DEFAULT_RETRYABLE_CODES = (500, 502, 503, 504, 573, 599)
+
+# use dataclass instead namedtuple if min version of python update to 3.7
+BatchOpResult = namedtuple(
+    'BatchOpResult',
+    [
+        'op',
+        'bucket',
+        'key',
+        'code',
+        'data'
+    ]
+)
+
+
+class BatchExecutor(object):
+    """批量操作执行器
+
+    将任意长度的资源管理操作迭代器按服务端限制拆分为多个 `/batch` 请求并发执行，
+    仅对失败且可重试的单个操作进行重试，并按输入顺序逐个返回每个操作的结果。
+    同时在途的请求数有上限，所以输入再多内存占用也是有界的。
+
+    Examples:
+        executor = BatchExecutor(bucket_manager, max_in_flight=8)
+        for result in executor.execute(build_batch_delete(bucket, keys)):
+            if result.code != 200:
+                print(result.key, result.data)
+    """
+
+    def __init__(
+        self,
+        bucket_manager,
+        batch_size=MAX_BATCH_SIZE,
+        max_in_flight=4,
+        max_retry_times=3,
+        retry_interval=0.5,
+        retryable_codes=None,
+        concurrent_executor=None
+    ):
+        """
+        Args:
+            bucket_manager:      BucketManager 对象
+            batch_size:          单次 batch 请求包含的操作数，不超过 1000
+            max_in_flight:       同时在途的 batch 请求数，
+                                 建议不超过 qiniu.config.set_default 中的 connection_pool 以复用连接
+            max_retry_times:     失败操作的最大重试次数
+            retry_interval:      首次重试的等待时间，单位秒，之后每次翻倍
+            retryable_codes:     可重试的单个操作状态码，默认为 DEFAULT_RETRYABLE_CODES
+            concurrent_executor: futures.Executor 对象，默认创建 max_in_flight 个线程的线程池
+        """
+        if not 0 < batch_size <= MAX_BATCH_SIZE:
+            raise ValueError('batch_size must be in range (0, {0}]'.format(MAX_BATCH_SIZE))
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be greater than 0')
+        self.bucket_manager = bucket_manager
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.max_retry_times = max_retry_times
+        self.retry_interval = retry_interval
+        self.retryable_codes = retryable_codes if retryable_codes is not None else DEFAULT_RETRYABLE_CODES
+        self.concurrent_executor = concurrent_executor
+
+    def execute(self, operations):
+        """
+        Args:
+            operations: 资源管理操作的可迭代对象，
+                        可由 build_batch_delete、build_batch_copy 等函数生成，也可为生成器
+
+        Returns:
+            一个生成器，按输入顺序每次产生一个 BatchOpResult
+        """
+        ops_iter = iter(operations)
+        executor = self.concurrent_executor
+        own_executor = executor is None
+        if own_executor:
+            executor = futures.ThreadPoolExecutor(max_workers=self.max_in_flight)
+
+        in_flight = deque()
+        try:
+            while True:
+                while len(in_flight) < self.max_in_flight:
+                    chunk = list(itertools.islice(ops_iter, self.batch_size))
+                    if not chunk:
+                        break
+                    in_flight.append(executor.submit(self.__execute_chunk, chunk))
+                if not in_flight:
+                    break
+                # change to `yield from` when min version of python update to >= 3.3
+                for result in in_flight.popleft().result():
+                    yield result
+        finally:
+            for ftr in in_flight:
+                ftr.cancel()
+            if own_executor:
+                executor.shutdown(wait=False)
+
+    def __execute_chunk(self, chunk):
+        """
+        Parameters
+        ----------
+        chunk: list[str]
+
+        Returns
+        -------
+        list[BatchOpResult]
+        """
+        results = [None] * len(chunk)
+        pending_indexes = list(range(len(chunk)))
+        retried_times = 0
+
+        while True:
+            ops = [chunk[i] for i in pending_indexes]
+            ret, resp = self.bucket_manager.batch(ops)
+            retry_indexes = []
+
+            # the response body of partial failure (298) or all failed (400) is still the results list,
+            # but ret is None by the status code is not 200
+            if not isinstance(ret, list):
+                body = resp.json()
+                if isinstance(body, list):
+                    ret = body
+
+            if isinstance(ret, list) and len(ret) == len(ops):
+                for i, op_ret in zip(pending_indexes, ret):
+                    code = op_ret.get('code', -1)
+                    results[i] = _build_result(chunk[i], code, op_ret.get('data'))
+                    if code in self.retryable_codes:
+                        retry_indexes.append(i)
+            else:
+                # the whole request failed, the body could be an error message
+                code = resp.status_code
+                data = ret if ret else {'error': getattr(resp, 'error', resp.text_body)}
+                for i in pending_indexes:
+                    results[i] = _build_result(chunk[i], code, data)
+                if resp.need_retry():
+                    retry_indexes = pending_indexes
+
+            if not retry_indexes or retried_times >= self.max_retry_times:
+                break
+            time.sleep(self.retry_interval * (2 ** retried_times))
+            retried_times += 1
+            pending_indexes = retry_indexes
+
+        return results
+
+
+def _build_result(op, code, data):
+    """
+    Parameters
+    ----------
+    op: str
+    code: int
+    data: dict or None
+
+    Returns
+    -------
+    BatchOpResult
+    """
+    bucket, key = None, None
+    segments = op.split('/')
+    if len(segments) >= 2:
+        # `qiniu.utils.decode_entry` will truncate the key contains ':'
+        entry_segments = to_str(urlsafe_base64_decode(segments[1])).split(':', 1)
+        bucket = entry_segments[0]
+        key = entry_segments[1] if len(entry_segments) > 1 else None
+    return BatchOpResult(
+        op=op,
+        bucket=bucket,
+        key=key,
+        code=code,
+        data=data
+    )
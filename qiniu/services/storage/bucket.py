@@ -1,12 +1,18 @@
 # -*- coding: utf-8 -*-
+import threading
+
 from qiniu import config, QiniuMacAuth
 from qiniu import http
 from qiniu.utils import urlsafe_base64_encode, entry, decode_entry
 from qiniu.http.endpoint import Endpoint
+from qiniu.http.endpoint_health import default_endpoint_health_tracker
+from qiniu.http.instrumentation import request_tags
 from qiniu.http.region import Region, ServiceName
-from qiniu.http.regions_provider import get_default_regions_provider
+from qiniu.http.regions_provider import get_default_regions_provider, MemoizedRegionsProvider
+from qiniu.retry.budget import default_retry_budget
 
 from ._bucket_default_retrier import get_default_retrier
+from ._bucket_lister import ObjectsLister, ListShardStats  # noqa
 
 
 class BucketManager(object):
@@ -25,7 +31,11 @@ class BucketManager(object):
         zone=None,
         regions=None,
         query_regions_endpoints=None,
-        preferred_scheme='http'
+        preferred_scheme='http',
+        endpoint_health_tracker=default_endpoint_health_tracker,
+        hedging=None,
+        retry_backoff=None,
+        retry_budget=default_retry_budget
     ):
         """
         Parameters
@@ -35,6 +45,14 @@ class BucketManager(object):
         regions: list[Region]
         query_regions_endpoints: list[Endpoint]
         preferred_scheme: str, default='http'
+        endpoint_health_tracker: EndpointHealthTracker, default=default_endpoint_health_tracker
+            order the endpoints by their health. None to keep the original order.
+        hedging: qiniu.retry.hedging.Hedging, optional
+            hedge the slow idempotent requests, such as stat, list and querying regions.
+        retry_backoff: qiniu.retry.abc.Backoff, optional
+            the delay before each retry, retry immediately if not specified.
+        retry_budget: qiniu.retry.RetryBudget, default=default_retry_budget
+            the budget of retries shared by managers. None to retry without limit.
         """
         self.auth = auth
         self.mac_auth = QiniuMacAuth(
@@ -50,6 +68,16 @@ class BucketManager(object):
         self.regions = regions
         self.query_regions_endpoints = query_regions_endpoints
         self.preferred_scheme = preferred_scheme
+        self.endpoint_health_tracker = endpoint_health_tracker
+        self.hedging = hedging
+        self.retry_backoff = retry_backoff
+        self.retry_budget = retry_budget
+
+        # memoize the regions providers and retriers,
+        # which cost more than the request itself when stat or delete in high frequency
+        self.__regions_providers = {}
+        self.__retriers = {}
+        self.__memo_lock = threading.Lock()
 
     def list(self, bucket, prefix=None, marker=None, limit=None, delimiter=None):
         """前缀查询:
@@ -89,7 +117,8 @@ class BucketManager(object):
             [ServiceName.RSF],
             '/list',
             data=options,
-            method='GET'
+            method='GET',
+            idempotent=True
         )
 
         eof = False
@@ -98,6 +127,58 @@ class BucketManager(object):
 
         return ret, eof, info
 
+    def iter_objects(
+        self,
+        bucket,
+        prefix=None,
+        limit=None,
+        prefixes=None,
+        shard_delimiter=None,
+        max_workers=4,
+        ordered=True,
+        prefetch_pages=1,
+        shard_stats_handler=None
+    ):
+        """自动翻页列举:
+
+        自动跟随 marker 列举所有文件，在调用方处理当前页时预取下一页。
+        可将列举范围按前缀拆分为多个分片，在线程池中并发列举。
+
+        Args:
+            bucket:              空间名
+            prefix:              列举前缀
+            limit:               单次列举个数限制
+            prefixes:            分片前缀列表，每个前缀作为一个分片列举，不可与 prefix 或 shard_delimiter 同时使用
+            shard_delimiter:     按分隔符拆分分片，prefix 下的每个公共前缀作为一个分片列举
+            max_workers:         并发列举的分片数
+            ordered:             是否按分片顺序输出，为 False 时按到达顺序输出
+            prefetch_pages:      每个分片最多预取的页数
+            shard_stats_handler: 分片列举完成的回调，参数为 ListShardStats，可用于统计每个分片的吞吐
+
+        Returns:
+            一个生成器，每次产生一个dict变量，类似 {"hash": "<Hash string>", "key": "<Key string>"}
+
+        Raises:
+            RuntimeError: 列举请求失败
+        """
+        if prefixes and (prefix is not None or shard_delimiter):
+            raise ValueError('"prefixes" could not be used with "prefix" or "shard_delimiter"')
+
+        lister = ObjectsLister(
+            list_func=self.list,
+            bucket=bucket,
+            limit=limit,
+            max_workers=max_workers,
+            prefetch_pages=prefetch_pages,
+            ordered=ordered,
+            shard_stats_handler=shard_stats_handler
+        )
+        return lister.iter_objects(
+            prefixes=prefixes,
+            shard_delimiter=shard_delimiter,
+            prefix=prefix
+        )
+
     def list_domains(self, bucket):
         """获取 Bucket 空间域名
         https://developer.qiniu.com/kodo/3949/get-the-bucket-space-domain
@@ -109,7 +190,7 @@ class BucketManager(object):
             resBody, respInfo
             resBody 为绑定的域名列表，格式：["example.com"]
         """
-        return self.__uc_do_with_retrier('/v2/domains?tbl={0}'.format(bucket))
+        return self.__uc_do_with_retrier('/v2/domains?tbl={0}'.format(bucket), idempotent=True)
 
     def stat(self, bucket, key):
         """获取文件信息:
@@ -136,7 +217,8 @@ class BucketManager(object):
         return self.__server_do_with_retrier(
             bucket,
             [ServiceName.RS],
-            '/stat/{0}'.format(resource)
+            '/stat/{0}'.format(resource),
+            idempotent=True
         )
 
     def delete(self, bucket, key):
@@ -489,7 +571,7 @@ class BucketManager(object):
                 [ <Bucket1>, <Bucket2>, ... ]
             一个ResponseInfo对象
         """
-        return self.__uc_do_with_retrier('/buckets')
+        return self.__uc_do_with_retrier('/buckets', idempotent=True)
 
     def delete_after_days(self, bucket, key, days):
         """更新文件生命周期
@@ -535,7 +617,7 @@ class BucketManager(object):
 
         Args:
         """
-        return self.__uc_do_with_retrier('/v3/buckets?region={0}'.format(region))
+        return self.__uc_do_with_retrier('/v3/buckets?region={0}'.format(region), idempotent=True)
 
     def bucket_info(self, bucket_name):
         """
@@ -544,7 +626,7 @@ class BucketManager(object):
         Args:
             bucket_name: 存储空间名
         """
-        return self.__uc_do_with_retrier('/v2/bucketInfo?bucket={0}'.format(bucket_name))
+        return self.__uc_do_with_retrier('/v2/bucketInfo?bucket={0}'.format(bucket_name), idempotent=True)
 
     def bucket_domain(self, bucket_name):
         """
@@ -601,19 +683,75 @@ class BucketManager(object):
                 for h in [query_region_host] + query_region_backup_hosts
             ]
 
-        return get_default_regions_provider(
-            query_endpoints_provider=query_regions_endpoints,
-            access_key=self.auth.get_access_key(),
-            bucket_name=bucket_name,
-            preferred_scheme=self.preferred_scheme
+        access_key = self.auth.get_access_key()
+        memo_key = (
+            access_key,
+            bucket_name,
+            self.preferred_scheme,
+            tuple(e.host for e in query_regions_endpoints)
+        )
+        regions_provider = self.__regions_providers.get(memo_key)
+        if regions_provider is not None:
+            return regions_provider
+
+        regions_provider = MemoizedRegionsProvider(
+            get_default_regions_provider(
+                query_endpoints_provider=query_regions_endpoints,
+                access_key=access_key,
+                bucket_name=bucket_name,
+                preferred_scheme=self.preferred_scheme,
+                hedging=self.hedging
+            )
+        )
+        with self.__memo_lock:
+            return self.__regions_providers.setdefault(memo_key, regions_provider)
+
+    def _get_retrier(self, bucket_name, service_names):
+        """
+        Parameters
+        ----------
+        bucket_name: str
+        service_names: list[ServiceName]
+
+        Returns
+        -------
+        qiniu.retry.Retrier
+            it could be reused, the retrying state is created by each iteration
+        """
+        regions_provider = self._get_regions_provider(bucket_name=bucket_name)
+        if not isinstance(regions_provider, MemoizedRegionsProvider):
+            # the regions or zone specified are cheap to build a retrier
+            return get_default_retrier(
+                regions_provider=regions_provider,
+                service_names=service_names,
+                endpoint_health_tracker=self.endpoint_health_tracker,
+                backoff=self.retry_backoff,
+                retry_budget=self.retry_budget
+            )
+
+        memo_key = (regions_provider, tuple(service_names))
+        retrier = self.__retriers.get(memo_key)
+        if retrier is not None:
+            return retrier
+
+        retrier = get_default_retrier(
+            regions_provider=regions_provider,
+            service_names=service_names,
+            endpoint_health_tracker=self.endpoint_health_tracker,
+            backoff=self.retry_backoff,
+            retry_budget=self.retry_budget
         )
+        with self.__memo_lock:
+            return self.__retriers.setdefault(memo_key, retrier)
 
-    def __uc_do_with_retrier(self, url_resource, data=None):
+    def __uc_do_with_retrier(self, url_resource, data=None, idempotent=False):
         """
         Parameters
         ----------
         url_resource: url
         data: dict or None
+        idempotent: bool
+            the request could be hedged if True
 
         Returns
         -------
@@ -635,15 +773,22 @@ class BucketManager(object):
 
         retrier = get_default_retrier(
             regions_provider=regions,
-            service_names=[ServiceName.UC]
+            service_names=[ServiceName.UC],
+            endpoint_health_tracker=self.endpoint_health_tracker,
+            backoff=self.retry_backoff,
+            retry_budget=self.retry_budget
         )
 
         attempt = None
         for attempt in retrier:
             with attempt:
-                host = attempt.context.get('endpoint').get_value(scheme=self.preferred_scheme)
-                url = host + url_resource
-                attempt.result = self.__post(url, data)
+                attempt.result = self.__do_request(
+                    attempt.context,
+                    self.__post,
+                    url_resource,
+                    data,
+                    idempotent
+                )
                 ret, resp = attempt.result
                 if resp.ok() and ret:
                     return attempt.result
@@ -655,7 +800,15 @@ class BucketManager(object):
 
         return attempt.result
 
-    def __server_do_with_retrier(self, bucket_name, service_names, url_resource, data=None, method='POST'):
+    def __server_do_with_retrier(
+        self,
+        bucket_name,
+        service_names,
+        url_resource,
+        data=None,
+        method='POST',
+        idempotent=False
+    ):
         """
         Parameters
         ----------
@@ -664,6 +817,8 @@ class BucketManager(object):
         url_resource: str
         data: dict or None
         method: str
+        idempotent: bool
+            the request could be hedged if True
 
         Returns
         -------
@@ -673,10 +828,7 @@ class BucketManager(object):
         if not service_names:
             raise ValueError('service_names is empty')
 
-        retrier = get_default_retrier(
-            regions_provider=self._get_regions_provider(bucket_name=bucket_name),
-            service_names=service_names
-        )
+        retrier = self._get_retrier(bucket_name, service_names)
 
         method = method.upper()
         if method == 'POST':
@@ -689,9 +841,13 @@ class BucketManager(object):
         attempt = None
         for attempt in retrier:
             with attempt:
-                host = attempt.context.get('endpoint').get_value(scheme=self.preferred_scheme)
-                url = host + url_resource
-                attempt.result = send_request(url, data)
+                attempt.result = self.__do_request(
+                    attempt.context,
+                    send_request,
+                    url_resource,
+                    data,
+                    idempotent
+                )
                 ret, resp = attempt.result
                 if resp.ok() and ret:
                     return attempt.result
@@ -703,6 +859,36 @@ class BucketManager(object):
 
         return attempt.result
 
+    def __do_request(self, retry_context, send_request, url_resource, data, idempotent):
+        """
+        Parameters
+        ----------
+        retry_context: dict
+        send_request: callable
+            `(url: str, data: dict or None) -> (dict or None, ResponseInfo)`
+        url_resource: str
+        data: dict or None
+        idempotent: bool
+
+        Returns
+        -------
+        ret: dict or None
+        resp: ResponseInfo
+        """
+        def do(context):
+            host = context.get('endpoint').get_value(scheme=self.preferred_scheme)
+            with request_tags(service_name=context.get('service_name')):
+                return send_request(host + url_resource, data)
+
+        if self.hedging is None or not idempotent:
+            return do(retry_context)
+
+        return self.hedging.do(
+            retry_context,
+            do,
+            accept_result=lambda result: not result[1].need_retry()
+        )
+
     def __post(self, url, data=None):
         return http._post_with_qiniu_mac(url, data, self.mac_auth)
 
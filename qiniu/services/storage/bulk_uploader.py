@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+from collections import namedtuple
+from concurrent import futures
+
+from qiniu.services.storage.uploaders import FormUploader, ResumeUploaderV2
+
+
+# the files not larger than it are uploaded by form upload, and the others by resumable upload v2
+DEFAULT_RESUME_THRESHOLD = 4 * (1024 ** 2)
+
+# use dataclass instead namedtuple if min version of python update to 3.7
+BulkUploadResult = namedtuple(
+    'BulkUploadResult',
+    [
+        'file_path',
+        'key',
+        'size',
+        'ok',
+        'skipped',
+        'hash',
+        'error'
+    ]
+)
+
+
+class BulkUploader(object):
+    """批量上传器
+
+    上传一个目录树或任意多个文件，小文件使用表单上传，超过 resume_threshold 的文件使用分片上传 v2。
+    所有文件共享同一个区域信息、上传凭证与连接池，
+    同时上传的文件数与字节数均有上限，所以文件再多内存占用也是有界的。
+
+    指定 manifest_path 时，每个上传成功的文件会追加一行 JSON 到该文件中，
+    重新执行时会跳过其中大小与修改时间均未变化的文件，因此中断后可以继续上传。
+
+    Examples:
+        bulk_uploader = BulkUploader('bucket', auth)
+        for result in bulk_uploader.upload_dir('./images', key_prefix='images/', manifest_path='./images.jsonl'):
+            if not result.ok:
+                print(result.file_path, result.error)
+    """
+
+    def __init__(
+        self,
+        bucket_name,
+        auth,
+        regions=None,
+        resume_threshold=DEFAULT_RESUME_THRESHOLD,
+        part_size=4 * (1024 ** 2),
+        max_in_flight_files=16,
+        max_in_flight_bytes=256 * (1024 ** 2),
+        up_token_expires=3600,
+        upload_progress_recorder=None,
+        concurrent_executor=None
+    ):
+        """
+        Args:
+            bucket_name:              上传的空间名
+            auth:                     Auth 对象
+            regions:                  空间所在的区域，默认查询一次并被所有文件共享
+            resume_threshold:         超过该字节数的文件使用分片上传
+            part_size:                分片上传的分片大小
+            max_in_flight_files:      同时上传的文件数
+            max_in_flight_bytes:      同时上传的文件总字节数，单个文件超过时按该值计算
+            up_token_expires:         上传凭证的有效期，单位秒，凭证由 UpTokenCache 缓存并在过期前更新
+            upload_progress_recorder: 分片上传的断点记录，如 SQLiteUploadProgressRecorder
+            concurrent_executor:      分片上传的分片并发所用的 futures.Executor，默认为所有上传共享的 default_upload_scheduler
+        """
+        if max_in_flight_files < 1:
+            raise ValueError('max_in_flight_files must be greater than 0')
+        if max_in_flight_bytes < 1:
+            raise ValueError('max_in_flight_bytes must be greater than 0')
+        self.bucket_name = bucket_name
+        self.auth = auth
+        self.resume_threshold = resume_threshold
+        self.max_in_flight_files = max_in_flight_files
+        self.max_in_flight_bytes = max_in_flight_bytes
+        self.up_token_expires = up_token_expires
+
+        self.form_uploader = FormUploader(
+            bucket_name,
+            auth=auth,
+            regions=regions
+        )
+        if not regions:
+            # share the regions provider, so the regions are only queried once
+            regions = self.form_uploader._get_regions_provider()
+            self.form_uploader.regions = regions
+
+        resume_uploader_opts = {
+            'auth': auth,
+            'regions': regions,
+            'part_size': part_size,
+            'upload_progress_recorder': upload_progress_recorder
+        }
+        if concurrent_executor is not None:
+            resume_uploader_opts['concurrent_executor'] = concurrent_executor
+        self.resume_uploader = ResumeUploaderV2(
+            bucket_name,
+            **resume_uploader_opts
+        )
+
+    def upload_dir(self, local_dir, key_prefix='', manifest_path=None):
+        """
+        Args:
+            local_dir:     待上传的目录，会递归遍历其中的所有文件
+            key_prefix:    文件名前缀，文件名为前缀加上相对于 local_dir 的路径，使用 / 分隔
+            manifest_path: 记录上传成功的文件的清单路径，若在 local_dir 中，
+                           该文件及以其路径为前缀的文件不会被上传
+
+        Returns:
+            一个生成器，按完成顺序每次产生一个 BulkUploadResult
+        """
+        files = _walk_files(local_dir, key_prefix)
+        if manifest_path:
+            manifest_prefix = os.path.abspath(manifest_path)
+            files = (
+                (file_path, key)
+                for file_path, key in files
+                if not os.path.abspath(file_path).startswith(manifest_prefix)
+            )
+        return self.upload_files(files, manifest_path=manifest_path)
+
+    def upload_files(self, files, manifest_path=None):
+        """
+        Args:
+            files:         (文件路径, 文件名) 的可迭代对象，也可为生成器
+            manifest_path: 记录上传成功的文件的清单路径
+
+        Returns:
+            一个生成器，按完成顺序每次产生一个 BulkUploadResult
+        """
+        finished = _load_manifest(manifest_path) if manifest_path else {}
+        manifest = open(manifest_path, 'a') if manifest_path else None
+
+        files_iter = iter(files)
+        executor = futures.ThreadPoolExecutor(max_workers=self.max_in_flight_files)
+        # future -> (file_path, key, size, mtime, cost)
+        in_flight = {}
+        in_flight_bytes = 0
+        pending = None
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(in_flight) < self.max_in_flight_files:
+                    if pending is None:
+                        file_path_and_key = next(files_iter, None)
+                        if file_path_and_key is None:
+                            exhausted = True
+                            break
+                        file_path, key = file_path_and_key
+                        size = os.path.getsize(file_path)
+                        mtime = int(os.path.getmtime(file_path))
+                        if finished.get(key) == (size, mtime):
+                            yield BulkUploadResult(
+                                file_path=file_path,
+                                key=key,
+                                size=size,
+                                ok=True,
+                                skipped=True,
+                                hash=None,
+                                error=None
+                            )
+                            continue
+                        pending = (file_path, key, size, mtime, min(size, self.max_in_flight_bytes))
+                    cost = pending[-1]
+                    if in_flight and in_flight_bytes + cost > self.max_in_flight_bytes:
+                        break
+                    in_flight[executor.submit(self.__upload_file, *pending[:-1])] = pending
+                    in_flight_bytes += cost
+                    pending = None
+
+                if not in_flight:
+                    break
+
+                done, _ = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+                for ftr in done:
+                    file_path, key, size, mtime, cost = in_flight.pop(ftr)
+                    in_flight_bytes -= cost
+                    result = ftr.result()
+                    if result.ok and manifest:
+                        manifest.write(json.dumps({
+                            'key': key,
+                            'file_path': file_path,
+                            'size': size,
+                            'mtime': mtime,
+                            'hash': result.hash
+                        }) + '\n')
+                        manifest.flush()
+                    yield result
+        finally:
+            for ftr in in_flight:
+                ftr.cancel()
+            executor.shutdown(wait=True)
+            if manifest:
+                manifest.close()
+
+    def __upload_file(self, file_path, key, size, mtime):
+        """
+        Parameters
+        ----------
+        file_path: str
+        key: str
+        size: int
+        mtime: int
+
+        Returns
+        -------
+        BulkUploadResult
+        """
+        uploader = self.form_uploader if size <= self.resume_threshold else self.resume_uploader
+        ret, resp, error = None, None, None
+        try:
+            ret, resp = uploader.upload(
+                key,
+                file_path=file_path,
+                modify_time=mtime,
+                expired=self.up_token_expires
+            )
+        except Exception as err:
+            error = str(err)
+        ok = error is None and resp is not None and resp.ok() and ret is not None
+        if not ok and error is None:
+            error = resp.error if resp is not None else 'unknown'
+        return BulkUploadResult(
+            file_path=file_path,
+            key=key,
+            size=size,
+            ok=ok,
+            skipped=False,
+            hash=ret.get('hash') if ok else None,
+            error=error
+        )
+
+
+def _walk_files(local_dir, key_prefix):
+    """
+    Parameters
+    ----------
+    local_dir: str
+    key_prefix: str
+
+    Yields
+    -------
+    (str, str)
+        file path and key
+    """
+    for dir_path, dir_names, file_names in os.walk(local_dir):
+        # walk in a stable order
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            file_path = os.path.join(dir_path, file_name)
+            if not os.path.isfile(file_path):
+                continue
+            rel_path = os.path.relpath(file_path, local_dir)
+            yield file_path, key_prefix + rel_path.replace(os.sep, '/')
+
+
+def _load_manifest(manifest_path):
+    """
+    Parameters
+    ----------
+    manifest_path: str
+
+    Returns
+    -------
+    dict[str, (int, int)]
+        key -> (size, mtime) of the uploaded files
+    """
+    finished = {}
+    if not os.path.isfile(manifest_path):
+        return finished
+    with open(manifest_path, 'r') as f:
+        for line in f:
+            try:
+                item = json.loads(line)
+                finished[item['key']] = (item['size'], item['mtime'])
+            except (ValueError, KeyError, TypeError):
+                # the last line may be broken by crashing
+                continue
+    return finished
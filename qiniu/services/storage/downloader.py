@@ -0,0 +1,798 @@
+# -*- coding: utf-8 -*-
+import io
+import logging
+import os
+import re
+import shutil
+import threading
+from collections import namedtuple, OrderedDict
+from concurrent import futures
+
+from qiniu.compat import quote
+from qiniu.http.default_client import qn_http_client
+from qiniu.http.endpoint import Endpoint
+from qiniu.http.endpoint_health import default_endpoint_health_tracker
+from qiniu.http.instrumentation import instrument, request_tags
+from qiniu.http.region import ServiceName
+from qiniu.http.regions_provider import get_default_regions_provider
+from qiniu.retry.budget import default_retry_budget
+from qiniu.utils import etag_files, urlsafe_base64_decode
+from qiniu import config
+
+from ._bucket_default_retrier import get_default_retrier
+
+
+# the size of the buffer writing the response body into the file
+_WRITE_BUFFER_SIZE = 64 * 1024
+
+# the suffix of the file being downloaded, it's renamed to the target file after finished
+DOWNLOADING_FILE_SUFFIX = '.qiniu-downloading'
+
+_CONTENT_RANGE_RE = re.compile(r'^bytes\s+(?:(\d+)-(\d+)|\*)/(\d+)$')
+
+# use dataclass instead namedtuple if min version of python update to 3.7
+DownloadResult = namedtuple(
+    'DownloadResult',
+    [
+        'key',
+        'file_path',
+        'size',
+        'etag',
+        'resumed_size'
+    ]
+)
+
+
+class DownloadError(IOError):
+    def __init__(self, message, status_code=None, no_need_retry=False):
+        """
+        Parameters
+        ----------
+        message: str
+        status_code: int, optional
+        no_need_retry: bool
+            the retrier stops retrying other domains if True
+        """
+        super(DownloadError, self).__init__(message)
+        self.status_code = status_code
+        self.no_need_retry = no_need_retry
+
+
+class _FileModifiedError(DownloadError):
+    """
+    The etag or size of the file on the server isn't the same as the downloaded parts
+    """
+    def __init__(self, message, status_code=None):
+        super(_FileModifiedError, self).__init__(message, status_code=status_code, no_need_retry=True)
+
+
+class Downloader(object):
+    """分片并发下载器
+
+    将文件按 part_size 切分为多个字节范围，通过共享的连接池并发下载，并使用 `os.pwrite` 写入预先分配大小的临时文件，
+    全部完成后校验大小与 etag（仅限 qetag 格式），再重命名为目标文件。
+
+    下载域名按 domains（如 CDN 或自定义域名）、空间所在区域的 io 域名的顺序，
+    由与资源管理相同的重试机制依据域名的健康状况选择与切换，每个分片单独重试。
+
+    指定 download_progress_recorder 时，每完成一个分片都会记录进度，
+    中断后再次下载同一文件时，若临时文件仍在且文件未在服务端被修改，则仅下载未完成的分片。
+
+    Examples:
+        downloader = Downloader(domains=['cdn.example.com'], auth=auth, bucket_name='bucket')
+        result = downloader.download_file('key', '/path/to/file')
+    """
+
+    def __init__(
+        self,
+        domains=None,
+        auth=None,
+        bucket_name=None,
+        regions=None,
+        private=None,
+        part_size=8 * (1024 ** 2),
+        max_workers=4,
+        url_expires=3600,
+        preferred_scheme='http',
+        download_progress_recorder=None,
+        verify_etag=True,
+        concurrent_executor=None,
+        endpoint_health_tracker=default_endpoint_health_tracker,
+        retry_backoff=None,
+        retry_budget=default_retry_budget
+    ):
+        """
+        Args:
+            domains:                    下载域名列表，str 或 Endpoint，优先于 io 域名使用
+            auth:                       Auth 对象，用于生成私有下载链接与查询空间所在区域
+            bucket_name:                空间名，提供时将空间所在区域的 io 域名作为下载域名
+            regions:                    空间所在区域，默认通过 auth 与 bucket_name 查询
+            private:                    是否生成私有下载链接，默认在提供 auth 时为 True
+            part_size:                  分片大小
+            max_workers:                同时下载的分片数
+            url_expires:                私有下载链接的有效期，单位秒，每次请求时重新生成
+            preferred_scheme:           域名未指定协议时使用的协议
+            download_progress_recorder: 下载进度记录，接口与分片上传的断点记录相同，如 SQLiteUploadProgressRecorder
+            verify_etag:                下载完成后是否校验 etag，服务端的 etag 不是 qetag 格式时不校验
+            concurrent_executor:        分片下载所用的 futures.Executor，默认每次下载创建 max_workers 个线程
+            endpoint_health_tracker:    域名健康状况记录，None 则按原顺序使用域名
+            retry_backoff:              重试前的等待策略，qiniu.retry.abc.Backoff
+            retry_budget:               重试预算，qiniu.retry.RetryBudget
+        """
+        if part_size <= 0:
+            raise ValueError('part_size must be greater than 0')
+        if max_workers <= 0:
+            raise ValueError('max_workers must be greater than 0')
+        self.domains = [
+            d if isinstance(d, Endpoint) else Endpoint.from_host(d)
+            for d in (domains or [])
+        ]
+        self.auth = auth
+        self.bucket_name = bucket_name
+        self.regions = regions
+        self.private = private if private is not None else auth is not None
+        if self.private and auth is None:
+            raise ValueError('auth is required to download private files')
+        if not self.domains and not regions and not (auth and bucket_name):
+            raise ValueError('Must provide domains, regions or both auth and bucket_name')
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self.url_expires = url_expires
+        self.preferred_scheme = preferred_scheme
+        self.download_progress_recorder = download_progress_recorder
+        self.verify_etag = verify_etag
+        self.concurrent_executor = concurrent_executor
+        self.endpoint_health_tracker = endpoint_health_tracker
+        self.retry_backoff = retry_backoff
+        self.retry_budget = retry_budget
+
+        self.__retrier = None
+        self.__retrier_lock = threading.Lock()
+
+    def download_file(self, key, file_path, progress_handler=None):
+        """
+        Args:
+            key:              待下载的文件名
+            file_path:        保存的本地路径，已存在时会被覆盖
+            progress_handler: 进度回调，参数为已下载的字节数与总字节数，在下载线程中执行
+
+        Returns:
+            DownloadResult
+
+        Raises:
+            DownloadError: 下载失败，或下载的文件大小、etag 与服务端不一致
+        """
+        downloading_path = file_path + DOWNLOADING_FILE_SUFFIX
+        record = self.__get_record(downloading_path, key)
+        if record is not None:
+            resumed_size = sum(self.__get_part_range(record, part_no)[1] for part_no in record['parts'])
+            try:
+                return self.__download_rest_parts(key, file_path, downloading_path, record, resumed_size, progress_handler)
+            except _FileModifiedError as err:
+                # the recorded parts are of the previous version of the file, so download it again from the beginning
+                logging.info('%s is modified since the last downloading, download it again. error: %s', key, err)
+
+        record, etag = self.__download_first_part(key, downloading_path)
+        if record is None:
+            # the whole file is downloaded by the first request
+            return self.__finish(key, file_path, downloading_path, etag, resumed_size=0)
+        return self.__download_rest_parts(key, file_path, downloading_path, record, 0, progress_handler)
+
+    def __download_rest_parts(self, key, file_path, downloading_path, record, resumed_size, progress_handler):
+        """
+        Download the parts not in the record concurrently, then verify and rename the file.
+
+        Raises:
+            _FileModifiedError: the file is modified on the server, the record and the downloading file are deleted
+        """
+        size = record['size']
+        lock = threading.Lock()
+        # only used if os.pwrite is unavailable
+        write_lock = threading.Lock()
+        done_parts = set(record['parts'])
+        state = {'downloaded_size': sum(self.__get_part_range(record, part_no)[1] for part_no in done_parts)}
+
+        def on_part_done(part_no, part_size):
+            with lock:
+                record['parts'].append(part_no)
+                self.__set_record(downloading_path, key, record)
+                state['downloaded_size'] += part_size
+                downloaded_size = state['downloaded_size']
+            if callable(progress_handler):
+                progress_handler(downloaded_size, size)
+
+        if callable(progress_handler):
+            progress_handler(state['downloaded_size'], size)
+
+        executor = self.concurrent_executor
+        if executor is None:
+            executor = futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            with open(downloading_path, 'r+b') as f:
+                part_futures = [
+                    executor.submit(
+                        self.__download_part,
+                        key,
+                        f,
+                        write_lock,
+                        record,
+                        part_no,
+                        on_part_done
+                    )
+                    for part_no in range(self.__get_parts_count(record))
+                    if part_no not in done_parts
+                ]
+                for ftr in futures.as_completed(part_futures):
+                    err = ftr.exception()
+                    if err is not None:
+                        for other_ftr in part_futures:
+                            other_ftr.cancel()
+                        # the running parts are writing the file
+                        futures.wait(part_futures)
+                        raise err
+        except _FileModifiedError:
+            # the downloaded parts can't be resumed any more
+            self.__delete_record(downloading_path, key)
+            os.remove(downloading_path)
+            raise
+        finally:
+            if executor is not self.concurrent_executor:
+                executor.shutdown(wait=True)
+
+        return self.__finish(key, file_path, downloading_path, record['etag'], resumed_size=resumed_size, record=record)
+
+    def open(self, key, block_size=1024 * 1024, max_cache_size=64 * (1024 ** 2), max_read_ahead_size=16 * (1024 ** 2)):
+        """
+        以只读的文件对象打开文件，仅按需通过 Range 请求读取所需部分
+
+        Args:
+            key:                 文件名
+            block_size:          缓存块的大小
+            max_cache_size:      缓存的最大字节数，即占用内存的上限
+            max_read_ahead_size: 顺序读取时预读的最大字节数
+
+        Returns:
+            ObjectReader
+        """
+        return ObjectReader(
+            self,
+            key,
+            block_size=block_size,
+            max_cache_size=max_cache_size,
+            max_read_ahead_size=max_read_ahead_size
+        )
+
+    def get_url(self, endpoint, key):
+        """
+        Args:
+            endpoint: Endpoint 对象
+            key:      文件名
+
+        Returns:
+            下载链接，私有下载时包含下载凭证
+        """
+        url = '{0}/{1}'.format(endpoint.get_value(scheme=self.preferred_scheme), quote(key, safe='/~'))
+        if self.private:
+            url = self.auth.private_download_url(url, expires=self.url_expires)
+        return url
+
+    def __get_retrier(self):
+        if self.__retrier is not None:
+            return self.__retrier
+        regions = self.regions
+        if not regions and self.auth is not None and self.bucket_name:
+            query_region_host = config.get_default('default_query_region_host')
+            query_region_backup_hosts = config.get_default('default_query_region_backup_hosts')
+            regions = get_default_regions_provider(
+                query_endpoints_provider=[
+                    Endpoint.from_host(h)
+                    for h in [query_region_host] + query_region_backup_hosts
+                ],
+                access_key=self.auth.get_access_key(),
+                bucket_name=self.bucket_name,
+                preferred_scheme=self.preferred_scheme
+            )
+        with self.__retrier_lock:
+            if self.__retrier is None:
+                self.__retrier = get_default_retrier(
+                    regions_provider=regions or [],
+                    service_names=[ServiceName.IO],
+                    preferred_endpoints_provider=self.domains,
+                    endpoint_health_tracker=self.endpoint_health_tracker,
+                    backoff=self.retry_backoff,
+                    retry_budget=self.retry_budget,
+                    # the duration of downloading a part depends on its size
+                    record_latency=False
+                )
+        return self.__retrier
+
+    def _request_with_retrier(self, key, offset, size, handle_response):
+        """
+        Args:
+            key:             文件名
+            offset:          范围的起始位置，None 表示文件末尾的 size 个字节
+            size:            范围的大小，None 表示至文件结尾
+            handle_response: `(requests.Response) -> object`，处理响应，失败时抛出异常以切换域名重试
+
+        Returns:
+            handle_response 的返回值
+        """
+        if offset is None:
+            range_header = 'bytes=-{0}'.format(size)
+        elif size is None:
+            range_header = 'bytes={0}-'.format(offset)
+        else:
+            range_header = 'bytes={0}-{1}'.format(offset, offset + size - 1)
+
+        attempt = None
+        for attempt in self.__get_retrier():
+            with attempt:
+                url = self.get_url(attempt.context.get('endpoint'), key)
+                with request_tags(service_name=ServiceName.IO):
+                    resp = instrument(
+                        'GET',
+                        url,
+                        lambda: qn_http_client.session.get(
+                            url,
+                            headers={'Range': range_header},
+                            stream=True,
+                            timeout=config.get_default('connection_timeout')
+                        )
+                    )
+                try:
+                    attempt.result = handle_response(resp)
+                finally:
+                    resp.close()
+                return attempt.result
+
+        if attempt is None:
+            raise RuntimeError('Retrier is not working. attempt is None')
+        raise attempt.exception
+
+    def __download_first_part(self, key, downloading_path):
+        """
+        Download the first part to get the size and etag of the file.
+
+        Returns:
+            (record, etag), the record is None if the whole file is downloaded
+        """
+        def handle_response(resp):
+            _check_response(resp, allowed_status_codes=(200, 206, 416))
+            etag = _get_etag(resp)
+            if resp.status_code == 416:
+                # the empty file
+                _, _, size = _parse_content_range(resp)
+                if size != 0:
+                    raise DownloadError('unexpected Content-Range of 416', resp.status_code)
+                open(downloading_path, 'wb').close()
+                return None, etag
+            if resp.status_code == 200:
+                # the range is ignored, such as the server doesn't support it
+                with open(downloading_path, 'wb') as f:
+                    _write_body(resp, f, None, None)
+                return None, etag
+
+            start, end, size = _parse_content_range(resp)
+            if start != 0:
+                raise DownloadError('unexpected Content-Range {0}'.format(resp.headers.get('Content-Range')))
+            with open(downloading_path, 'wb') as f:
+                # preallocate the file, the other parts are written by pwrite
+                f.truncate(size)
+                _write_body(resp, f, 0, end - start + 1, threading.Lock())
+            return {
+                'key': key,
+                'size': size,
+                'etag': etag,
+                'part_size': self.part_size,
+                'first_part_size': end - start + 1,
+                'parts': [0]
+            }, etag
+
+        record, etag = self._request_with_retrier(key, 0, self.part_size, handle_response)
+        if record is not None:
+            self.__set_record(downloading_path, key, record)
+        return record, etag
+
+    def __download_part(self, key, f, write_lock, record, part_no, on_part_done):
+        offset, size = self.__get_part_range(record, part_no)
+
+        def handle_response(resp):
+            _check_response(resp, allowed_status_codes=(206,))
+            etag = _get_etag(resp)
+            if record['etag'] and etag and etag != record['etag']:
+                raise _FileModifiedError(
+                    'the file is modified while downloading, etag {0} != {1}'.format(etag, record['etag']),
+                    resp.status_code
+                )
+            start, end, total_size = _parse_content_range(resp)
+            if total_size != record['size']:
+                raise _FileModifiedError(
+                    'the file is modified while downloading, size {0} != {1}'.format(total_size, record['size']),
+                    resp.status_code
+                )
+            if start != offset or end != offset + size - 1:
+                raise DownloadError(
+                    'unexpected Content-Range {0}, expected bytes {1}-{2}/{3}'.format(
+                        resp.headers.get('Content-Range'),
+                        offset,
+                        offset + size - 1,
+                        record['size']
+                    )
+                )
+            _write_body(resp, f, offset, size, write_lock)
+
+        self._request_with_retrier(key, offset, size, handle_response)
+        on_part_done(part_no, size)
+
+    def __finish(self, key, file_path, downloading_path, etag, resumed_size, record=None):
+        size = os.path.getsize(downloading_path)
+        try:
+            if record is not None and size != record['size']:
+                raise DownloadError('the size {0} of downloaded file is not {1}'.format(size, record['size']))
+            if self.verify_etag and _is_qetag(etag):
+                downloaded_etag = etag_files([downloading_path], max_workers=self.max_workers)[0]
+                if downloaded_etag != etag:
+                    raise DownloadError('the etag {0} of downloaded file is not {1}'.format(downloaded_etag, etag))
+        except DownloadError:
+            self.__delete_record(downloading_path, key)
+            os.remove(downloading_path)
+            raise
+
+        if os.path.exists(file_path):
+            # os.rename can't overwrite on windows, change to `os.replace` when min version of python update to >= 3.3
+            os.remove(file_path)
+        shutil.move(downloading_path, file_path)
+        self.__delete_record(downloading_path, key)
+        return DownloadResult(
+            key=key,
+            file_path=file_path,
+            size=size,
+            etag=etag,
+            resumed_size=resumed_size
+        )
+
+    def __get_parts_count(self, record):
+        rest_size = record['size'] - record['first_part_size']
+        return 1 + (rest_size + record['part_size'] - 1) // record['part_size']
+
+    def __get_part_range(self, record, part_no):
+        """
+        Returns:
+            (offset, size) of the part
+        """
+        if part_no == 0:
+            return 0, record['first_part_size']
+        offset = record['first_part_size'] + (part_no - 1) * record['part_size']
+        return offset, min(record['part_size'], record['size'] - offset)
+
+    def __get_record(self, downloading_path, key):
+        """
+        Returns:
+            the record if the download could be resumed, otherwise None
+        """
+        if self.download_progress_recorder is None:
+            return None
+        record = self.download_progress_recorder.get_upload_record(downloading_path, key)
+        if not record:
+            return None
+        try:
+            if (
+                record.get('key') != key or
+                os.path.getsize(downloading_path) != record['size'] or
+                not isinstance(record.get('parts'), list)
+            ):
+                record = None
+        except (OSError, KeyError):
+            record = None
+        if record is None:
+            self.__delete_record(downloading_path, key)
+        return record
+
+    def __set_record(self, downloading_path, key, record):
+        if self.download_progress_recorder is None:
+            return
+        self.download_progress_recorder.set_upload_record(downloading_path, key, record)
+
+    def __delete_record(self, downloading_path, key):
+        if self.download_progress_recorder is None:
+            return
+        self.download_progress_recorder.delete_upload_record(downloading_path, key)
+
+
+class ObjectReader(io.RawIOBase):
+    """随机读取文件的只读文件对象
+
+    按 block_size 分块读取并缓存在 LRU 缓存中，缓存不超过 max_cache_size 字节。
+    一次读取中相邻的未缓存块合并为一个 Range 请求；
+    连续顺序读取时，预读的块数逐次翻倍，直至 max_read_ahead_size。
+    `seek` 不发送请求，文件大小由首次读取的响应获得；
+    若在此之前需要文件大小（如 `seek` 到相对文件末尾的位置），则读取文件末尾的一块来获取，
+    因此读取文件末尾的索引（如 ZIP、Parquet）仅需一个请求。
+
+    不是线程安全的，多线程读取请各自打开。
+
+    Examples:
+        with downloader.open('data.parquet') as f:
+            f.seek(-8, os.SEEK_END)
+            footer = f.read(8)
+    """
+
+    def __init__(self, downloader, key, block_size=1024 * 1024, max_cache_size=64 * (1024 ** 2), max_read_ahead_size=16 * (1024 ** 2)):
+        """
+        Args:
+            downloader:          Downloader 对象，提供下载域名、下载链接与重试
+            key:                 文件名
+            block_size:          缓存块的大小
+            max_cache_size:      缓存的最大字节数，不小于 block_size
+            max_read_ahead_size: 顺序读取时预读的最大字节数
+        """
+        super(ObjectReader, self).__init__()
+        if block_size <= 0:
+            raise ValueError('block_size must be greater than 0')
+        if max_cache_size < block_size:
+            raise ValueError('max_cache_size must not be less than block_size')
+        self.downloader = downloader
+        self.key = key
+        self.block_size = block_size
+        self.max_cache_blocks = max_cache_size // block_size
+        self.max_read_ahead_blocks = max(0, min(max_read_ahead_size // block_size, self.max_cache_blocks - 1))
+
+        self.__size = None
+        self.__pos = 0
+        # block index -> bytes, the least recently used first
+        self.__blocks = OrderedDict()
+        # the position the last read ended at, for detecting sequential reads
+        self.__last_read_end = None
+        self.__read_ahead_blocks = 0
+
+    @property
+    def size(self):
+        """
+        Returns:
+            文件大小，尚未读取过时会读取文件末尾的一块
+        """
+        if self.__size is None:
+            self.__fetch_tail()
+        return self.__size
+
+    def __len__(self):
+        return self.size
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.__pos
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        self._checkClosed()
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self.__pos + offset
+        elif whence == os.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError('whence should be 0, 1 or 2')
+        if pos < 0:
+            raise ValueError('negative seek position {0}'.format(pos))
+        self.__pos = pos
+        return pos
+
+    def readinto(self, b):
+        self._checkClosed()
+        view = memoryview(b).cast('B') if hasattr(memoryview, 'cast') else memoryview(b)
+        size = len(view)
+        if self.__size is not None:
+            size = min(size, max(0, self.__size - self.__pos))
+        if size <= 0:
+            return 0
+
+        start, end = self.__pos, self.__pos + size
+        if self.__last_read_end == start:
+            self.__read_ahead_blocks = min(max(1, self.__read_ahead_blocks * 2), self.max_read_ahead_blocks)
+        else:
+            self.__read_ahead_blocks = 0
+
+        first_block, last_block = start // self.block_size, (end - 1) // self.block_size
+        written_size = 0
+        for block_index in range(first_block, last_block + 1):
+            block = self.__get_block(block_index, last_block)
+            block_start = block_index * self.block_size
+            data_start = max(start, block_start) - block_start
+            data_end = min(end, block_start + len(block)) - block_start
+            if data_end > data_start:
+                view[written_size:written_size + data_end - data_start] = block[data_start:data_end]
+                written_size += data_end - data_start
+            if len(block) < self.block_size:
+                # the end of file
+                break
+
+        self.__pos += written_size
+        self.__last_read_end = self.__pos
+        return written_size
+
+    def close(self):
+        self.__blocks.clear()
+        super(ObjectReader, self).close()
+
+    def __get_block(self, block_index, last_needed_block):
+        """
+        Returns:
+            the block, which is shorter than block_size if it's the last one, or empty if it's beyond the end of file
+        """
+        block = self.__blocks.pop(block_index, None)
+        if block is not None:
+            # the most recently used is the last
+            self.__blocks[block_index] = block
+            return block
+
+        # coalesce the adjacent missing blocks, and read ahead if it's the end of this read
+        run_end = block_index
+        while (
+            run_end + 1 <= last_needed_block + self.__read_ahead_blocks and
+            run_end + 1 - block_index < self.max_cache_blocks and
+            run_end + 1 not in self.__blocks and
+            (self.__size is None or (run_end + 1) * self.block_size < self.__size)
+        ):
+            run_end += 1
+
+        offset = block_index * self.block_size
+        data = self.__fetch(offset, (run_end + 1) * self.block_size - offset)
+        if not data:
+            return b''
+        for i in range(0, len(data), self.block_size):
+            self.__put_block(block_index + i // self.block_size, data[i:i + self.block_size])
+        return self.__blocks[block_index]
+
+    def __put_block(self, block_index, block):
+        self.__blocks.pop(block_index, None)
+        while len(self.__blocks) >= self.max_cache_blocks:
+            self.__blocks.popitem(last=False)
+        self.__blocks[block_index] = block
+
+    def __fetch(self, offset, size):
+        """
+        Returns:
+            the data in range, which is shorter than size if the range exceeds the end of file
+        """
+        def handle_response(resp):
+            _check_response(resp, allowed_status_codes=(206, 416))
+            start, end, total_size = _parse_content_range(resp)
+            if self.__size is not None and total_size != self.__size:
+                raise DownloadError(
+                    'the file is modified while reading, size {0} != {1}'.format(total_size, self.__size),
+                    no_need_retry=True
+                )
+            if resp.status_code == 416:
+                # the offset is beyond the end of file
+                if offset < total_size:
+                    raise DownloadError('unexpected Content-Range of 416', resp.status_code)
+                return total_size, b''
+            expected_end = min(offset + size, total_size) - 1
+            if start != offset or end != expected_end:
+                raise DownloadError('unexpected Content-Range {0}'.format(resp.headers.get('Content-Range')))
+            data = resp.content
+            if len(data) != end - start + 1:
+                raise DownloadError('the body size {0} is not {1}'.format(len(data), end - start + 1))
+            return total_size, data
+
+        self.__size, data = self.downloader._request_with_retrier(self.key, offset, size, handle_response)
+        return data
+
+    def __fetch_tail(self):
+        def handle_response(resp):
+            _check_response(resp, allowed_status_codes=(206, 416))
+            start, end, total_size = _parse_content_range(resp)
+            if resp.status_code == 416:
+                # the empty file
+                if total_size != 0:
+                    raise DownloadError('unexpected Content-Range of 416', resp.status_code)
+                return total_size, b''
+            data = resp.content
+            if end != total_size - 1 or len(data) != end - start + 1:
+                raise DownloadError('unexpected Content-Range {0}'.format(resp.headers.get('Content-Range')))
+            return total_size, data
+
+        size, data = self.downloader._request_with_retrier(self.key, None, self.block_size, handle_response)
+        self.__size = size
+        if size:
+            # cache the last block, which is in the data as its size is not larger than block_size
+            block_index = (size - 1) // self.block_size
+            data_start = block_index * self.block_size - (size - len(data))
+            self.__put_block(block_index, data[data_start:])
+
+
+def _check_response(resp, allowed_status_codes):
+    if resp.status_code in allowed_status_codes:
+        return
+    # the client errors, such as the file not found or the token is invalid, are not worth to retry
+    no_need_retry = 400 <= resp.status_code < 500 and resp.status_code not in (408, 429)
+    raise DownloadError(
+        'failed to download, status code {0}, req id {1}: {2}'.format(
+            resp.status_code,
+            resp.headers.get('X-Reqid'),
+            resp.text[:1024]
+        ),
+        status_code=resp.status_code,
+        no_need_retry=no_need_retry
+    )
+
+
+def _get_etag(resp):
+    etag = resp.headers.get('ETag')
+    if not etag:
+        return None
+    if etag.startswith('W/'):
+        etag = etag[2:]
+    return etag.strip('"')
+
+
+def _parse_content_range(resp):
+    """
+    Returns:
+        (start, end, size), start and end are None for `bytes */size`
+    """
+    match = _CONTENT_RANGE_RE.match(resp.headers.get('Content-Range', '').strip())
+    if not match:
+        raise DownloadError('invalid Content-Range {0}'.format(resp.headers.get('Content-Range')), resp.status_code)
+    start, end, size = match.groups()
+    if start is None:
+        return None, None, int(size)
+    return int(start), int(end), int(size)
+
+
+def _write_body(resp, f, offset, size, write_lock=None):
+    """
+    Write the body into the file at the offset by pwrite, or sequentially if the offset is None.
+    The file is shared by the parts, so it's written with the lock if pwrite is unavailable, such as on windows.
+
+    Returns:
+        the written size
+
+    Raises:
+        DownloadError: the body is shorter or longer than the size
+    """
+    fd = f.fileno() if offset is not None and hasattr(os, 'pwrite') else None
+    written_size = 0
+    for chunk in resp.iter_content(_WRITE_BUFFER_SIZE):
+        if not chunk:
+            continue
+        if size is not None and written_size + len(chunk) > size:
+            raise DownloadError('the body is longer than {0}'.format(size))
+        if offset is None:
+            f.write(chunk)
+        elif fd is not None:
+            _pwrite_fully(fd, chunk, offset + written_size)
+        else:
+            with write_lock:
+                f.seek(offset + written_size)
+                f.write(chunk)
+        written_size += len(chunk)
+    if size is not None and written_size != size:
+        raise DownloadError('the body is shorter than {0}, got {1}'.format(size, written_size))
+    return written_size
+
+
+def _pwrite_fully(fd, data, offset):
+    view = memoryview(data)
+    while view:
+        written_size = os.pwrite(fd, view, offset)
+        view = view[written_size:]
+        offset += written_size
+
+
+def _is_qetag(etag):
+    """
+    The etag calculated by `qiniu.utils.etag`, it's not for the files uploaded by v2 with part size other than 4MB.
+    """
+    if not etag or len(etag) != 28:
+        return False
+    try:
+        data = urlsafe_base64_decode(etag)
+    except (TypeError, ValueError):
+        return False
+    return len(data) == 21 and data[:1] in (b'\x16', b'\x96')
@@ -1,10 +1,19 @@
 # -*- coding: utf-8 -*-
+import contextlib
 import hashlib
 import json
 import os
 import tempfile
+import threading
+import time
 from qiniu.compat import is_py2
 
+try:
+    import sqlite3
+except ImportError:
+    # some python builds are without sqlite3
+    sqlite3 = None
+
 
 class UploadProgressRecorder(object):
     """
@@ -55,3 +64,217 @@ class UploadProgressRecorder(object):
             os.remove(upload_record_file_path)
         except OSError:
             pass
+
+
+class SQLiteUploadProgressRecorder(object):
+    """
+    基于 SQLite 的持久化上传记录类，与 UploadProgressRecorder 接口相同
+
+    所有上传记录保存在同一个 SQLite 数据库（WAL 模式）中，以 (file_name, key) 为索引，
+    可被多个线程与进程同时使用。
+    记录中的列表（如各分片的 etags 或 contexts）按元素逐条保存，
+    上传器每完成一个分片仅追加新的元素，而非重写整条记录；
+    若已保存的最后一个元素发生变化，则重写该列表。
+
+    Attributes:
+        db_path:     数据库文件路径
+        max_age:     未更新超过该秒数的记录在 sweep_expired 时会被删除
+        timeout:     等待其他连接释放锁的秒数
+    """
+
+    def __init__(
+        self,
+        db_path=os.path.join(tempfile.gettempdir(), 'qiniu-upload-records.sqlite3'),
+        max_age=7 * 24 * 3600,
+        timeout=30
+    ):
+        if sqlite3 is None:
+            raise RuntimeError('SQLiteUploadProgressRecorder requires the sqlite3 module')
+        self.db_path = db_path
+        self.max_age = max_age
+        self.timeout = timeout
+        self.__local = threading.local()
+        self.__init_lock = threading.Lock()
+        self.__initialized = False
+
+    @property
+    def __conn(self):
+        conn = getattr(self.__local, 'conn', None)
+        if conn is not None:
+            return conn
+        # manage the transactions explicitly
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        with self.__init_lock:
+            if not self.__initialized:
+                conn.executescript(_SQLITE_RECORDER_SCHEMA)
+                self.__initialized = True
+        self.__local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def __transaction(self):
+        conn = self.__conn
+        # take the write lock at the beginning to avoid deadlock between readers upgrading
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    @staticmethod
+    def __record_id(file_name, key):
+        # None is not equal to None in SQL
+        return file_name or '', key or ''
+
+    def has_upload_record(self, file_name, key):
+        row = self.__conn.execute(
+            'SELECT 1 FROM upload_records WHERE file_name = ? AND key = ?',
+            self.__record_id(file_name, key)
+        ).fetchone()
+        return row is not None
+
+    def get_upload_record(self, file_name, key):
+        record_id = self.__record_id(file_name, key)
+        conn = self.__conn
+        conn.execute('BEGIN')
+        try:
+            row = conn.execute(
+                'SELECT data, list_fields FROM upload_records WHERE file_name = ? AND key = ?',
+                record_id
+            ).fetchone()
+            items = conn.execute(
+                'SELECT field, item FROM upload_record_items WHERE file_name = ? AND key = ? ORDER BY field, idx',
+                record_id
+            ).fetchall()
+        finally:
+            conn.execute('COMMIT')
+        if row is None:
+            return None
+
+        try:
+            data = json.loads(row[0])
+            for field in json.loads(row[1]):
+                data[field] = []
+            for field, item in items:
+                data[field].append(json.loads(item))
+        except (ValueError, KeyError):
+            return None
+        return data
+
+    def set_upload_record(self, file_name, key, data):
+        record_id = self.__record_id(file_name, key)
+        list_fields = sorted(k for k, v in data.items() if isinstance(v, list))
+        record_data = dict((k, v) for k, v in data.items() if not isinstance(v, list))
+        expired_at = record_data.get('expired_at') or None
+
+        with self.__transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO upload_records '
+                '(file_name, key, data, list_fields, expired_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                record_id + (json.dumps(record_data), json.dumps(list_fields), expired_at, time.time())
+            )
+            conn.execute(
+                'DELETE FROM upload_record_items WHERE file_name = ? AND key = ? AND field NOT IN ({0})'.format(
+                    ', '.join('?' * len(list_fields))
+                ),
+                record_id + tuple(list_fields)
+            )
+            for field in list_fields:
+                self.__append_items(conn, record_id, field, data[field])
+
+    def __append_items(self, conn, record_id, field, items):
+        """
+        only append the new items if the recorded items are the prefix of them, otherwise rewrite all
+        """
+        recorded_count, = conn.execute(
+            'SELECT COUNT(*) FROM upload_record_items WHERE file_name = ? AND key = ? AND field = ?',
+            record_id + (field,)
+        ).fetchone()
+        start = 0
+        if 0 < recorded_count <= len(items):
+            last_item, = conn.execute(
+                'SELECT item FROM upload_record_items WHERE file_name = ? AND key = ? AND field = ? AND idx = ?',
+                record_id + (field, recorded_count - 1)
+            ).fetchone() or (None,)
+            if last_item == _dump_item(items[recorded_count - 1]):
+                start = recorded_count
+        if start == 0 and recorded_count:
+            conn.execute(
+                'DELETE FROM upload_record_items WHERE file_name = ? AND key = ? AND field = ?',
+                record_id + (field,)
+            )
+        conn.executemany(
+            'INSERT INTO upload_record_items (file_name, key, field, idx, item) VALUES (?, ?, ?, ?, ?)',
+            [
+                record_id + (field, idx, _dump_item(items[idx]))
+                for idx in range(start, len(items))
+            ]
+        )
+
+    def delete_upload_record(self, file_name, key):
+        record_id = self.__record_id(file_name, key)
+        with self.__transaction() as conn:
+            conn.execute('DELETE FROM upload_records WHERE file_name = ? AND key = ?', record_id)
+            conn.execute('DELETE FROM upload_record_items WHERE file_name = ? AND key = ?', record_id)
+
+    def sweep_expired(self, now=None):
+        """清理过期的上传记录
+
+        Args:
+            now: 当前时间戳，默认为 time.time()
+
+        Returns:
+            被清理的记录数
+        """
+        if now is None:
+            now = time.time()
+        with self.__transaction() as conn:
+            cursor = conn.execute(
+                'DELETE FROM upload_records WHERE expired_at < ? OR updated_at < ?',
+                (now, now - self.max_age)
+            )
+            conn.execute(
+                'DELETE FROM upload_record_items WHERE NOT EXISTS ('
+                'SELECT 1 FROM upload_records r '
+                'WHERE r.file_name = upload_record_items.file_name AND r.key = upload_record_items.key'
+                ')'
+            )
+            return cursor.rowcount
+
+    def close(self):
+        """关闭当前线程的数据库连接"""
+        conn = getattr(self.__local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.__local.conn = None
+
+
+def _dump_item(item):
+    return json.dumps(item, sort_keys=True)
+
+
+_SQLITE_RECORDER_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS upload_records (
+    file_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    list_fields TEXT NOT NULL,
+    expired_at REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (file_name, key)
+);
+CREATE INDEX IF NOT EXISTS upload_records_expired_at ON upload_records (expired_at);
+CREATE INDEX IF NOT EXISTS upload_records_updated_at ON upload_records (updated_at);
+CREATE TABLE IF NOT EXISTS upload_record_items (
+    file_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    field TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (file_name, key, field, idx)
+);
+'''
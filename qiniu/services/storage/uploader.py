@@ -111,7 +111,7 @@ def put_file_v2(
         mime_type='application/octet-stream', check_crc=False,
         progress_handler=None, upload_progress_recorder=None, keep_last_modified=False,
         part_size=None, version='v2', bucket_name=None, metadata=None,
-        regions=None, accelerate_uploading=False
+        regions=None, accelerate_uploading=False, upload_profiler=None
 ):
     """上传文件到七牛，此接口的分片传接口默认使用 V2，V2 上传效率更高；在一些专有云服务中需要确认服务是否支持 V2。
 
@@ -131,6 +131,7 @@ def put_file_v2(
             metadata:                 元数据信息
             regions:                  region信息
             accelerate_uploading:     是否开启加速上传
+            upload_profiler:          记录分片上传 v2 的各分片耗时，用于分析上传性能
 
         Returns:
             一个dict变量，类似 {"hash": "<Hash string>", "key": "<Key string>"}
@@ -140,7 +141,8 @@ def put_file_v2(
         up_token=up_token, key=key, file_path=file_path, params=params, mime_type=mime_type,
         check_crc=check_crc, progress_handler=progress_handler, upload_progress_recorder=upload_progress_recorder,
         keep_last_modified=keep_last_modified, part_size=part_size, version=version, bucket_name=bucket_name,
-        metadata=metadata, regions=regions, accelerate_uploading=accelerate_uploading
+        metadata=metadata, regions=regions, accelerate_uploading=accelerate_uploading,
+        upload_profiler=upload_profiler
     )
 
 
@@ -149,7 +151,7 @@ def _put_file(
         mime_type='application/octet-stream', check_crc=False,
         progress_handler=None, upload_progress_recorder=None, keep_last_modified=False,
         part_size=None, version=None, bucket_name=None, metadata=None,
-        regions=None, accelerate_uploading=False
+        regions=None, accelerate_uploading=False, upload_profiler=None
 ):
     """上传文件到七牛
 
@@ -169,6 +171,7 @@ def _put_file(
         metadata:                 元数据信息
         regions:                  region信息
         accelerate_uploading:     是否开启加速上传
+        upload_profiler:          记录分片上传 v2 的各分片耗时，用于分析上传性能
 
     Returns:
         一个dict变量，类似 {"hash": "<Hash string>", "key": "<Key string>"}
@@ -186,7 +189,8 @@ def _put_file(
                 upload_progress_recorder=upload_progress_recorder,
                 modify_time=modify_time, keep_last_modified=keep_last_modified,
                 part_size=part_size, version=version, bucket_name=bucket_name, metadata=metadata,
-                regions=regions, accelerate_uploading=accelerate_uploading
+                regions=regions, accelerate_uploading=accelerate_uploading,
+                upload_profiler=upload_profiler
             )
         else:
             crc = file_crc32(file_path)
@@ -324,7 +328,8 @@ def put_stream_v2(
         bucket_name=None,
         metadata=None,
         regions=None,
-        accelerate_uploading=False
+        accelerate_uploading=False,
+        upload_profiler=None
 ):
     """ 通过 stream 方式上传文件到七牛，此接口的分片传接口默认使用 V2，V2 上传效率更高；在一些专有云服务中需要确认服务是否支持 V2。
 
@@ -333,7 +338,7 @@ def put_stream_v2(
             key:                      上传文件名
             input_stream:             上传数据流
             file_name:                文件名
-            data_size:                数据流大小
+            data_size:                数据流大小，为 None 时按顺序读取数据流并流式上传，适用于管道等无法 seek 的数据流
             params:                   自定义变量，规格参考 https://developer.qiniu.com/kodo/manual/vars#xvar
             mime_type:                上传数据的mimeType
             progress_handler:         上传进度
@@ -346,6 +351,7 @@ def put_stream_v2(
             metadata:                 元数据信息
             regions:                  region信息
             accelerate_uploading:     是否开启加速上传
+            upload_profiler:          记录分片上传 v2 的各分片耗时，用于分析上传性能
 
         Returns:
             一个dict变量，类似 {"hash": "<Hash string>", "key": "<Key string>"}
@@ -368,7 +374,8 @@ def put_stream_v2(
         bucket_name=bucket_name,
         metadata=metadata,
         regions=regions,
-        accelerate_uploading=accelerate_uploading
+        accelerate_uploading=accelerate_uploading,
+        upload_profiler=upload_profiler
     )
 
 
@@ -389,7 +396,8 @@ def _put_stream(
         bucket_name=None,
         metadata=None,
         regions=None,
-        accelerate_uploading=False
+        accelerate_uploading=False,
+        upload_profiler=None
 ):
     if not bucket_name:
         bucket_name = Auth.get_bucket_name(up_token)
@@ -419,7 +427,8 @@ def _put_stream(
             part_size=part_size,
             regions=regions,
             accelerate_uploading=accelerate_uploading,
-            preferred_scheme=get_default('default_zone').scheme
+            preferred_scheme=get_default('default_zone').scheme,
+            upload_profiler=upload_profiler
         )
     else:
         raise ValueError('version only could be v1 or v2')
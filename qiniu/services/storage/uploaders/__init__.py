@@ -1,9 +1,16 @@
+from .concurrency_controller import AIMDConcurrencyController
 from .form_uploader import FormUploader
 from .resume_uploader_v1 import ResumeUploaderV1
 from .resume_uploader_v2 import ResumeUploaderV2
+from .upload_profiler import UploadProfiler
+from .upload_scheduler import UploadScheduler, default_upload_scheduler
 
 __all__ = [
+    'AIMDConcurrencyController',
     'FormUploader',
     'ResumeUploaderV1',
-    'ResumeUploaderV2'
+    'ResumeUploaderV2',
+    'UploadProfiler',
+    'UploadScheduler',
+    'default_upload_scheduler'
 ]
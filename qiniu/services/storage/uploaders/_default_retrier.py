@@ -1,10 +1,13 @@
 from collections import namedtuple
 
+from qiniu.http.endpoint_health import default_endpoint_health_tracker
+from qiniu.http.endpoint_health_retry_policy import EndpointHealthRetryPolicy
 from qiniu.http.endpoints_retry_policy import EndpointsRetryPolicy
 from qiniu.http.region import ServiceName
 from qiniu.http.regions_retry_policy import RegionsRetryPolicy
 from qiniu.retry.abc import RetryPolicy
 from qiniu.retry import Retrier
+from qiniu.retry.budget import default_retry_budget
 
 
 _TokenExpiredRetryState = namedtuple(
@@ -169,7 +172,10 @@ def get_default_retrier(
     regions_provider,
     preferred_endpoints_provider=None,
     progress_record=None,
-    accelerate_uploading=False
+    accelerate_uploading=False,
+    endpoint_health_tracker=default_endpoint_health_tracker,
+    backoff=None,
+    retry_budget=default_retry_budget
 ):
     """
     Parameters
@@ -178,6 +184,12 @@ def get_default_retrier(
     preferred_endpoints_provider: Iterable[Endpoint]
     progress_record: ProgressRecord
     accelerate_uploading: bool
+    endpoint_health_tracker: EndpointHealthTracker
+        order the endpoints by their health. None to keep the original order.
+    backoff: qiniu.retry.abc.Backoff
+        the delay before each retry. None to retry immediately.
+    retry_budget: qiniu.retry.RetryBudget
+        the budget shared by retriers. None to retry without limit.
 
     Returns
     -------
@@ -213,4 +225,12 @@ def get_default_retrier(
         )
     ]
 
-    return Retrier(retry_policies)
+    if endpoint_health_tracker is not None:
+        # the duration of uploading depends on the size of file, so it's not the latency of the endpoint
+        retry_policies.append(EndpointHealthRetryPolicy(endpoint_health_tracker, record_latency=False))
+
+    return Retrier(
+        retry_policies,
+        backoff=backoff,
+        retry_budget=retry_budget
+    )
@@ -1,7 +1,7 @@
 import abc
-from concurrent import futures
 
 from qiniu.services.storage.uploaders.io_chunked import ChunkInfo
+from qiniu.services.storage.uploaders.upload_scheduler import UploadScheduler, default_upload_scheduler
 from qiniu.services.storage.uploaders.abc import UploaderBase
 
 
@@ -13,6 +13,11 @@ class ResumeUploaderBase(UploaderBase):
     progress_handler: function, optional
     upload_progress_recorder: UploadProgressRecorder, optional
     concurrent_executor: futures.Executor, optional
+    max_concurrent_workers: int
+    upload_priority: int
+    upload_profiler: UploadProfiler, optional
+    adaptive_part_size: bool
+    concurrency_controller: AIMDConcurrencyController, optional
     """
     __metaclass__ = abc.ABCMeta
 
@@ -29,7 +34,20 @@ class ResumeUploaderBase(UploaderBase):
         progress_handler: function
         upload_progress_recorder: UploadProgressRecorder
         max_concurrent_workers: int
+            the max count of parts uploading at the same time of a file
         concurrent_executor: futures.Executor
+            default is `default_upload_scheduler` shared by uploaders,
+            or the parts are uploaded sequentially if it's set to None
+        upload_priority: int
+            the priority of files in `UploadScheduler`, the larger the first
+        upload_profiler: UploadProfiler
+            record the timeline of parts if provided, only used by ResumeUploaderV2 now
+        adaptive_part_size: bool
+            pick the part size by the data size if True, `part_size` is the min part size then.
+            only used by ResumeUploaderV2 now
+        concurrency_controller: AIMDConcurrencyController
+            tune the count of in-flight parts by the throughput and errors if provided,
+            and the default `max_concurrent_workers` is its `max_limit`. only used by ResumeUploaderV2 now
         kwargs
         """
         super(ResumeUploaderBase, self).__init__(bucket_name, **kwargs)
@@ -46,11 +64,36 @@ class ResumeUploaderBase(UploaderBase):
             None
         )
 
-        max_workers = kwargs.get('max_concurrent_workers', 3)
+        self.adaptive_part_size = kwargs.get('adaptive_part_size', False)
+
+        self.concurrency_controller = kwargs.get('concurrency_controller', None)
+
+        self.max_concurrent_workers = kwargs.get(
+            'max_concurrent_workers',
+            self.concurrency_controller.max_limit if self.concurrency_controller else 3
+        )
         self.concurrent_executor = kwargs.get(
             'concurrent_executor',
-            futures.ThreadPoolExecutor(max_workers=max_workers)
+            default_upload_scheduler
         )
+        self.upload_priority = kwargs.get('upload_priority', 0)
+
+        self.upload_profiler = kwargs.get('upload_profiler', None)
+
+    def _get_parts_executor(self):
+        """
+        Returns
+        -------
+        futures.Executor or None
+            a new flow of the scheduler for each file, so the files are scheduled fairly,
+            or the `concurrent_executor` itself if it's not an `UploadScheduler`
+        """
+        if isinstance(self.concurrent_executor, UploadScheduler):
+            return self.concurrent_executor.new_flow(
+                priority=self.upload_priority,
+                max_in_flight=self.max_concurrent_workers
+            )
+        return self.concurrent_executor
 
     def gen_chunk_list(self, size, chunk_size=None, uploaded_chunk_no_list=None):
         """
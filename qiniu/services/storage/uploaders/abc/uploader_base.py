@@ -3,7 +3,10 @@ import abc
 import qiniu.config as config
 from qiniu.region import LegacyRegion
 from qiniu.http.endpoint import Endpoint
+from qiniu.http.endpoint_health import default_endpoint_health_tracker
 from qiniu.http.regions_provider import get_default_regions_provider
+from qiniu.retry.budget import default_retry_budget
+from qiniu.services.storage.uploaders.up_token_cache import default_up_token_cache
 
 # type import
 from qiniu.auth import Auth # noqa
@@ -34,6 +37,14 @@ class UploaderBase(object):
             The instance of Auth to sign requests.
         regions: list[Region], default=[]
             The regions of bucket. It will be queried if not specified.
+        up_token_cache: UpTokenCache, default=default_up_token_cache
+            The cache of up tokens generated by `get_up_token`. None to disable it.
+        endpoint_health_tracker: EndpointHealthTracker, default=default_endpoint_health_tracker
+            Order the up endpoints by their health. None to keep the original order.
+        retry_backoff: qiniu.retry.abc.Backoff, default=None
+            The delay before each retry. It's ignored by the asyncio uploaders, which shouldn't be blocked.
+        retry_budget: RetryBudget, default=default_retry_budget
+            The budget of retries shared by uploaders. None to retry without limit.
         kwargs
             The others arguments may be used by subclass.
         """
@@ -59,6 +70,15 @@ class UploaderBase(object):
         # change the default value to False when remove config.get_default('default_zone')
         self.accelerate_uploading = kwargs.get('accelerate_uploading', None)
 
+        # set to None to generate a new up token for each uploading
+        self.up_token_cache = kwargs.get('up_token_cache', default_up_token_cache)
+
+        # set to None to try the up endpoints in the original order
+        self.endpoint_health_tracker = kwargs.get('endpoint_health_tracker', default_endpoint_health_tracker)
+
+        self.retry_backoff = kwargs.get('retry_backoff', None)
+        self.retry_budget = kwargs.get('retry_budget', default_retry_budget)
+
     def get_up_token(
         self,
         bucket_name=None,
@@ -94,16 +114,16 @@ class UploaderBase(object):
         kwargs_for_up_token = {
             k: v
             for k, v in {
-                'bucket': bucket_name,
                 'key': key,
-                'expired': expired,
+                'expires': expired,
                 'policy': policy,
                 'strict_policy': strict_policy
             }.items()
-            if k
+            if v is not None
         }
-        up_token = self.auth.upload_token(**kwargs_for_up_token)
-        return up_token
+        if self.up_token_cache is None:
+            return self.auth.upload_token(bucket_name, **kwargs_for_up_token)
+        return self.up_token_cache.get(self.auth, bucket_name, **kwargs_for_up_token)
 
     def _get_regions_provider(self, access_key=None, bucket_name=None):
         """
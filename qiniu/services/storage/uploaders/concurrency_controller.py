@@ -0,0 +1,102 @@
+import threading
+import time
+
+
+class AIMDConcurrencyController(object):
+    """
+    Tune the count of in-flight parts in the style of TCP congestion control.
+
+    The throughput is measured by windows, each window is `limit` parts completed.
+    The limit is increased by one if the throughput of a window is higher than the last one by `min_throughput_gain`,
+    decreased by one if lower by it, and multiplied by `decrease_ratio` when a part failed or was retried.
+
+    Examples
+    --------
+    controller = AIMDConcurrencyController(initial_limit=2, max_limit=16)
+    uploader = ResumeUploaderV2(bucket_name, auth=auth, concurrency_controller=controller)
+    """
+
+    def __init__(
+        self,
+        initial_limit=2,
+        min_limit=1,
+        max_limit=16,
+        decrease_ratio=0.5,
+        min_throughput_gain=0.1
+    ):
+        """
+        Parameters
+        ----------
+        initial_limit: int
+        min_limit: int
+        max_limit: int
+            also the default max workers of the uploader's executor
+        decrease_ratio: float
+            in range (0, 1)
+        min_throughput_gain: float
+            the ratio of throughput change regarded as better or worse
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError('must be 1 <= min_limit <= initial_limit <= max_limit')
+        if not 0 < decrease_ratio < 1:
+            raise ValueError('decrease_ratio must be in range (0, 1)')
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_ratio = decrease_ratio
+        self.min_throughput_gain = min_throughput_gain
+
+        self.__limit = float(initial_limit)
+        self.__last_throughput = None
+        self.__lock = threading.Lock()
+        self.__reset_window()
+
+    @property
+    def limit(self):
+        """
+        Returns
+        -------
+        int
+            the max count of in-flight parts now
+        """
+        return int(self.__limit)
+
+    def on_part_done(self, size, started_at, ok, retries=0):
+        """
+        called when a part is completed
+
+        Parameters
+        ----------
+        size: int
+        started_at: float
+            the timestamp the part started uploading
+        ok: bool
+        retries: int
+        """
+        with self.__lock:
+            if not ok or retries:
+                self.__limit = max(self.min_limit, self.__limit * self.decrease_ratio)
+                # the throughput is changed by the errors, measure again
+                self.__last_throughput = None
+                self.__reset_window()
+                return
+
+            self.__window_size += size
+            self.__window_parts += 1
+            if self.__window_started_at is None or started_at < self.__window_started_at:
+                self.__window_started_at = started_at
+            if self.__window_parts < self.limit:
+                return
+
+            throughput = self.__window_size / max(time.time() - self.__window_started_at, 1e-6)
+            last_throughput = self.__last_throughput
+            if last_throughput is None or throughput > last_throughput * (1 + self.min_throughput_gain):
+                self.__limit = min(self.max_limit, self.__limit + 1)
+            elif throughput < last_throughput * (1 - self.min_throughput_gain):
+                self.__limit = max(self.min_limit, self.__limit - 1)
+            self.__last_throughput = throughput
+            self.__reset_window()
+
+    def __reset_window(self):
+        self.__window_size = 0
+        self.__window_parts = 0
+        self.__window_started_at = None
@@ -1,14 +1,20 @@
-from io import BytesIO
+import binascii
+import os
 from os import path
 from time import time
 
 from qiniu.compat import is_seekable
-from qiniu.utils import b, io_crc32
+from qiniu.utils import b, _get_pread_fd, _pread_fully
 from qiniu.auth import Auth
 from qiniu.http import qn_http_client
+from qiniu.http.instrumentation import request_tags
 
 from .abc import UploaderBase
 from ._default_retrier import get_default_retrier
+from .multipart_encoder import MultipartEncoder
+
+# the size of blocks to compute crc32
+_CRC32_BLOCK_SIZE = 4 * (1024 ** 2)
 
 
 class FormUploader(UploaderBase):
@@ -107,15 +113,15 @@ class FormUploader(UploaderBase):
             if file_path:
                 data_size = path.getsize(file_path)
                 data = open(file_path, 'rb')
-            elif isinstance(data, bytes):
-                data_size = len(data)
-                data = BytesIO(data)
             elif isinstance(data, str):
+                data = b(data)
+            if isinstance(data, bytes):
                 data_size = len(data)
-                data = BytesIO(b(data))
+            elif not data_size:
+                data_size = self.__get_rest_size(data)
             if not crc32_int:
-                crc32_int = self.__get_crc32_int(data)
-            fields = self.__get_form_fields(
+                crc32_int = self.__get_crc32_int(data, data_size)
+            fields = self._get_form_fields(
                 up_token=up_token,
                 key=key,
                 crc32_int=crc32_int,
@@ -150,12 +156,17 @@ class FormUploader(UploaderBase):
                 access_key=access_key,
                 bucket_name=bucket_name
             ),
-            accelerate_uploading=self.accelerate_uploading
+            accelerate_uploading=self.accelerate_uploading,
+            endpoint_health_tracker=self.endpoint_health_tracker,
+            backoff=self.retry_backoff,
+            retry_budget=self.retry_budget
         )
         data = upload_data_opts.get('data')
+        # the data is uploaded from the current position, so rewind to it rather than the beginning to retry
+        data_start = data.tell() if not isinstance(data, bytes) and is_seekable(data) else 0
         attempt = None
         for attempt in retrier:
-            with attempt:
+            with attempt, request_tags(service_name=attempt.context.get('service_name')):
                 attempt.result = self.__upload_data(
                     up_endpoint=attempt.context.get('endpoint'),
                     **upload_data_opts
@@ -163,12 +174,14 @@ class FormUploader(UploaderBase):
                 ret, resp = attempt.result
                 if resp.ok() and ret:
                     return attempt.result
-                if (
-                    not is_seekable(data) or
-                    not resp.need_retry()
-                ):
+                if not resp.need_retry():
+                    return attempt.result
+                # the bytes are encoded again by each attempt
+                if isinstance(data, bytes):
+                    continue
+                if not is_seekable(data):
                     return attempt.result
-                data.seek(0)
+                data.seek(data_start)
 
         if attempt is None:
             raise RuntimeError('Retrier is not working. attempt is None')
@@ -190,8 +203,9 @@ class FormUploader(UploaderBase):
         up_endpoint: Endpoint
         fields: dict
         file_name: str
-        data: IOBase
+        data: bytes or IOBase
         data_size: int
+            the data is sent by `requests` files, which reads all data into memory, if the size is unknown
         mime_type: str
 
         Returns
@@ -203,16 +217,32 @@ class FormUploader(UploaderBase):
         if not file_name or not file_name.strip():
             file_name = 'file_name'
 
-        ret, resp = qn_http_client.post(
+        if data_size is None:
+            return qn_http_client.post(
+                url=req_url,
+                data=fields,
+                files={
+                    'file': (file_name, data, mime_type)
+                }
+            )
+
+        body = MultipartEncoder(
+            fields=fields,
+            file_name=file_name,
+            data=data,
+            data_size=data_size,
+            mime_type=mime_type
+        )
+        return qn_http_client.post(
             url=req_url,
-            data=fields,
-            files={
-                'file': (file_name, data, mime_type)
+            data=body,
+            files=None,
+            headers={
+                'Content-Type': body.content_type
             }
         )
-        return ret, resp
 
-    def __get_form_fields(
+    def _get_form_fields(
         self,
         up_token,
         **kwargs
@@ -263,19 +293,64 @@ class FormUploader(UploaderBase):
 
         return result
 
-    def __get_crc32_int(self, data):
+    def __get_crc32_int(self, data, size=None):
         """
+        Compute crc32 of the data in one pass,
+        the regular file is read by `os.pread` so the position isn't moved.
+
         Parameters
         ----------
-        data: BytesIO
+        data: bytes or IOBase
+        size: int, optional
+            the size of data to upload from the current position, as the multipart body sends.
+            None to compute until the end.
 
         Returns
         -------
-        str
+        int or None
+            None if the data isn't seekable
         """
-        result = None
+        if isinstance(data, bytes):
+            return binascii.crc32(data[:size]) & 0xFFFFFFFF
         if not is_seekable(data):
-            return result
-        result = io_crc32(data)
-        data.seek(0)
+            return None
+
+        result = 0
+        start = data.tell()
+        end = None if size is None else start + size
+        fd = _get_pread_fd(data)
+        offset = start
+        while end is None or offset < end:
+            block_size = _CRC32_BLOCK_SIZE if end is None else min(_CRC32_BLOCK_SIZE, end - offset)
+            if fd is not None:
+                block = _pread_fully(fd, block_size, offset)
+            else:
+                block = data.read(block_size)
+            if not block:
+                break
+            result = binascii.crc32(block, result) & 0xFFFFFFFF
+            offset += len(block)
+        if fd is None:
+            data.seek(start)
         return result
+
+    def __get_rest_size(self, data):
+        """
+        Parameters
+        ----------
+        data: IOBase
+
+        Returns
+        -------
+        int or None
+            the size from the current position to the end, None if the data isn't seekable
+        """
+        if not is_seekable(data):
+            return None
+        start = data.tell()
+        end = data.seek(0, os.SEEK_END)
+        if end is None:
+            # the seek of python 2 returns None
+            end = data.tell()
+        data.seek(start)
+        return end - start
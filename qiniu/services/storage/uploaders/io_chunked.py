@@ -3,6 +3,12 @@ import io
 from collections import namedtuple
 
 from qiniu.compat import is_seekable
+from qiniu.utils import _get_pread_fd, _pread_fully
+
+
+# the chunks not larger than it will be read into memory by `read_chunk` at once,
+# and the larger chunks should be streamed by `IOChunked` to limit the memory usage.
+MAX_BUFFERED_CHUNK_SIZE = 64 * (1024 ** 2)
 
 
 ChunkInfo = namedtuple(
@@ -32,6 +38,7 @@ class IOChunked(io.IOBase):
         self.__chunk_end = chunk_offset + chunk_size
         self.__lock = lock
         self.__chunk_pos = 0
+        self.__pread_fd = _get_pread_fd(base_io)
 
         self.buffer_size = min(buffer_size, chunk_size)
 
@@ -71,9 +78,12 @@ class IOChunked(io.IOBase):
         read_size = min(self.__rest_chunk_size, read_size)
 
         # -- ignore size argument --
-        with self.__lock:
-            self.__base_io.seek(self.__curr_base_pos)
-            data = self.__base_io.read(read_size)
+        if self.__pread_fd is not None:
+            data = _pread_fully(self.__pread_fd, read_size, self.__curr_base_pos)
+        else:
+            with self.__lock:
+                self.__base_io.seek(self.__curr_base_pos)
+                data = self.__base_io.read(read_size)
 
         self.__chunk_pos += len(data)
         return data
@@ -88,3 +98,149 @@ class IOChunked(io.IOBase):
     @property
     def __rest_chunk_size(self):
         return self.__chunk_end - self.__curr_base_pos
+
+
+def read_chunk(base_io, chunk_offset, chunk_size, lock):
+    """
+    Read the whole chunk into memory.
+
+    The regular file is read by `os.pread`, which neither takes the lock nor moves the file position,
+    so the chunks could be read concurrently.
+    The others are read by seeking the base_io with the lock.
+
+    Parameters
+    ----------
+    base_io: IOBase
+    chunk_offset: int
+    chunk_size: int
+    lock: Lock
+
+    Returns
+    -------
+    bytes
+    """
+    fd = _get_pread_fd(base_io)
+    if fd is not None:
+        return _pread_fully(fd, chunk_size, chunk_offset)
+
+    chunked_data = IOChunked(
+        base_io=base_io,
+        chunk_offset=chunk_offset,
+        chunk_size=chunk_size,
+        lock=lock
+    )
+    buf = []
+    while True:
+        data = chunked_data.read(chunk_size)
+        if not data:
+            break
+        buf.append(data)
+    return b''.join(buf)
+
+
+class BufferChunked(io.IOBase):
+    def __init__(self, buf, size):
+        """
+        A seekable reader of the first `size` bytes in a buffer, which doesn't copy the buffer.
+        It's used to send a part read into a reusable buffer, and send again if failed.
+
+        Parameters
+        ----------
+        buf: bytearray
+        size: int
+        """
+        self.view = memoryview(buf)[:size]
+        self.__pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=0):
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self.__pos + offset
+        elif whence == os.SEEK_END:
+            pos = len(self.view) + offset
+        else:
+            raise ValueError('whence should be 0, 1 or 2')
+        self.__pos = max(0, min(len(self.view), pos))
+        return self.__pos
+
+    def tell(self):
+        return self.__pos
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self.view) - self.__pos
+        data = self.view[self.__pos:self.__pos + size].tobytes()
+        self.__pos += len(data)
+        return data
+
+    def __len__(self):
+        return len(self.view)
+
+
+class IterableReader(io.IOBase):
+    def __init__(self, iterable):
+        """
+        Read the bytes yielded by an iterable, such as a generator, like a non-seekable stream.
+
+        Parameters
+        ----------
+        iterable: Iterable[bytes]
+        """
+        self.__iterator = iter(iterable)
+        self.__rest = b''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        chunks = [self.__rest]
+        read_size = len(self.__rest)
+        while size is None or size < 0 or read_size < size:
+            chunk = next(self.__iterator, None)
+            if chunk is None:
+                break
+            chunks.append(chunk)
+            read_size += len(chunk)
+        data = b''.join(chunks)
+        if size is None or size < 0:
+            size = len(data)
+        self.__rest = data[size:]
+        return data[:size]
+
+
+def read_into_fully(base_io, buf):
+    """
+    Read into the buffer until it's full or the end of stream,
+    since a pipe or a socket may return less than the buffer size.
+
+    Parameters
+    ----------
+    base_io: IOBase
+    buf: bytearray
+
+    Returns
+    -------
+    int
+        the size read
+    """
+    view = memoryview(buf)
+    readinto = getattr(base_io, 'readinto', None)
+    read_size = 0
+    while read_size < len(view):
+        if readinto is not None:
+            size = readinto(view[read_size:])
+        else:
+            data = base_io.read(len(view) - read_size)
+            size = len(data)
+            view[read_size:read_size + size] = data
+        if not size:
+            break
+        read_size += size
+    return read_size
@@ -0,0 +1,177 @@
+import binascii
+import io
+import os
+
+from qiniu.compat import is_seekable, str, bytes
+from qiniu.utils import b, _get_pread_fd, _pread_fully
+
+
+class MultipartEncoder(io.IOBase):
+    """
+    Encode the form fields and a file as a `multipart/form-data` body, which is read on demand,
+    so the file is never concatenated into the body in memory.
+
+    The regular file is read by `os.pread` from its position when the encoder created,
+    the bytes are read by slices, and the other streams are read sequentially.
+
+    Examples
+    --------
+    body = MultipartEncoder(fields, 'file_name', data, data_size)
+    requests.post(url, data=body, headers={'Content-Type': body.content_type})
+    """
+
+    def __init__(
+        self,
+        fields,
+        file_name,
+        data,
+        data_size,
+        mime_type=None,
+        file_field_name='file',
+        boundary=None
+    ):
+        """
+        Parameters
+        ----------
+        fields: dict
+            the form fields sent before the file
+        file_name: str
+        data: bytes or IOBase
+        data_size: int
+        mime_type: str
+        file_field_name: str
+        boundary: str
+            random if not provided
+        """
+        if boundary is None:
+            boundary = binascii.hexlify(os.urandom(16)).decode('ascii')
+        self.boundary = boundary
+        self.content_type = 'multipart/form-data; boundary={0}'.format(boundary)
+
+        head = []
+        for name, value in fields.items():
+            head.append(self.__part_header(name))
+            head.append(value if isinstance(value, bytes) else _to_text(value).encode('utf-8'))
+            head.append(b'\r\n')
+        head.append(self.__part_header(file_field_name, file_name, mime_type or 'application/octet-stream'))
+        self.__head = b''.join(head)
+        # the CRLF after the file is a part of the tail
+        self.__tail = b('\r\n--{0}--\r\n'.format(boundary))
+
+        self.__data = data
+        self.__data_size = data_size
+        self.__pread_fd = None
+        self.__data_start = None
+        if not isinstance(data, bytes):
+            self.__pread_fd = _get_pread_fd(data)
+            if is_seekable(data):
+                self.__data_start = data.tell()
+
+        self.__pos = 0
+        self.__length = len(self.__head) + data_size + len(self.__tail)
+
+    def __part_header(self, name, file_name=None, mime_type=None):
+        disposition = u'form-data; name="{0}"'.format(_escape_header_param(_to_text(name)))
+        if file_name is not None:
+            disposition += u'; filename="{0}"'.format(_escape_header_param(_to_text(file_name)))
+        lines = [
+            u'--{0}'.format(self.boundary),
+            u'Content-Disposition: {0}'.format(disposition)
+        ]
+        if mime_type:
+            lines.append(u'Content-Type: {0}'.format(mime_type))
+        return (u'\r\n'.join(lines) + u'\r\n\r\n').encode('utf-8')
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return isinstance(self.__data, bytes) or self.__data_start is not None
+
+    def seek(self, offset, whence=0):
+        if whence == os.SEEK_SET:
+            pos = offset
+        elif whence == os.SEEK_CUR:
+            pos = self.__pos + offset
+        elif whence == os.SEEK_END:
+            pos = self.__length + offset
+        else:
+            raise ValueError('whence should be 0, 1 or 2')
+        pos = max(0, min(self.__length, pos))
+        if pos == self.__pos:
+            return pos
+        if not self.seekable():
+            raise io.UnsupportedOperation('the data is not seekable')
+        if self.__pread_fd is None and self.__data_start is not None:
+            data_offset = max(0, min(self.__data_size, pos - len(self.__head)))
+            self.__data.seek(self.__data_start + data_offset)
+        self.__pos = pos
+        return pos
+
+    def tell(self):
+        return self.__pos
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.__length - self.__pos
+        head_size, data_end = len(self.__head), len(self.__head) + self.__data_size
+        chunks = []
+        while size > 0 and self.__pos < self.__length:
+            if self.__pos < head_size:
+                chunk = self.__head[self.__pos:self.__pos + size]
+            elif self.__pos < data_end:
+                offset = self.__pos - head_size
+                chunk = self.__read_data(offset, min(size, self.__data_size - offset))
+                if not chunk:
+                    raise IOError('the data is shorter than data_size {0}'.format(self.__data_size))
+            else:
+                offset = self.__pos - data_end
+                chunk = self.__tail[offset:offset + size]
+            chunks.append(chunk)
+            self.__pos += len(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+    def __read_data(self, offset, size):
+        if isinstance(self.__data, bytes):
+            return memoryview(self.__data)[offset:offset + size].tobytes()
+        if self.__pread_fd is not None:
+            return _pread_fully(self.__pread_fd, size, self.__data_start + offset)
+        return self.__data.read(size)
+
+    def __len__(self):
+        return self.__length
+
+
+def _to_text(value):
+    """
+    Parameters
+    ----------
+    value: str or bytes or any
+        the bytes are decoded as UTF-8, and the others are converted by `str`
+
+    Returns
+    -------
+    str
+        unicode on Python 2
+    """
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    if isinstance(value, str):
+        return value
+    return str(value)
+
+
+def _escape_header_param(value):
+    """
+    Escape the name or filename in `Content-Disposition` as the browsers do.
+
+    Parameters
+    ----------
+    value: str
+
+    Returns
+    -------
+    str
+    """
+    return value.replace('\\', '\\\\').replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
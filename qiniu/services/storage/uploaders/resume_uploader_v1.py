@@ -13,11 +13,12 @@ from qiniu.compat import is_seekable
 from qiniu.auth import Auth
 from qiniu.http import qn_http_client, ResponseInfo
 from qiniu.http.endpoint import Endpoint
-from qiniu.utils import b, io_crc32, urlsafe_base64_encode
+from qiniu.http.instrumentation import bind_request_tags, request_tags
+from qiniu.utils import b, crc32, urlsafe_base64_encode
 
 from ._default_retrier import ProgressRecord, get_default_retrier
 from .abc import ResumeUploaderBase
-from .io_chunked import IOChunked
+from .io_chunked import read_chunk
 
 
 class ResumeUploaderV1(ResumeUploaderBase):
@@ -323,8 +324,9 @@ class ResumeUploaderV1(ResumeUploaderBase):
             # if last part has been uploaded, should correct the uploaded size
             uploaded_size += (data_size % context.part_size) - context.part_size
         lock = Lock()
+        executor = self._get_parts_executor()
 
-        if not self.concurrent_executor:
+        if not executor:
             # upload sequentially
             for chunk in chunk_list:
                 part, resp = self.__upload_part(
@@ -351,8 +353,9 @@ class ResumeUploaderV1(ResumeUploaderBase):
             # upload concurrently
             future_chunk_dict = {}
             for chunk in chunk_list:
-                ftr = self.concurrent_executor.submit(
-                    self.__upload_part,
+                ftr = executor.submit(
+                    # the parts are uploaded in other threads, so tag their requests as the current thread
+                    bind_request_tags(self.__upload_part),
                     data=data,
                     chunk_info=chunk,
                     up_hosts=up_hosts,
@@ -509,12 +512,15 @@ class ResumeUploaderV1(ResumeUploaderBase):
             preferred_endpoints_provider=preferred_endpoints,
             progress_record=progress_record,
             accelerate_uploading=self.accelerate_uploading,
+            endpoint_health_tracker=self.endpoint_health_tracker,
+            backoff=self.retry_backoff,
+            retry_budget=self.retry_budget
         )
 
         data = upload_opts.get('data')
         attempt = None
         for attempt in retrier:
-            with attempt:
+            with attempt, request_tags(service_name=attempt.context.get('service_name')):
                 upload_opts['up_endpoint'] = attempt.context.get('endpoint')
                 attempt.result = self.__upload(
                     **upload_opts
@@ -655,9 +661,15 @@ class ResumeUploaderV1(ResumeUploaderBase):
             logging.warning('ResumeUploader not support part_size. It is fixed to 4MB.')
 
         # up_token
+        up_token_opts = dict(
+            (k, kwargs.pop(k))
+            for k in ['bucket_name', 'expired', 'policy', 'strict_policy']
+            if k in kwargs
+        )
         up_token = kwargs.get('up_token', None)
         if not up_token:
-            kwargs.setdefault('up_token', self.get_up_token(**kwargs))
+            up_token = self.get_up_token(**up_token_opts)
+            kwargs['up_token'] = up_token
             access_key = self.auth.get_access_key()
         else:
             access_key, _, _ = Auth.up_token_decode(up_token)
@@ -709,14 +721,15 @@ class ResumeUploaderV1(ResumeUploaderBase):
         if not up_hosts:
             raise ValueError('Must provide one up host at least')
 
-        chunked_data = IOChunked(
+        # the block size of v1 is fixed to 4MB,
+        # so read it once, then compute crc32 and send with the same buffer
+        chunked_data = read_chunk(
             base_io=data,
             chunk_offset=chunk_info.chunk_offset,
             chunk_size=chunk_info.chunk_size,
             lock=lock
         )
-        chunk_crc32 = io_crc32(chunked_data)
-        chunked_data.seek(0)
+        chunk_crc32 = crc32(chunked_data)
         part, resp = None, None
         for up_host in up_hosts:
             url = '/'.join([
@@ -740,12 +753,8 @@ class ResumeUploaderV1(ResumeUploaderBase):
                     expired_at=ret.get('expired_at', 0),
                 )
                 return part, resp
-            if (
-                not is_seekable(chunked_data) or
-                not resp.need_retry()
-            ):
+            if not resp.need_retry():
                 return part, resp
-            chunked_data.seek(0)
         return part, resp
 
     def __get_mkfile_url(
@@ -2,6 +2,7 @@ import functools
 import math
 from collections import namedtuple
 from concurrent import futures
+from hashlib import md5
 from io import BytesIO
 from os import path
 from threading import Lock
@@ -11,15 +12,45 @@ from qiniu.compat import is_seekable
 from qiniu.auth import Auth
 from qiniu.http import qn_http_client, ResponseInfo
 from qiniu.http.endpoint import Endpoint
-from qiniu.utils import b, io_md5, urlsafe_base64_encode
+from qiniu.http.instrumentation import bind_request_tags, request_tags
+from qiniu.utils import b, urlsafe_base64_encode, EtagV2Calculator
 from qiniu.compat import json
 
 from ._default_retrier import ProgressRecord, get_default_retrier
 from .abc import ResumeUploaderBase
-from .io_chunked import IOChunked
+from .io_chunked import (
+    IOChunked, BufferChunked, IterableReader, ChunkInfo, MAX_BUFFERED_CHUNK_SIZE, read_chunk, read_into_fully
+)
+from .upload_profiler import PartProfile
+
+# the limits of parts by the service
+MIN_PART_SIZE = 1024 ** 2
+MAX_PART_SIZE = 1024 ** 3
+MAX_PARTS = 10000
+# the count of parts the adaptive part size aims for
+ADAPTIVE_TARGET_PARTS = 1000
 
 
 class ResumeUploaderV2(ResumeUploaderBase):
+    def __init__(
+        self,
+        bucket_name,
+        **kwargs
+    ):
+        """
+        Parameters
+        ----------
+        bucket_name: str
+        verify_etag: bool
+            calculate the etag while reading the parts and compare it with the hash responded by complete parts,
+            the parts recovered from the record are not read, so the upload resumed will not be verified.
+        kwargs
+            the same as `ResumeUploaderBase`
+        """
+        super(ResumeUploaderV2, self).__init__(bucket_name, **kwargs)
+
+        self.verify_etag = kwargs.get('verify_etag', False)
+
     def _recover_from_record(
         self,
         file_name,
@@ -176,7 +207,8 @@ class ResumeUploaderV2(ResumeUploaderBase):
         key,
         file_name,
         modify_time,
-        part_size
+        part_size,
+        recover=True
     ):
         context = _ResumeUploadV2Context(
             up_hosts=[],
@@ -185,9 +217,14 @@ class ResumeUploaderV2(ResumeUploaderBase):
             part_size=part_size,
             parts=[],
             modify_time=modify_time,
-            resumed=False
+            resumed=False,
+            etag_calculator=EtagV2Calculator() if self.verify_etag else None
         )
 
+        # the stream couldn't skip the uploaded parts, so it's never recovered
+        if not recover:
+            return context
+
         # try to recover from record
 
         return self._recover_from_record(
@@ -236,8 +273,9 @@ class ResumeUploaderV2(ResumeUploaderBase):
         if file_path and data:
             raise TypeError('Must provide only one of file_path or data.')
 
-        # data must has length
-        if not file_path and not data_size:
+        # data must has length, unless it's uploaded by streaming
+        streaming = not file_path and self._is_streaming(data, data_size)
+        if not file_path and not data_size and not streaming:
             raise TypeError('Must provide size if use data.')
 
         if not modify_time:
@@ -247,7 +285,12 @@ class ResumeUploaderV2(ResumeUploaderBase):
                 modify_time = int(time())
 
         if not part_size:
-            part_size = self.part_size
+            if file_path:
+                part_size = self._get_part_size(path.getsize(file_path))
+            elif data_size:
+                part_size = self._get_part_size(data_size)
+            else:
+                part_size = self.part_size
 
         # -- initial context
         if not file_name and file_path:
@@ -256,7 +299,8 @@ class ResumeUploaderV2(ResumeUploaderBase):
             key=key,
             file_name=file_name,
             modify_time=modify_time,
-            part_size=part_size
+            part_size=part_size,
+            recover=not streaming
         )
 
         if (
@@ -278,7 +322,7 @@ class ResumeUploaderV2(ResumeUploaderBase):
 
         resp = None
         for up_host in context.up_hosts:
-            url = self.__get_url_for_upload(
+            url = self._get_url_for_upload(
                 up_host,
                 bucket_name,
                 key
@@ -318,7 +362,7 @@ class ResumeUploaderV2(ResumeUploaderBase):
         data_size: int
         context: _ResumeUploadV2Context
         kwargs
-            key, file_name
+            key, file_name, up_token_provider
 
         Returns
         -------
@@ -337,6 +381,7 @@ class ResumeUploaderV2(ResumeUploaderBase):
         up_hosts = list(context.up_hosts)
         file_name = kwargs.get('file_name', None)
         key = kwargs.get('key', None)
+        up_token_provider = kwargs.get('up_token_provider', None)
 
         # initial upload state
         part, resp = None, None
@@ -345,8 +390,9 @@ class ResumeUploaderV2(ResumeUploaderBase):
             # if last part uploaded, should correct the uploaded size
             uploaded_size += (data_size % context.part_size) - context.part_size
         lock = Lock()
+        executor = self._get_parts_executor()
 
-        if not self.concurrent_executor:
+        if not executor:
             # upload sequentially
             for chunk in chunk_list:
                 part, resp = self.__upload_part(
@@ -356,7 +402,10 @@ class ResumeUploaderV2(ResumeUploaderBase):
                     up_token=up_token,
                     upload_id=context.upload_id,
                     key=key,
-                    lock=lock
+                    lock=lock,
+                    etag_calculator=context.etag_calculator,
+                    up_token_provider=up_token_provider,
+                    part_profile=self.__new_part_profile(chunk)
                 )
                 if not resp.ok():
                     return None, resp
@@ -370,52 +419,202 @@ class ResumeUploaderV2(ResumeUploaderBase):
                     total_size=data_size
                 )
         else:
-            # upload concurrently
+            # upload concurrently, and the in-flight parts are limited by the concurrency controller if provided
+            chunks = iter(chunk_list)
             future_chunk_dict = {}
-            for chunk in chunk_list:
-                ftr = self.concurrent_executor.submit(
-                    self.__upload_part,
-                    data=data,
+            first_failed_resp = None
+            while True:
+                while (
+                    not first_failed_resp and
+                    (
+                        not self.concurrency_controller or
+                        len(future_chunk_dict) < self.concurrency_controller.limit
+                    )
+                ):
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    ftr = executor.submit(
+                        # the parts are uploaded in other threads, so tag their requests as the current thread
+                        bind_request_tags(self.__upload_part),
+                        data=data,
+                        chunk_info=chunk,
+                        up_hosts=up_hosts,
+                        up_token=up_token,
+                        upload_id=context.upload_id,
+                        key=key,
+                        lock=lock,
+                        etag_calculator=context.etag_calculator,
+                        up_token_provider=up_token_provider,
+                        part_profile=self.__new_part_profile(chunk)
+                    )
+                    future_chunk_dict[ftr] = chunk
+                if not future_chunk_dict:
+                    break
+
+                done, _ = futures.wait(future_chunk_dict, return_when=futures.FIRST_COMPLETED)
+                for ftr in done:
+                    chunk = future_chunk_dict.pop(ftr)
+                    if ftr.cancelled():
+                        continue
+                    elif ftr.exception():
+                        if first_failed_resp:
+                            continue
+                        first_failed_resp = ResponseInfo(None, ftr.exception())
+                        for not_done in filter(lambda f: not f.done(), future_chunk_dict):
+                            not_done.cancel()
+                    else:
+                        part, resp = ftr.result()
+                        if not part:
+                            if not first_failed_resp:
+                                first_failed_resp = resp
+                                for not_done in filter(lambda f: not f.done(), future_chunk_dict):
+                                    not_done.cancel()
+                        else:
+                            context.parts.append(part)
+                            uploaded_size += chunk.chunk_size
+                            self._progress_handler(
+                                file_name=file_name,
+                                key=key,
+                                context=context,
+                                uploaded_size=uploaded_size,
+                                total_size=data_size
+                            )
+            if first_failed_resp:
+                return None, first_failed_resp
+
+        return part, resp
+
+    def upload_parts_streaming(
+        self,
+        up_token,
+        data,
+        context,
+        **kwargs
+    ):
+        """
+        Upload the parts read from a stream sequentially, the size of which isn't needed.
+
+        The parts are read into a bounded pool of reusable buffers, and uploaded concurrently,
+        so there are at most `max_concurrent_workers` parts in memory. The failed part is sent again from its buffer.
+        The stream is never recorded for resuming, and `total_size` of the progress handler is -1.
+
+        Parameters
+        ----------
+        up_token: str
+        data: IOBase or Iterable[bytes]
+        context: _ResumeUploadV2Context
+        kwargs
+            key, file_name, up_token_provider
+
+        Returns
+        -------
+        part: _ResumeUploadV2Part
+        resp: ResponseInfo
+        data_size: int
+            the size read from the stream
+        """
+        up_hosts = list(context.up_hosts)
+        key = kwargs.get('key', None)
+        up_token_provider = kwargs.get('up_token_provider', None)
+        if not hasattr(data, 'read'):
+            data = IterableReader(data)
+
+        executor = self._get_parts_executor()
+        max_in_flight = self.max_concurrent_workers if executor else 1
+        free_buffers = []
+        future_chunk_dict = {}
+        lock = Lock()
+        part, resp, first_failed_resp = None, None, None
+        data_size, uploaded_size, part_no, eof = 0, 0, 0, False
+        while True:
+            while (
+                not eof and
+                not first_failed_resp and
+                len(future_chunk_dict) < max_in_flight and
+                (
+                    not self.concurrency_controller or
+                    not executor or
+                    len(future_chunk_dict) < self.concurrency_controller.limit
+                )
+            ):
+                buf = free_buffers.pop() if free_buffers else bytearray(context.part_size)
+                read_started_at = time()
+                size = read_into_fully(data, buf)
+                read_time = time() - read_started_at
+                eof = size < len(buf)
+                if not size and part_no:
+                    free_buffers.append(buf)
+                    break
+                part_no += 1
+                if part_no > MAX_PARTS:
+                    first_failed_resp = ResponseInfo(
+                        None,
+                        ValueError('the stream is too large to upload by {0} parts'.format(MAX_PARTS))
+                    )
+                    break
+                data_size += size
+                chunk = ChunkInfo(chunk_no=part_no, chunk_offset=0, chunk_size=size)
+                part_profile = self.__new_part_profile(chunk)
+                if part_profile:
+                    part_profile.read_time = read_time
+                upload_opts = dict(
+                    data=BufferChunked(buf, size),
                     chunk_info=chunk,
                     up_hosts=up_hosts,
                     up_token=up_token,
                     upload_id=context.upload_id,
                     key=key,
-                    lock=lock
+                    lock=lock,
+                    etag_calculator=context.etag_calculator,
+                    up_token_provider=up_token_provider,
+                    part_profile=part_profile
                 )
-                future_chunk_dict[ftr] = chunk
+                if executor:
+                    ftr = executor.submit(bind_request_tags(self.__upload_part), **upload_opts)
+                else:
+                    ftr = futures.Future()
+                    try:
+                        ftr.set_result(self.__upload_part(**upload_opts))
+                    except Exception as err:
+                        ftr.set_exception(err)
+                future_chunk_dict[ftr] = (chunk, buf)
+            if not future_chunk_dict:
+                break
 
-            first_failed_resp = None
-            for ftr in futures.as_completed(future_chunk_dict):
+            done, _ = futures.wait(future_chunk_dict, return_when=futures.FIRST_COMPLETED)
+            for ftr in done:
+                chunk, buf = future_chunk_dict.pop(ftr)
+                # the buffer is reusable only after the part is done
+                free_buffers.append(buf)
                 if ftr.cancelled():
                     continue
                 elif ftr.exception():
-                    if first_failed_resp:
-                        continue
-                    first_failed_resp = ResponseInfo(None, ftr.exception())
-                    for not_done in filter(lambda f: not f.done(), future_chunk_dict):
-                        not_done.cancel()
-                else:
-                    part, resp = ftr.result()
-                    if not part:
-                        if not first_failed_resp:
-                            first_failed_resp = resp
-                            for not_done in filter(lambda f: not f.done(), future_chunk_dict):
-                                not_done.cancel()
-                    else:
-                        context.parts.append(part)
-                        uploaded_size += future_chunk_dict[ftr].chunk_size
-                        self._progress_handler(
-                            file_name=file_name,
-                            key=key,
-                            context=context,
-                            uploaded_size=uploaded_size,
-                            total_size=data_size
-                        )
-            if first_failed_resp:
-                return None, first_failed_resp
+                    if not first_failed_resp:
+                        first_failed_resp = ResponseInfo(None, ftr.exception())
+                        for not_done in filter(lambda f: not f.done(), future_chunk_dict):
+                            not_done.cancel()
+                    continue
+                part, resp = ftr.result()
+                if not part:
+                    if not first_failed_resp:
+                        first_failed_resp = resp
+                        for not_done in filter(lambda f: not f.done(), future_chunk_dict):
+                            not_done.cancel()
+                    continue
+                context.parts.append(part)
+                uploaded_size += chunk.chunk_size
+                self._progress_handler(
+                    file_name=None,
+                    key=None,
+                    context=context,
+                    uploaded_size=uploaded_size,
+                    total_size=-1
+                )
+        if first_failed_resp:
+            return None, first_failed_resp, data_size
 
-        return part, resp
+        return part, resp, data_size
 
     def complete_parts(
         self,
@@ -431,7 +630,7 @@ class ResumeUploaderV2(ResumeUploaderBase):
         data_size: int
         context: _ResumeUploadV2Context
         kwargs
-            key, file_name, params, metadata
+            key, file_name, params, metadata, up_token_provider
         Returns
         -------
             ret: dict
@@ -442,6 +641,9 @@ class ResumeUploaderV2(ResumeUploaderBase):
         mime_type = kwargs.get('mime_type', None)
         params = kwargs.get('params', None)
         metadata = kwargs.get('metadata', None)
+        up_token_provider = kwargs.get('up_token_provider', None)
+        if up_token_provider:
+            up_token = up_token_provider()
 
         # sort contexts
         sorted_parts = sorted(context.parts, key=lambda part: part.part_no)
@@ -450,7 +652,7 @@ class ResumeUploaderV2(ResumeUploaderBase):
 
         ret, resp = None, None
         for up_host in context.up_hosts:
-            url = self.__get_url_for_upload(
+            url = self._get_url_for_upload(
                 up_host,
                 bucket_name,
                 key,
@@ -486,7 +688,35 @@ class ResumeUploaderV2(ResumeUploaderBase):
             context,
             resp
         )
-        return ret, resp
+        return self._verify_etag(context, ret, resp)
+
+    def _verify_etag(self, context, ret, resp):
+        """
+        Parameters
+        ----------
+        context: _ResumeUploadV2Context
+        ret: dict
+        resp: ResponseInfo
+
+        Returns
+        -------
+        ret: dict
+            None if the etag mismatched
+        resp: ResponseInfo
+        """
+        if not context.etag_calculator or not ret or not resp or not resp.ok():
+            return ret, resp
+        local_etag = context.etag_calculator.etag(parts_count=len(context.parts))
+        if not local_etag or not ret.get('hash') or local_etag == ret['hash']:
+            return ret, resp
+        err = ValueError('etag mismatched, local: {0}, server: {1}, reqid: {2}'.format(
+            local_etag,
+            ret['hash'],
+            resp.req_id
+        ))
+        # uploading again to other hosts gets the same result
+        err.no_need_retry = True
+        return None, ResponseInfo(None, err)
 
     def __upload_with_retrier(
         self,
@@ -498,12 +728,17 @@ class ResumeUploaderV2(ResumeUploaderBase):
         key = upload_opts.get('key', None)
         modify_time = upload_opts.get('modify_time', None)
         part_size = upload_opts.get('part_size', self.part_size)
+        streaming = not upload_opts.get('file_path') and self._is_streaming(
+            upload_opts.get('data'),
+            upload_opts.get('data_size')
+        )
 
         context = self._initial_context(
             key=key,
             file_name=file_name,
             modify_time=modify_time,
-            part_size=part_size
+            part_size=part_size,
+            recover=not streaming
         )
         preferred_endpoints = None
         if context.up_hosts:
@@ -541,13 +776,16 @@ class ResumeUploaderV2(ResumeUploaderBase):
             ),
             preferred_endpoints_provider=preferred_endpoints,
             progress_record=progress_record,
-            accelerate_uploading=self.accelerate_uploading
+            accelerate_uploading=self.accelerate_uploading,
+            endpoint_health_tracker=self.endpoint_health_tracker,
+            backoff=self.retry_backoff,
+            retry_budget=self.retry_budget
         )
 
         data = upload_opts.get('data')
         attempt = None
         for attempt in retrier:
-            with attempt:
+            with attempt, request_tags(service_name=attempt.context.get('service_name')):
                 upload_opts['up_endpoint'] = attempt.context.get('endpoint')
                 attempt.result = self.__upload(
                     **upload_opts
@@ -555,10 +793,12 @@ class ResumeUploaderV2(ResumeUploaderBase):
                 ret, resp = attempt.result
                 if resp.ok() and ret:
                     return attempt.result
-                if (
-                    not is_seekable(data) or
-                    not resp.need_retry()
-                ):
+                if not resp.need_retry():
+                    return attempt.result
+                # the file and bytes are reopened or wrapped again by each attempt
+                if data is None or isinstance(data, (bytes, str)):
+                    continue
+                if not is_seekable(data):
                     return attempt.result
                 data.seek(0)
 
@@ -580,7 +820,8 @@ class ResumeUploaderV2(ResumeUploaderBase):
         mime_type,
         custom_vars,
         metadata,
-        up_endpoint
+        up_endpoint,
+        up_token_provider=None
     ):
         # initial_parts
         context, resp = self.initial_parts(
@@ -603,6 +844,31 @@ class ResumeUploaderV2(ResumeUploaderBase):
             return None, resp
 
         # upload parts
+        if not file_path and self._is_streaming(data, data_size):
+            ret, resp, data_size = self.upload_parts_streaming(
+                up_token=up_token,
+                data=data,
+                context=context,
+
+                key=key,
+                file_name=file_name,
+                up_token_provider=up_token_provider
+            )
+            if resp and not resp.ok():
+                return ret, resp
+            return self.complete_parts(
+                up_token=up_token,
+                data_size=data_size,
+                context=context,
+
+                key=key,
+                up_token_provider=up_token_provider,
+                mime_type=mime_type,
+                file_name=file_name,
+                params=custom_vars,
+                metadata=metadata
+            )
+
         try:
             if file_path:
                 data_size = path.getsize(file_path)
@@ -620,7 +886,8 @@ class ResumeUploaderV2(ResumeUploaderBase):
                 context=context,
 
                 key=key,
-                file_name=file_name
+                file_name=file_name,
+                up_token_provider=up_token_provider
             )
         finally:
             if file_path:
@@ -636,6 +903,7 @@ class ResumeUploaderV2(ResumeUploaderBase):
             context=context,
 
             key=key,
+            up_token_provider=up_token_provider,
             mime_type=mime_type,
             file_name=file_name,
             params=custom_vars,
@@ -664,7 +932,9 @@ class ResumeUploaderV2(ResumeUploaderBase):
         ----------
         key: str
         file_path: str
-        data: IOBase
+        data: IOBase or Iterable[bytes]
+            uploaded by `upload_parts_streaming` if it's not seekable or without data_size,
+            such as a pipe or a generator
         data_size: int
         part_size: int
         modify_time: int
@@ -685,9 +955,18 @@ class ResumeUploaderV2(ResumeUploaderBase):
         resp: ResponseInfo
         """
         # up_token
+        up_token_opts = dict(
+            (k, kwargs.pop(k))
+            for k in ['bucket_name', 'expired', 'policy', 'strict_policy']
+            if k in kwargs
+        )
         up_token = kwargs.get('up_token', None)
+        up_token_provider = None
         if not up_token:
-            kwargs.setdefault('up_token', self.get_up_token(**kwargs))
+            # the up token generated by uploader will be renewed during uploading the parts
+            up_token_provider = functools.partial(self.get_up_token, **up_token_opts)
+            up_token = up_token_provider()
+            kwargs['up_token'] = up_token
             access_key = self.auth.get_access_key()
         else:
             access_key, _, _ = Auth.up_token_decode(up_token)
@@ -712,10 +991,11 @@ class ResumeUploaderV2(ResumeUploaderBase):
             mime_type=mime_type,
             custom_vars=custom_vars,
             metadata=metadata,
+            up_token_provider=up_token_provider,
             **kwargs
         )
 
-    def __get_url_for_upload(
+    def _get_url_for_upload(
         self,
         up_host,
         bucket_name,
@@ -767,7 +1047,107 @@ class ResumeUploaderV2(ResumeUploaderBase):
         up_token,
         upload_id,
         key,
-        lock
+        lock,
+        etag_calculator=None,
+        up_token_provider=None,
+        part_profile=None
+    ):
+        if part_profile is None:
+            return self.__do_upload_part(
+                data, chunk_info, up_hosts, up_token, upload_id, key, lock,
+                etag_calculator=etag_calculator,
+                up_token_provider=up_token_provider
+            )
+
+        part_profile.start()
+        part, resp = None, None
+        try:
+            part, resp = self.__do_upload_part(
+                data, chunk_info, up_hosts, up_token, upload_id, key, lock,
+                etag_calculator=etag_calculator,
+                up_token_provider=up_token_provider,
+                part_profile=part_profile
+            )
+        finally:
+            part_profile.finish(ok=part is not None)
+            if self.concurrency_controller and self.concurrent_executor:
+                self.concurrency_controller.on_part_done(
+                    size=part_profile.size,
+                    started_at=part_profile.started_at,
+                    ok=part_profile.ok,
+                    retries=part_profile.retries
+                )
+        return part, resp
+
+    def __new_part_profile(self, chunk_info):
+        """
+        Parameters
+        ----------
+        chunk_info: ChunkInfo
+
+        Returns
+        -------
+        PartProfile or None
+        """
+        if self.upload_profiler:
+            return self.upload_profiler.new_part(chunk_info.chunk_no, chunk_info.chunk_size)
+        if self.concurrency_controller and self.concurrent_executor:
+            return PartProfile(chunk_info.chunk_no, chunk_info.chunk_size, submitted_at=time())
+        return None
+
+    @staticmethod
+    def _is_streaming(data, data_size):
+        """
+        Parameters
+        ----------
+        data: IOBase or Iterable[bytes] or bytes or str
+        data_size: int
+
+        Returns
+        -------
+        bool
+        """
+        if data is None or isinstance(data, (bytes, str)):
+            return False
+        return not data_size or not is_seekable(data)
+
+    def _get_part_size(self, data_size):
+        """
+        Parameters
+        ----------
+        data_size: int
+
+        Returns
+        -------
+        int
+        """
+        if not self.adaptive_part_size:
+            return self.part_size
+        # the fewer parts, the fewer requests, but the more to upload again if a part failed
+        part_size = max(
+            self.part_size,
+            MIN_PART_SIZE,
+            int(math.ceil(data_size / float(ADAPTIVE_TARGET_PARTS))),
+            int(math.ceil(data_size / float(MAX_PARTS)))
+        )
+        # align to a power of 2 in MB
+        aligned_part_size = MIN_PART_SIZE
+        while aligned_part_size < part_size:
+            aligned_part_size *= 2
+        return min(aligned_part_size, MAX_PART_SIZE)
+
+    def __do_upload_part(
+        self,
+        data,
+        chunk_info,
+        up_hosts,
+        up_token,
+        upload_id,
+        key,
+        lock,
+        etag_calculator=None,
+        up_token_provider=None,
+        part_profile=None
     ):
         """
         Parameters
@@ -779,6 +1159,11 @@ class ResumeUploaderV2(ResumeUploaderBase):
         upload_id: str
         key: str
         lock: Lock
+        etag_calculator: EtagV2Calculator
+        up_token_provider: () -> str
+            get the renewed up token if provided
+        part_profile: PartProfile
+            record the time of stages if provided
 
         Returns
         -------
@@ -788,21 +1173,71 @@ class ResumeUploaderV2(ResumeUploaderBase):
         if not up_hosts:
             raise ValueError('Must provide on up host at least')
 
+        if up_token_provider:
+            up_token = up_token_provider()
+
         bucket_name = Auth.get_bucket_name(up_token)
         if not bucket_name:
             bucket_name = self.bucket_name
 
-        chunked_data = IOChunked(
-            base_io=data,
-            chunk_offset=chunk_info.chunk_offset,
-            chunk_size=chunk_info.chunk_size,
-            lock=lock
-        )
-        chunk_md5 = io_md5(chunked_data)
-        chunked_data.seek(0)
+        read_time, hash_time = 0.0, 0.0
+        if isinstance(data, BufferChunked):
+            # the part is read into the buffer by `upload_parts_streaming` already
+            started_at = time()
+            chunked_data = data
+            chunk_md5 = md5(data.view).hexdigest()
+            if etag_calculator:
+                etag_calculator.update_part(chunk_info.chunk_no, data.view)
+            hash_time = time() - started_at
+        elif chunk_info.chunk_size <= MAX_BUFFERED_CHUNK_SIZE:
+            # read once, then compute md5 and send with the same buffer
+            started_at = time()
+            chunked_data = read_chunk(
+                base_io=data,
+                chunk_offset=chunk_info.chunk_offset,
+                chunk_size=chunk_info.chunk_size,
+                lock=lock
+            )
+            read_at = time()
+            chunk_md5 = md5(chunked_data).hexdigest()
+            if etag_calculator:
+                etag_calculator.update_part(chunk_info.chunk_no, chunked_data)
+            read_time, hash_time = read_at - started_at, time() - read_at
+        else:
+            chunked_data = IOChunked(
+                base_io=data,
+                chunk_offset=chunk_info.chunk_offset,
+                chunk_size=chunk_info.chunk_size,
+                lock=lock
+            )
+            md5_hasher = md5()
+            part_hasher = etag_calculator.new_part_hasher() if etag_calculator else None
+            # reading and hashing are interleaved, so measure them by each buffer
+            while True:
+                started_at = time()
+                buf = chunked_data.read(chunked_data.buffer_size)
+                read_at = time()
+                read_time += read_at - started_at
+                if not buf:
+                    break
+                md5_hasher.update(buf)
+                if part_hasher:
+                    part_hasher.update(buf)
+                hash_time += time() - read_at
+            chunk_md5 = md5_hasher.hexdigest()
+            if part_hasher:
+                etag_calculator.set_part(chunk_info.chunk_no, part_hasher)
+            chunked_data.seek(0)
+        if part_profile:
+            part_profile.read_time += read_time
+            part_profile.hash_time = hash_time
+            part_profile.put_started_at = time()
         part, resp = None, None
-        for up_host in up_hosts:
-            url = self.__get_url_for_upload(
+        for tried_times, up_host in enumerate(up_hosts):
+            if part_profile:
+                part_profile.host = up_host
+                part_profile.retries = tried_times
+            url = self._get_url_for_upload(
                 up_host,
                 bucket_name,
                 key,
@@ -819,18 +1254,18 @@ class ResumeUploaderV2(ResumeUploaderBase):
                     'Authorization': 'UpToken {}'.format(up_token)
                 }
             )
+            if part_profile:
+                part_profile.put_time = time() - part_profile.put_started_at
             if resp.ok() and ret:
                 part = _ResumeUploadV2Part(
                     part_no=chunk_info.chunk_no,
                     etag=ret.get('etag', '')
                 )
                 return part, resp
-            if (
-                not is_seekable(chunked_data) or
-                not resp.need_retry()
-            ):
+            if not resp.need_retry():
                 return part, resp
-            chunked_data.seek(0)
+            if isinstance(chunked_data, (IOChunked, BufferChunked)):
+                chunked_data.seek(0)
         return part, resp
 
 
@@ -852,6 +1287,7 @@ _ResumeUploadV2Context = namedtuple(
         'part_size',
         'parts',
         'modify_time',
-        'resumed'
+        'resumed',
+        'etag_calculator'
     ]
 )
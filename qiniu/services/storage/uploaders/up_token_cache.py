@@ -0,0 +1,149 @@
+import functools
+import threading
+import time
+from collections import namedtuple, OrderedDict
+
+from qiniu.compat import json
+
+
+# use dataclass instead namedtuple if min version of python update to 3.7
+_UpTokenEntry = namedtuple(
+    '_UpTokenEntry',
+    [
+        'up_token',
+        'created_at',
+        'expires'
+    ]
+)
+
+
+class UpTokenCache(object):
+    """
+    Reuse the up tokens generated by `Auth.upload_token` with the same bucket, key and policy.
+
+    A token is reused until `refresh_ratio` of its lifetime elapsed.
+    After that and before the half of the rest lifetime elapsed,
+    the token is still returned if `refresh_in_background`, while a new one is generated in a background thread.
+    So the token returned always has `(1 - refresh_ratio) / 2` of its lifetime at least.
+    """
+
+    def __init__(
+        self,
+        refresh_ratio=0.5,
+        refresh_in_background=True,
+        max_size=1024
+    ):
+        """
+        Parameters
+        ----------
+        refresh_ratio: float
+            the ratio of the token lifetime, after which the token will be refreshed. in range (0, 1)
+        refresh_in_background: bool
+        max_size: int
+            the max count of cached tokens, the oldest will be evicted.
+        """
+        if not 0 < refresh_ratio < 1:
+            raise ValueError('refresh_ratio must be in range (0, 1)')
+        if max_size < 1:
+            raise ValueError('max_size must be greater than 0')
+        self.refresh_ratio = refresh_ratio
+        self.refresh_in_background = refresh_in_background
+        self.max_size = max_size
+
+        self.__entries = OrderedDict()
+        self.__refreshing = set()
+        self.__lock = threading.Lock()
+
+    def get(
+        self,
+        auth,
+        bucket,
+        key=None,
+        expires=3600,
+        policy=None,
+        strict_policy=True
+    ):
+        """
+        Parameters are the same as `Auth.upload_token`, and auth
+
+        Parameters
+        ----------
+        auth: qiniu.Auth
+        bucket: str
+        key: str
+        expires: int
+        policy: dict
+        strict_policy: bool
+
+        Returns
+        -------
+        str
+        """
+        cache_key = (
+            auth.get_access_key(),
+            bucket,
+            key,
+            expires,
+            json.dumps(policy, sort_keys=True) if policy else None,
+            strict_policy
+        )
+        generate = functools.partial(
+            auth.upload_token,
+            bucket,
+            key=key,
+            expires=expires,
+            policy=policy,
+            strict_policy=strict_policy
+        )
+
+        with self.__lock:
+            entry = self.__entries.get(cache_key)
+        if entry:
+            age = time.time() - entry.created_at
+            if age < entry.expires * self.refresh_ratio:
+                return entry.up_token
+            stale_limit = entry.expires * (1 + self.refresh_ratio) / 2
+            if self.refresh_in_background and age < stale_limit:
+                self.__refresh_in_background(cache_key, generate, expires)
+                return entry.up_token
+
+        return self.__refresh(cache_key, generate, expires).up_token
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+    def __refresh(self, cache_key, generate, expires):
+        # the deadline of token is computed after it
+        created_at = time.time()
+        entry = _UpTokenEntry(
+            up_token=generate(),
+            created_at=created_at,
+            expires=expires
+        )
+        with self.__lock:
+            self.__entries.pop(cache_key, None)
+            while len(self.__entries) >= self.max_size:
+                self.__entries.popitem(last=False)
+            self.__entries[cache_key] = entry
+        return entry
+
+    def __refresh_in_background(self, cache_key, generate, expires):
+        with self.__lock:
+            if cache_key in self.__refreshing:
+                return
+            self.__refreshing.add(cache_key)
+
+        def refresh():
+            try:
+                self.__refresh(cache_key, generate, expires)
+            finally:
+                with self.__lock:
+                    self.__refreshing.discard(cache_key)
+
+        thread = threading.Thread(target=refresh)
+        thread.daemon = True
+        thread.start()
+
+
+default_up_token_cache = UpTokenCache()
@@ -0,0 +1,252 @@
+import json
+import threading
+import time
+from collections import namedtuple
+
+
+# use dataclass instead namedtuple if min version of python update to 3.7
+UploadProfileSummary = namedtuple(
+    'UploadProfileSummary',
+    [
+        'parts',
+        'total_size',
+        'elapsed',
+        'throughput',
+        'workers',
+        'worker_utilization',
+        'read_time',
+        'hash_time',
+        'wait_time',
+        'put_time',
+        'retries',
+        'bottleneck',
+        'critical_path'
+    ]
+)
+"""
+parts: int
+total_size: int
+elapsed: float
+    seconds from the first part submitted to the last part finished
+throughput: float
+    MB/s
+workers: int
+    the count of threads uploaded parts
+worker_utilization: float
+    the busy time of workers divides `elapsed * workers`
+read_time, hash_time, wait_time, put_time: float
+    the sum of seconds of all parts
+retries: int
+bottleneck: str
+    the stage costs most, one of 'read', 'hash', 'wait' and 'put'
+critical_path: dict[str, float]
+    the seconds of each stage in the worker finished last, including 'idle',
+    which ends the uploading
+"""
+
+
+class PartProfile(object):
+    def __init__(self, part_no, size, submitted_at):
+        """
+        The timestamps and seconds of uploading a part, set by the uploader.
+
+        Parameters
+        ----------
+        part_no: int
+        size: int
+        submitted_at: float
+        """
+        self.part_no = part_no
+        self.size = size
+        self.submitted_at = submitted_at
+        self.started_at = None
+        self.finished_at = None
+        self.worker = None
+        self.read_time = 0.0
+        self.hash_time = 0.0
+        self.put_started_at = None
+        self.put_time = 0.0
+        self.retries = 0
+        self.host = None
+        self.ok = False
+
+    def start(self):
+        self.started_at = time.time()
+        self.worker = threading.current_thread().name
+
+    def finish(self, ok):
+        self.finished_at = time.time()
+        self.ok = ok
+
+    @property
+    def wait_time(self):
+        if self.started_at is None:
+            return 0.0
+        return self.started_at - self.submitted_at
+
+    def to_dict(self):
+        return {
+            'part_no': self.part_no,
+            'size': self.size,
+            'worker': self.worker,
+            'host': self.host,
+            'ok': self.ok,
+            'retries': self.retries,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'wait_time': self.wait_time,
+            'read_time': self.read_time,
+            'hash_time': self.hash_time,
+            'put_time': self.put_time
+        }
+
+
+class UploadProfiler(object):
+    """
+    Record the timeline of parts uploaded by `ResumeUploaderV2`,
+    to find out the time spent on reading, hashing, waiting for workers and putting.
+
+    Examples
+    --------
+    profiler = UploadProfiler()
+    uploader = ResumeUploaderV2(bucket_name, auth=auth, upload_profiler=profiler)
+    uploader.upload(key, file_path=file_path)
+    print(profiler.summary())
+    profiler.export_chrome_trace('upload.trace.json')
+    """
+
+    def __init__(self):
+        self.__parts = []
+        self.__lock = threading.Lock()
+
+    def new_part(self, part_no, size):
+        """
+        called by the uploader when the part is submitted to the workers
+
+        Parameters
+        ----------
+        part_no: int
+        size: int
+
+        Returns
+        -------
+        PartProfile
+        """
+        part = PartProfile(part_no, size, submitted_at=time.time())
+        with self.__lock:
+            self.__parts.append(part)
+        return part
+
+    def clear(self):
+        with self.__lock:
+            self.__parts = []
+
+    def timeline(self):
+        """
+        Returns
+        -------
+        list[dict]
+            the profiles of the parts started, ordered by the started time
+        """
+        return [p.to_dict() for p in self.__get_started_parts()]
+
+    def summary(self):
+        """
+        Returns
+        -------
+        UploadProfileSummary or None
+            None if no part started
+        """
+        parts = self.__get_started_parts()
+        finished_parts = [p for p in parts if p.finished_at is not None]
+        if not finished_parts:
+            return None
+
+        started_at = min(p.submitted_at for p in parts)
+        finished_at = max(p.finished_at for p in finished_parts)
+        elapsed = max(finished_at - started_at, 1e-9)
+        total_size = sum(p.size for p in finished_parts if p.ok)
+
+        busy_time_by_worker = {}
+        for p in finished_parts:
+            busy_time_by_worker[p.worker] = busy_time_by_worker.get(p.worker, 0) + p.finished_at - p.started_at
+        workers = len(busy_time_by_worker)
+
+        stage_times = {
+            'read': sum(p.read_time for p in parts),
+            'hash': sum(p.hash_time for p in parts),
+            'wait': sum(p.wait_time for p in parts),
+            'put': sum(p.put_time for p in parts)
+        }
+
+        last_worker = max(finished_parts, key=lambda p: p.finished_at).worker
+        last_worker_parts = [p for p in finished_parts if p.worker == last_worker]
+        critical_path = {
+            'read': sum(p.read_time for p in last_worker_parts),
+            'hash': sum(p.hash_time for p in last_worker_parts),
+            'put': sum(p.put_time for p in last_worker_parts),
+        }
+        critical_path['idle'] = max(0.0, elapsed - busy_time_by_worker[last_worker])
+
+        return UploadProfileSummary(
+            parts=len(finished_parts),
+            total_size=total_size,
+            elapsed=elapsed,
+            throughput=total_size / elapsed / (1024 ** 2),
+            workers=workers,
+            worker_utilization=sum(busy_time_by_worker.values()) / (elapsed * workers),
+            read_time=stage_times['read'],
+            hash_time=stage_times['hash'],
+            wait_time=stage_times['wait'],
+            put_time=stage_times['put'],
+            retries=sum(p.retries for p in parts),
+            bottleneck=max(stage_times, key=lambda k: stage_times[k]),
+            critical_path=critical_path
+        )
+
+    def export_chrome_trace(self, file_path):
+        """
+        Export the timeline in the Trace Event Format, which could be opened by chrome://tracing or Perfetto.
+        Each worker is a thread in the trace.
+
+        Parameters
+        ----------
+        file_path: str
+        """
+        events = []
+        for p in self.__get_started_parts():
+            args = {
+                'part_no': p.part_no,
+                'size': p.size,
+                'host': p.host,
+                'retries': p.retries,
+                'ok': p.ok
+            }
+            stages = [
+                ('wait', p.submitted_at, p.wait_time),
+                ('read', p.started_at, p.read_time),
+                ('hash', p.started_at + p.read_time, p.hash_time),
+            ]
+            if p.put_started_at is not None:
+                stages.append(('put', p.put_started_at, p.put_time))
+            for name, ts, duration in stages:
+                if duration <= 0:
+                    continue
+                events.append({
+                    'name': '{0} part {1}'.format(name, p.part_no),
+                    'cat': name,
+                    'ph': 'X',
+                    'ts': ts * 1e6,
+                    'dur': duration * 1e6,
+                    'pid': 1,
+                    'tid': p.worker if name != 'wait' else 'queue',
+                    'args': args
+                })
+        with open(file_path, 'w') as f:
+            json.dump({'traceEvents': events}, f)
+
+    def __get_started_parts(self):
+        with self.__lock:
+            parts = [p for p in self.__parts if p.started_at is not None]
+        return sorted(parts, key=lambda p: p.started_at)
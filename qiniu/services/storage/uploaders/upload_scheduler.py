@@ -0,0 +1,190 @@
+import threading
+from collections import deque
+from concurrent import futures
+
+
+class UploadScheduler(futures.Executor):
+    """
+    A bounded executor shared by uploaders, which schedules the parts of files fairly.
+
+    Each upload submits its parts to its own flow created by `new_flow`.
+    The flows with the larger priority are scheduled first,
+    and the flows with the same priority take turns, so a small file isn't queued behind all parts of a huge one.
+    The worker threads are started on demand, and are daemon threads,
+    so they don't block the interpreter from exiting.
+
+    Examples
+    --------
+    scheduler = UploadScheduler(max_workers=32)
+    uploader = ResumeUploaderV2(bucket_name, auth=auth, concurrent_executor=scheduler)
+    """
+
+    def __init__(self, max_workers=16, thread_name_prefix='qiniu-upload'):
+        """
+        Parameters
+        ----------
+        max_workers: int
+            the max count of parts uploading at the same time in total. It could be increased at runtime.
+        thread_name_prefix: str
+        """
+        if max_workers <= 0:
+            raise ValueError('max_workers must be greater than 0')
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+
+        # priority -> deque[UploadFlow], the flows with pending work items
+        self.__ready_flows = {}
+        self.__threads = []
+        self.__idle_workers = 0
+        self.__shutdown = False
+        self.__cond = threading.Condition()
+        self.__default_flow = UploadFlow(self)
+
+    def new_flow(self, priority=0, max_in_flight=None):
+        """
+        Parameters
+        ----------
+        priority: int
+        max_in_flight: int, optional
+            the max count of work items of the flow running at the same time
+
+        Returns
+        -------
+        UploadFlow
+        """
+        return UploadFlow(self, priority=priority, max_in_flight=max_in_flight)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        submit to the default flow with priority 0 and without in-flight limit
+
+        Returns
+        -------
+        futures.Future
+        """
+        return self.__default_flow.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait=True, **kwargs):
+        with self.__cond:
+            self.__shutdown = True
+            self.__cond.notify_all()
+            threads = list(self.__threads)
+        if wait:
+            for t in threads:
+                t.join()
+
+    def _enqueue(self, flow, work_item):
+        with self.__cond:
+            if self.__shutdown:
+                raise RuntimeError('cannot schedule new futures after shutdown')
+            flow._pending.append(work_item)
+            if len(flow._pending) == 1:
+                self.__ready_flows.setdefault(flow.priority, deque()).append(flow)
+            if self.__idle_workers > 0:
+                self.__cond.notify()
+            elif len(self.__threads) < self.max_workers:
+                t = threading.Thread(
+                    target=self.__work,
+                    name='{0}-{1}'.format(self.thread_name_prefix, len(self.__threads))
+                )
+                t.daemon = True
+                t.start()
+                self.__threads.append(t)
+
+    def __pop_work_item(self):
+        """
+        must be called with the lock held
+
+        Returns
+        -------
+        (UploadFlow, _WorkItem) or (None, None)
+        """
+        for priority in sorted(self.__ready_flows, reverse=True):
+            flows = self.__ready_flows[priority]
+            for _ in range(len(flows)):
+                flow = flows[0]
+                flows.rotate(-1)
+                if flow.max_in_flight is not None and flow._in_flight >= flow.max_in_flight:
+                    continue
+                work_item = flow._pending.popleft()
+                flow._in_flight += 1
+                if not flow._pending:
+                    flows.remove(flow)
+                    if not flows:
+                        del self.__ready_flows[priority]
+                return flow, work_item
+        return None, None
+
+    def __work(self):
+        while True:
+            with self.__cond:
+                flow, work_item = self.__pop_work_item()
+                while work_item is None:
+                    if self.__shutdown:
+                        return
+                    self.__idle_workers += 1
+                    self.__cond.wait()
+                    self.__idle_workers -= 1
+                    flow, work_item = self.__pop_work_item()
+
+            work_item.run()
+
+            with self.__cond:
+                flow._in_flight -= 1
+                if flow._pending and self.__idle_workers > 0:
+                    # the flow limited by max_in_flight could be scheduled again
+                    self.__cond.notify()
+
+
+class UploadFlow(futures.Executor):
+    def __init__(self, scheduler, priority=0, max_in_flight=None):
+        """
+        The work items of a flow are run in the submitted order.
+        It's created by `UploadScheduler.new_flow` usually.
+
+        Parameters
+        ----------
+        scheduler: UploadScheduler
+        priority: int
+        max_in_flight: int, optional
+        """
+        self.scheduler = scheduler
+        self.priority = priority
+        self.max_in_flight = max_in_flight
+        self._pending = deque()
+        self._in_flight = 0
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Returns
+        -------
+        futures.Future
+        """
+        ftr = futures.Future()
+        self.scheduler._enqueue(self, _WorkItem(ftr, fn, args, kwargs))
+        return ftr
+
+    def shutdown(self, wait=True, **kwargs):
+        # the threads are owned by the scheduler
+        pass
+
+
+class _WorkItem(object):
+    def __init__(self, ftr, fn, args, kwargs):
+        self.future = ftr
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        if not self.future.set_running_or_notify_cancel():
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except BaseException as err:
+            self.future.set_exception(err)
+        else:
+            self.future.set_result(result)
+
+
+default_upload_scheduler = UploadScheduler()
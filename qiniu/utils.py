@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
+import os
+import stat
+import threading
 import warnings
+from collections import deque
 from functools import wraps
 from hashlib import sha1, new as hashlib_new
 from base64 import urlsafe_b64encode, urlsafe_b64decode
 from datetime import datetime, tzinfo, timedelta
 
+from concurrent import futures
+
 from .compat import b, s
 
 try:
@@ -109,6 +115,57 @@ def _file_iter(input_stream, size, offset=0):
     input_stream.seek(0)
 
 
+def _get_pread_fd(base_io):
+    """
+    Get the file descriptor which could be read by `os.pread`.
+
+    Parameters
+    ----------
+    base_io: IOBase
+
+    Returns
+    -------
+    int or None
+        None if `os.pread` is unavailable or base_io is not a regular file.
+    """
+    if not hasattr(os, 'pread'):
+        return None
+    try:
+        fd = base_io.fileno()
+        if not stat.S_ISREG(os.fstat(fd).st_mode):
+            return None
+    except (AttributeError, ValueError, OSError, IOError):
+        return None
+    return fd
+
+
+def _pread_fully(fd, size, offset):
+    """
+    Parameters
+    ----------
+    fd: int
+    size: int
+    offset: int
+
+    Returns
+    -------
+    bytes
+    """
+    data = os.pread(fd, size, offset)
+    if len(data) == size or not data:
+        return data
+    # a short read is possible, e.g. interrupted by signal
+    buf = [data]
+    read_size = len(data)
+    while read_size < size:
+        data = os.pread(fd, size - read_size, offset + read_size)
+        if not data:
+            break
+        buf.append(data)
+        read_size += len(data)
+    return b''.join(buf)
+
+
 def _sha1(data):
     """单块计算hash:
 
@@ -141,6 +198,21 @@ def etag_stream(input_stream):
 
     """
     array = [_sha1(block) for block in _file_iter(input_stream, _BLOCK_SIZE)]
+    return urlsafe_base64_encode(_etag_of_block_sha1s(array))
+
+
+def _etag_of_block_sha1s(array):
+    """
+    由各个 4MB 块的 sha1 计算未编码的 etag
+
+    Parameters
+    ----------
+    array: list[bytes]
+
+    Returns
+    -------
+    bytes
+    """
     if len(array) == 0:
         array = [_sha1(b'')]
     if len(array) == 1:
@@ -150,7 +222,7 @@ def etag_stream(input_stream):
         sha1_str = b('').join(array)
         data = _sha1(sha1_str)
         prefix = b'\x96'
-    return urlsafe_base64_encode(prefix + data)
+    return prefix + data
 
 
 def etag(filePath):
@@ -175,6 +247,223 @@ def etag(filePath):
         return etag_stream(f)
 
 
+def _default_etag_workers():
+    # change to os.cpu_count when min version of python update to >= 3.4
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):
+        return 1
+
+
+def _sha1_of_block(f, fd, lock, offset):
+    if fd is not None:
+        data = _pread_fully(fd, _BLOCK_SIZE, offset)
+    else:
+        with lock:
+            f.seek(offset)
+            data = f.read(_BLOCK_SIZE)
+    return _sha1(data), len(data)
+
+
+def etag_files(file_paths, max_workers=None, progress_handler=None):
+    """
+    并发计算多个文件的 etag
+
+    所有文件的 4MB 块共用一个线程池计算 sha1，hashlib 在计算较大的数据时会释放 GIL，
+    因此单个大文件的多个块与多个文件之间都可以并行计算。
+    普通文件使用 `os.pread` 读取，无需加锁；
+    同时在计算中的块最多为 max_workers 的 2 倍，以此限制内存占用。
+
+    结果与 `etag` 相同，同样不适用于 v2 分片上传使用 4MB 以外分片大小的情况。
+
+    Parameters
+    ----------
+    file_paths: list[str]
+        待计算 etag 的文件路径
+    max_workers: int, optional
+        计算线程数，默认为 CPU 核数
+    progress_handler: (int, int) -> None, optional
+        进度回调，参数为已计算的字节数与总字节数，在调用线程中执行
+
+    Returns
+    -------
+    list[str]
+        与 file_paths 顺序一致的 etag 列表
+    """
+    file_paths = list(file_paths)
+    if max_workers is None:
+        max_workers = _default_etag_workers()
+    max_workers = max(1, max_workers)
+
+    file_sizes = [os.path.getsize(file_path) for file_path in file_paths]
+    total_size = sum(file_sizes)
+    results = [None] * len(file_paths)
+
+    # file index -> opened file, block count, sha1 of finished blocks
+    opened_files = {}
+    in_flight = deque()
+    hashed_size = 0
+
+    def _collect_oldest():
+        file_index, ftr = in_flight.popleft()
+        block_sha1, block_size = ftr.result()
+        f, block_count, block_sha1s = opened_files[file_index]
+        block_sha1s.append(block_sha1)
+        if len(block_sha1s) == block_count:
+            results[file_index] = urlsafe_base64_encode(_etag_of_block_sha1s(block_sha1s))
+            del opened_files[file_index]
+            f.close()
+        return block_size
+
+    executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for file_index, file_path in enumerate(file_paths):
+            f = open(file_path, 'rb')
+            fd = _get_pread_fd(f)
+            lock = threading.Lock()
+            # an empty file is also a block
+            block_count = max(1, (file_sizes[file_index] + _BLOCK_SIZE - 1) // _BLOCK_SIZE)
+            opened_files[file_index] = (f, block_count, [])
+            for block_index in range(block_count):
+                if len(in_flight) >= max_workers * 2:
+                    hashed_size += _collect_oldest()
+                    if progress_handler:
+                        progress_handler(hashed_size, total_size)
+                in_flight.append((
+                    file_index,
+                    executor.submit(_sha1_of_block, f, fd, lock, block_index * _BLOCK_SIZE)
+                ))
+        while in_flight:
+            hashed_size += _collect_oldest()
+            if progress_handler:
+                progress_handler(hashed_size, total_size)
+    finally:
+        for _, ftr in in_flight:
+            ftr.cancel()
+        executor.shutdown(wait=True)
+        for f, _, _ in opened_files.values():
+            f.close()
+    return results
+
+
+class _PartEtagHasher(object):
+    """
+    增量计算单个分片的 v1 etag，数据可以按任意大小分多次传入
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.__block_sha1s = []
+        self.__block = sha1()
+        self.__block_size = 0
+
+    def update(self, data):
+        view = memoryview(data)
+        offset = 0
+        while offset < len(view):
+            size = min(_BLOCK_SIZE - self.__block_size, len(view) - offset)
+            self.__block.update(view[offset:offset + size])
+            self.__block_size += size
+            offset += size
+            if self.__block_size == _BLOCK_SIZE:
+                self.__block_sha1s.append(self.__block.digest())
+                self.__block = sha1()
+                self.__block_size = 0
+        self.size += len(view)
+
+    def digest(self):
+        """
+        Returns
+        -------
+        bytes
+            未编码的 v1 etag，包含前缀字节
+        """
+        block_sha1s = list(self.__block_sha1s)
+        if self.__block_size or not block_sha1s:
+            block_sha1s.append(self.__block.digest())
+        return _etag_of_block_sha1s(block_sha1s)
+
+
+class EtagV2Calculator(object):
+    """
+    计算 v2 分片上传的文件 etag，支持 4MB 以外的分片大小
+
+    各个分片可以乱序、并发地传入。
+    若除最后一个分片外均为 4MB 且最后一个分片不超过 4MB，结果与 `etag` 相同；
+    否则为 0x9e 前缀加上各分片 v1 etag（去掉前缀字节）拼接后的 sha1。
+    """
+
+    def __init__(self):
+        # part_no -> (part_size, part_etag)
+        self.__parts = {}
+        self.__lock = threading.Lock()
+
+    def new_part_hasher(self):
+        """
+        用于分片数据无法一次读入内存的情况，写完后通过 `set_part` 记录
+
+        Returns
+        -------
+        _PartEtagHasher
+        """
+        return _PartEtagHasher()
+
+    def set_part(self, part_no, part_hasher):
+        """
+        Parameters
+        ----------
+        part_no: int
+            从 1 开始的分片号
+        part_hasher: _PartEtagHasher
+        """
+        part = (part_hasher.size, part_hasher.digest())
+        with self.__lock:
+            self.__parts[part_no] = part
+
+    def update_part(self, part_no, data):
+        """
+        Parameters
+        ----------
+        part_no: int
+            从 1 开始的分片号
+        data: bytes
+            分片的全部数据
+        """
+        part_hasher = self.new_part_hasher()
+        part_hasher.update(data)
+        self.set_part(part_no, part_hasher)
+
+    def etag(self, parts_count=None):
+        """
+        Parameters
+        ----------
+        parts_count: int, optional
+            分片总数，默认为已传入的最大分片号
+
+        Returns
+        -------
+        str or None
+            若有分片未传入则为 None
+        """
+        with self.__lock:
+            parts = sorted(self.__parts.items())
+        if parts_count is None:
+            parts_count = len(parts)
+        if [part_no for part_no, _ in parts] != list(range(1, parts_count + 1)):
+            return None
+
+        part_sizes = [part_size for _, (part_size, _) in parts]
+        part_sha1s = [part_etag[1:] for _, (_, part_etag) in parts]
+        if (
+            all(part_size == _BLOCK_SIZE for part_size in part_sizes[:-1]) and
+            (not part_sizes or part_sizes[-1] <= _BLOCK_SIZE)
+        ):
+            # each part is a single block, same as v1
+            return urlsafe_base64_encode(_etag_of_block_sha1s(part_sha1s))
+        return urlsafe_base64_encode(b'\x9e' + _sha1(b('').join(part_sha1s)))
+
+
 def entry(bucket, key):
     """计算七牛API中的数据格式:
 
@@ -58,12 +58,16 @@ setup(
         'enum34; python_version == "2.7"'
     ],
     extras_require={
+        'aio': [
+            'aiohttp; python_version >= "3.6"',
+        ],
         'dev': [
             'coverage<7.2',
             'flake8',
             'pytest',
             'pytest-cov',
             'freezegun',
+            'aiohttp; python_version >= "3.6"',
         ]
     },
 
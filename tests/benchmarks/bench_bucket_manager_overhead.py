@@ -0,0 +1,81 @@
+"""
+Benchmark the client-side overhead of a `BucketManager` operation before the request is sent.
+
+It compares the legacy way, which builds the regions provider and the retrier for each operation,
+with the memoized ones of `BucketManager`.
+The regions are set into the cache in advance, so no request is sent.
+
+Usage (with the sdk installed, e.g. `pip install -e .`):
+    python tests/benchmarks/bench_bucket_manager_overhead.py [--count N]
+"""
+import argparse
+import time
+
+from qiniu import Auth
+from qiniu.config import QUERY_REGION_HOST, QUERY_REGION_BACKUP_HOSTS
+from qiniu.compat import urlparse
+from qiniu.http.endpoint import Endpoint
+from qiniu.http.region import Region, ServiceName
+from qiniu.http.regions_provider import get_default_regions_provider
+from qiniu.services.storage.bucket import BucketManager
+from qiniu.services.storage._bucket_default_retrier import get_default_retrier
+
+BUCKET_NAME = 'bench-bucket'
+
+
+def _query_regions_endpoints():
+    return [
+        Endpoint(h)
+        for h in [urlparse(QUERY_REGION_HOST).hostname] + QUERY_REGION_BACKUP_HOSTS
+    ]
+
+
+def _legacy_first_attempt(auth):
+    retrier = get_default_retrier(
+        regions_provider=get_default_regions_provider(
+            query_endpoints_provider=_query_regions_endpoints(),
+            access_key=auth.get_access_key(),
+            bucket_name=BUCKET_NAME
+        ),
+        service_names=[ServiceName.RS]
+    )
+    for attempt in retrier:
+        return attempt.context.get('endpoint')
+
+
+def _memoized_first_attempt(bucket_manager):
+    retrier = bucket_manager._get_retrier(BUCKET_NAME, [ServiceName.RS])
+    for attempt in retrier:
+        return attempt.context.get('endpoint')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=2000)
+    args = parser.parse_args()
+
+    auth = Auth('bench-ak', 'bench-sk')
+    cached_regions_provider = get_default_regions_provider(
+        query_endpoints_provider=_query_regions_endpoints(),
+        access_key=auth.get_access_key(),
+        bucket_name=BUCKET_NAME
+    )
+    # keep the cache in memory only, and avoid querying the regions
+    cached_regions_provider.persist_path = ''
+    cached_regions_provider.set_regions([Region.from_region_id('z0')])
+
+    bucket_manager = BucketManager(auth)
+    for name, first_attempt in [
+        ('per operation', lambda: _legacy_first_attempt(auth)),
+        ('memoized', lambda: _memoized_first_attempt(bucket_manager)),
+    ]:
+        first_attempt()
+        started_at = time.time()
+        for _ in range(args.count):
+            first_attempt()
+        elapsed = time.time() - started_at
+        print('{0:<15} {1:>10.1f} us/op'.format(name, elapsed * 1e6 / args.count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark the retrier with a flapping primary host, which times out at the given rate.
+
+It compares trying the endpoints in the static order
+with ordering them by `EndpointHealthTracker`. No request is sent, the latencies are simulated by sleeping.
+
+Usage (with the sdk installed, e.g. `pip install -e .`):
+    python tests/benchmarks/bench_endpoint_health.py [--count N] [--failure-rate R] [--timeout-ms N]
+"""
+import argparse
+import random
+import time
+
+from qiniu.http.endpoint import Endpoint
+from qiniu.http.endpoint_health import EndpointHealthTracker
+from qiniu.http.region import Region, ServiceName
+from qiniu.services.storage._bucket_default_retrier import get_default_retrier
+
+
+def _run(retrier, count, failure_rate, timeout):
+    started_at = time.time()
+    for _ in range(count):
+        for attempt in retrier:
+            with attempt:
+                host = attempt.context['endpoint'].host
+                if host == 'primary' and random.random() < failure_rate:
+                    time.sleep(timeout)
+                    raise IOError('mocked timeout')
+                time.sleep(0.001)
+                break
+    return time.time() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--failure-rate', type=float, default=0.5)
+    parser.add_argument('--timeout-ms', type=int, default=50)
+    args = parser.parse_args()
+
+    regions = [Region(services={
+        ServiceName.UP: [Endpoint('primary'), Endpoint('backup')]
+    })]
+    for name, tracker in [
+        ('static order', None),
+        ('health ordered', EndpointHealthTracker()),
+    ]:
+        retrier = get_default_retrier(
+            regions_provider=regions,
+            service_names=[ServiceName.UP],
+            endpoint_health_tracker=tracker
+        )
+        random.seed(0)
+        elapsed = _run(retrier, args.count, args.failure_rate, args.timeout_ms / 1000.0)
+        print('{0:<15} {1:>8.2f} ms/op'.format(name, elapsed * 1000 / args.count))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark calculating the etag of large local files.
+
+It compares `etag`, which hashes the 4MB blocks of the files one after another in a single thread,
+with `etag_files`, which hashes the blocks of all the files by a thread pool.
+
+Usage (with the sdk installed, e.g. `pip install -e .`):
+    python tests/benchmarks/bench_etag.py [--file PATH ...] [--files N] [--size-mb N] [--workers N]
+
+`--files` temporary files of `--size-mb` will be created if `--file` not provided.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from qiniu.utils import etag, etag_files
+
+
+def _run_sequential(file_paths, workers):
+    return [etag(file_path) for file_path in file_paths]
+
+
+def _run_parallel(file_paths, workers):
+    return etag_files(file_paths, max_workers=workers)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--file', action='append', default=[])
+    parser.add_argument('--files', type=int, default=4)
+    parser.add_argument('--size-mb', type=int, default=256)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    file_paths = args.file
+    tmp_dir = None
+    if not file_paths:
+        tmp_dir = tempfile.mkdtemp()
+        for i in range(args.files):
+            file_path = os.path.join(tmp_dir, 'bench-etag-{0}'.format(i))
+            with open(file_path, 'wb') as f:
+                for _ in range(args.size_mb):
+                    f.write(os.urandom(1024 * 1024))
+            file_paths.append(file_path)
+
+    try:
+        total_size_mb = sum(os.path.getsize(file_path) for file_path in file_paths) / (1024 ** 2)
+        # warm up the page cache, so both are measured without disk I/O
+        expected = _run_sequential(file_paths, args.workers)
+        for name, run in [
+            ('etag', _run_sequential),
+            ('etag_files -j {0}'.format(args.workers), _run_parallel),
+        ]:
+            started_at = time.time()
+            results = run(file_paths, args.workers)
+            elapsed = time.time() - started_at
+            if results != expected:
+                raise RuntimeError('etag mismatch {0} != {1}'.format(results, expected))
+            print('{0:<20} {1:>8.1f} MB/s'.format(name, total_size_mb / elapsed))
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark the peak memory of encoding a form upload body, without sending any request.
+
+It compares the body built by `requests` with `files=`, which is the way `FormUploader` used to send,
+and `MultipartEncoder` read in blocks like `http.client` sends a file-like body.
+
+Usage (with the sdk installed, e.g. `pip install -e .`):
+    python tests/benchmarks/bench_form_upload_memory.py [--size-mb N]
+"""
+import argparse
+import os
+import tempfile
+import tracemalloc
+
+import requests
+
+from qiniu.services.storage.uploaders.multipart_encoder import MultipartEncoder
+
+FIELDS = {'token': 'bench-up-token', 'key': 'bench-key', 'crc32': 123456}
+
+
+def _measure(encode):
+    tracemalloc.start()
+    try:
+        encode()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1024.0 ** 2)
+
+
+def _encode_by_requests(file_path):
+    with open(file_path, 'rb') as f:
+        requests.Request(
+            'POST',
+            'https://upload.qiniup.com',
+            data=FIELDS,
+            files={'file': ('bench', f, 'application/octet-stream')}
+        ).prepare()
+
+
+def _encode_by_encoder(file_path):
+    with open(file_path, 'rb') as f:
+        body = MultipartEncoder(FIELDS, 'bench', f, os.path.getsize(file_path))
+        for _ in iter(lambda: body.read(8192), b''):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=8)
+    args = parser.parse_args()
+
+    fd, file_path = tempfile.mkstemp()
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(os.urandom(args.size_mb * 1024 * 1024))
+        print('{0:<20} {1:>8.2f} MB peak'.format('requests files', _measure(lambda: _encode_by_requests(file_path))))
+        print('{0:<20} {1:>8.2f} MB peak'.format('MultipartEncoder', _measure(lambda: _encode_by_encoder(file_path))))
+    finally:
+        os.remove(file_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark the tail latency of idempotent requests with occasional slow responses.
+
+It compares sending each request once with hedging the slow ones by `Hedging`.
+No request is sent, the latencies are simulated by sleeping.
+
+Usage (with the sdk installed, e.g. `pip install -e .`):
+    python tests/benchmarks/bench_hedging.py [--count N] [--slow-rate R] [--slow-ms N] [--hedge-ratio R]
+"""
+import argparse
+import random
+import time
+
+from qiniu.http.endpoint import Endpoint
+from qiniu.retry import Hedging
+
+
+def _new_context():
+    return {
+        'endpoint': Endpoint('a.example.com'),
+        'alternative_endpoints': [Endpoint('b.example.com')]
+    }
+
+
+def _percentile(latencies, p):
+    latencies = sorted(latencies)
+    return latencies[min(int(len(latencies) * p / 100.0), len(latencies) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=500)
+    parser.add_argument('--slow-rate', type=float, default=0.03)
+    parser.add_argument('--slow-ms', type=int, default=200)
+    parser.add_argument('--hedge-ratio', type=float, default=0.05)
+    args = parser.parse_args()
+
+    def request(_context):
+        if random.random() < args.slow_rate:
+            time.sleep(args.slow_ms / 1000.0)
+        else:
+            time.sleep(0.005)
+
+    hedging = Hedging(delay_percentile=95, initial_delay=0.05, max_hedge_ratio=args.hedge_ratio)
+    for name, do in [
+        ('no hedging', lambda: request(_new_context())),
+        ('hedging', lambda: hedging.do(_new_context(), request)),
+    ]:
+        random.seed(0)
+        latencies = []
+        for _ in range(args.count):
+            started_at = time.time()
+            do()
+            latencies.append(time.time() - started_at)
+        print('{0:<12} p50 {1:>7.1f} ms  p99 {2:>7.1f} ms'.format(
+            name,
+            _percentile(latencies, 50) * 1000,
+            _percentile(latencies, 99) * 1000
+        ))
+    print(hedging.stats())
+
+
+if __name__ == '__main__':
+    main()
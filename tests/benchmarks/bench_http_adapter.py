@@ -0,0 +1,119 @@
+"""
+Benchmark the connection reuse of the default HTTP client.
+
+It compares the current adapter mounting with the old behavior,
+which rebuilt and remounted the adapter before every request.
+
+Usage (with the sdk installed, e.g. `pip install -e .`):
+    python tests/benchmarks/bench_http_adapter.py [--url URL] [--requests N] [--threads N]
+
+The URL must be served with HTTP/1.1 keep-alive to show the connection reuse.
+If not provided, a local keep-alive server with the same responses
+as the `/echo` route of `tests/mock_server` will be started.
+"""
+import argparse
+import threading
+import time
+from concurrent import futures
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+from requests.adapters import HTTPAdapter
+
+from qiniu import config
+import qiniu.http.default_client as default_client
+from qiniu.http import qn_http_client
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.connections.add(self.client_address)
+        body = b'Response echo status is 200'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Reqid', 'mocked-req-id')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _EchoServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def _legacy_init_http_adapter():
+    adapter = HTTPAdapter(
+        pool_connections=config.get_default('connection_pool'),
+        pool_maxsize=config.get_default('connection_pool'),
+        max_retries=config.get_default('connection_retries'))
+    qn_http_client.session.mount('http://', adapter)
+
+
+def _run(url, total, threads):
+    def send():
+        _ret, resp = qn_http_client.get(url)
+        if not resp.ok():
+            raise RuntimeError(str(resp))
+
+    started_at = time.time()
+    with futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        for ftr in [executor.submit(send) for _ in range(total)]:
+            ftr.result()
+    return time.time() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default=None)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server = _EchoServer(('127.0.0.1', 0), _EchoHandler)
+        server.connections = set()
+        server.lock = threading.Lock()
+        t = threading.Thread(target=server.serve_forever)
+        t.daemon = True
+        t.start()
+        url = 'http://127.0.0.1:{0}/echo?status=200'.format(server.server_address[1])
+
+    init_http_adapter = default_client._init_http_adapter
+    try:
+        for name, init in [
+            ('remount per request', _legacy_init_http_adapter),
+            ('change-driven', init_http_adapter),
+        ]:
+            default_client._init_http_adapter = init
+            default_client._http_adapter_opts = None
+            if server:
+                server.connections.clear()
+            elapsed = _run(url, args.requests, args.threads)
+            print('{0:<20} {1:>8.1f} req/s  {2} connections'.format(
+                name,
+                args.requests / elapsed,
+                len(server.connections) if server else 'n/a'
+            ))
+    finally:
+        default_client._init_http_adapter = init_http_adapter
+        if server:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark the overhead of request instrumentation, without sending any request.
+
+It compares calling the send function directly, with `instrument` but no hook,
+and with `instrument` and a hook appending the metrics to a list.
+
+Usage (with the sdk installed, e.g. `pip install -e .`):
+    python tests/benchmarks/bench_instrumentation.py [--count N]
+"""
+import argparse
+import datetime
+import time
+
+import requests
+
+from qiniu.http.instrumentation import add_request_hook, remove_request_hook, instrument
+
+URL = 'https://rs.qiniuapi.com/stat/bench'
+
+
+def _new_response():
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.headers['X-Reqid'] = 'bench-req-id'
+    resp.headers['Content-Length'] = '64'
+    resp.elapsed = datetime.timedelta(milliseconds=1)
+    resp.request = requests.Request('POST', URL, data=b'bench').prepare()
+    return resp
+
+
+def _measure(count, send):
+    started_at = time.time()
+    for _ in range(count):
+        send()
+    return (time.time() - started_at) * 1e6 / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=200000)
+    args = parser.parse_args()
+
+    resp = _new_response()
+
+    def send():
+        return resp
+
+    print('{0:<20} {1:>8.2f} us/op'.format('direct', _measure(args.count, send)))
+    print('{0:<20} {1:>8.2f} us/op'.format('no hook', _measure(args.count, lambda: instrument('POST', URL, send))))
+
+    metrics_list = []
+    add_request_hook(metrics_list.append)
+    try:
+        print('{0:<20} {1:>8.2f} us/op'.format(
+            'list hook',
+            _measure(args.count, lambda: instrument('POST', URL, send))
+        ))
+    finally:
+        remove_request_hook(metrics_list.append)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark reading the parts of resumable uploads concurrently.
+
+It compares the legacy way, which reads each part twice (once for md5, once for the body)
+through the seek-and-read under a shared lock,
+with `read_chunk`, which reads each part once by `os.pread` without the lock.
+
+Usage (with the sdk installed, e.g. `pip install -e .`):
+    python tests/benchmarks/bench_part_reads.py [--file PATH] [--size-mb N] [--part-size-mb N] [--workers N]
+
+A temporary file of `--size-mb` will be created if `--file` not provided.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent import futures
+from hashlib import md5
+
+from qiniu.utils import io_md5
+from qiniu.services.storage.uploaders.io_chunked import IOChunked, read_chunk
+
+
+def _legacy_read_part(f, offset, size, lock):
+    chunked_data = IOChunked(
+        base_io=f,
+        chunk_offset=offset,
+        chunk_size=size,
+        lock=lock
+    )
+    # disable the pread of IOChunked to measure the legacy behavior
+    chunked_data._IOChunked__pread_fd = None
+    chunk_md5 = io_md5(chunked_data)
+    chunked_data.seek(0)
+    body = b''.join(iter(lambda: chunked_data.read(size), b''))
+    return chunk_md5, len(body)
+
+
+def _read_part(f, offset, size, lock):
+    data = read_chunk(f, chunk_offset=offset, chunk_size=size, lock=lock)
+    return md5(data).hexdigest(), len(data)
+
+
+def _run(file_path, part_size, workers, read_part):
+    file_size = os.path.getsize(file_path)
+    lock = threading.Lock()
+    started_at = time.time()
+    with open(file_path, 'rb') as f, futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        ftrs = [
+            executor.submit(read_part, f, offset, min(part_size, file_size - offset), lock)
+            for offset in range(0, file_size, part_size)
+        ]
+        total = sum(ftr.result()[1] for ftr in ftrs)
+    if total != file_size:
+        raise RuntimeError('read size mismatch {0} != {1}'.format(total, file_size))
+    return time.time() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--file', default=None)
+    parser.add_argument('--size-mb', type=int, default=512)
+    parser.add_argument('--part-size-mb', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    file_path = args.file
+    tmp_dir = None
+    if not file_path:
+        tmp_dir = tempfile.mkdtemp()
+        file_path = os.path.join(tmp_dir, 'bench-part-reads')
+        with open(file_path, 'wb') as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+
+    try:
+        file_size_mb = os.path.getsize(file_path) / (1024 ** 2)
+        # warm up the page cache, so both are measured without disk I/O
+        _run(file_path, args.part_size_mb * (1024 ** 2), args.workers, _read_part)
+        for name, read_part in [
+            ('locked, read twice', _legacy_read_part),
+            ('pread, read once', _read_part),
+        ]:
+            elapsed = _run(file_path, args.part_size_mb * (1024 ** 2), args.workers, read_part)
+            print('{0:<20} {1:>8.1f} MB/s'.format(name, file_size_mb / elapsed))
+    finally:
+        if tmp_dir:
+            os.remove(file_path)
+            os.rmdir(tmp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark the latency of a cold lookup in the persistent regions cache by the count of cached buckets.
+
+A cold lookup is the first lookup of a bucket in a new process, which misses the memory cache
+and reads the regions from the persist file. The JSON lines file is scanned wholly,
+while the SQLite database only reads the row of the bucket.
+The SQLite connection is reused among lookups, as it is in a process.
+
+Usage (with the sdk installed, e.g. `pip install -e .`):
+    python tests/benchmarks/bench_regions_cache.py [--buckets 100 1000 10000] [--lookups N]
+"""
+import argparse
+import datetime
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from qiniu.http.endpoint import Endpoint
+from qiniu.http.region import Region, ServiceName
+from qiniu.http.regions_provider import CachedRegionsProvider, _global_cache_scope
+
+
+def _new_region(i):
+    return Region(
+        region_id='bench-{0}'.format(i),
+        services={
+            ServiceName.UP: [Endpoint('up-bench-{0}.qiniup.com'.format(i))],
+            ServiceName.IO: [Endpoint('io-bench-{0}.qiniup.com'.format(i))],
+            ServiceName.UC: [Endpoint('uc.qiniuapi.com')],
+        }
+    )
+
+
+def _new_provider(persist_path, cache_key):
+    provider = CachedRegionsProvider(
+        cache_key=cache_key,
+        base_regions_provider=[],
+        persist_path=persist_path
+    )
+    # don't measure shrinking
+    provider._cache_scope = provider._cache_scope._replace(last_shrink_at=datetime.datetime.now())
+    return provider
+
+
+def _bench(persist_path, buckets, lookups):
+    for i in range(buckets):
+        _new_provider(persist_path, 'bucket-{0}'.format(i)).set_regions([_new_region(i)])
+
+    costs = []
+    for _ in range(lookups):
+        _global_cache_scope.memo_cache.clear()
+        provider = _new_provider(persist_path, 'bucket-{0}'.format(random.randrange(buckets)))
+        provider._cache_scope.memo_cache.clear()
+        started_at = time.time()
+        regions = list(provider)
+        costs.append(time.time() - started_at)
+        assert regions
+    costs.sort()
+    return costs[len(costs) // 2] * 1000, costs[int(len(costs) * 0.99)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--buckets', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--lookups', type=int, default=100)
+    args = parser.parse_args()
+
+    print('{0:>8} {1:>8} {2:>12} {3:>12}'.format('buckets', 'backend', 'p50 ms', 'p99 ms'))
+    for buckets in args.buckets:
+        for backend, file_name in [('jsonl', 'regions-cache.jsonl'), ('sqlite', 'regions-cache.sqlite3')]:
+            temp_dir = tempfile.mkdtemp()
+            try:
+                p50, p99 = _bench(os.path.join(temp_dir, file_name), buckets, args.lookups)
+            finally:
+                _global_cache_scope.memo_cache.clear()
+                shutil.rmtree(temp_dir)
+            print('{0:>8} {1:>8} {2:>12.3f} {3:>12.3f}'.format(buckets, backend, p50, p99))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark the load amplification of retries during an outage.
+
+All hosts fail in the simulated outage, so each request is retried on every endpoint.
+It compares the attempts sent by the retriers with and without the `RetryBudget`,
+and shows the delays of the backoff strategies.
+No request is sent.
+
+Usage (with the sdk installed, e.g. `pip install -e .`):
+    python tests/benchmarks/bench_retry_budget.py [--requests N] [--hosts N]
+"""
+import argparse
+
+from qiniu.http.endpoint import Endpoint
+from qiniu.http.region import Region, ServiceName
+from qiniu.retry import RetryBudget, ExponentialBackoff, DecorrelatedJitterBackoff
+from qiniu.services.storage._bucket_default_retrier import get_default_retrier
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--hosts', type=int, default=4)
+    args = parser.parse_args()
+
+    regions = [Region(services={
+        ServiceName.UP: [Endpoint('up-{0}.example.com'.format(i)) for i in range(args.hosts)]
+    })]
+    for name, retry_budget in [
+        ('no budget', None),
+        ('budget 20%', RetryBudget(ratio=0.2, min_retries_per_second=0, max_tokens=10)),
+    ]:
+        retrier = get_default_retrier(
+            regions_provider=regions,
+            service_names=[ServiceName.UP],
+            endpoint_health_tracker=None,
+            retry_budget=retry_budget
+        )
+        attempts = 0
+        for _ in range(args.requests):
+            try:
+                for attempt in retrier:
+                    with attempt:
+                        attempts += 1
+                        raise IOError('mocked outage')
+            except IOError:
+                pass
+        print('{0:<12} {1:>6.2f} attempts/request'.format(name, attempts / float(args.requests)))
+
+    for name, backoff in [
+        ('exponential', ExponentialBackoff()),
+        ('decorrelated', DecorrelatedJitterBackoff()),
+    ]:
+        delays = []
+        delay = 0
+        for retried_times in range(6):
+            delay = backoff.get_delay(retried_times, delay)
+            delays.append('{0:.3f}'.format(delay))
+        print('{0:<12} delays: {1}'.format(name, ', '.join(delays)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+import sys
+
+# the async cases require python >= 3.6 and aiohttp, skip collecting them if unavailable
+collect_ignore_glob = []
+if sys.version_info < (3, 6):
+    collect_ignore_glob.append('test_*.py')
+else:
+    try:
+        import aiohttp  # noqa
+    except ImportError:
+        collect_ignore_glob.append('test_*.py')
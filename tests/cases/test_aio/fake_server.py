@@ -0,0 +1,141 @@
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import time
+
+from aiohttp import web
+
+from qiniu.http.endpoint import Endpoint
+from qiniu.http.region import Region, ServiceName
+from qiniu.utils import etag_stream
+
+
+def _etag_v2(parts):
+    # a simple implementation of the etag, which is independent from the EtagV2Calculator
+    if (
+        all(len(p) == 4 * 1024 * 1024 for p in parts[:-1]) and
+        (not parts or len(parts[-1]) <= 4 * 1024 * 1024)
+    ):
+        return etag_stream(io.BytesIO(b''.join(parts)))
+    h = hashlib.sha1()
+    for p in parts:
+        h.update(base64.urlsafe_b64decode(etag_stream(io.BytesIO(p)))[1:])
+    return base64.urlsafe_b64encode(b'\x9e' + h.digest()).decode('utf-8')
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def _json(data, status=200):
+    return web.json_response(data, status=status, headers={'X-Reqid': 'fake-req-id'})
+
+
+class FakeServer:
+    """
+    A fake server of the rs, rsf and up services on the running event loop
+    """
+    def __init__(self):
+        self.requests = []
+        self.objects = {}
+        self.uploads = {}
+        self.failed_parts = set()
+        self.wrong_hash = False
+        self._runner = None
+        self.port = None
+
+    @property
+    def host(self):
+        return '127.0.0.1:{0}'.format(self.port)
+
+    @property
+    def region(self):
+        endpoints = [Endpoint(self.host, default_scheme='http')]
+        return Region(
+            region_id='fake',
+            services={
+                ServiceName.UP: endpoints,
+                ServiceName.RS: endpoints,
+                ServiceName.RSF: endpoints
+            }
+        )
+
+    async def __aenter__(self):
+        app = web.Application(client_max_size=1024 ** 3)
+        app.router.add_route('*', '/{tail:.*}', self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._runner.cleanup()
+
+    async def handle(self, request):
+        segments = request.path.strip('/').split('/')
+        if request.method == 'POST' and segments == ['']:
+            form = await request.post()
+            self.requests.append((request.method, request.path, dict(request.headers), form))
+            self.objects[form['key']] = form['file'].file.read()
+            return _json({'key': form['key'], 'hash': 'fake-hash', 'crc32': form.get('crc32')})
+
+        body = await request.read()
+        self.requests.append((request.method, request.path, dict(request.headers), body))
+
+        if request.headers.get('Host', '').startswith('localhost'):
+            return _json({'error': 'fake unavailable'}, status=503)
+
+        if segments[0] == 'stat':
+            if not request.headers.get('Authorization', '').startswith('Qiniu '):
+                return _json({'error': 'bad token'}, status=401)
+            key = base64.urlsafe_b64decode(segments[1]).decode('utf-8').split(':', 1)[1]
+            if key not in self.objects:
+                return _json({'error': 'no such file or directory'}, status=612)
+            return _json({'fsize': len(self.objects[key]), 'hash': 'fake-hash'})
+
+        if segments[0] == 'list':
+            keys = sorted(self.objects)
+            return _json({'items': [{'key': k} for k in keys], 'marker': ''})
+
+        if segments[0] == 'batch':
+            return _json([{'code': 200}, {'code': 612, 'data': {'error': 'no such file'}}], status=298)
+
+        if segments[0] == 'buckets':
+            return self.handle_resume_v2(request, segments, body)
+
+        return _json({'error': 'not found'}, status=404)
+
+    def handle_resume_v2(self, request, segments, body):
+        # /buckets/<bucket>/objects/<key>/uploads[/<upload_id>[/<part_no>]]
+        key = base64.urlsafe_b64decode(segments[3]).decode('utf-8')
+        if len(segments) == 5:
+            upload_id = 'upload-{0}'.format(len(self.uploads))
+            self.uploads[upload_id] = {}
+            return _json({'uploadId': upload_id, 'expireAt': int(time.time()) + 3600})
+
+        upload_id = segments[5]
+        if len(segments) == 7:
+            part_no = int(segments[6])
+            if part_no in self.failed_parts:
+                return _json({'error': 'fake part failed'}, status=400)
+            if hashlib.md5(body).hexdigest() != request.headers.get('Content-MD5'):
+                return _json({'error': 'md5 mismatch'}, status=400)
+            self.uploads[upload_id][part_no] = body
+            return _json({'etag': 'etag-{0}'.format(part_no), 'md5': request.headers.get('Content-MD5')})
+
+        parts = json.loads(body.decode('utf-8'))['parts']
+        part_bodies = [
+            self.uploads[upload_id][p['partNumber']]
+            for p in parts
+        ]
+        self.objects[key] = b''.join(part_bodies)
+        object_hash = 'fake-hash' if self.wrong_hash else _etag_v2(part_bodies)
+        return _json({'key': key, 'hash': object_hash, 'parts': parts})
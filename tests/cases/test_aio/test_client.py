@@ -0,0 +1,170 @@
+import asyncio
+import time
+
+from qiniu.http.region import Region
+from qiniu.http.regions_provider import CachedRegionsProvider
+from qiniu.aio import AsyncHTTPClient, resolve_regions
+from qiniu.aio.http.middleware import Middleware, RetryDomainsMiddleware, UserAgentMiddleware
+
+from .fake_server import FakeServer, run
+
+
+class _RecordMiddleware(Middleware):
+    def __init__(self, name, record):
+        self.name = name
+        self.record = record
+
+    async def __call__(self, request, nxt):
+        self.record.append('bef_' + self.name)
+        resp = await nxt(request)
+        self.record.append('aft_' + self.name)
+        return resp
+
+
+class _SlowRegionsProvider:
+    def __init__(self, regions):
+        self.regions = regions
+        self.iterated_times = 0
+
+    def __iter__(self):
+        self.iterated_times += 1
+        time.sleep(0.2)
+        return iter(self.regions)
+
+
+class TestAsyncHTTPClient:
+    def test_middlewares(self):
+        record = []
+
+        async def main():
+            async with FakeServer() as server, AsyncHTTPClient(
+                middlewares=[
+                    UserAgentMiddleware('test'),
+                    _RecordMiddleware('A', record)
+                ]
+            ) as client:
+                ret, resp = await client.get(
+                    'http://{0}/list'.format(server.host),
+                    middlewares=[_RecordMiddleware('B', record)]
+                )
+                return ret, resp, server.requests
+
+        ret, resp, requests = run(main())
+
+        assert resp.ok(), resp
+        assert ret == {'items': [], 'marker': ''}
+        assert record == ['bef_A', 'bef_B', 'aft_B', 'aft_A']
+        assert requests[0][2]['User-Agent'].startswith('QiniuPython/test')
+
+    def test_retry_domains(self):
+        async def main():
+            async with FakeServer() as server, AsyncHTTPClient() as client:
+                ret, resp = await client.get(
+                    'http://localhost:{0}/list'.format(server.port),
+                    middlewares=[
+                        RetryDomainsMiddleware(
+                            backup_domains=['127.0.0.1'],
+                            max_retry_times=2
+                        )
+                    ]
+                )
+                return resp, [r[2]['Host'] for r in server.requests]
+
+        resp, hosts = run(main())
+
+        assert resp.ok(), resp
+        assert [h.split(':')[0] for h in hosts] == ['localhost', 'localhost', '127.0.0.1']
+
+    def test_connection_failed(self):
+        async def main():
+            async with AsyncHTTPClient() as client:
+                return await client.get('http://127.0.0.1:1/list', timeout=3)
+
+        ret, resp = run(main())
+
+        assert ret is None
+        assert resp.status_code == -1
+        assert resp.need_retry()
+
+    def test_close_sessions_of_closed_loops(self):
+        client = AsyncHTTPClient()
+
+        async def main():
+            async with FakeServer() as server:
+                ret, resp = await client.get('http://{0}/list'.format(server.host))
+                return resp, client.session
+
+        resp, first_session = run(main())
+        assert resp.ok(), resp
+        assert not first_session.closed
+
+        # the session of the closed loop is closed by the next request in another loop
+        resp, second_session = run(main())
+        assert resp.ok(), resp
+        assert first_session.closed
+        assert second_session is not first_session
+        assert list(client._sessions.values()) == [second_session]
+
+        run(client.close())
+        assert second_session.closed
+        assert not client._sessions
+
+    def test_session_per_loop(self):
+        client = AsyncHTTPClient()
+        loop_a = asyncio.new_event_loop()
+        loop_b = asyncio.new_event_loop()
+
+        async def get_session():
+            return client.session
+
+        try:
+            session_a = loop_a.run_until_complete(get_session())
+            session_b = loop_b.run_until_complete(get_session())
+            # switching back to the alive loop reuses its session rather than dropping it
+            assert loop_a.run_until_complete(get_session()) is session_a
+            assert session_b is not session_a
+            loop_a.run_until_complete(client.close())
+            loop_b.run_until_complete(client.close())
+            assert session_a.closed and session_b.closed
+        finally:
+            loop_a.close()
+            loop_b.close()
+
+
+class TestResolveRegions:
+    def test_not_block_and_merge_resolving(self):
+        base_provider = _SlowRegionsProvider([Region.from_region_id('z0')])
+        regions_provider = CachedRegionsProvider(
+            cache_key='test-aio-resolve-regions-{0}'.format(time.time()),
+            base_regions_provider=base_provider,
+            persist_path=''
+        )
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(time.time())
+                await asyncio.sleep(0.01)
+
+        async def main():
+            ticker = asyncio.ensure_future(tick())
+            try:
+                results = await asyncio.gather(*[
+                    resolve_regions(regions_provider)
+                    for _ in range(10)
+                ])
+            finally:
+                ticker.cancel()
+            # hit the memo cache
+            results.append(await resolve_regions(regions_provider))
+            return results
+
+        results = run(main())
+
+        assert base_provider.iterated_times == 1
+        assert all(
+            [r.region_id for r in regions] == ['z0']
+            for regions in results
+        )
+        # the event loop was not blocked by the slow provider
+        assert len(ticks) > 5
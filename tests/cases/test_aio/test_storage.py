@@ -0,0 +1,242 @@
+import os
+import threading
+
+import pytest
+
+from qiniu import Auth, build_batch_stat, UploadProgressRecorder
+from qiniu.aio import AsyncBucketManager, AsyncFormUploader, AsyncResumeUploaderV2, AsyncHTTPClient
+
+from .fake_server import FakeServer, run
+
+
+@pytest.fixture(scope='function')
+def fake_auth():
+    yield Auth('fake-ak', 'fake-sk')
+
+
+class TestAsyncBucketManager:
+    def test_stat(self, fake_auth):
+        async def main():
+            async with FakeServer() as server, AsyncHTTPClient() as client:
+                server.objects['exists'] = b'hello'
+                bucket_manager = AsyncBucketManager(
+                    fake_auth,
+                    regions=[server.region],
+                    http_client=client
+                )
+                return (
+                    await bucket_manager.stat('bucket', 'exists'),
+                    await bucket_manager.stat('bucket', 'not-exists'),
+                    await bucket_manager.list('bucket')
+                )
+
+        (ret, resp), (ret_not_found, resp_not_found), (ret_list, eof, _resp_list) = run(main())
+
+        assert resp.ok(), resp
+        assert ret['fsize'] == 5
+        assert ret_not_found is None
+        assert resp_not_found.status_code == 612
+        assert [item['key'] for item in ret_list['items']] == ['exists']
+        assert eof
+
+    def test_batch_partial_failed(self, fake_auth):
+        async def main():
+            async with FakeServer() as server, AsyncHTTPClient() as client:
+                bucket_manager = AsyncBucketManager(
+                    fake_auth,
+                    regions=[server.region],
+                    http_client=client
+                )
+                return await bucket_manager.batch(build_batch_stat('bucket', ['a', 'b']))
+
+        ret, resp = run(main())
+
+        # keep the same as BucketManager.batch
+        assert ret is None
+        assert resp.status_code == 298
+        assert [r['code'] for r in resp.json()] == [200, 612]
+
+
+class TestAsyncUploaders:
+    def test_form_upload(self, fake_auth):
+        async def main():
+            async with FakeServer() as server, AsyncHTTPClient() as client:
+                uploader = AsyncFormUploader(
+                    'bucket',
+                    auth=fake_auth,
+                    regions=[server.region],
+                    http_client=client
+                )
+                ret, resp = await uploader.upload(
+                    'form-key',
+                    data=b'hello form',
+                    up_token=fake_auth.upload_token('bucket')
+                )
+                return ret, resp, server.objects
+
+        ret, resp, objects = run(main())
+
+        assert resp.ok(), resp
+        assert ret['key'] == 'form-key'
+        assert ret['crc32'] is not None
+        assert objects['form-key'] == b'hello form'
+
+    @pytest.mark.parametrize('concurrent', [True, False])
+    def test_resume_upload_v2(self, fake_auth, temp_file, concurrent):
+        opts = {}
+        if not concurrent:
+            opts['concurrent_executor'] = None
+
+        async def main():
+            async with FakeServer() as server, AsyncHTTPClient() as client:
+                uploader = AsyncResumeUploaderV2(
+                    'bucket',
+                    auth=fake_auth,
+                    regions=[server.region],
+                    http_client=client,
+                    part_size=1024 * 1024,
+                    **opts
+                )
+                ret, resp = await uploader.upload(
+                    'resume-key',
+                    file_path=temp_file,
+                    up_token=fake_auth.upload_token('bucket')
+                )
+                return ret, resp, server.objects
+
+        ret, resp, objects = run(main())
+
+        assert resp.ok(), resp
+        assert [p['partNumber'] for p in ret['parts']] == [1, 2, 3, 4]
+        with open(temp_file, 'rb') as f:
+            assert objects['resume-key'] == f.read()
+
+    def test_resume_upload_v2_record_off_event_loop(self, fake_auth, temp_file, tmp_path):
+        recorder = _ThreadRecordingUploadProgressRecorder(str(tmp_path))
+
+        async def main():
+            async with FakeServer() as server, AsyncHTTPClient() as client:
+                uploader = AsyncResumeUploaderV2(
+                    'bucket',
+                    auth=fake_auth,
+                    regions=[server.region],
+                    http_client=client,
+                    part_size=1024 * 1024,
+                    upload_progress_recorder=recorder
+                )
+                return await uploader.upload(
+                    'resume-key',
+                    file_path=temp_file,
+                    up_token=fake_auth.upload_token('bucket')
+                )
+
+        ret, resp = run(main())
+
+        assert resp.ok(), resp
+        called = set(name for name, _ in recorder.calls)
+        assert {'get_upload_record', 'set_upload_record', 'delete_upload_record'} <= called
+        assert all(
+            thread is not threading.main_thread()
+            for name, thread in recorder.calls
+        )
+
+    def test_resume_upload_v2_by_generated_up_token(self, fake_auth, temp_file):
+        async def main():
+            async with FakeServer() as server, AsyncHTTPClient() as client:
+                uploader = AsyncResumeUploaderV2(
+                    'bucket',
+                    auth=fake_auth,
+                    regions=[server.region],
+                    http_client=client,
+                    part_size=1024 * 1024
+                )
+                ret, resp = await uploader.upload('resume-key', file_path=temp_file)
+                return ret, resp, server.requests
+
+        ret, resp, requests = run(main())
+
+        assert resp.ok(), resp
+        assert all(
+            headers['Authorization'].startswith('UpToken fake-ak:')
+            for _, _, headers, _ in requests
+        )
+
+    @pytest.mark.parametrize('wrong_hash', [False, True])
+    def test_resume_upload_v2_verify_etag(self, fake_auth, temp_file, wrong_hash):
+        async def main():
+            async with FakeServer() as server, AsyncHTTPClient() as client:
+                server.wrong_hash = wrong_hash
+                uploader = AsyncResumeUploaderV2(
+                    'bucket',
+                    auth=fake_auth,
+                    # the mismatched etag must not be retried in the other region
+                    regions=[server.region, server.region],
+                    http_client=client,
+                    part_size=1024 * 1024,
+                    verify_etag=True
+                )
+                ret, resp = await uploader.upload(
+                    'resume-key',
+                    file_path=temp_file,
+                    up_token=fake_auth.upload_token('bucket'),
+                )
+                return ret, resp, server.uploads
+
+        ret, resp, uploads = run(main())
+
+        assert len(uploads) == 1
+        if wrong_hash:
+            assert ret is None
+            assert isinstance(resp.exception, ValueError)
+            assert not resp.need_retry()
+        else:
+            assert resp.ok(), resp
+            assert ret['hash'].startswith('n')
+
+    def test_resume_upload_v2_part_failed(self, fake_auth, temp_file):
+        async def main():
+            async with FakeServer() as server, AsyncHTTPClient() as client:
+                server.failed_parts.add(3)
+                uploader = AsyncResumeUploaderV2(
+                    'bucket',
+                    auth=fake_auth,
+                    regions=[server.region],
+                    http_client=client,
+                    part_size=1024 * 1024
+                )
+                return await uploader.upload(
+                    'resume-key',
+                    file_path=temp_file,
+                    up_token=fake_auth.upload_token('bucket')
+                )
+
+        ret, resp = run(main())
+
+        assert ret is None
+        assert resp.status_code == 400
+
+
+class _ThreadRecordingUploadProgressRecorder(UploadProgressRecorder):
+    def __init__(self, record_folder):
+        super(_ThreadRecordingUploadProgressRecorder, self).__init__(record_folder)
+        self.calls = []
+
+    def get_upload_record(self, file_name, key):
+        self.calls.append(('get_upload_record', threading.current_thread()))
+        return super(_ThreadRecordingUploadProgressRecorder, self).get_upload_record(file_name, key)
+
+    def set_upload_record(self, file_name, key, data):
+        self.calls.append(('set_upload_record', threading.current_thread()))
+        super(_ThreadRecordingUploadProgressRecorder, self).set_upload_record(file_name, key, data)
+
+    def delete_upload_record(self, file_name, key):
+        self.calls.append(('delete_upload_record', threading.current_thread()))
+        super(_ThreadRecordingUploadProgressRecorder, self).delete_upload_record(file_name, key)
+
+
+@pytest.fixture(scope='function')
+def temp_file(tmp_path):
+    file_path = str(tmp_path / 'aio-resume-upload')
+    with open(file_path, 'wb') as f:
+        f.write(os.urandom(3 * 1024 * 1024 + 1))
+    yield file_path
@@ -1,4 +1,5 @@
 import os
+import time
 
 import pytest
 
@@ -9,3 +10,23 @@ from qiniu.compat import urlparse
 def mock_server_addr():
     addr = os.getenv('MOCK_SERVER_ADDRESS', 'http://localhost:8000')
     yield urlparse(addr)
+
+
+@pytest.fixture(params=['Asia/Shanghai', 'America/Los_Angeles'])
+def local_tz(request):
+    """
+    Run the case in a local timezone other than UTC, the naive datetimes are in local time
+    """
+    if not hasattr(time, 'tzset'):
+        pytest.skip('time.tzset is unavailable')
+    origin_tz = os.environ.get('TZ')
+    os.environ['TZ'] = request.param
+    time.tzset()
+    try:
+        yield request.param
+    finally:
+        if origin_tz is None:
+            os.environ.pop('TZ', None)
+        else:
+            os.environ['TZ'] = origin_tz
+        time.tzset()
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+from qiniu.http import qn_http_client
+import qiniu.http.default_client as default_client
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b'{}'
+        self.server.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Reqid', 'mocked-req-id')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _KeepAliveServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture(scope='function')
+def keep_alive_server():
+    server = _KeepAliveServer(('127.0.0.1', 0), _KeepAliveHandler)
+    server.connections = set()
+    t = threading.Thread(target=server.serve_forever)
+    t.daemon = True
+    t.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestDefaultClient:
+    def test_adapter_not_rebuilt(self, mock_server_addr):
+        url = '{scheme}://{host}/echo?status=200'.format(
+            scheme=mock_server_addr.scheme,
+            host=mock_server_addr.netloc
+        )
+        qn_http_client.get(url)
+        adapter = qn_http_client.session.get_adapter('http://')
+        qn_http_client.get(url)
+
+        assert qn_http_client.session.get_adapter('http://') is adapter
+        assert qn_http_client.session.get_adapter('https://') is adapter
+
+    @pytest.mark.parametrize(
+        'set_conf_default',
+        [
+            {
+                'connection_pool': 3
+            }
+        ],
+        indirect=True
+    )
+    def test_adapter_rebuilt_by_config_changed(self, set_conf_default):
+        default_client._init_http_adapter()
+        adapter = qn_http_client.session.get_adapter('https://')
+        assert adapter._pool_maxsize == 3
+
+    def test_connection_reused(self, keep_alive_server):
+        url = 'http://127.0.0.1:{0}/'.format(keep_alive_server.server_address[1])
+        for _ in range(10):
+            _ret, resp = qn_http_client.get(url)
+            assert resp.ok(), resp
+
+        assert len(keep_alive_server.connections) == 1
@@ -0,0 +1,122 @@
+import pytest
+
+from qiniu.http.endpoint import Endpoint
+from qiniu.http.endpoint_health import EndpointHealthTracker
+from qiniu.http.region import Region, ServiceName
+from qiniu.services.storage._bucket_default_retrier import get_default_retrier
+
+
+@pytest.fixture(scope='function')
+def endpoints():
+    yield [Endpoint(h) for h in ['a.example.com', 'b.example.com', 'c.example.com']]
+
+
+class TestEndpointHealthTracker:
+    def test_keep_order_without_samples(self, endpoints):
+        tracker = EndpointHealthTracker()
+
+        assert tracker.sort_endpoints(endpoints) == endpoints
+
+        tracker.record_success('a.example.com', 0.1)
+        assert tracker.sort_endpoints(endpoints) == endpoints
+
+    def test_sort_by_latency_and_failures(self, endpoints):
+        tracker = EndpointHealthTracker()
+        tracker.record_success('a.example.com', 0.5)
+        tracker.record_success('b.example.com', 0.2)
+        tracker.record_success('c.example.com', 0.1)
+        tracker.record_failure('c.example.com')
+
+        # the score of c is 0.1 * (1 + 10 * 0.3)
+        assert [e.host for e in tracker.sort_endpoints(endpoints)] == [
+            'b.example.com',
+            'c.example.com',
+            'a.example.com'
+        ]
+
+    def test_circuit_breaker(self, endpoints):
+        tracker = EndpointHealthTracker(failure_threshold=2, cooldown=10)
+        tracker.record_failure('a.example.com', now=100)
+        assert tracker.is_available('a.example.com', now=100)
+
+        tracker.record_failure('a.example.com', now=100)
+        assert not tracker.is_available('a.example.com', now=105)
+        assert tracker.sort_endpoints(endpoints, now=105)[-1].host == 'a.example.com'
+
+        # half open after cooldown, and one more failure opens it again
+        assert tracker.is_available('a.example.com', now=110)
+        tracker.record_failure('a.example.com', now=110)
+        assert not tracker.is_available('a.example.com', now=115)
+
+        tracker.record_success('a.example.com', 0.1)
+        assert tracker.is_available('a.example.com', now=115)
+
+        stats = tracker.stats()['a.example.com']
+        assert stats.successes == 1
+        assert stats.failures == 3
+        assert stats.consecutive_failures == 0
+
+
+class TestEndpointHealthRetryPolicy:
+    def test_record_attempts_and_skip_failed_endpoint(self, endpoints):
+        tracker = EndpointHealthTracker(failure_threshold=1)
+        retrier = get_default_retrier(
+            regions_provider=[Region(services={ServiceName.RS: endpoints})],
+            service_names=[ServiceName.RS],
+            endpoint_health_tracker=tracker
+        )
+
+        def do_request():
+            for attempt in retrier:
+                with attempt:
+                    host = attempt.context['endpoint'].host
+                    if host == 'a.example.com':
+                        raise ValueError('mocked error')
+                    return host
+
+        assert do_request() == 'b.example.com'
+        assert do_request() == 'b.example.com'
+
+        stats = tracker.stats()
+        assert stats['a.example.com'].failures == 1
+        assert stats['b.example.com'].successes == 2
+        assert 'c.example.com' not in stats
+
+    def test_not_record_latency_of_bulk_transfer(self, endpoints):
+        tracker = EndpointHealthTracker()
+        retrier = get_default_retrier(
+            regions_provider=[Region(services={ServiceName.IO: endpoints})],
+            service_names=[ServiceName.IO],
+            endpoint_health_tracker=tracker,
+            record_latency=False
+        )
+
+        for attempt in retrier:
+            with attempt:
+                break
+
+        stats = tracker.stats()
+        assert stats['a.example.com'].successes == 1
+        assert stats['a.example.com'].latency_ewma is None
+        # the host carried the large file is not ordered after the others
+        assert [e.host for e in tracker.sort_endpoints(endpoints)] == [e.host for e in endpoints]
+
+    def test_not_count_client_errors_as_failures(self, endpoints):
+        tracker = EndpointHealthTracker(failure_threshold=1)
+        retrier = get_default_retrier(
+            regions_provider=[Region(services={ServiceName.IO: endpoints})],
+            service_names=[ServiceName.IO],
+            endpoint_health_tracker=tracker
+        )
+
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                for attempt in retrier:
+                    with attempt:
+                        err = ValueError('mocked not found')
+                        err.no_need_retry = True
+                        raise err
+
+        stats = tracker.stats()
+        assert stats['a.example.com'].failures == 0
+        assert tracker.is_available('a.example.com')
@@ -0,0 +1,57 @@
+import datetime
+import time
+
+from qiniu.http.region import Region
+from qiniu.http.regions_provider import MemoizedRegionsProvider, _get_region_expires_at
+
+
+class CountingRegionsProvider:
+    def __init__(self, regions):
+        self.regions = regions
+        self.count = 0
+
+    def __iter__(self):
+        self.count += 1
+        return iter(self.regions)
+
+
+class TestMemoizedRegionsProvider:
+    def test_memoize_until_expired(self):
+        base_regions_provider = CountingRegionsProvider([Region.from_region_id('z0', ttl=86400)])
+        regions_provider = MemoizedRegionsProvider(base_regions_provider)
+
+        for _ in range(3):
+            assert [r.region_id for r in regions_provider] == ['z0']
+        assert base_regions_provider.count == 1
+
+        base_regions_provider.regions = [
+            Region.from_region_id(
+                'z1',
+                ttl=10,
+                create_time=datetime.datetime.now() - datetime.timedelta(seconds=20)
+            )
+        ]
+        regions_provider.invalidate()
+        assert [r.region_id for r in regions_provider] == ['z1']
+        # the region is expired, so resolve it again
+        assert [r.region_id for r in regions_provider] == ['z1']
+        assert base_regions_provider.count == 3
+
+    def test_max_ttl(self):
+        base_regions_provider = CountingRegionsProvider([Region.from_region_id('z0', ttl=86400)])
+        regions_provider = MemoizedRegionsProvider(base_regions_provider, max_ttl=0)
+
+        list(regions_provider)
+        list(regions_provider)
+
+        assert base_regions_provider.count == 2
+
+    def test_memoize_in_local_timezone(self, local_tz):
+        region = Region.from_region_id('z0', ttl=60)
+        assert abs(_get_region_expires_at(region) - (time.time() + 60)) < 1
+
+        base_regions_provider = CountingRegionsProvider([region])
+        regions_provider = MemoizedRegionsProvider(base_regions_provider)
+        list(regions_provider)
+        list(regions_provider)
+        assert base_regions_provider.count == 1
@@ -165,6 +165,35 @@ class TestCachedQueryRegionsProvider:
         except OSError:
             pass
 
+    @pytest.mark.parametrize(
+        'cached_regions_provider',
+        [
+            {
+                # the custom path configured before the SQLite cache is introduced
+                'persist_path': os.path.join(tempfile.gettempdir(), 'test-custom-json-lines-cache'),
+            }
+        ],
+        indirect=True
+    )
+    def test_getter_with_json_lines_file_of_custom_path(self, cached_regions_provider):
+        r_z0 = Region.from_region_id('z0')
+        r_z0.ttl = 86400
+
+        with open(cached_regions_provider.persist_path, 'w') as f:
+            f.write(json.dumps({
+                'cacheKey': cached_regions_provider.cache_key,
+                'regions': [_persist_region(r_z0)]
+            }) + os.linesep)
+
+        assert [r.region_id for r in cached_regions_provider] == ['z0']
+
+        # the updates are appended in JSON lines as well
+        cached_regions_provider.set_regions([Region.from_region_id('z1', ttl=86400)])
+        with open(cached_regions_provider.persist_path, 'r') as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[-1])['cacheKey'] == cached_regions_provider.cache_key
+
     @pytest.mark.parametrize(
         'cached_regions_provider',
         [
@@ -183,6 +212,11 @@ class TestCachedQueryRegionsProvider:
             cached_regions_provider.persist_path = None
         else:
             old_persist_path = _global_cache_scope.persist_path
+        # the file may be created by the other cases
+        try:
+            os.remove(old_persist_path)
+        except OSError:
+            pass
 
         regions = [Region.from_region_id('z0')]
         cached_regions_provider.set_regions(regions)
@@ -282,7 +316,7 @@ class TestCachedQueryRegionsProvider:
         )
         list(cached_regions_provider)
 
-        assert len(cached_regions_provider._cache_scope.memo_cache[origin_cache_key]) == 0
+        assert len(cached_regions_provider._cache_scope.memo_cache.get(origin_cache_key, [])) == 0
 
     def test_shrink_with_ignore_expired_regions(self, cached_regions_provider):
         expired_region = Region.from_region_id('z0')
@@ -0,0 +1,144 @@
+import datetime
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from qiniu.http.endpoint import Endpoint
+from qiniu.http.region import Region, ServiceName
+from qiniu.http.regions_provider import CachedRegionsProvider, _global_cache_scope
+from qiniu.http.regions_refresher import RegionsRefresher
+
+
+class FakeRegionsProvider:
+    def __init__(self, ttl=86400):
+        self.ttl = ttl
+        self.queried_times = 0
+        self.fail = False
+
+    def __iter__(self):
+        self.queried_times += 1
+        if self.fail:
+            raise RuntimeError('query failed')
+        return iter([
+            Region(
+                region_id='z{0}'.format(self.queried_times),
+                services={ServiceName.UP: [Endpoint('up.python.qiniu.com')]},
+                ttl=self.ttl
+            )
+        ])
+
+
+def _wait_until(predicate, timeout=3):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture(scope='function')
+def refresher():
+    refresher = RegionsRefresher(refresh_ahead=0, retry_interval=0.05)
+    yield refresher
+    refresher.stop()
+
+
+@pytest.fixture(scope='function')
+def new_cached_regions_provider(rand_string, refresher):
+    persist_path = os.path.join(tempfile.gettempdir(), rand_string(16) + '.sqlite3')
+
+    def _new(base_regions_provider):
+        provider = CachedRegionsProvider(
+            cache_key='test-refresher-key',
+            base_regions_provider=base_regions_provider,
+            persist_path=persist_path,
+            regions_refresher=refresher
+        )
+        # skip the shrinking at first
+        provider._cache_scope = provider._cache_scope._replace(last_shrink_at=datetime.datetime.now())
+        return provider
+
+    yield _new
+
+    _global_cache_scope.memo_cache.clear()
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove(persist_path + suffix)
+        except OSError:
+            pass
+
+
+class TestRegionsRefresher:
+    def test_query_once_after_warmup(self, new_cached_regions_provider):
+        base_regions_provider = FakeRegionsProvider()
+        provider = new_cached_regions_provider(base_regions_provider)
+        for _ in range(3):
+            assert [r.region_id for r in provider] == ['z1']
+        assert base_regions_provider.queried_times == 1
+
+    def test_provide_expired_regions_while_refreshing(self, new_cached_regions_provider):
+        base_regions_provider = FakeRegionsProvider()
+        provider = new_cached_regions_provider(base_regions_provider)
+        expired_region = Region(
+            region_id='expired',
+            services={ServiceName.UP: [Endpoint('up.python.qiniu.com')]},
+            ttl=1,
+            create_time=datetime.datetime.fromtimestamp(0)
+        )
+        provider._cache_scope.memo_cache[provider.cache_key] = [expired_region]
+
+        assert [r.region_id for r in provider] == ['expired']
+        assert _wait_until(lambda: [r.region_id for r in provider] == ['z1'])
+        assert base_regions_provider.queried_times == 1
+
+    def test_refresh_before_expired_if_used(self, new_cached_regions_provider):
+        base_regions_provider = FakeRegionsProvider(ttl=1)
+        provider = new_cached_regions_provider(base_regions_provider)
+        provider.regions_refresher.refresh_ahead = 0.9
+
+        assert [r.region_id for r in provider] == ['z1']
+        assert [r.region_id for r in provider] == ['z1']
+        assert _wait_until(lambda: base_regions_provider.queried_times == 2)
+        assert [r.region_id for r in provider] == ['z2']
+
+    def test_not_refresh_if_unused(self, new_cached_regions_provider):
+        base_regions_provider = FakeRegionsProvider(ttl=1)
+        provider = new_cached_regions_provider(base_regions_provider)
+        provider.regions_refresher.refresh_ahead = 0.9
+
+        assert [r.region_id for r in provider] == ['z1']
+        time.sleep(0.3)
+        assert base_regions_provider.queried_times == 1
+
+    def test_retry_if_refresh_failed(self, new_cached_regions_provider):
+        base_regions_provider = FakeRegionsProvider(ttl=1)
+        provider = new_cached_regions_provider(base_regions_provider)
+        provider.regions_refresher.refresh_ahead = 0.9
+
+        list(provider)
+        base_regions_provider.fail = True
+        list(provider)
+        assert _wait_until(lambda: base_regions_provider.queried_times == 2)
+        assert [r.region_id for r in provider] == ['z1']
+
+        # retried as it's used again
+        base_regions_provider.fail = False
+        assert _wait_until(lambda: base_regions_provider.queried_times == 3)
+        assert [r.region_id for r in provider] == ['z3']
+
+    def test_shrink_in_background(self, refresher):
+        shrunk_threads = []
+
+        class FakeProvider:
+            cache_key = 'fake'
+            persist_path = 'fake-path'
+
+            def shrink(self):
+                shrunk_threads.append(threading.current_thread().name)
+
+        refresher.shrink_later(FakeProvider())
+        assert _wait_until(lambda: shrunk_threads == [refresher.thread_name])
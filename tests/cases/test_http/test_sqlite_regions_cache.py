@@ -0,0 +1,146 @@
+import datetime
+import os
+import tempfile
+import time
+
+import pytest
+
+from qiniu.http.endpoint import Endpoint
+from qiniu.http.region import Region, ServiceName
+from qiniu.http.regions_provider import (
+    CachedRegionsProvider,
+    SQLiteRegionsCache,
+    _global_cache_scope,
+    _get_sqlite_regions_cache,
+    _get_region_from_persisted,
+    _persist_region,
+    sqlite3
+)
+
+pytestmark = pytest.mark.skipif(sqlite3 is None, reason='sqlite3 is unavailable')
+
+
+def _new_region(region_id, ttl=86400, create_time=None):
+    return Region(
+        region_id=region_id,
+        services={
+            ServiceName.UP: [Endpoint('up-{0}.python.qiniu.com'.format(region_id))]
+        },
+        ttl=ttl,
+        create_time=create_time
+    )
+
+
+@pytest.fixture(scope='function')
+def db_path(rand_string):
+    p = os.path.join(tempfile.gettempdir(), rand_string(16) + '.sqlite3')
+    yield p
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove(p + suffix)
+        except OSError:
+            pass
+
+
+class TestSQLiteRegionsCache:
+    def test_get_and_set(self, db_path):
+        cache = SQLiteRegionsCache(db_path)
+        assert cache.get('key-1') is None
+
+        cache.set('key-1', [_new_region('z0')])
+        cache.set('key-2', [_new_region('z1'), _new_region('z2')])
+        cache.set('key-1', [_new_region('na0')])
+
+        regions = cache.get('key-1')
+        assert [r.region_id for r in regions] == ['na0']
+        assert [e.host for e in regions[0].services[ServiceName.UP]] == ['up-na0.python.qiniu.com']
+        assert [r.region_id for r in cache.get('key-2')] == ['z1', 'z2']
+
+    def test_shared_by_instances(self, db_path):
+        SQLiteRegionsCache(db_path).set('key-1', [_new_region('z0')])
+        assert [r.region_id for r in SQLiteRegionsCache(db_path).get('key-1')] == ['z0']
+
+    def test_shrink(self, db_path):
+        cache = SQLiteRegionsCache(db_path, max_age=3600)
+        expired_region = _new_region('z0', ttl=1, create_time=datetime.datetime.fromtimestamp(0))
+        cache.set('expired', [expired_region])
+        cache.set('live', [_new_region('z1')])
+        cache.set('never-expired', [_new_region('z2', ttl=-1)])
+
+        assert cache.shrink() == 0
+        assert cache.get('expired') is not None
+
+        assert cache.shrink(should_shrink_expired_regions=True) == 1
+        assert cache.get('expired') is None
+        assert cache.get('live') is not None
+
+        # not updated for a long time
+        assert cache.shrink(now=time.time() + 7200) == 2
+        assert cache.get('never-expired') is None
+
+    def test_round_trip_in_local_timezone(self, db_path, local_tz):
+        region = _new_region('z0', ttl=3600)
+
+        persisted_region = _get_region_from_persisted(_persist_region(region))
+        assert abs((persisted_region.create_time - region.create_time).total_seconds()) < 1
+        assert persisted_region.is_live
+
+        cache = SQLiteRegionsCache(db_path)
+        cache.set('key-1', [region])
+        cached_region, = cache.get('key-1')
+        assert abs((cached_region.create_time - region.create_time).total_seconds()) < 1
+        assert cached_region.is_live
+        # the fresh regions are not evicted as expired ones
+        assert cache.shrink(should_shrink_expired_regions=True) == 0
+
+
+class TestCachedRegionsProviderWithSQLite:
+    def test_backend_by_path(self, db_path):
+        assert isinstance(_get_sqlite_regions_cache(db_path), SQLiteRegionsCache)
+        assert _get_sqlite_regions_cache(db_path) is _get_sqlite_regions_cache(db_path)
+        assert _get_sqlite_regions_cache('regions-cache.jsonl') is None
+        assert _get_sqlite_regions_cache(db_path + '-not-exists') is None
+        assert _get_sqlite_regions_cache(None) is None
+
+    def test_backend_by_file_header(self, db_path):
+        json_lines_path = db_path + '.custom'
+        try:
+            with open(json_lines_path, 'w') as f:
+                f.write('{}' + os.linesep)
+            # the existing JSON lines file is kept as is, even though the suffix is of SQLite
+            os.rename(json_lines_path, db_path)
+            assert _get_sqlite_regions_cache(db_path) is None
+
+            os.remove(db_path)
+            SQLiteRegionsCache(db_path).set('key-1', [_new_region('z0')])
+            os.rename(db_path, json_lines_path)
+            # the existing SQLite database is used whatever its name is
+            assert isinstance(_get_sqlite_regions_cache(json_lines_path), SQLiteRegionsCache)
+        finally:
+            for suffix in ('', '-wal', '-shm'):
+                try:
+                    os.remove(json_lines_path + suffix)
+                except OSError:
+                    pass
+
+    def test_getter_from_file(self, db_path):
+        regions = [_new_region('z0')]
+        provider = CachedRegionsProvider(
+            cache_key='test-cache-key',
+            base_regions_provider=[],
+            persist_path=db_path
+        )
+        try:
+            provider.set_regions(regions)
+            _global_cache_scope.memo_cache.clear()
+            provider._cache_scope.memo_cache.clear()
+
+            another_provider = CachedRegionsProvider(
+                cache_key='test-cache-key',
+                base_regions_provider=[],
+                persist_path=db_path
+            )
+            assert [r.region_id for r in another_provider] == ['z0']
+            assert _get_sqlite_regions_cache(db_path).get('another-cache-key') is None
+        finally:
+            _global_cache_scope.memo_cache.clear()
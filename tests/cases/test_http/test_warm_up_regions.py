@@ -0,0 +1,91 @@
+import os
+import tempfile
+import threading
+
+import pytest
+
+from qiniu.http import regions_provider as regions_provider_module
+from qiniu.http.endpoint import Endpoint
+from qiniu.http.region import Region, ServiceName
+from qiniu.http.regions_provider import _global_cache_scope, warm_up_regions
+
+
+class FakeQueryRegionsProvider:
+    queried = []
+    lock = threading.Lock()
+
+    def __init__(self, access_key, bucket_name, endpoints_provider, **kwargs):
+        self.bucket_name = bucket_name
+
+    def __iter__(self):
+        with self.lock:
+            self.queried.append(self.bucket_name)
+        if self.bucket_name.startswith('bad'):
+            raise RuntimeError('no such bucket')
+        return iter([
+            Region(
+                region_id='region-of-' + self.bucket_name,
+                services={ServiceName.UP: [Endpoint('up.python.qiniu.com')]}
+            )
+        ])
+
+
+@pytest.fixture(scope='function')
+def persist_path(rand_string, monkeypatch):
+    monkeypatch.setattr(regions_provider_module, 'QueryRegionsProvider', FakeQueryRegionsProvider)
+    FakeQueryRegionsProvider.queried = []
+    _global_cache_scope.memo_cache.clear()
+    p = os.path.join(tempfile.gettempdir(), rand_string(16) + '.sqlite3')
+    yield p
+    _global_cache_scope.memo_cache.clear()
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove(p + suffix)
+        except OSError:
+            pass
+
+
+class TestWarmUpRegions:
+    def test_warm_up(self, persist_path):
+        bucket_names = ['bucket-{0}'.format(i) for i in range(20)] + ['bad-bucket']
+        results = warm_up_regions(
+            'fake-ak',
+            bucket_names,
+            query_endpoints_provider=[Endpoint('uc.python.qiniu.com')],
+            max_workers=4,
+            persist_path=persist_path,
+            regions_refresher=None
+        )
+
+        assert [r.bucket_name for r in results] == bucket_names
+        for result in results[:-1]:
+            assert result.error is None
+            assert [r.region_id for r in result.regions] == ['region-of-' + result.bucket_name]
+        assert isinstance(results[-1].error, RuntimeError)
+        assert results[-1].regions == []
+
+        # cached in memory and file
+        assert len(_global_cache_scope.memo_cache) == 20
+        _global_cache_scope.memo_cache.clear()
+        FakeQueryRegionsProvider.queried = []
+        results = warm_up_regions(
+            'fake-ak',
+            bucket_names[:-1],
+            query_endpoints_provider=[Endpoint('uc.python.qiniu.com')],
+            persist_path=persist_path,
+            regions_refresher=None
+        )
+        assert all(r.error is None for r in results)
+        assert FakeQueryRegionsProvider.queried == []
+
+    def test_force_refresh(self, persist_path):
+        opts = {
+            'query_endpoints_provider': [Endpoint('uc.python.qiniu.com')],
+            'persist_path': persist_path,
+            'regions_refresher': None
+        }
+        warm_up_regions('fake-ak', ['bucket'], **opts)
+        warm_up_regions('fake-ak', ['bucket'], **opts)
+        assert FakeQueryRegionsProvider.queried == ['bucket']
+        warm_up_regions('fake-ak', ['bucket'], force_refresh=True, **opts)
+        assert FakeQueryRegionsProvider.queried == ['bucket', 'bucket']
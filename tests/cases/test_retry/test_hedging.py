@@ -0,0 +1,79 @@
+import threading
+import time
+
+from qiniu.http.endpoint import Endpoint
+from qiniu.retry import Hedging
+
+
+def new_context():
+    return {
+        'endpoint': Endpoint('a.example.com'),
+        'alternative_endpoints': [Endpoint('b.example.com'), Endpoint('c.example.com')]
+    }
+
+
+def slow_on(slow_host, latency=0.5):
+    def request(context):
+        host = context['endpoint'].host
+        if host == slow_host:
+            time.sleep(latency)
+        return host
+    return request
+
+
+class TestHedging:
+    def test_no_hedge_for_fast_request(self):
+        hedging = Hedging(delay=0.5, max_hedge_ratio=1)
+        context = new_context()
+
+        assert hedging.do(context, slow_on('b.example.com')) == 'a.example.com'
+        assert context['endpoint'].host == 'a.example.com'
+        assert len(context['alternative_endpoints']) == 2
+        assert hedging.stats().hedges == 0
+
+    def test_hedge_slow_request(self):
+        hedging = Hedging(delay=0.05, max_hedge_ratio=1)
+        context = new_context()
+
+        assert hedging.do(context, slow_on('a.example.com')) == 'b.example.com'
+        assert context['endpoint'].host == 'b.example.com'
+        assert [e.host for e in context['alternative_endpoints']] == ['c.example.com']
+        stats = hedging.stats()
+        assert stats.hedges == 1
+        assert stats.hedge_wins == 1
+
+    def test_hedges_are_budgeted(self):
+        hedging = Hedging(delay=0.01, max_hedge_ratio=0.5)
+
+        results = [
+            hedging.do(new_context(), slow_on('a.example.com', latency=0.05))
+            for _ in range(4)
+        ]
+
+        assert results == ['a.example.com', 'b.example.com'] * 2
+        assert hedging.stats().hedges == 2
+
+    def test_reject_result_of_hedge(self):
+        hedging = Hedging(delay=0.05, max_hedge_ratio=1)
+        context = new_context()
+        hedge_finished = threading.Event()
+
+        def request(ctx):
+            if ctx['endpoint'].host == 'a.example.com':
+                hedge_finished.wait(1)
+                return 'ok'
+            hedge_finished.set()
+            return 'bad'
+
+        assert hedging.do(context, request, accept_result=lambda r: r == 'ok') == 'ok'
+        assert context['endpoint'].host == 'a.example.com'
+
+    def test_percentile_delay(self):
+        hedging = Hedging(delay_percentile=90, initial_delay=3, max_hedge_ratio=0)
+        assert hedging.get_delay() == 3
+
+        # the latency is recorded after the result returned, so more than 10 requests
+        for _ in range(20):
+            hedging.do(new_context(), lambda ctx: None)
+
+        assert hedging.get_delay() < 3
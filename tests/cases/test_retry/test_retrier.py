@@ -1,3 +1,5 @@
+import pytest
+
 import qiniu.retry
 import qiniu.retry.abc
 
@@ -140,3 +142,89 @@ class TestRetry:
 
         assert tried_times == 1
         assert retried_times_ref.value == 0
+
+    def test_after_attempt_with_returned_result(self):
+        class RecordPolicy(qiniu.retry.abc.RetryPolicy):
+            def __init__(self):
+                self.attempts = []
+
+            def init_context(self, context):
+                pass
+
+            def should_retry(self, attempt):
+                return attempt.exception is not None
+
+            def prepare_retry(self, attempt):
+                pass
+
+            def after_attempt(self, attempt):
+                self.attempts.append((attempt.exception, attempt.result))
+
+        record_policy = RecordPolicy()
+        retrier = qiniu.retry.Retrier(policies=[record_policy])
+
+        def do_something():
+            for attempt in retrier:
+                with attempt:
+                    if not record_policy.attempts:
+                        raise ValueError('mocked error')
+                    attempt.result = 'ok'
+                    return attempt.result
+
+        assert do_something() == 'ok'
+        assert len(record_policy.attempts) == 2
+        assert isinstance(record_policy.attempts[0][0], ValueError)
+        assert record_policy.attempts[1] == (None, 'ok')
+
+    def test_retrier_with_backoff(self):
+        sleeps = []
+        retrier = qiniu.retry.Retrier(
+            policies=[MaxRetryPolicy(max_times=3)],
+            backoff=qiniu.retry.ExponentialBackoff(base_delay=0.1, max_delay=0.3, full_jitter=False),
+            sleep=sleeps.append
+        )
+
+        with pytest.raises(ValueError):
+            for attempt in retrier:
+                with attempt:
+                    raise ValueError('mocked error')
+
+        assert sleeps == [0.1, 0.2, 0.3]
+
+    def test_retrier_with_retry_budget(self):
+        retry_budget = qiniu.retry.RetryBudget(ratio=1, min_retries_per_second=0, max_tokens=2)
+        retrier = qiniu.retry.Retrier(
+            policies=[MaxRetryPolicy(max_times=3)],
+            retry_budget=retry_budget
+        )
+
+        tried_times = []
+        for _ in range(2):
+            tried_times.append(0)
+            with pytest.raises(ValueError):
+                for attempt in retrier:
+                    with attempt:
+                        tried_times[-1] += 1
+                        raise ValueError('mocked error')
+
+        # 2 tokens initially, and 1 token deposited by each request
+        assert tried_times == [3, 2]
+        stats = retry_budget.stats()
+        assert stats.requests == 2
+        assert stats.retries == 3
+        assert stats.rejected_retries == 2
+
+
+class TestBackoff:
+    def test_exponential_backoff_with_jitter(self):
+        backoff = qiniu.retry.ExponentialBackoff(base_delay=0.1, max_delay=1)
+        for retried_times in range(100):
+            assert 0 <= backoff.get_delay(retried_times, 0) <= min(1, 0.1 * 2 ** retried_times)
+
+    def test_decorrelated_jitter_backoff(self):
+        backoff = qiniu.retry.DecorrelatedJitterBackoff(base_delay=0.1, max_delay=1)
+        delay = 0
+        for retried_times in range(100):
+            next_delay = backoff.get_delay(retried_times, delay)
+            assert 0.1 <= next_delay <= min(1, max(0.1, delay * 3))
+            delay = next_delay
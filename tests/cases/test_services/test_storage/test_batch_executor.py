@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+
+from qiniu import BatchExecutor, build_batch_delete
+from qiniu.http import ResponseInfo
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.text_body = ''
+        self.error = 'mocked error'
+        self._body = body
+
+    def json(self):
+        return self._body if self._body is not None else {}
+
+    def need_retry(self):
+        return self.status_code >= 500
+
+
+class FakeBucketManager:
+    def __init__(self, fail_times_by_key=None, request_failures=0):
+        self.fail_times_by_key = dict(fail_times_by_key or {})
+        self.request_failures = request_failures
+        self.requested_sizes = []
+        self.lock = threading.Lock()
+
+    def batch(self, operations):
+        with self.lock:
+            self.requested_sizes.append(len(operations))
+            if self.request_failures > 0:
+                self.request_failures -= 1
+                return None, ResponseInfo(None, Exception('mocked connection error'))
+            results = []
+            for op in operations:
+                if self.fail_times_by_key.get(op, 0) > 0:
+                    self.fail_times_by_key[op] -= 1
+                    results.append({'code': 599, 'data': {'error': 'mocked'}})
+                elif op == build_batch_delete('bucket', ['not-found'])[0]:
+                    results.append({'code': 612, 'data': {'error': 'no such file or directory'}})
+                else:
+                    results.append({'code': 200})
+        if all(r['code'] == 200 for r in results):
+            return results, FakeResponse(200)
+        return None, FakeResponse(298, results)
+
+
+class TestBatchExecutor:
+    def test_chunk_and_keep_order(self):
+        keys = ['key-{0}'.format(i) for i in range(2500)]
+        bucket_manager = FakeBucketManager()
+        executor = BatchExecutor(bucket_manager, max_in_flight=3)
+
+        results = list(executor.execute(build_batch_delete('bucket', keys)))
+
+        assert [r.key for r in results] == keys
+        assert all(r.code == 200 and r.bucket == 'bucket' for r in results)
+        assert sorted(bucket_manager.requested_sizes) == [500, 1000, 1000]
+
+    def test_retry_failed_ops_only(self):
+        ops = build_batch_delete('bucket', ['a', 'b', 'c:with:colon', 'not-found'])
+        bucket_manager = FakeBucketManager(fail_times_by_key={ops[1]: 2})
+        executor = BatchExecutor(bucket_manager, retry_interval=0)
+
+        results = list(executor.execute(iter(ops)))
+
+        assert [(r.key, r.code) for r in results] == [
+            ('a', 200),
+            ('b', 200),
+            ('c:with:colon', 200),
+            ('not-found', 612)
+        ]
+        assert bucket_manager.requested_sizes == [4, 1, 1]
+
+    def test_give_up_after_max_retry_times(self):
+        ops = build_batch_delete('bucket', ['a', 'b'])
+        bucket_manager = FakeBucketManager(fail_times_by_key={ops[0]: 10})
+        executor = BatchExecutor(bucket_manager, max_retry_times=2, retry_interval=0)
+
+        results = list(executor.execute(ops))
+
+        assert [r.code for r in results] == [599, 200]
+        assert bucket_manager.requested_sizes == [2, 1, 1]
+
+    def test_retry_whole_request(self):
+        ops = build_batch_delete('bucket', ['a', 'b'])
+        bucket_manager = FakeBucketManager(request_failures=1)
+        executor = BatchExecutor(bucket_manager, retry_interval=0)
+
+        results = list(executor.execute(ops))
+
+        assert [r.code for r in results] == [200, 200]
+        assert bucket_manager.requested_sizes == [2, 2]
+
+    def test_invalid_batch_size(self):
+        with pytest.raises(ValueError):
+            BatchExecutor(FakeBucketManager(), batch_size=1001)
@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+
+from qiniu import Auth, BucketManager
+from qiniu.http import ResponseInfo
+
+
+class FakeListResponse:
+    status_code = 200
+    text_body = ''
+
+
+def make_fake_list(keys, calls=None, fail_prefix=None):
+    """
+    Simulate the RSF list API on sorted keys.
+    The marker is the index of the next key.
+    """
+    keys = sorted(keys)
+    lock = threading.Lock()
+
+    def fake_list(bucket, prefix=None, marker=None, limit=None, delimiter=None):
+        if calls is not None:
+            with lock:
+                calls.append((prefix, marker, delimiter))
+        if fail_prefix is not None and prefix == fail_prefix:
+            return None, False, ResponseInfo(None, Exception('mocked error'))
+        prefix = prefix or ''
+        limit = limit or 1000
+        start = int(marker) if marker else 0
+        items, common_prefixes = [], []
+        i = start
+        candidates = [k for k in keys if k.startswith(prefix)]
+        while i < len(candidates) and len(items) + len(common_prefixes) < limit:
+            k = candidates[i]
+            i += 1
+            if delimiter and delimiter in k[len(prefix):]:
+                cp = prefix + k[len(prefix):].split(delimiter)[0] + delimiter
+                common_prefixes.append(cp)
+                # skip the keys under the common prefix like RSF
+                while i < len(candidates) and candidates[i].startswith(cp):
+                    i += 1
+                continue
+            items.append({'key': k})
+        ret = {'items': items}
+        if common_prefixes:
+            ret['commonPrefixes'] = common_prefixes
+        if i < len(candidates):
+            ret['marker'] = str(i)
+        return ret, 'marker' not in ret, FakeListResponse()
+
+    return fake_list
+
+
+@pytest.fixture(scope='function')
+def fake_bucket_manager():
+    yield BucketManager(Auth('fake-ak', 'fake-sk'))
+
+
+class TestIterObjects:
+    def test_follow_markers(self, fake_bucket_manager, monkeypatch):
+        keys = ['k{0:03d}'.format(i) for i in range(25)]
+        calls = []
+        monkeypatch.setattr(fake_bucket_manager, 'list', make_fake_list(keys, calls))
+
+        result = [item['key'] for item in fake_bucket_manager.iter_objects('bucket', limit=10)]
+
+        assert result == keys
+        assert [c[1] for c in calls] == [None, '10', '20']
+
+    def test_prefix_shards_ordered(self, fake_bucket_manager, monkeypatch):
+        keys = ['a/{0}'.format(i) for i in range(7)] + ['b/{0}'.format(i) for i in range(5)]
+        monkeypatch.setattr(fake_bucket_manager, 'list', make_fake_list(keys))
+        stats = []
+
+        result = [
+            item['key']
+            for item in fake_bucket_manager.iter_objects(
+                'bucket',
+                limit=2,
+                prefixes=['b/', 'a/'],
+                max_workers=2,
+                shard_stats_handler=stats.append
+            )
+        ]
+
+        assert result == sorted(k for k in keys if k.startswith('b/')) + sorted(k for k in keys if k.startswith('a/'))
+        assert [(s.prefix, s.items, s.pages) for s in stats] == [('b/', 5, 3), ('a/', 7, 4)]
+
+    def test_delimiter_shards_unordered(self, fake_bucket_manager, monkeypatch):
+        keys = ['top1', 'top2'] + [
+            '{0}/{1}'.format(d, i)
+            for d in ['x', 'y', 'z']
+            for i in range(4)
+        ]
+        monkeypatch.setattr(fake_bucket_manager, 'list', make_fake_list(keys))
+        stats = []
+
+        result = [
+            item['key']
+            for item in fake_bucket_manager.iter_objects(
+                'bucket',
+                limit=3,
+                shard_delimiter='/',
+                ordered=False,
+                shard_stats_handler=stats.append
+            )
+        ]
+
+        assert sorted(result) == sorted(keys)
+        assert sorted(s.prefix for s in stats if s.prefix) == ['x/', 'y/', 'z/']
+
+    def test_shard_failed(self, fake_bucket_manager, monkeypatch):
+        keys = ['a/1', 'b/1']
+        monkeypatch.setattr(fake_bucket_manager, 'list', make_fake_list(keys, fail_prefix='b/'))
+
+        with pytest.raises(RuntimeError):
+            list(fake_bucket_manager.iter_objects('bucket', prefixes=['a/', 'b/']))
+
+    def test_stop_early(self, fake_bucket_manager, monkeypatch):
+        keys = ['k{0:03d}'.format(i) for i in range(100)]
+        calls = []
+        monkeypatch.setattr(fake_bucket_manager, 'list', make_fake_list(keys, calls))
+
+        objects = fake_bucket_manager.iter_objects('bucket', limit=10)
+        assert next(objects)['key'] == 'k000'
+        objects.close()
+
+        assert len(calls) < 10
+
+    def test_invalid_arguments(self, fake_bucket_manager):
+        with pytest.raises(ValueError):
+            fake_bucket_manager.iter_objects('bucket', prefix='a', prefixes=['b'])
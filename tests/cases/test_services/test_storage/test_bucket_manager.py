@@ -2,7 +2,11 @@ import pytest
 
 from qiniu.services.storage.bucket import BucketManager
 from qiniu.region import LegacyRegion
-from qiniu import build_batch_restore_ar
+from qiniu import Auth, build_batch_restore_ar
+from qiniu.http import regions_provider as regions_provider_module
+from qiniu.http.endpoint import Endpoint
+from qiniu.http.region import Region, ServiceName
+from qiniu.http.regions_refresher import RegionsRefresher
 
 
 @pytest.fixture(scope='function')
@@ -203,3 +207,50 @@ class TestBucketManager:
         assert resp.ok(), resp
         assert len(ret) > 0, resp
         assert any(b.get('tbl') for b in ret), ret
+
+    def test_memoize_regions_provider_and_retrier(self):
+        bucket_manager = BucketManager(Auth('fake-ak', 'fake-sk'))
+
+        regions_provider = bucket_manager._get_regions_provider('bucket-a')
+        retrier = bucket_manager._get_retrier('bucket-a', [ServiceName.RS])
+
+        assert bucket_manager._get_regions_provider('bucket-a') is regions_provider
+        assert bucket_manager._get_retrier('bucket-a', [ServiceName.RS]) is retrier
+        assert bucket_manager._get_regions_provider('bucket-b') is not regions_provider
+        assert bucket_manager._get_retrier('bucket-a', [ServiceName.RSF]) is not retrier
+
+    def test_memoized_regions_touch_refresher(self, monkeypatch, rand_string):
+        touched_keys = []
+
+        class _RecordingRegionsRefresher(RegionsRefresher):
+            def touch(self, provider):
+                touched_keys.append(provider.cache_key)
+                super(_RecordingRegionsRefresher, self).touch(provider)
+
+        refresher = _RecordingRegionsRefresher()
+        monkeypatch.setattr(regions_provider_module, 'default_regions_refresher', refresher)
+        bucket_manager = BucketManager(Auth('fake-ak', 'fake-sk'))
+        bucket_name = 'bucket-' + rand_string(8)
+        retrier = bucket_manager._get_retrier(bucket_name, [ServiceName.RS])
+        cached_regions_provider = bucket_manager._get_regions_provider(bucket_name).base_regions_provider
+        try:
+            cached_regions_provider.persist_path = ''
+            cached_regions_provider.set_regions([
+                Region(
+                    region_id='z0',
+                    services={ServiceName.RS: [Endpoint('rs.example.com')]},
+                    ttl=3600
+                )
+            ])
+
+            for _ in range(3):
+                for attempt in retrier:
+                    with attempt:
+                        assert attempt.context['endpoint'].host == 'rs.example.com'
+                        break
+
+            # the memoized regions are still marked used, so they're refreshed before expired
+            assert touched_keys == [cached_regions_provider.cache_key] * 3
+        finally:
+            refresher.stop()
+            regions_provider_module._global_cache_scope.memo_cache.clear()
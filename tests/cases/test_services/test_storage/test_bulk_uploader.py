@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+
+import pytest
+
+from qiniu import Auth
+from qiniu.http.region import Region
+from qiniu.services.storage.bulk_uploader import BulkUploader
+
+
+class _FakeResp(object):
+    def __init__(self, ok):
+        self.status_code = 200 if ok else 400
+        self.error = None if ok else 'fake error'
+
+    def ok(self):
+        return self.status_code == 200
+
+
+class _FakeUploader(object):
+    def __init__(self, failed_keys=None):
+        self.failed_keys = failed_keys or set()
+        self.uploaded = []
+        self.up_token_expires = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def upload(self, key, file_path=None, modify_time=None, expired=None):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.up_token_expires.add(expired)
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight -= 1
+        if key in self.failed_keys:
+            return None, _FakeResp(False)
+        with self.lock:
+            self.uploaded.append(key)
+        return {'key': key, 'hash': 'hash-' + key}, _FakeResp(True)
+
+
+@pytest.fixture(scope='function')
+def local_dir(tmp_path):
+    for rel_path, size in [
+        ('a.txt', 10),
+        ('b/c.txt', 20),
+        ('b/d/e.bin', 2048),
+        ('f.bin', 4096)
+    ]:
+        file_path = tmp_path / 'local' / rel_path
+        if not file_path.parent.exists():
+            file_path.parent.mkdir(parents=True)
+        file_path.write_bytes(os.urandom(size))
+    yield str(tmp_path / 'local')
+
+
+def _new_bulk_uploader(failed_keys=None, **kwargs):
+    bulk_uploader = BulkUploader(
+        'bucket',
+        Auth('fake-ak', 'fake-sk'),
+        regions=[Region.from_region_id('z0')],
+        resume_threshold=1024,
+        **kwargs
+    )
+    bulk_uploader.form_uploader = _FakeUploader(failed_keys)
+    bulk_uploader.resume_uploader = _FakeUploader(failed_keys)
+    return bulk_uploader
+
+
+class TestBulkUploader:
+    def test_upload_dir(self, local_dir):
+        bulk_uploader = _new_bulk_uploader(failed_keys={'p/b/c.txt'})
+
+        results = list(bulk_uploader.upload_dir(local_dir, key_prefix='p/'))
+
+        assert sorted(r.key for r in results) == ['p/a.txt', 'p/b/c.txt', 'p/b/d/e.bin', 'p/f.bin']
+        assert [r.key for r in results if not r.ok] == ['p/b/c.txt']
+        assert sorted(bulk_uploader.form_uploader.uploaded) == ['p/a.txt']
+        assert sorted(bulk_uploader.resume_uploader.uploaded) == ['p/b/d/e.bin', 'p/f.bin']
+        assert bulk_uploader.form_uploader.up_token_expires | bulk_uploader.resume_uploader.up_token_expires == {3600}
+
+    def test_resume_by_manifest(self, local_dir, tmp_path):
+        manifest_path = str(tmp_path / 'manifest.jsonl')
+
+        bulk_uploader = _new_bulk_uploader(failed_keys={'b/c.txt'})
+        list(bulk_uploader.upload_dir(local_dir, manifest_path=manifest_path))
+        # a broken line by crashing
+        with open(manifest_path, 'a') as f:
+            f.write('{"key": "b/c.t')
+        with open(os.path.join(local_dir, 'a.txt'), 'ab') as f:
+            f.write(b'modified')
+
+        bulk_uploader = _new_bulk_uploader()
+        results = list(bulk_uploader.upload_dir(local_dir, manifest_path=manifest_path))
+
+        assert sorted(r.key for r in results if r.skipped) == ['b/d/e.bin', 'f.bin']
+        assert sorted(r.key for r in results if not r.skipped and r.ok) == ['a.txt', 'b/c.txt']
+
+    def test_manifest_in_local_dir_not_uploaded(self, local_dir):
+        manifest_path = os.path.join(local_dir, 'manifest.jsonl')
+        bulk_uploader = _new_bulk_uploader()
+
+        list(bulk_uploader.upload_dir(local_dir, manifest_path=manifest_path))
+        results = list(bulk_uploader.upload_dir(local_dir, manifest_path=manifest_path))
+
+        assert len(results) == 4
+        assert all(r.skipped for r in results)
+
+    def test_in_flight_limits(self, local_dir):
+        bulk_uploader = _new_bulk_uploader(max_in_flight_files=2, max_in_flight_bytes=4096)
+
+        files = [
+            (os.path.join(local_dir, 'b', 'd', 'e.bin'), 'key-{0}'.format(i))
+            for i in range(10)
+        ]
+        results = list(bulk_uploader.upload_files(files))
+
+        assert len(results) == 10 and all(r.ok for r in results)
+        assert bulk_uploader.resume_uploader.max_in_flight == 2
+
+        bulk_uploader = _new_bulk_uploader(max_in_flight_files=8, max_in_flight_bytes=2048)
+        list(bulk_uploader.upload_files(files))
+        assert bulk_uploader.resume_uploader.max_in_flight == 1
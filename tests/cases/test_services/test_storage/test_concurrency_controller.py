@@ -0,0 +1,127 @@
+import io
+import os
+import time
+
+import pytest
+
+from qiniu.services.storage.uploaders import resume_uploader_v2
+from qiniu.services.storage.uploaders.concurrency_controller import AIMDConcurrencyController
+from qiniu.services.storage.uploaders.resume_uploader_v2 import ResumeUploaderV2, _ResumeUploadV2Context
+
+
+class _FakeResponseInfo:
+    def ok(self):
+        return True
+
+    def need_retry(self):
+        return False
+
+
+class _FakeHTTPClient:
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def put(self, url, data, files, headers):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        self.in_flight -= 1
+        return {'etag': 'etag'}, _FakeResponseInfo()
+
+
+class TestAIMDConcurrencyController:
+    def test_increase_by_throughput(self):
+        controller = AIMDConcurrencyController(initial_limit=2, max_limit=4)
+        now = time.time()
+
+        # the first window
+        controller.on_part_done(size=100, started_at=now - 1, ok=True)
+        assert controller.limit == 2
+        controller.on_part_done(size=100, started_at=now - 1, ok=True)
+        assert controller.limit == 3
+
+        # the throughput of the next window is much higher
+        for _ in range(3):
+            controller.on_part_done(size=1000, started_at=now - 1, ok=True)
+        assert controller.limit == 4
+
+        # never exceed the max limit
+        for _ in range(4):
+            controller.on_part_done(size=10000, started_at=now - 1, ok=True)
+        assert controller.limit == 4
+
+    def test_decrease_by_throughput(self):
+        controller = AIMDConcurrencyController(initial_limit=3, max_limit=4)
+        now = time.time()
+        for _ in range(3):
+            controller.on_part_done(size=1000, started_at=now - 1, ok=True)
+        assert controller.limit == 4
+
+        for _ in range(4):
+            controller.on_part_done(size=100, started_at=now - 1, ok=True)
+        assert controller.limit == 3
+
+    def test_decrease_multiplicatively_by_errors(self):
+        controller = AIMDConcurrencyController(initial_limit=8, max_limit=16)
+
+        controller.on_part_done(size=100, started_at=time.time(), ok=False)
+        assert controller.limit == 4
+        controller.on_part_done(size=100, started_at=time.time(), ok=True, retries=1)
+        assert controller.limit == 2
+        controller.on_part_done(size=100, started_at=time.time(), ok=False)
+        controller.on_part_done(size=100, started_at=time.time(), ok=False)
+        assert controller.limit == 1
+
+    def test_invalid_limits(self):
+        with pytest.raises(ValueError):
+            AIMDConcurrencyController(initial_limit=8, max_limit=4)
+
+    def test_limit_in_flight_parts(self, monkeypatch):
+        http_client = _FakeHTTPClient()
+        monkeypatch.setattr(resume_uploader_v2, 'qn_http_client', http_client)
+        part_size = 1024 ** 2
+        uploader = ResumeUploaderV2(
+            'bucket',
+            part_size=part_size,
+            concurrency_controller=AIMDConcurrencyController(initial_limit=1, max_limit=1)
+        )
+        data_size = 4 * part_size
+        context = _ResumeUploadV2Context(
+            up_hosts=['https://upload.example.com'],
+            upload_id='upload-id',
+            expired_at=0,
+            part_size=part_size,
+            parts=[],
+            modify_time=0,
+            resumed=False,
+            etag_calculator=None
+        )
+
+        part, _resp = uploader.upload_parts(
+            up_token='ak:sign:eyJzY29wZSI6ImJ1Y2tldCJ9',
+            data=io.BytesIO(os.urandom(data_size)),
+            data_size=data_size,
+            context=context,
+            key='key'
+        )
+
+        assert part is not None
+        assert sorted(p.part_no for p in context.parts) == [1, 2, 3, 4]
+        assert http_client.max_in_flight == 1
+
+
+class TestAdaptivePartSize:
+    @pytest.mark.parametrize('data_size,expected_part_size', [
+        (10 * 1024 ** 2, 4 * 1024 ** 2),
+        (10 * 1024 ** 3, 16 * 1024 ** 2),
+        (50 * 1024 ** 3, 64 * 1024 ** 2),
+        (20 * 1024 ** 4, 1024 ** 3),
+    ])
+    def test_get_part_size(self, data_size, expected_part_size):
+        uploader = ResumeUploaderV2('bucket', adaptive_part_size=True)
+        assert uploader._get_part_size(data_size) == expected_part_size
+
+    def test_fixed_part_size(self):
+        uploader = ResumeUploaderV2('bucket', part_size=2 * 1024 ** 2)
+        assert uploader._get_part_size(50 * 1024 ** 3) == 2 * 1024 ** 2
@@ -0,0 +1,270 @@
+import os
+import re
+import threading
+
+import pytest
+
+from qiniu.compat import is_py2
+from qiniu.http.endpoint_health import EndpointHealthTracker
+from qiniu.services.storage.downloader import Downloader, DownloadError, DOWNLOADING_FILE_SUFFIX
+from qiniu.services.storage.upload_progress_recorder import UploadProgressRecorder
+from qiniu.utils import etag_stream, io_md5
+
+if is_py2:
+    pytest.skip('the range server requires python 3', allow_module_level=True)
+
+from http.server import BaseHTTPRequestHandler, HTTPServer  # noqa: E402
+from io import BytesIO  # noqa: E402
+from socketserver import ThreadingMixIn  # noqa: E402
+
+
+class RangeServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, content):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), RangeRequestHandler)
+        self.content = content
+        self.etag = etag_stream(BytesIO(content))
+        self.ranges = []
+        self.fail_from = None
+        self.lock = threading.Lock()
+
+    @property
+    def domain(self):
+        return 'http://127.0.0.1:{0}'.format(self.server_address[1])
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if not self.path.startswith('/file'):
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        content = server.content
+        start, end = re.match(r'bytes=(\d*)-(\d+)', self.headers['Range']).groups()
+        if start:
+            start, end = int(start), min(int(end), len(content) - 1)
+        else:
+            # the suffix range
+            start, end = max(0, len(content) - int(end)), len(content) - 1
+        if start >= len(content):
+            self.send_response(416)
+            self.send_header('Content-Range', 'bytes */{0}'.format(len(content)))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        with server.lock:
+            server.ranges.append((start, end))
+        if server.fail_from is not None and start >= server.fail_from:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(206)
+        self.send_header('Content-Range', 'bytes {0}-{1}/{2}'.format(start, end, len(content)))
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('ETag', '"{0}"'.format(server.etag))
+        self.end_headers()
+        self.wfile.write(content[start:end + 1])
+
+
+@pytest.fixture(scope='function')
+def range_server():
+    server = RangeServer(os.urandom(5 * 1024 * 1024 + 123))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope='function')
+def file_path(tmp_path):
+    yield str(tmp_path / 'downloaded')
+
+
+def _new_downloader(domains, **kwargs):
+    kwargs.setdefault('part_size', 1024 * 1024)
+    return Downloader(
+        domains=domains,
+        endpoint_health_tracker=None,
+        retry_budget=None,
+        **kwargs
+    )
+
+
+class TestDownloader:
+    def test_download_in_parts(self, range_server, file_path):
+        progress = []
+        result = _new_downloader([range_server.domain]).download_file(
+            'file',
+            file_path,
+            progress_handler=lambda downloaded, total: progress.append((downloaded, total))
+        )
+        with open(file_path, 'rb') as f:
+            assert io_md5(f) == io_md5(BytesIO(range_server.content))
+        assert result.size == len(range_server.content)
+        assert result.etag == range_server.etag
+        assert result.resumed_size == 0
+        assert len(range_server.ranges) == 6
+        assert progress[-1] == (result.size, result.size)
+        assert not os.path.exists(file_path + DOWNLOADING_FILE_SUFFIX)
+
+    def test_fail_over_domains(self, range_server, file_path):
+        downloader = _new_downloader(['http://127.0.0.1:1', range_server.domain])
+        result = downloader.download_file('file', file_path)
+        assert result.size == len(range_server.content)
+
+    def test_not_found(self, range_server, file_path):
+        downloader = _new_downloader([range_server.domain, range_server.domain])
+        with pytest.raises(DownloadError) as exc_info:
+            downloader.download_file('not-found', file_path)
+        assert exc_info.value.status_code == 404
+        # not retried
+        assert not os.path.exists(file_path)
+
+    def test_not_found_not_break_circuit(self, range_server, file_path):
+        tracker = EndpointHealthTracker(failure_threshold=1)
+        downloader = Downloader(
+            domains=[range_server.domain],
+            endpoint_health_tracker=tracker,
+            retry_budget=None,
+            part_size=1024 * 1024
+        )
+        for _ in range(3):
+            with pytest.raises(DownloadError):
+                downloader.download_file('not-found', file_path)
+
+        # the missing keys are not the failures of the healthy domain
+        assert tracker.is_available(range_server.domain.split('://')[1])
+        assert downloader.download_file('file', file_path).size == len(range_server.content)
+
+    def test_etag_mismatch(self, range_server, file_path):
+        range_server.etag = etag_stream(BytesIO(b'other content'))
+        with pytest.raises(DownloadError):
+            _new_downloader([range_server.domain]).download_file('file', file_path)
+        assert not os.path.exists(file_path)
+        assert not os.path.exists(file_path + DOWNLOADING_FILE_SUFFIX)
+
+    def test_resume(self, range_server, file_path, tmp_path):
+        recorder = UploadProgressRecorder(record_folder=str(tmp_path))
+        range_server.fail_from = 3 * 1024 * 1024
+        downloader = _new_downloader([range_server.domain], download_progress_recorder=recorder, max_workers=1)
+        with pytest.raises(DownloadError):
+            downloader.download_file('file', file_path)
+        assert os.path.exists(file_path + DOWNLOADING_FILE_SUFFIX)
+
+        range_server.fail_from = None
+        range_server.ranges = []
+        result = downloader.download_file('file', file_path)
+        assert result.resumed_size == 3 * 1024 * 1024
+        assert min(start for start, _ in range_server.ranges) == 3 * 1024 * 1024
+        with open(file_path, 'rb') as f:
+            assert io_md5(f) == io_md5(BytesIO(range_server.content))
+        assert recorder.get_upload_record(file_path + DOWNLOADING_FILE_SUFFIX, 'file') is None
+
+    @pytest.mark.parametrize('size_changed', [False, True])
+    def test_resume_after_modified(self, range_server, file_path, tmp_path, size_changed):
+        recorder = UploadProgressRecorder(record_folder=str(tmp_path))
+        range_server.fail_from = 3 * 1024 * 1024
+        downloader = _new_downloader([range_server.domain], download_progress_recorder=recorder, max_workers=1)
+        with pytest.raises(DownloadError):
+            downloader.download_file('file', file_path)
+        assert recorder.get_upload_record(file_path + DOWNLOADING_FILE_SUFFIX, 'file') is not None
+
+        # the file is overwritten on the server
+        range_server.content = os.urandom(len(range_server.content) + (1024 if size_changed else 0))
+        range_server.etag = etag_stream(BytesIO(range_server.content))
+        range_server.fail_from = None
+        range_server.ranges = []
+        result = downloader.download_file('file', file_path)
+
+        # the stale record is discarded and the file is downloaded again from the beginning
+        assert result.resumed_size == 0
+        assert result.etag == range_server.etag
+        assert (0, 1024 * 1024 - 1) in range_server.ranges
+        with open(file_path, 'rb') as f:
+            assert io_md5(f) == io_md5(BytesIO(range_server.content))
+        assert recorder.get_upload_record(file_path + DOWNLOADING_FILE_SUFFIX, 'file') is None
+
+        # and later downloads are not blocked
+        assert downloader.download_file('file', file_path).size == len(range_server.content)
+
+    def test_modified_while_downloading(self, range_server, file_path, tmp_path):
+        recorder = UploadProgressRecorder(record_folder=str(tmp_path))
+        content = range_server.content
+        downloader = _new_downloader([range_server.domain], download_progress_recorder=recorder, max_workers=1)
+
+        def modify(downloaded, total):
+            if downloaded >= 2 * 1024 * 1024:
+                range_server.etag = etag_stream(BytesIO(b'other content'))
+
+        with pytest.raises(DownloadError):
+            downloader.download_file('file', file_path, progress_handler=modify)
+        # nothing left to resume the stale parts from
+        assert not os.path.exists(file_path + DOWNLOADING_FILE_SUFFIX)
+        assert recorder.get_upload_record(file_path + DOWNLOADING_FILE_SUFFIX, 'file') is None
+
+        range_server.etag = etag_stream(BytesIO(content))
+        assert downloader.download_file('file', file_path).resumed_size == 0
+
+
+class TestObjectReader:
+    def test_read_footer(self, range_server):
+        content = range_server.content
+        with _new_downloader([range_server.domain]).open('file', block_size=64 * 1024) as f:
+            f.seek(-8, os.SEEK_END)
+            assert f.read(8) == content[-8:]
+            f.seek(-100, os.SEEK_CUR)
+            assert f.read(50) == content[-100:-50]
+            assert f.size == len(content)
+            assert f.read(1000) == content[-50:]
+            assert f.read(1) == b''
+        assert len(range_server.ranges) == 1
+
+    def test_sequential_read_ahead(self, range_server):
+        content = range_server.content
+        block_size = 64 * 1024
+        reader = _new_downloader([range_server.domain]).open(
+            'file',
+            block_size=block_size,
+            max_cache_size=32 * block_size,
+            max_read_ahead_size=8 * block_size
+        )
+        chunks = []
+        for chunk in iter(lambda: reader.read(block_size // 2), b''):
+            chunks.append(chunk)
+        assert b''.join(chunks) == content
+        blocks_count = (len(content) + block_size - 1) // block_size
+        # the adjacent blocks are coalesced, and read ahead
+        assert len(range_server.ranges) < blocks_count / 4
+        for start, end in range_server.ranges:
+            assert end - start + 1 <= 32 * block_size
+
+    def test_random_read_with_bounded_cache(self, range_server):
+        content = range_server.content
+        block_size = 16 * 1024
+        reader = _new_downloader([range_server.domain]).open(
+            'file',
+            block_size=block_size,
+            max_cache_size=4 * block_size
+        )
+        buf = bytearray(3 * block_size)
+        for pos in [123, 4 * 1024 * 1024, 5, 200000, len(content) - 10]:
+            reader.seek(pos)
+            n = reader.readinto(buf)
+            assert bytes(buf[:n]) == content[pos:pos + 3 * block_size]
+            assert reader.tell() == pos + n
+        assert len(reader._ObjectReader__blocks) <= 4
+
+    def test_read_larger_than_cache(self, range_server):
+        content = range_server.content
+        block_size = 64 * 1024
+        reader = _new_downloader([range_server.domain]).open('file', block_size=block_size, max_cache_size=2 * block_size)
+        assert reader.read() == content
@@ -0,0 +1,73 @@
+import io
+import os
+import threading
+from concurrent import futures
+
+import pytest
+
+from qiniu.services.storage.uploaders.io_chunked import IOChunked, read_chunk
+
+
+@pytest.fixture(scope='function')
+def chunked_file(tmp_path):
+    content = os.urandom(1024 * 1024 + 3)
+    file_path = str(tmp_path / 'chunked-file')
+    with open(file_path, 'wb') as f:
+        f.write(content)
+    with open(file_path, 'rb') as f:
+        yield f, content
+
+
+class TestReadChunk:
+    @pytest.mark.skipif(not hasattr(os, 'pread'), reason='os.pread is unavailable')
+    def test_read_file_without_lock(self, chunked_file):
+        f, content = chunked_file
+        lock = threading.Lock()
+        f.seek(10)
+
+        # the lock is held by others, reading by pread should not wait it
+        with lock:
+            data = read_chunk(f, chunk_offset=1024, chunk_size=4096, lock=lock)
+
+        assert data == content[1024:1024 + 4096]
+        assert f.tell() == 10
+
+    def test_read_concurrently(self, chunked_file):
+        f, content = chunked_file
+        lock = threading.Lock()
+        chunk_size = 64 * 1024
+
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            chunks = list(executor.map(
+                lambda offset: read_chunk(f, chunk_offset=offset, chunk_size=chunk_size, lock=lock),
+                range(0, len(content), chunk_size)
+            ))
+
+        assert b''.join(chunks) == content
+        assert len(chunks[-1]) == 3
+
+    def test_read_bytes_io(self):
+        content = os.urandom(1024)
+        lock = threading.Lock()
+
+        data = read_chunk(io.BytesIO(content), chunk_offset=100, chunk_size=200, lock=lock)
+
+        assert data == content[100:300]
+
+
+class TestIOChunked:
+    def test_read_and_seek(self, chunked_file):
+        f, content = chunked_file
+        chunked_data = IOChunked(
+            base_io=f,
+            chunk_offset=1000,
+            chunk_size=500,
+            lock=threading.Lock(),
+            buffer_size=200
+        )
+
+        first_read = b''.join(iter(lambda: chunked_data.read(1), b''))
+        chunked_data.seek(0)
+        second_read = b''.join(iter(lambda: chunked_data.read(1), b''))
+
+        assert first_read == second_read == content[1000:1500]
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+import binascii
+import io
+import os
+from email.parser import BytesParser
+
+import pytest
+import requests
+
+from qiniu.http.endpoint import Endpoint
+from qiniu.http.region import Region, ServiceName
+from qiniu.services.storage.uploaders import FormUploader, form_uploader
+from qiniu.services.storage.uploaders.multipart_encoder import MultipartEncoder
+
+
+def _parse_form(content_type, body):
+    message = BytesParser().parsebytes(
+        'Content-Type: {0}\r\n\r\n'.format(content_type).encode('utf-8') + body
+    )
+    return dict(
+        (part.get_param('name', header='content-disposition'), part)
+        for part in message.get_payload()
+    )
+
+
+class _FakeResponseInfo:
+    def __init__(self, ok):
+        self._ok = ok
+
+    def ok(self):
+        return self._ok
+
+    def need_retry(self):
+        return not self._ok
+
+
+class _FakeHTTPClient:
+    def __init__(self, failed_times=0):
+        self.failed_times = failed_times
+        self.bodies = []
+
+    def post(self, url, data, files, headers=None):
+        self.bodies.append((headers['Content-Type'], data.read()))
+        if len(self.bodies) <= self.failed_times:
+            return None, _FakeResponseInfo(ok=False)
+        return {'key': 'key', 'hash': 'hash'}, _FakeResponseInfo(ok=True)
+
+
+class TestMultipartEncoder:
+    @pytest.mark.parametrize('source', ['bytes', 'file', 'stream'])
+    def test_encode(self, tmp_path, source):
+        content = os.urandom(100 * 1024 + 7)
+        file_path = str(tmp_path / 'data')
+        with open(file_path, 'wb') as f:
+            f.write(content)
+        data = {
+            'bytes': lambda: content,
+            'file': lambda: open(file_path, 'rb'),
+            'stream': lambda: io.BufferedReader(io.BytesIO(content))
+        }[source]()
+
+        body = MultipartEncoder(
+            fields={'token': 'up-token', 'key': 'a/b c', 'crc32': 123},
+            file_name='na"me',
+            data=data,
+            data_size=len(content),
+            mime_type='text/plain'
+        )
+        encoded = b''
+        for chunk in iter(lambda: body.read(8192), b''):
+            encoded += chunk
+        if source == 'file':
+            data.close()
+
+        assert len(encoded) == len(body)
+        form = _parse_form(body.content_type, encoded)
+        assert form['token'].get_payload() == 'up-token'
+        assert form['key'].get_payload() == 'a/b c'
+        assert form['crc32'].get_payload() == '123'
+        assert form['file'].get_payload(decode=True) == content
+        assert form['file'].get_content_type() == 'text/plain'
+        assert 'filename="na%22me"' in form['file']['Content-Disposition']
+
+    def test_encode_non_ascii(self):
+        body = MultipartEncoder(
+            fields={'token': 'up-token', u'x:名称': u'中文/键', 'key': u'中文/键'},
+            file_name=u'文件.txt',
+            data=b'data',
+            data_size=4,
+            boundary='boundary'
+        )
+        encoded = body.read()
+
+        assert len(encoded) == len(body)
+        assert (
+            u'Content-Disposition: form-data; name="key"\r\n\r\n中文/键\r\n'.encode('utf-8')
+        ) in encoded
+        assert (
+            u'Content-Disposition: form-data; name="x:名称"\r\n\r\n中文/键\r\n'.encode('utf-8')
+        ) in encoded
+        assert (
+            u'Content-Disposition: form-data; name="file"; filename="文件.txt"\r\n'
+            u'Content-Type: application/octet-stream\r\n\r\ndata\r\n--boundary--\r\n'.encode('utf-8')
+        ) in encoded
+
+    def test_seek_and_content_length(self):
+        body = MultipartEncoder(fields={'token': 't'}, file_name='f', data=b'data', data_size=4)
+        first = body.read()
+        body.seek(0)
+
+        assert body.read() == first
+        body.seek(0)
+        prepared = requests.Request('POST', 'http://127.0.0.1', data=body).prepare()
+        assert prepared.headers['Content-Length'] == str(len(first))
+
+    def test_data_shorter_than_size(self):
+        body = MultipartEncoder(fields={}, file_name='f', data=io.BytesIO(b'data'), data_size=10)
+        with pytest.raises(IOError):
+            body.read()
+
+
+class TestFormUploaderWithEncoder:
+    @pytest.fixture(scope='function')
+    def http_client(self, monkeypatch):
+        client = _FakeHTTPClient(failed_times=1)
+        monkeypatch.setattr(form_uploader, 'qn_http_client', client)
+        return client
+
+    @pytest.fixture(scope='function')
+    def regions(self):
+        return [
+            Region(
+                'fake-id',
+                services={
+                    ServiceName.UP: [
+                        Endpoint('upload-a.example.com'),
+                        Endpoint('upload-b.example.com')
+                    ]
+                }
+            )
+        ]
+
+    @pytest.mark.parametrize('from_file', [False, True])
+    def test_upload_and_retry(self, tmp_path, http_client, regions, from_file):
+        content = os.urandom(1024 * 1024)
+        uploader = FormUploader('bucket', regions=regions)
+        upload_opts = {'data': content}
+        if from_file:
+            file_path = str(tmp_path / 'data')
+            with open(file_path, 'wb') as f:
+                f.write(content)
+            upload_opts = {'file_path': file_path}
+
+        ret, resp = uploader.upload('key', up_token='ak:sign:eyJzY29wZSI6ImJ1Y2tldCJ9', **upload_opts)
+
+        assert ret == {'key': 'key', 'hash': 'hash'}
+        assert len(http_client.bodies) == 2
+        for content_type, body in http_client.bodies:
+            form = _parse_form(content_type, body)
+            assert form['file'].get_payload(decode=True) == content
+            assert form['crc32'].get_payload() == str(binascii.crc32(content) & 0xFFFFFFFF)
+
+    @pytest.mark.parametrize('from_file', [False, True])
+    def test_upload_part_of_stream(self, tmp_path, http_client, regions, from_file):
+        content = os.urandom(100)
+        file_path = str(tmp_path / 'data')
+        with open(file_path, 'wb') as f:
+            f.write(content)
+        uploader = FormUploader('bucket', regions=regions)
+
+        with (open(file_path, 'rb') if from_file else io.BytesIO(content)) as data:
+            data.seek(5)
+            ret, resp = uploader.upload(
+                'key',
+                up_token='ak:sign:eyJzY29wZSI6ImJ1Y2tldCJ9',
+                data=data,
+                data_size=10
+            )
+
+        assert ret == {'key': 'key', 'hash': 'hash'}
+        for content_type, body in http_client.bodies:
+            form = _parse_form(content_type, body)
+            # the crc32 is of the sent bytes rather than the rest of the stream
+            assert form['file'].get_payload(decode=True) == content[5:15]
+            assert form['crc32'].get_payload() == str(binascii.crc32(content[5:15]) & 0xFFFFFFFF)
@@ -0,0 +1,161 @@
+import os
+import threading
+
+import pytest
+
+from qiniu.http import instrumentation
+from qiniu.http.instrumentation import add_request_hook, remove_request_hook, request_tags
+from qiniu.services.storage.uploaders import resume_uploader_v2
+from qiniu.services.storage.uploaders.io_chunked import BufferChunked, IterableReader, read_into_fully
+from qiniu.services.storage.uploaders.resume_uploader_v2 import ResumeUploaderV2, _ResumeUploadV2Context
+
+
+class _FakeResponseInfo:
+    def __init__(self, ok):
+        self._ok = ok
+
+    def ok(self):
+        return self._ok
+
+    def need_retry(self):
+        return not self._ok
+
+
+class _FakeHTTPClient:
+    def __init__(self, failed_hosts=None):
+        self.failed_hosts = failed_hosts or []
+        self.parts = {}
+        self.buffers = set()
+        self.service_names = []
+        self.lock = threading.Lock()
+
+    def put(self, url, data, files, headers):
+        body = data.read()
+        with self.lock:
+            self.buffers.add(id(data.view.obj))
+            self.service_names.append(getattr(instrumentation._request_tags, 'service_name', None))
+            if any(url.startswith(h) for h in self.failed_hosts):
+                return None, _FakeResponseInfo(ok=False)
+            self.parts[int(url.rsplit('/', 1)[-1])] = body
+        return {'etag': 'etag'}, _FakeResponseInfo(ok=True)
+
+
+def _new_context(part_size):
+    return _ResumeUploadV2Context(
+        up_hosts=['https://upload-a.example.com', 'https://upload-b.example.com'],
+        upload_id='upload-id',
+        expired_at=0,
+        part_size=part_size,
+        parts=[],
+        modify_time=0,
+        resumed=False,
+        etag_calculator=None
+    )
+
+
+def _pipe_reader(content):
+    read_fd, write_fd = os.pipe()
+
+    def write():
+        with os.fdopen(write_fd, 'wb') as f:
+            f.write(content)
+
+    threading.Thread(target=write).start()
+    return os.fdopen(read_fd, 'rb', 0)
+
+
+class TestStreamingUpload:
+    @pytest.mark.parametrize('concurrent', [False, True])
+    def test_upload_pipe(self, monkeypatch, concurrent):
+        http_client = _FakeHTTPClient(failed_hosts=['https://upload-a.example.com'])
+        monkeypatch.setattr(resume_uploader_v2, 'qn_http_client', http_client)
+        part_size = 1024 ** 2
+        opts = {'max_concurrent_workers': 2} if concurrent else {'concurrent_executor': None}
+        uploader = ResumeUploaderV2('bucket', part_size=part_size, **opts)
+        content = os.urandom(5 * part_size + 10)
+        context = _new_context(part_size)
+
+        with _pipe_reader(content) as data:
+            part, resp, data_size = uploader.upload_parts_streaming(
+                up_token='ak:sign:eyJzY29wZSI6ImJ1Y2tldCJ9',
+                data=data,
+                context=context,
+                key='key'
+            )
+
+        assert part is not None
+        assert data_size == len(content)
+        assert sorted(p.part_no for p in context.parts) == [1, 2, 3, 4, 5, 6]
+        # the failed parts are sent again from the buffers
+        assert b''.join(http_client.parts[i] for i in range(1, 7)) == content
+        assert len(http_client.buffers) <= (2 if concurrent else 1)
+
+    def test_upload_generator(self, monkeypatch):
+        http_client = _FakeHTTPClient()
+        monkeypatch.setattr(resume_uploader_v2, 'qn_http_client', http_client)
+        part_size = 1024 ** 2
+        uploader = ResumeUploaderV2('bucket', part_size=part_size)
+        chunks = [os.urandom(300 * 1024) for _ in range(10)]
+
+        part, resp, data_size = uploader.upload_parts_streaming(
+            up_token='ak:sign:eyJzY29wZSI6ImJ1Y2tldCJ9',
+            data=(c for c in chunks),
+            context=_new_context(part_size),
+            key='key'
+        )
+
+        assert part is not None
+        assert data_size == 3000 * 1024
+        assert b''.join(http_client.parts[i] for i in range(1, 4)) == b''.join(chunks)
+
+    def test_tag_requests_of_parts(self, monkeypatch):
+        http_client = _FakeHTTPClient()
+        monkeypatch.setattr(resume_uploader_v2, 'qn_http_client', http_client)
+        part_size = 1024 ** 2
+        uploader = ResumeUploaderV2('bucket', part_size=part_size, max_concurrent_workers=2)
+        # the requests are tagged only if any hook is added
+        metrics_list = []
+        add_request_hook(metrics_list.append)
+        try:
+            with request_tags(service_name='up'):
+                uploader.upload_parts_streaming(
+                    up_token='ak:sign:eyJzY29wZSI6ImJ1Y2tldCJ9',
+                    data=IterableReader([os.urandom(3 * part_size)]),
+                    context=_new_context(part_size),
+                    key='key'
+                )
+        finally:
+            remove_request_hook(metrics_list.append)
+
+        # the parts are uploaded in the executor threads, but tagged as the thread uploading the file
+        assert http_client.service_names == ['up'] * 3
+
+    def test_is_streaming(self):
+        assert not ResumeUploaderV2._is_streaming(b'data', None)
+        assert not ResumeUploaderV2._is_streaming(None, None)
+        assert ResumeUploaderV2._is_streaming(IterableReader([b'data']), 4)
+        with open(__file__, 'rb') as f:
+            assert ResumeUploaderV2._is_streaming(f, None)
+            assert not ResumeUploaderV2._is_streaming(f, 10)
+
+
+class TestStreamingIO:
+    def test_buffer_chunked(self):
+        buf = bytearray(b'0123456789')
+        chunked = BufferChunked(buf, 6)
+
+        assert len(chunked) == 6
+        assert chunked.read(4) == b'0123'
+        assert chunked.read() == b'45'
+        chunked.seek(0)
+        assert chunked.read() == b'012345'
+
+    def test_read_into_fully(self):
+        reader = IterableReader([b'ab', b'cde', b'f'])
+        buf = bytearray(4)
+
+        assert read_into_fully(reader, buf) == 4
+        assert bytes(buf) == b'abcd'
+        assert read_into_fully(reader, buf) == 2
+        assert bytes(buf[:2]) == b'ef'
+        assert read_into_fully(reader, buf) == 0
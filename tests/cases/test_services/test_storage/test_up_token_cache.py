@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from qiniu import Auth
+from qiniu.services.storage.uploaders import FormUploader
+from qiniu.services.storage.uploaders import up_token_cache as up_token_cache_module
+from qiniu.services.storage.uploaders.up_token_cache import UpTokenCache
+
+
+class _FakeTime(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class _CountingAuth(Auth):
+    def __init__(self):
+        super(_CountingAuth, self).__init__('fake-ak', 'fake-sk')
+        self.generated_times = 0
+        self.generated = threading.Event()
+
+    def upload_token(self, *args, **kwargs):
+        self.generated_times += 1
+        self.generated.set()
+        return 'token-{0}'.format(self.generated_times)
+
+
+@pytest.fixture(scope='function')
+def fake_time(monkeypatch):
+    fake = _FakeTime()
+    monkeypatch.setattr(up_token_cache_module, 'time', fake)
+    yield fake
+
+
+class TestUpTokenCache:
+    def test_reuse_by_scope_and_policy(self, fake_time):
+        cache = UpTokenCache()
+        auth = _CountingAuth()
+
+        token = cache.get(auth, 'bucket')
+        assert cache.get(auth, 'bucket') == token
+        assert cache.get(auth, 'bucket', key='key') != token
+        assert cache.get(auth, 'bucket', policy={'insertOnly': 1}) != token
+        assert cache.get(auth, 'bucket', policy={'insertOnly': 1}) == 'token-3'
+        assert auth.generated_times == 3
+
+    def test_refresh(self, fake_time):
+        cache = UpTokenCache(refresh_ratio=0.5, refresh_in_background=False)
+        auth = _CountingAuth()
+
+        assert cache.get(auth, 'bucket', expires=100) == 'token-1'
+        fake_time.now += 49
+        assert cache.get(auth, 'bucket', expires=100) == 'token-1'
+        fake_time.now += 2
+        assert cache.get(auth, 'bucket', expires=100) == 'token-2'
+
+    def test_refresh_in_background(self, fake_time):
+        cache = UpTokenCache(refresh_ratio=0.5)
+        auth = _CountingAuth()
+
+        cache.get(auth, 'bucket', expires=100)
+        auth.generated.clear()
+        fake_time.now += 60
+        # return the stale one and refresh in background
+        assert cache.get(auth, 'bucket', expires=100) == 'token-1'
+        assert auth.generated.wait(5)
+        deadline = time.time() + 5
+        while cache.get(auth, 'bucket', expires=100) != 'token-2' and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.get(auth, 'bucket', expires=100) == 'token-2'
+        assert auth.generated_times == 2
+
+        # too stale to return
+        fake_time.now += 80
+        assert cache.get(auth, 'bucket', expires=100) == 'token-3'
+
+    def test_max_size(self, fake_time):
+        cache = UpTokenCache(max_size=2)
+        auth = _CountingAuth()
+
+        for key in ['a', 'b', 'c']:
+            cache.get(auth, 'bucket', key=key)
+        cache.get(auth, 'bucket', key='c')
+        cache.get(auth, 'bucket', key='a')
+
+        assert auth.generated_times == 4
+
+
+class TestUploaderGetUpToken:
+    def test_get_up_token(self):
+        cache = UpTokenCache()
+        uploader = FormUploader('bucket', auth=Auth('fake-ak', 'fake-sk'), up_token_cache=cache)
+
+        up_token = uploader.get_up_token(expired=7200, policy={'insertOnly': 1})
+
+        assert uploader.get_up_token(expired=7200, policy={'insertOnly': 1}) == up_token
+        _, _, policy = Auth.up_token_decode(up_token)
+        assert policy['scope'] == 'bucket'
+        assert policy['insertOnly'] == 1
+
+    def test_without_cache(self):
+        uploader = FormUploader('bucket', auth=_CountingAuth(), up_token_cache=None)
+
+        uploader.get_up_token()
+        uploader.get_up_token()
+
+        assert uploader.auth.generated_times == 2
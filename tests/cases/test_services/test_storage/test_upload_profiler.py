@@ -0,0 +1,111 @@
+import io
+import json
+import os
+
+import pytest
+
+from qiniu.services.storage.uploaders import resume_uploader_v2
+from qiniu.services.storage.uploaders.resume_uploader_v2 import ResumeUploaderV2, _ResumeUploadV2Context
+from qiniu.services.storage.uploaders.upload_profiler import UploadProfiler
+
+
+def _add_part(profiler, part_no, worker, submitted_at, started_at, read_time, hash_time, put_time, retries=0):
+    part = profiler.new_part(part_no, size=1024 ** 2)
+    part.submitted_at = submitted_at
+    part.started_at = started_at
+    part.worker = worker
+    part.read_time = read_time
+    part.hash_time = hash_time
+    part.put_started_at = started_at + read_time + hash_time
+    part.put_time = put_time
+    part.retries = retries
+    part.finished_at = part.put_started_at + put_time
+    part.ok = True
+
+
+class _FakeResponseInfo:
+    def ok(self):
+        return True
+
+    def need_retry(self):
+        return False
+
+
+class _FakeHTTPClient:
+    def put(self, url, data, files, headers):
+        return {'etag': 'etag'}, _FakeResponseInfo()
+
+
+class TestUploadProfiler:
+    def test_summary(self):
+        profiler = UploadProfiler()
+        _add_part(profiler, 1, 'w1', submitted_at=0, started_at=0, read_time=1, hash_time=1, put_time=2)
+        _add_part(profiler, 2, 'w2', submitted_at=0, started_at=0, read_time=1, hash_time=1, put_time=4, retries=1)
+        _add_part(profiler, 3, 'w1', submitted_at=0, started_at=4, read_time=1, hash_time=1, put_time=2)
+
+        summary = profiler.summary()
+
+        assert summary.parts == 3
+        assert summary.total_size == 3 * 1024 ** 2
+        assert summary.elapsed == 8
+        assert summary.throughput == pytest.approx(3 / 8.0)
+        assert summary.workers == 2
+        # w1 is busy for 8s and w2 for 6s
+        assert summary.worker_utilization == pytest.approx(14 / 16.0)
+        assert summary.wait_time == 4
+        assert summary.put_time == 8
+        assert summary.retries == 1
+        assert summary.bottleneck == 'put'
+        assert summary.critical_path == {'read': 2, 'hash': 2, 'put': 4, 'idle': 0}
+
+    def test_summary_without_parts(self):
+        assert UploadProfiler().summary() is None
+
+    def test_export_chrome_trace(self, tmp_path):
+        profiler = UploadProfiler()
+        _add_part(profiler, 1, 'w1', submitted_at=0, started_at=1, read_time=1, hash_time=1, put_time=2)
+        trace_path = str(tmp_path / 'trace.json')
+
+        profiler.export_chrome_trace(trace_path)
+
+        with open(trace_path) as f:
+            events = json.load(f)['traceEvents']
+        assert [e['cat'] for e in events] == ['wait', 'read', 'hash', 'put']
+        assert events[3]['ts'] == 3e6
+        assert events[3]['dur'] == 2e6
+        assert events[3]['tid'] == 'w1'
+
+    @pytest.mark.parametrize('concurrent', [False, True])
+    def test_profile_upload_parts(self, monkeypatch, concurrent):
+        monkeypatch.setattr(resume_uploader_v2, 'qn_http_client', _FakeHTTPClient())
+        profiler = UploadProfiler()
+        part_size = 1024 ** 2
+        opts = {} if concurrent else {'concurrent_executor': None}
+        uploader = ResumeUploaderV2('bucket', part_size=part_size, upload_profiler=profiler, **opts)
+        data_size = 3 * part_size + 10
+        context = _ResumeUploadV2Context(
+            up_hosts=['https://upload.example.com'],
+            upload_id='upload-id',
+            expired_at=0,
+            part_size=part_size,
+            parts=[],
+            modify_time=0,
+            resumed=False,
+            etag_calculator=None
+        )
+
+        part, resp = uploader.upload_parts(
+            up_token='ak:sign:eyJzY29wZSI6ImJ1Y2tldCJ9',
+            data=io.BytesIO(os.urandom(data_size)),
+            data_size=data_size,
+            context=context,
+            key='key'
+        )
+
+        assert part is not None
+        timeline = profiler.timeline()
+        assert sorted(p['part_no'] for p in timeline) == [1, 2, 3, 4]
+        assert all(p['ok'] and p['host'] == 'https://upload.example.com' for p in timeline)
+        summary = profiler.summary()
+        assert summary.total_size == data_size
+        assert summary.retries == 0
@@ -0,0 +1,109 @@
+import sqlite3
+import time
+from concurrent import futures
+
+import pytest
+
+from qiniu import SQLiteUploadProgressRecorder
+from qiniu.services.storage.uploaders import ResumeUploaderV2
+
+
+@pytest.fixture(scope='function')
+def sqlite_recorder(tmp_path):
+    recorder = SQLiteUploadProgressRecorder(db_path=str(tmp_path / 'records.sqlite3'))
+    yield recorder
+    recorder.close()
+
+
+def _v2_record(parts_count, expired_at=None):
+    return {
+        'up_hosts': ['https://upload.qiniup.com'],
+        'upload_id': 'fake-upload-id',
+        'expired_at': expired_at or time.time() + 3600,
+        'part_size': 4 * 1024 * 1024,
+        'modify_time': 1,
+        'etags': [
+            {
+                'etag': 'etag-{0}'.format(i),
+                'partNumber': i
+            }
+            for i in range(1, parts_count + 1)
+        ]
+    }
+
+
+class TestSQLiteUploadProgressRecorder:
+    def test_set_get_delete(self, sqlite_recorder):
+        record = _v2_record(3)
+
+        assert not sqlite_recorder.has_upload_record('file', 'key')
+        assert sqlite_recorder.get_upload_record('file', 'key') is None
+
+        sqlite_recorder.set_upload_record('file', 'key', record)
+        assert sqlite_recorder.has_upload_record('file', 'key')
+        assert sqlite_recorder.get_upload_record('file', 'key') == record
+        # lookup by both of file name and key
+        assert not sqlite_recorder.has_upload_record('file', 'other-key')
+        assert not sqlite_recorder.has_upload_record(None, 'key')
+
+        sqlite_recorder.delete_upload_record('file', 'key')
+        assert not sqlite_recorder.has_upload_record('file', 'key')
+
+    def test_append_parts_incrementally(self, sqlite_recorder):
+        for parts_count in range(0, 5):
+            sqlite_recorder.set_upload_record('file', 'key', _v2_record(parts_count))
+        assert sqlite_recorder.get_upload_record('file', 'key')['etags'] == _v2_record(4)['etags']
+
+        # the recorded parts are kept, only the new ones are inserted
+        conn = sqlite3.connect(sqlite_recorder.db_path)
+        rows_before = conn.execute('SELECT rowid, idx FROM upload_record_items WHERE field = ?', ('etags',)).fetchall()
+        sqlite_recorder.set_upload_record('file', 'key', _v2_record(5))
+        rows_after = conn.execute('SELECT rowid, idx FROM upload_record_items WHERE field = ?', ('etags',)).fetchall()
+        conn.close()
+        assert rows_after[:4] == rows_before
+        assert len(rows_after) == 5
+
+        # rewrite if the recorded parts changed
+        record = _v2_record(2)
+        record['etags'][1]['etag'] = 'changed'
+        sqlite_recorder.set_upload_record('file', 'key', record)
+        assert sqlite_recorder.get_upload_record('file', 'key') == record
+
+    def test_sweep_expired(self, sqlite_recorder):
+        sqlite_recorder.set_upload_record('file', 'expired', _v2_record(2, expired_at=time.time() - 1))
+        sqlite_recorder.set_upload_record('file', 'valid', _v2_record(2))
+
+        assert sqlite_recorder.sweep_expired() == 1
+        assert not sqlite_recorder.has_upload_record('file', 'expired')
+        assert sqlite_recorder.has_upload_record('file', 'valid')
+
+        # not updated for a long time
+        assert sqlite_recorder.sweep_expired(now=time.time() + sqlite_recorder.max_age + 1) == 1
+        assert not sqlite_recorder.has_upload_record('file', 'valid')
+
+    def test_concurrent(self, sqlite_recorder):
+        def set_records(key):
+            for parts_count in range(1, 11):
+                sqlite_recorder.set_upload_record('file', key, _v2_record(parts_count))
+            return sqlite_recorder.get_upload_record('file', key)
+
+        keys = ['key-{0}'.format(i) for i in range(8)]
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            records = list(executor.map(set_records, keys))
+
+        assert all(r['etags'] == _v2_record(10)['etags'] for r in records)
+
+    def test_recover_by_uploader(self, sqlite_recorder):
+        sqlite_recorder.set_upload_record('file', 'key', _v2_record(2))
+        uploader = ResumeUploaderV2('bucket', upload_progress_recorder=sqlite_recorder)
+
+        context = uploader._initial_context(
+            key='key',
+            file_name='file',
+            modify_time=1,
+            part_size=None
+        )
+
+        assert context.resumed
+        assert context.upload_id == 'fake-upload-id'
+        assert [p.part_no for p in context.parts] == [1, 2]
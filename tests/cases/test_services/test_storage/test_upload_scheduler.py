@@ -0,0 +1,128 @@
+import threading
+
+import pytest
+
+from qiniu.services.storage.uploaders import ResumeUploaderV2
+from qiniu.services.storage.uploaders.upload_scheduler import UploadScheduler, UploadFlow, default_upload_scheduler
+
+
+@pytest.fixture(scope='function')
+def blocked_scheduler():
+    """
+    a scheduler with one worker blocked by the first work item,
+    so the order of the following work items could be asserted
+    """
+    scheduler = UploadScheduler(max_workers=1)
+    started, unblocked = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        unblocked.wait()
+
+    scheduler.submit(block)
+    started.wait()
+    yield scheduler, unblocked.set
+    unblocked.set()
+    scheduler.shutdown()
+
+
+class TestUploadScheduler:
+    def test_submit(self):
+        scheduler = UploadScheduler(max_workers=2)
+        ftrs = [scheduler.submit(lambda x: x * 2, i) for i in range(10)]
+        assert [f.result() for f in ftrs] == [i * 2 for i in range(10)]
+        scheduler.shutdown()
+
+    def test_exception(self):
+        scheduler = UploadScheduler(max_workers=1)
+
+        def fail():
+            raise ValueError('failed')
+
+        with pytest.raises(ValueError):
+            scheduler.submit(fail).result()
+        scheduler.shutdown()
+
+    def test_fair_across_flows(self, blocked_scheduler):
+        scheduler, unblock = blocked_scheduler
+        order = []
+        large_flow, small_flow = scheduler.new_flow(), scheduler.new_flow()
+        ftrs = [large_flow.submit(order.append, 'large') for _ in range(5)]
+        ftrs.append(small_flow.submit(order.append, 'small'))
+
+        unblock()
+        for f in ftrs:
+            f.result()
+
+        assert order == ['large', 'small', 'large', 'large', 'large', 'large']
+
+    def test_priority(self, blocked_scheduler):
+        scheduler, unblock = blocked_scheduler
+        order = []
+        low_flow, high_flow = scheduler.new_flow(priority=0), scheduler.new_flow(priority=1)
+        ftrs = [low_flow.submit(order.append, 'low') for _ in range(2)]
+        ftrs += [high_flow.submit(order.append, 'high') for _ in range(2)]
+
+        unblock()
+        for f in ftrs:
+            f.result()
+
+        assert order == ['high', 'high', 'low', 'low']
+
+    def test_max_in_flight(self):
+        scheduler = UploadScheduler(max_workers=4)
+        flow = scheduler.new_flow(max_in_flight=2)
+        lock = threading.Lock()
+        state = {'in_flight': 0, 'max_in_flight': 0}
+        barrier = threading.Event()
+
+        def work():
+            with lock:
+                state['in_flight'] += 1
+                state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+            barrier.wait(0.05)
+            with lock:
+                state['in_flight'] -= 1
+
+        ftrs = [flow.submit(work) for _ in range(8)]
+        for f in ftrs:
+            f.result()
+
+        assert state['max_in_flight'] == 2
+        scheduler.shutdown()
+
+    def test_cancel(self, blocked_scheduler):
+        scheduler, unblock = blocked_scheduler
+        order = []
+        flow = scheduler.new_flow()
+        cancelled = flow.submit(order.append, 'cancelled')
+        ftr = flow.submit(order.append, 'done')
+
+        assert cancelled.cancel()
+        unblock()
+        ftr.result()
+
+        assert order == ['done']
+
+    def test_submit_after_shutdown(self):
+        scheduler = UploadScheduler(max_workers=1)
+        scheduler.shutdown()
+        with pytest.raises(RuntimeError):
+            scheduler.submit(lambda: None)
+
+    def test_shared_by_uploaders(self):
+        uploader = ResumeUploaderV2('bucket', max_concurrent_workers=5, upload_priority=1)
+
+        executor = uploader._get_parts_executor()
+
+        assert uploader.concurrent_executor is default_upload_scheduler
+        assert isinstance(executor, UploadFlow)
+        assert executor.max_in_flight == 5
+        assert executor.priority == 1
+
+    def test_custom_executor(self):
+        scheduler = UploadScheduler()
+        uploader = ResumeUploaderV2('bucket', concurrent_executor=None)
+        assert uploader._get_parts_executor() is None
+        uploader = ResumeUploaderV2('bucket', concurrent_executor=scheduler.new_flow())
+        assert uploader._get_parts_executor() is uploader.concurrent_executor
@@ -1,4 +1,9 @@
+import io
+import os
 from datetime import datetime, timedelta, tzinfo
+from hashlib import sha1
+
+import pytest
 
 from qiniu import utils, compat
 
@@ -143,3 +148,75 @@ class TestUtils:
         base_dt = datetime(year=2011, month=8, day=3)
         now_dt = datetime.now()
         assert int((now_dt - base_dt).total_seconds()) == utils.dt2ts(now_dt) - utils.dt2ts(base_dt)
+
+
+@pytest.fixture(scope='class')
+def etag_test_files(tmp_path_factory):
+    tmp_dir = tmp_path_factory.mktemp('etag')
+    file_paths = []
+    for size in [0, 1, 4 * 1024 * 1024, 4 * 1024 * 1024 + 1, 9 * 1024 * 1024]:
+        file_path = str(tmp_dir / 'etag-{0}'.format(size))
+        with open(file_path, 'wb') as f:
+            f.write(os.urandom(size))
+        file_paths.append(file_path)
+    yield file_paths
+
+
+class TestEtagFiles:
+    @pytest.mark.parametrize('max_workers', [1, 4])
+    def test_same_as_etag(self, etag_test_files, max_workers):
+        results = utils.etag_files(etag_test_files, max_workers=max_workers)
+
+        assert results == [utils.etag(file_path) for file_path in etag_test_files]
+        assert results[0] == 'Fto5o-5ea0sNMlW_75VgGJCv2AcJ'
+
+    def test_progress(self, etag_test_files):
+        progress = []
+
+        utils.etag_files(
+            etag_test_files,
+            max_workers=2,
+            progress_handler=lambda hashed, total: progress.append((hashed, total))
+        )
+
+        total_size = sum(os.path.getsize(file_path) for file_path in etag_test_files)
+        assert progress[-1] == (total_size, total_size)
+        assert [p[0] for p in progress] == sorted(p[0] for p in progress)
+
+
+class TestEtagV2Calculator:
+    def test_4mb_parts_same_as_etag(self, etag_test_files):
+        file_path = etag_test_files[-1]
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        part_size = 4 * 1024 * 1024
+        calculator = utils.EtagV2Calculator()
+
+        # out of order
+        for offset in reversed(range(0, len(content), part_size)):
+            calculator.update_part(offset // part_size + 1, content[offset:offset + part_size])
+
+        assert calculator.etag() == utils.etag(file_path)
+
+    def test_other_part_size(self, etag_test_files):
+        file_path = etag_test_files[-1]
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        part_size = 5 * 1024 * 1024
+        parts = [content[:part_size], content[part_size:]]
+        calculator = utils.EtagV2Calculator()
+
+        # feed the part in small pieces
+        part_hasher = calculator.new_part_hasher()
+        for offset in range(0, part_size, 1024 * 1024 - 1):
+            part_hasher.update(parts[0][offset:min(offset + 1024 * 1024 - 1, part_size)])
+        calculator.set_part(1, part_hasher)
+        assert calculator.etag(parts_count=2) is None
+        calculator.update_part(2, parts[1])
+
+        expected_data = b''.join(
+            utils.urlsafe_base64_decode(utils.etag_stream(io.BytesIO(p)))[1:]
+            for p in parts
+        )
+        expected = utils.urlsafe_base64_encode(b'\x9e' + sha1(expected_data).digest())
+        assert calculator.etag() == calculator.etag(parts_count=2) == expected